@@ -0,0 +1,77 @@
+"""
+Benchmark of ``S3ArtifactRepository.log_artifacts`` against an in-memory S3 stand-in (moto), with
+a simulated per-request latency to approximate a remote object store.
+
+Usage:
+
+    python dev/benchmarks/artifact_upload.py --num-files 200 --file-size 65536 --latency 0.05
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import boto3
+from moto import mock_s3
+
+from mlflow.store.artifact.artifact_repo import UPLOAD_MAX_WORKERS_ENV_VAR
+from mlflow.store.artifact.s3_artifact_repo import S3ArtifactRepository
+
+BUCKET = "benchmark-bucket"
+
+
+def _create_artifacts(root, num_files, file_size):
+    for i in range(num_files):
+        subdir = os.path.join(root, "dir%d" % (i % 10))
+        os.makedirs(subdir, exist_ok=True)
+        with open(os.path.join(subdir, "file%d" % i), "wb") as f:
+            f.write(os.urandom(file_size))
+
+
+def _time_log_artifacts(local_dir, max_workers, run_index):
+    os.environ[UPLOAD_MAX_WORKERS_ENV_VAR] = str(max_workers)
+    repo = S3ArtifactRepository("s3://{}/run{}-{}".format(BUCKET, run_index, max_workers))
+    start_time = time.time()
+    repo.log_artifacts(local_dir)
+    return time.time() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-files", type=int, default=200)
+    parser.add_argument("--file-size", type=int, default=64 * 1024, help="File size in bytes")
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Simulated latency per request, in seconds"
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    def simulate_latency(**kwargs):
+        time.sleep(args.latency)
+
+    with mock_s3(), tempfile.TemporaryDirectory() as local_dir:
+        boto3.setup_default_session()
+        # Registered on the default session so that it also applies to the clients created by
+        # the artifact repository
+        boto3.DEFAULT_SESSION.events.register("before-sign.s3.PutObject", simulate_latency)
+        boto3.client("s3").create_bucket(Bucket=BUCKET)
+        _create_artifacts(local_dir, args.num_files, args.file_size)
+
+        print("{:>8} {:>12} {:>12}".format("workers", "seconds", "files/s"))
+        for max_workers in args.workers:
+            elapsed = min(
+                _time_log_artifacts(local_dir, max_workers, run_index)
+                for run_index in range(args.repeat)
+            )
+            print(
+                "{:>8} {:>12.3f} {:>12.1f}".format(max_workers, elapsed, args.num_files / elapsed)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark of the schema enforcement of pyfunc models on wide column-based schemas. For each number
+of rows, compares the enforcement plans compiled once per schema with the enforcement of each
+column by ``mlflow.pyfunc._enforce_schema``, for inputs whose types match the schema and for
+inputs of which a fraction of the columns must be converted.
+
+Usage:
+
+    python dev/benchmarks/schema_enforcement.py --columns 500 --rows 1 10 1000
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from mlflow.pyfunc import _SchemaEnforcer, _enforce_schema
+from mlflow.types import ColSpec, DataType, Schema
+
+# Types of the columns of the schema, and of the inputs that are converted to them
+COLUMN_TYPES = [
+    (DataType.long, np.int64, np.int32),
+    (DataType.double, np.float64, np.float32),
+    (DataType.float, np.float32, np.float32),
+    (DataType.integer, np.int32, np.int16),
+    (DataType.boolean, np.bool_, np.bool_),
+]
+
+
+def _make_schema_and_input(num_rows, num_columns, converted_fraction):
+    columns = {}
+    specs = []
+    for i in range(num_columns):
+        data_type, dtype, converted_dtype = COLUMN_TYPES[i % len(COLUMN_TYPES)]
+        name = "c{}".format(i)
+        if i < num_columns * converted_fraction:
+            dtype = converted_dtype
+        columns[name] = (np.random.rand(num_rows) * 100).astype(dtype)
+        specs.append(ColSpec(data_type, name))
+    return Schema(specs), pd.DataFrame(columns)
+
+
+def _time_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start_time)
+    return np.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 10, 1000])
+    parser.add_argument("--columns", type=int, default=500)
+    parser.add_argument(
+        "--converted",
+        type=float,
+        nargs="+",
+        default=[0, 0.1],
+        help="Fractions of converted columns",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Number of timed runs per case")
+    args = parser.parse_args()
+
+    # The legacy enforcement warns that the DataFrames that it builds column by column are
+    # fragmented
+    warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+    print(
+        "{:>8} {:>10} {:>12} {:>12} {:>9}".format(
+            "rows", "converted", "legacy ms", "plan ms", "speedup"
+        )
+    )
+    for num_rows in args.rows:
+        for converted_fraction in args.converted:
+            schema, df = _make_schema_and_input(num_rows, args.columns, converted_fraction)
+            enforcer = _SchemaEnforcer(schema)
+            # Compile the plan of the input before timing the enforcement
+            enforcer.enforce(df)
+            legacy_ms = _time_ms(lambda: _enforce_schema(df, schema), args.repeat)
+            plan_ms = _time_ms(lambda: enforcer.enforce(df), args.repeat)
+            print(
+                "{:>8} {:>10} {:>12.3f} {:>12.3f} {:>8.1f}x".format(
+                    num_rows, converted_fraction, legacy_ms, plan_ms, legacy_ms / plan_ms
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
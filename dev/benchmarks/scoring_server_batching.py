@@ -0,0 +1,107 @@
+"""
+Latency and throughput benchmark of the pyfunc scoring server with and without adaptive
+micro-batching. A threaded in-process server scores a model with a fixed per-call overhead, which
+approximates the per-call cost of vectorized models, while concurrent clients send small requests.
+
+Usage:
+
+    python dev/benchmarks/scoring_server_batching.py --clients 32 --requests 2000 \
+        --call-overhead-ms 2 --max-batch-sizes 1 8 32 64
+"""
+import argparse
+import logging
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+from werkzeug.serving import make_server
+
+import mlflow.pyfunc
+from mlflow.pyfunc import scoring_server
+
+
+class OverheadModel(mlflow.pyfunc.PythonModel):
+    def __init__(self, call_overhead_ms):
+        self.call_overhead_ms = call_overhead_ms
+
+    def predict(self, context, model_input):
+        # Busy wait, as the per-call overhead of vectorized models is CPU-bound and holds the GIL
+        deadline = time.perf_counter() + self.call_overhead_ms / 1000.0
+        while time.perf_counter() < deadline:
+            pass
+        return model_input.sum(axis=1)
+
+
+def _run_benchmark(model, max_batch_size, max_batch_latency_ms, num_clients, num_requests, rows):
+    app = scoring_server.init(model, max_batch_size, max_batch_latency_ms)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    url = "http://127.0.0.1:{}/invocations".format(server.server_port)
+    payload = pd.DataFrame(np.random.rand(rows, 4), columns=list("abcd")).to_json(orient="split")
+    headers = {"Content-Type": scoring_server.CONTENT_TYPE_JSON_SPLIT_ORIENTED}
+    local = threading.local()
+
+    def score(_):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start_time = time.time()
+        local.session.post(url, data=payload, headers=headers).raise_for_status()
+        return time.time() - start_time
+
+    try:
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=num_clients) as executor:
+            latencies = list(executor.map(score, range(num_requests)))
+        elapsed = time.time() - start_time
+    finally:
+        server.shutdown()
+    latencies_ms = np.array(latencies) * 1000
+    return (
+        num_requests / elapsed,
+        np.percentile(latencies_ms, 50),
+        np.percentile(latencies_ms, 99),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=32, help="Number of concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=1, help="Number of rows per request")
+    parser.add_argument("--call-overhead-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--max-batch-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mlflow.pyfunc.save_model(
+            tmp_dir + "/model",
+            python_model=OverheadModel(args.call_overhead_ms),
+            pip_requirements=[],
+        )
+        model = mlflow.pyfunc.load_model(tmp_dir + "/model")
+        print(
+            "{:>15} {:>12} {:>12} {:>12}".format("max batch size", "requests/s", "p50 ms", "p99 ms")
+        )
+        for max_batch_size in args.max_batch_sizes:
+            throughput, p50, p99 = _run_benchmark(
+                model,
+                max_batch_size,
+                args.max_batch_latency_ms,
+                args.clients,
+                args.requests,
+                args.rows,
+            )
+            print(
+                "{:>15} {:>12.1f} {:>12.2f} {:>12.2f}".format(max_batch_size, throughput, p50, p99)
+            )
+
+
+if __name__ == "__main__":
+    main()
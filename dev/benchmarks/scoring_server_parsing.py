@@ -0,0 +1,106 @@
+"""
+Benchmark of the parsing of the request bodies of the pyfunc scoring server. For each orientation
+and payload size, compares the fast path, which parses the body straight from bytes, with parsing
+the decoded body with ``pandas.read_json``, with and without a model signature.
+
+Usage:
+
+    python dev/benchmarks/scoring_server_parsing.py --rows 10 1000 100000 --columns 10
+"""
+import argparse
+import json
+import time
+import warnings
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from mlflow.pyfunc import scoring_server
+from mlflow.types.utils import _infer_schema
+
+CONTENT_TYPES = {
+    "split": scoring_server.CONTENT_TYPE_JSON_SPLIT_ORIENTED,
+    "records": scoring_server.CONTENT_TYPE_JSON_RECORDS_ORIENTED,
+    "inferred": scoring_server.CONTENT_TYPE_JSON,
+    "csv": scoring_server.CONTENT_TYPE_CSV,
+}
+
+
+def _make_payload(orient, num_rows, num_columns):
+    df = pd.DataFrame(
+        {
+            "c{}".format(i): np.random.rand(num_rows)
+            if i % 3
+            else np.random.randint(0, 1000, num_rows)
+            for i in range(num_columns - 1)
+        }
+    )
+    df["label"] = np.random.choice(["a", "bb", "ccc"], num_rows)
+    if orient == "csv":
+        body = df.to_csv(index=False)
+    else:
+        body = df.to_json(orient="records" if orient == "records" else "split")
+    with warnings.catch_warnings():
+        # Ignore the warning about integer columns, which cannot represent missing values
+        warnings.simplefilter("ignore")
+        schema = _infer_schema(df)
+    return body.encode("utf-8"), schema
+
+
+def _parse_with_pandas(orient, body, schema):
+    # Parsing of the scoring server before the fast path
+    data = body.decode("utf-8")
+    if orient == "csv":
+        return pd.read_csv(StringIO(data))
+    if orient == "inferred":
+        orient = "records" if isinstance(json.loads(data), list) else "split"
+    return scoring_server.parse_json_input(StringIO(data), orient=orient, schema=schema)
+
+
+def _parse_with_fast_path(orient, body, schema):
+    return scoring_server._parse_invocation_input(CONTENT_TYPES[orient], body, schema)
+
+
+def _time_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start_time)
+    return np.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--orients", nargs="+", default=list(CONTENT_TYPES))
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs per case")
+    args = parser.parse_args()
+
+    print(
+        "{:>10} {:>8} {:>8} {:>12} {:>12} {:>9}".format(
+            "orient", "rows", "schema", "pandas ms", "fast ms", "speedup"
+        )
+    )
+    for orient in args.orients:
+        for num_rows in args.rows:
+            body, schema = _make_payload(orient, num_rows, args.columns)
+            for use_schema in [False, True]:
+                input_schema = schema if use_schema else None
+                pandas_ms = _time_ms(
+                    lambda: _parse_with_pandas(orient, body, input_schema), args.repeat
+                )
+                fast_ms = _time_ms(
+                    lambda: _parse_with_fast_path(orient, body, input_schema), args.repeat
+                )
+                print(
+                    "{:>10} {:>8} {:>8} {:>12.3f} {:>12.3f} {:>8.1f}x".format(
+                        orient, num_rows, str(use_schema), pandas_ms, fast_ms, pandas_ms / fast_ms
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -339,7 +339,9 @@ def _validate_static_prefix(ctx, param, value):  # pylint: disable=unused-argume
     default=None,
     help="Path to the directory where metrics will be stored. If the directory "
     "doesn't exist, it will be created. "
-    "Activate prometheus exporter to expose metrics on /metrics endpoint.",
+    "Activate prometheus exporter to expose metrics on /metrics endpoint. Exported metrics "
+    "include per-handler latencies, request and response payload sizes, artifact download "
+    "throughput, per-store-method latencies and database connection pool usage.",
 )
 def server(
     backend_store_uri,
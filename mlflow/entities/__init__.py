@@ -10,6 +10,7 @@ from mlflow.entities.lifecycle_stage import LifecycleStage
 from mlflow.entities.metric import Metric
 from mlflow.entities.param import Param
 from mlflow.entities.run import Run
+from mlflow.entities.run_aggregation_group import RunAggregationGroup
 from mlflow.entities.run_data import RunData
 from mlflow.entities.run_info import RunInfo
 from mlflow.entities.run_status import RunStatus
@@ -23,6 +24,7 @@ __all__ = [
     "Metric",
     "Param",
     "Run",
+    "RunAggregationGroup",
     "RunData",
     "RunInfo",
     "RunStatus",
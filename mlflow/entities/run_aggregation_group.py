@@ -0,0 +1,60 @@
+from collections import OrderedDict
+
+from mlflow.entities._mlflow_object import _MLflowObject
+from mlflow.protos.service_pb2 import RunAggregationGroup as ProtoRunAggregationGroup
+
+
+class RunAggregationGroup(_MLflowObject):
+    """
+    Aggregated metric values of a group of runs sharing the same group-by values.
+    """
+
+    def __init__(self, group_by, aggregations):
+        self._group_by = OrderedDict(group_by)
+        self._aggregations = OrderedDict(aggregations)
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.__dict__ == other.__dict__
+        return False
+
+    @property
+    def group_by(self):
+        """
+        Dictionary mapping each group-by key (e.g. ``params.model_type``) to the value shared by
+        the runs of the group, or ``None`` if the runs have no value for the key.
+        """
+        return self._group_by
+
+    @property
+    def aggregations(self):
+        """
+        Dictionary mapping each aggregation (e.g. ``avg(metrics.accuracy)``) to its value, or
+        ``None`` if none of the runs of the group has a value for the aggregated metric.
+        """
+        return self._aggregations
+
+    def to_proto(self):
+        proto = ProtoRunAggregationGroup()
+        for key, value in self.group_by.items():
+            proto_key = proto.group_by.add()
+            proto_key.key = key
+            if value is not None:
+                proto_key.value = value
+        for aggregation, value in self.aggregations.items():
+            proto_value = proto.aggregations.add()
+            proto_value.aggregation = aggregation
+            if value is not None:
+                proto_value.value = value
+        return proto
+
+    @classmethod
+    def from_proto(cls, proto):
+        group_by = [
+            (key.key, key.value if key.HasField("value") else None) for key in proto.group_by
+        ]
+        aggregations = [
+            (value.aggregation, value.value if value.HasField("value") else None)
+            for value in proto.aggregations
+        ]
+        return cls(group_by, aggregations)
@@ -2,8 +2,10 @@ import logging
 import click
 import os
 
+from mlflow.exceptions import MlflowException
 from mlflow.models import Model
 from mlflow.models.model import MLMODEL_FILE_NAME
+from mlflow.protos.databricks_pb2 import INVALID_PARAMETER_VALUE
 from mlflow.store.artifact.models_artifact_repo import ModelsArtifactRepository
 from mlflow.tracking.artifact_utils import _download_artifact_from_uri
 from mlflow.utils import cli_args
@@ -31,7 +33,78 @@ def commands():
 @cli_args.WORKERS
 @cli_args.NO_CONDA
 @cli_args.INSTALL_MLFLOW
-def serve(model_uri, port, host, workers, no_conda=False, install_mlflow=False):
+@click.option(
+    "--max-batch-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Enable adaptive micro-batching: the inputs of concurrent requests are merged into"
+    " batches of at most this number of rows, which are scored with a single call to the"
+    " model's predict method. Only applies to models with the 'python_function' flavor"
+    " whose predictions for a row do not depend on the other rows. Default: 1 (disabled).",
+)
+@click.option(
+    "--max-batch-latency-ms",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Maximum time, in milliseconds, for which a request waits for other requests to fill"
+    " up its batch when batching is enabled (default: 5).",
+)
+@click.option(
+    "--asgi",
+    is_flag=True,
+    default=False,
+    help="Serve the model with the ASGI scoring server, run by uvicorn, instead of the WSGI"
+    " server. Requests are parsed on an event loop and predictions are made on a bounded pool"
+    " of threads or processes, so that each worker can serve many concurrent requests with a"
+    " single copy of the model. Requires uvicorn to be installed.",
+)
+@click.option(
+    "--inference-executor",
+    type=click.Choice(["thread", "process"]),
+    default=None,
+    help="With --asgi, make predictions on a pool of threads sharing the model, for I/O-bound"
+    " models or models that release the GIL, or on a pool of processes that each load the"
+    " model (default: thread).",
+)
+@click.option(
+    "--inference-workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="With --asgi, maximum number of concurrent predictions per worker"
+    " (default: number of CPUs plus 4, up to 32).",
+)
+@click.option(
+    "--preload",
+    is_flag=True,
+    default=False,
+    help="Load the model once in the gunicorn master process before forking the workers, which"
+    " share its memory pages through copy-on-write. Not suitable for models whose libraries"
+    " start threads or hold file descriptors when loading, which do not survive forks. Ignored"
+    " with --asgi and on Windows.",
+)
+@click.option(
+    "--warm-up",
+    is_flag=True,
+    default=False,
+    help="Make predictions for the input example saved with the model before serving requests,"
+    " so that lazy initialization, e.g. graph tracing or JIT compilation, does not slow down the"
+    " first requests. The server only reports healthy once the warm-up is done.",
+)
+def serve(
+    model_uri,
+    port,
+    host,
+    workers,
+    no_conda=False,
+    install_mlflow=False,
+    max_batch_size=None,
+    max_batch_latency_ms=None,
+    asgi=False,
+    inference_executor=None,
+    inference_workers=None,
+    preload=False,
+    warm_up=False,
+):
     """
     Serve a model saved with MLflow by launching a webserver on the specified host and port.
     The command supports models with the ``python_function`` or ``crate`` (R Function) flavor.
@@ -50,16 +123,103 @@ def serve(model_uri, port, host, workers, no_conda=False, install_mlflow=False):
             "columns": ["a", "b", "c"],
             "data": [[1, 2, 3], [4, 5, 6]]
         }'
+
+    Under high request rates with small payloads, vectorized models can be scored more
+    efficiently by merging concurrent requests into batches:
+
+    .. code-block:: bash
+
+        $ mlflow models serve -m runs:/my-run-id/model-path --max-batch-size 64
+
+    I/O-bound models, or models that release the GIL, can serve many concurrent requests from a
+    single copy of the model with the ASGI scoring server:
+
+    .. code-block:: bash
+
+        $ mlflow models serve -m runs:/my-run-id/model-path --asgi --inference-workers 16
     """
     return _get_flavor_backend(
-        model_uri, no_conda=no_conda, workers=workers, install_mlflow=install_mlflow
+        model_uri,
+        no_conda=no_conda,
+        workers=workers,
+        install_mlflow=install_mlflow,
+        max_batch_size=max_batch_size,
+        max_batch_latency_ms=max_batch_latency_ms,
+        asgi=asgi,
+        inference_executor=inference_executor,
+        inference_workers=inference_workers,
+        preload=preload,
+        warm_up=warm_up,
     ).serve(model_uri=model_uri, port=port, host=host)
 
 
+@commands.command("serve-multi-model")
+@click.option(
+    "--model-root",
+    default=None,
+    metavar="URI",
+    help="URI of a directory containing the models in '<name>/<version>' subdirectories, e.g. a"
+    " local path or an 's3://' URI. If not provided, models are loaded from the model registry.",
+)
+@cli_args.PORT
+@cli_args.HOST
+@cli_args.WORKERS
+@click.option(
+    "--max-models",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Maximum number of models kept in memory by each worker. The least recently used models"
+    " are evicted first (default: 32).",
+)
+@click.option(
+    "--max-cache-size-mb",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Maximum total size, in megabytes, of the files of the models kept in memory by each"
+    " worker (default: no limit).",
+)
+def serve_multi_model(model_root, port, host, workers, max_models=None, max_cache_size_mb=None):
+    """
+    Serve many models saved with MLflow from a single webserver. The models must have the
+    ``python_function`` flavor and are served in the current environment.
+
+    Models are loaded on their first request and kept in a least recently used cache. You can make
+    requests to ``POST /models/<name>/<version>/invocations``, with the same formats as the
+    ``/invocations`` endpoint of ``mlflow models serve``, and list the loaded models and the
+    metrics of the cache with ``GET /models``.
+
+    Example:
+
+    .. code-block:: bash
+
+        $ mlflow models serve-multi-model --model-root /mnt/models --max-models 100 &
+
+        $ curl http://127.0.0.1:5000/models/tenant-1/3/invocations \\
+            -H 'Content-Type: application/json' -d '{
+            "columns": ["a", "b", "c"],
+            "data": [[1, 2, 3], [4, 5, 6]]
+        }'
+    """
+    from mlflow.pyfunc.backend import serve_multi_model as _serve_multi_model
+
+    return _serve_multi_model(
+        port=port,
+        host=host,
+        workers=workers,
+        model_root_uri=model_root,
+        max_models=max_models,
+        max_cache_size_mb=max_cache_size_mb,
+    )
+
+
 @commands.command("predict")
 @cli_args.MODEL_URI
 @click.option(
-    "--input-path", "-i", default=None, help="CSV containing pandas DataFrame to predict against."
+    "--input-path",
+    "-i",
+    default=None,
+    help="File containing the pandas DataFrame to predict against, in the format specified by"
+    " --content-type. If not provided, the input is read from stdin.",
 )
 @click.option(
     "--output-path",
@@ -71,7 +231,9 @@ def serve(model_uri, port, host, workers, no_conda=False, install_mlflow=False):
     "--content-type",
     "-t",
     default="json",
-    help="Content type of the input file. Can be one of {'json', 'csv'}.",
+    help="Content type of the input file. Can be one of {'json', 'csv', 'arrow', 'parquet'}."
+    " 'arrow' denotes the Apache Arrow IPC streaming format. The 'arrow' and 'parquet' content"
+    " types require pyarrow.",
 )
 @click.option(
     "--json-format",
@@ -85,19 +247,77 @@ def serve(model_uri, port, host, workers, no_conda=False, install_mlflow=False):
     "https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.read_json"
     ".html",
 )
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Score the input in chunks of this number of rows and write the predictions of each"
+    " chunk as soon as they are made, so that inputs larger than memory can be scored (default:"
+    " 10000 rows if --workers or --output-format is specified). CSV, Arrow and Parquet inputs are"
+    " read incrementally. Only applies to python_function models.",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of worker processes scoring chunks of the input in parallel. Each worker loads"
+    " the model once. Predictions are written in the order of the input rows.",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(["json-lines", "csv", "parquet"]),
+    default=None,
+    help="Format of the predictions written in chunked mode (default: 'json-lines', with one"
+    " JSON object per prediction). 'parquet' requires pyarrow.",
+)
 @cli_args.NO_CONDA
 @cli_args.INSTALL_MLFLOW
 def predict(
-    model_uri, input_path, output_path, content_type, json_format, no_conda, install_mlflow
+    model_uri,
+    input_path,
+    output_path,
+    content_type,
+    json_format,
+    chunk_size,
+    workers,
+    output_format,
+    no_conda,
+    install_mlflow,
 ):
     """
     Generate predictions in json format using a saved MLflow model. For information about the input
     data formats accepted by this function, see the following documentation:
     https://www.mlflow.org/docs/latest/models.html#built-in-deployment-tools.
+
+    With --chunk-size, --workers or --output-format, the input is scored in chunks by a pool of
+    worker processes and the predictions are streamed to the output, e.g.
+
+    .. code-block:: bash
+
+        $ mlflow models predict -m runs:/<run_id>/model -i input.parquet -t parquet \\
+            --chunk-size 50000 --workers 4 --output-format parquet -o predictions.parquet
     """
+    from mlflow.pyfunc.backend import PyFuncBackend
+
     if content_type == "json" and json_format not in ("split", "records"):
         raise Exception("Unsupported json format '{}'.".format(json_format))
-    return _get_flavor_backend(model_uri, no_conda=no_conda, install_mlflow=install_mlflow).predict(
+    backend = _get_flavor_backend(
+        model_uri,
+        no_conda=no_conda,
+        install_mlflow=install_mlflow,
+        workers=workers,
+        chunk_size=chunk_size,
+        output_format=output_format,
+    )
+    is_chunked = chunk_size is not None or workers != 1 or output_format is not None
+    if is_chunked and not isinstance(backend, PyFuncBackend):
+        raise MlflowException(
+            "--chunk-size, --workers and --output-format only apply to python_function models,"
+            " but the model is scored by {}.".format(type(backend).__name__),
+            error_code=INVALID_PARAMETER_VALUE,
+        )
+    return backend.predict(
         model_uri=model_uri,
         input_path=input_path,
         output_path=output_path,
@@ -213,6 +213,7 @@ import pandas
 import yaml
 from copy import deepcopy
 import logging
+import warnings
 
 from typing import Any, Union, List, Dict
 import mlflow
@@ -496,6 +497,31 @@ def _enforce_tensor_schema(pfInput: PyFuncInput, input_schema: Schema):
     return new_pfInput
 
 
+def _check_missing_inputs(input_names, actual_cols):
+    expected_cols = set(input_names)
+    missing_cols = expected_cols - actual_cols
+    extra_cols = actual_cols - expected_cols
+    # Preserve order from the original columns, since missing/extra columns are likely to
+    # be in same order.
+    missing_cols = [c for c in input_names if c in missing_cols]
+    extra_cols = [c for c in actual_cols if c in extra_cols]
+    if missing_cols:
+        raise MlflowException(
+            "Model is missing inputs {0}."
+            " Note that there were extra inputs: {1}".format(missing_cols, extra_cols)
+        )
+
+
+def _check_input_count(input_schema: Schema, num_actual_columns):
+    if num_actual_columns < len(input_schema.inputs):
+        raise MlflowException(
+            "Model inference is missing inputs. The model signature declares "
+            "{0} inputs  but the provided value only has "
+            "{1} inputs. Note: the inputs were not named in the signature so we can "
+            "only verify their count.".format(len(input_schema.inputs), num_actual_columns)
+        )
+
+
 def _enforce_schema(pfInput: PyFuncInput, input_schema: Schema):
     """
     Enforces the provided input matches the model's input schema,
@@ -537,27 +563,10 @@ def _enforce_schema(pfInput: PyFuncInput, input_schema: Schema):
             actual_cols = set(pfInput.columns)
         elif isinstance(pfInput, dict):
             actual_cols = set(pfInput.keys())
-        missing_cols = expected_cols - actual_cols
-        extra_cols = actual_cols - expected_cols
-        # Preserve order from the original columns, since missing/extra columns are likely to
-        # be in same order.
-        missing_cols = [c for c in input_names if c in missing_cols]
-        extra_cols = [c for c in actual_cols if c in extra_cols]
-        if missing_cols:
-            raise MlflowException(
-                "Model is missing inputs {0}."
-                " Note that there were extra inputs: {1}".format(missing_cols, extra_cols)
-            )
+        _check_missing_inputs(input_names, actual_cols)
     elif not input_schema.is_tensor_spec():
         # The model signature does not specify column names => we can only verify column count.
-        num_actual_columns = len(pfInput.columns)
-        if num_actual_columns < len(input_schema.inputs):
-            raise MlflowException(
-                "Model inference is missing inputs. The model signature declares "
-                "{0} inputs  but the provided value only has "
-                "{1} inputs. Note: the inputs were not named in the signature so we can "
-                "only verify their count.".format(len(input_schema.inputs), num_actual_columns)
-            )
+        _check_input_count(input_schema, len(pfInput.columns))
 
     return (
         _enforce_tensor_schema(pfInput, input_schema)
@@ -566,6 +575,95 @@ def _enforce_schema(pfInput: PyFuncInput, input_schema: Schema):
     )
 
 
+def _is_compatible_dtype(dtype, t: DataType):
+    """
+    Return whether :py:func:`_enforce_mlflow_datatype` returns columns of type `dtype` unchanged
+    for the type `t`, without converting them.
+    """
+    if dtype == object and t != DataType.binary:
+        # Object columns are inferred, or converted to strings
+        return False
+    if t.to_pandas() == dtype or t.to_numpy() == dtype:
+        return True
+    # Binary and datetime columns are matched regardless of their itemsize and precision
+    return t in (DataType.binary, DataType.datetime) and dtype.kind == t.to_numpy().kind
+
+
+# Maximum number of enforcement plans cached by a `_SchemaEnforcer`, i.e. of distinct combinations
+# of input columns and types
+_MAX_ENFORCEMENT_PLANS = 16
+
+
+class _SchemaEnforcer(object):
+    """
+    Enforces a model input schema like :py:func:`_enforce_schema`, with the column-based schema
+    compiled once into an enforcement plan per combination of input columns and types.
+
+    A plan holds the positions of the columns of the schema in the input DataFrame, and the
+    columns whose type does not match the schema. DataFrames whose columns and types were already
+    seen are enforced by selecting the columns in one shot and converting the mismatched columns
+    only, instead of validating and copying each column. Other inputs are enforced by
+    :py:func:`_enforce_schema`.
+    """
+
+    def __init__(self, input_schema: Schema):
+        self.input_schema = input_schema
+        self._input_types = input_schema.input_types()
+        self._input_names = input_schema.input_names() if input_schema.has_input_names() else None
+        self._plans = {}
+
+    def _compile_plan(self, columns, dtypes):
+        if self._input_names is not None:
+            _check_missing_inputs(self._input_names, set(columns))
+            positions = [columns.index(name) for name in self._input_names]
+        else:
+            _check_input_count(self.input_schema, len(columns))
+            positions = list(range(len(self._input_types)))
+        if positions == list(range(len(columns))):
+            # The input has the columns of the schema in the same order
+            positions = None
+        conversions = [
+            (columns[i], t)
+            for i, t in zip(positions or range(len(columns)), self._input_types)
+            if not _is_compatible_dtype(dtypes[i], t)
+        ]
+        return positions, conversions
+
+    def enforce(self, pfInput: PyFuncInput):
+        """
+        Enforce the provided input matches the model's input schema.
+
+        :return: The input, with its columns converted to the types of the schema for column-based
+                 schemas.
+        """
+        if (
+            self.input_schema.is_tensor_spec()
+            or not isinstance(pfInput, pandas.DataFrame)
+            or not pfInput.columns.is_unique
+        ):
+            return _enforce_schema(pfInput, self.input_schema)
+
+        columns = tuple(pfInput.columns)
+        dtypes = tuple(pfInput.dtypes)
+        key = (columns, dtypes)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._compile_plan(columns, dtypes)
+            if len(self._plans) >= _MAX_ENFORCEMENT_PLANS:
+                self._plans.clear()
+            self._plans[key] = plan
+
+        positions, conversions = plan
+        # NB: Like `_enforce_schema`, return a copy of the input, so that the model can modify it
+        if positions is None:
+            enforced = pfInput.copy()
+        else:
+            enforced = pfInput.take(positions, axis=1)
+        for name, t in conversions:
+            enforced[name] = _enforce_mlflow_datatype(name, pfInput[name], t)
+        return enforced
+
+
 class PyFuncModel(object):
     """
     MLflow 'python function' model.
@@ -588,6 +686,8 @@ class PyFuncModel(object):
             raise MlflowException("Model is missing metadata.")
         self._model_meta = model_meta
         self._model_impl = model_impl
+        input_schema = model_meta.get_input_schema()
+        self._schema_enforcer = _SchemaEnforcer(input_schema) if input_schema is not None else None
 
     def predict(self, data: PyFuncInput) -> PyFuncOutput:
         """
@@ -604,7 +704,13 @@ class PyFuncModel(object):
         """
         input_schema = self.metadata.get_input_schema()
         if input_schema is not None:
-            data = _enforce_schema(data, input_schema)
+            if (
+                self._schema_enforcer is None
+                or self._schema_enforcer.input_schema is not input_schema
+            ):
+                # The signature of the model was replaced after it was loaded
+                self._schema_enforcer = _SchemaEnforcer(input_schema)
+            data = self._schema_enforcer.enforce(data)
         return self._model_impl.predict(data)
 
     @property
@@ -715,7 +821,7 @@ def _warn_potentially_incompatible_py_version_if_necessary(model_py_version=None
         )
 
 
-def spark_udf(spark, model_uri, result_type="double"):
+def spark_udf(spark, model_uri, result_type="double", max_records_per_batch=None):
     """
     A Spark UDF that can be used to invoke the Python function formatted model.
 
@@ -737,6 +843,13 @@ def spark_udf(spark, model_uri, result_type="double"):
     NOTE: Inputs of type ``pyspark.sql.types.DateType`` are not supported on earlier versions of
     Spark (2.4 and below).
 
+    On Spark 3.0 and above, the UDF is an iterator of batches UDF, which fetches the model once per
+    task rather than once per batch. Spark sends the rows to the UDF in Arrow batches of at most
+    ``spark.sql.execution.arrow.maxRecordsPerBatch`` rows (10000 by default), a configuration of
+    the Spark session. The model is packaged once per Spark application for a given content of the
+    model directory, so that creating the UDF again for the same model does not archive the model
+    and ship it to the executors again.
+
     .. code-block:: python
         :caption: Example
 
@@ -787,6 +900,10 @@ def spark_udf(spark, model_uri, result_type="double"):
 
         - ``ArrayType(StringType)``: All columns converted to ``string``.
 
+    :param max_records_per_batch: Maximum number of rows passed to the model's ``predict`` method at
+                                  once. Larger Arrow batches are split. Defaults to the size of the
+                                  Arrow batches.
+
     :return: Spark UDF that applies the model's ``predict`` method to the data and returns a
              type specified by ``result_type``, which by default is a double.
     """
@@ -795,7 +912,7 @@ def spark_udf(spark, model_uri, result_type="double"):
     # functionality.
     import functools
     from mlflow.pyfunc.spark_model_cache import SparkModelCache
-    from pyspark.sql.functions import pandas_udf
+    from pyspark.sql.functions import pandas_udf, PandasUDFType
     from pyspark.sql.types import _parse_datatype_string
     from pyspark.sql.types import ArrayType, DataType as SparkDataType
     from pyspark.sql.types import DoubleType, IntegerType, FloatType, LongType, StringType
@@ -816,6 +933,16 @@ def spark_udf(spark, model_uri, result_type="double"):
             error_code=INVALID_PARAMETER_VALUE,
         )
 
+    if max_records_per_batch is not None and (
+        not isinstance(max_records_per_batch, int) or max_records_per_batch <= 0
+    ):
+        raise MlflowException(
+            message="Invalid max_records_per_batch '{}'. It must be a positive integer.".format(
+                max_records_per_batch
+            ),
+            error_code=INVALID_PARAMETER_VALUE,
+        )
+
     with TempDir() as local_tmpdir:
         local_model_path = _download_artifact_from_uri(
             artifact_uri=model_uri, output_path=local_tmpdir.path()
@@ -823,8 +950,15 @@ def spark_udf(spark, model_uri, result_type="double"):
         archive_path = SparkModelCache.add_local_model(spark, local_model_path)
         model_metadata = Model.load(os.path.join(local_model_path, MLMODEL_FILE_NAME))
 
-    def predict(*args):
-        model = SparkModelCache.get_or_load(archive_path)
+    def split_batch(args):
+        num_rows = len(args[0]) if args else 0
+        if max_records_per_batch is None or num_rows <= max_records_per_batch:
+            yield args
+            return
+        for start in range(0, num_rows, max_records_per_batch):
+            yield tuple(x.iloc[start : start + max_records_per_batch] for x in args)
+
+    def predict_batch(model, args):
         input_schema = model.metadata.get_input_schema()
         pdf = None
 
@@ -889,7 +1023,32 @@ def spark_udf(spark, model_uri, result_type="double"):
         else:
             return result[result.columns[0]]
 
-    udf = pandas_udf(predict, result_type)
+    def predict(*args):
+        model = SparkModelCache.get_or_load(archive_path)
+        return pandas.concat(
+            [predict_batch(model, batch) for batch in split_batch(args)], ignore_index=True
+        )
+
+    def predict_batches(iterator):
+        # The model is fetched once per task rather than once per Arrow batch
+        model = SparkModelCache.get_or_load(archive_path)
+        for args in iterator:
+            # A single input column is passed as a Series, or as a DataFrame for struct columns
+            if not isinstance(args, tuple):
+                args = (args,)
+            # NB: Spark matches the predictions with the input rows by position, so that the
+            # predictions of a batch can be returned in several parts
+            for batch in split_batch(args):
+                yield predict_batch(model, batch)
+
+    if hasattr(PandasUDFType, "SCALAR_ITER"):
+        with warnings.catch_warnings():
+            # Spark 3 recommends declaring the type of pandas UDFs with type hints, which can not
+            # describe a variable number of input columns
+            warnings.simplefilter("ignore", UserWarning)
+            udf = pandas_udf(predict_batches, result_type, PandasUDFType.SCALAR_ITER)
+    else:
+        udf = pandas_udf(predict, result_type)
     udf.metadata = model_metadata
 
     @functools.wraps(udf)
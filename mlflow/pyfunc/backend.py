@@ -5,7 +5,9 @@ import subprocess
 import posixpath
 from mlflow.models import FlavorBackend
 from mlflow.models.docker_utils import _build_image, DISABLE_ENV_CREATION
+from mlflow.exceptions import MlflowException
 from mlflow.pyfunc import ENV, scoring_server
+from mlflow.pyfunc.scoring_server import asgi, multi_model
 
 from mlflow.utils.conda import get_or_create_conda_env, get_conda_bin_executable, get_conda_command
 from mlflow.tracking.artifact_utils import _download_artifact_from_uri
@@ -14,17 +16,55 @@ from mlflow.version import VERSION
 
 _logger = logging.getLogger(__name__)
 
+# Maximum number of threads per worker process used to fill the batches of the scoring server
+_MAX_BATCHING_THREADS = 32
+
+# Number of threads per worker process of the multi-model server, so that the requests of loaded
+# models are served while other models are being loaded
+_MULTI_MODEL_THREADS = 8
+
+# Command failing with an explicit message if uvicorn is not installed in its environment
+_CHECK_UVICORN_INSTALLED_COMMAND = (
+    'python -c "from mlflow.pyfunc.backend import _check_uvicorn_installed;'
+    ' _check_uvicorn_installed()"'
+)
+
 
 class PyFuncBackend(FlavorBackend):
     """
         Flavor backend implementation for the generic python models.
     """
 
-    def __init__(self, config, workers=1, no_conda=False, install_mlflow=False, **kwargs):
+    def __init__(
+        self,
+        config,
+        workers=1,
+        no_conda=False,
+        install_mlflow=False,
+        max_batch_size=None,
+        max_batch_latency_ms=None,
+        asgi=False,
+        inference_executor=None,
+        inference_workers=None,
+        preload=False,
+        warm_up=False,
+        chunk_size=None,
+        output_format=None,
+        **kwargs
+    ):
         super().__init__(config=config, **kwargs)
         self._nworkers = workers or 1
         self._no_conda = no_conda
         self._install_mlflow = install_mlflow
+        self._max_batch_size = max_batch_size
+        self._max_batch_latency_ms = max_batch_latency_ms
+        self._asgi = asgi
+        self._inference_executor = inference_executor
+        self._inference_workers = inference_workers
+        self._preload = preload
+        self._warm_up = warm_up
+        self._chunk_size = chunk_size
+        self._output_format = output_format
 
     def prepare_env(self, model_uri):
         local_path = _download_artifact_from_uri(model_uri)
@@ -39,7 +79,9 @@ class PyFuncBackend(FlavorBackend):
     ):
         """
         Generate predictions using generic python model saved with MLflow.
-        Return the prediction results as a JSON.
+        Return the prediction results as a JSON, or, if a chunk size, several workers or an output
+        format are specified, score the input in chunks with a pool of worker processes and
+        stream the predictions in the output format.
         """
         local_path = _download_artifact_from_uri(model_uri)
         # NB: Absolute windows paths do not work with mlflow apis, use file uri to ensure
@@ -53,17 +95,32 @@ class PyFuncBackend(FlavorBackend):
                 "input_path={input_path}, "
                 "output_path={output_path}, "
                 "content_type={content_type}, "
-                'json_format={json_format})"'
+                "json_format={json_format}, "
+                "chunk_size={chunk_size}, "
+                "workers={workers}, "
+                'output_format={output_format})"'
             ).format(
                 model_uri=repr(local_uri),
                 input_path=repr(input_path),
                 output_path=repr(output_path),
                 content_type=repr(content_type),
                 json_format=repr(json_format),
+                chunk_size=repr(self._chunk_size),
+                workers=repr(self._nworkers),
+                output_format=repr(self._output_format),
             )
             return _execute_in_conda_env(conda_env_path, command, self._install_mlflow)
         else:
-            scoring_server._predict(local_uri, input_path, output_path, content_type, json_format)
+            scoring_server._predict(
+                local_uri,
+                input_path,
+                output_path,
+                content_type,
+                json_format,
+                chunk_size=self._chunk_size,
+                workers=self._nworkers,
+                output_format=self._output_format,
+            )
 
     def serve(self, model_uri, port, host):
         """
@@ -73,30 +130,53 @@ class PyFuncBackend(FlavorBackend):
         # NB: Absolute windows paths do not work with mlflow apis, use file uri to ensure
         # platform compatibility.
         local_uri = path_to_local_file_uri(local_path)
-        if os.name != "nt":
+        # Batches are filled by concurrent requests, which each worker process handles with a
+        # pool of threads
+        nthreads = None
+        if self._max_batch_size is not None and self._max_batch_size > 1:
+            nthreads = min(self._max_batch_size, _MAX_BATCHING_THREADS)
+        if self._asgi:
+            # Predictions are made on the bounded executor of the application, so each worker
+            # process serves concurrent requests without additional threads
             command = (
-                "gunicorn --timeout=60 -b {host}:{port} -w {nworkers} ${{GUNICORN_CMD_ARGS}}"
-                " -- mlflow.pyfunc.scoring_server.wsgi:app"
+                "uvicorn --factory --host {host} --port {port} --workers {nworkers}"
+                " mlflow.pyfunc.scoring_server.asgi:create_app"
             ).format(host=host, port=port, nworkers=self._nworkers)
         else:
-            command = (
-                "waitress-serve --host={host} --port={port} "
-                "--ident=mlflow mlflow.pyfunc.scoring_server.wsgi:app"
-            ).format(host=host, port=port)
+            command = _get_wsgi_server_command(
+                host, port, self._nworkers, nthreads, preload=self._preload
+            )
+        if self._preload and (self._asgi or os.name == "nt"):
+            _logger.warning(
+                "Ignoring the preload option, which only applies to models served by gunicorn."
+            )
 
         command_env = os.environ.copy()
         command_env[scoring_server._SERVER_MODEL_PATH] = local_uri
+        if self._max_batch_size is not None:
+            command_env[scoring_server.MAX_BATCH_SIZE_ENV_KEY] = str(self._max_batch_size)
+        if self._max_batch_latency_ms is not None:
+            command_env[scoring_server.MAX_BATCH_LATENCY_MS_ENV_KEY] = str(
+                self._max_batch_latency_ms
+            )
+        if self._warm_up:
+            command_env[scoring_server.WARMUP_ENV_KEY] = "true"
+        if self._inference_executor is not None:
+            command_env[asgi.EXECUTOR_ENV_KEY] = self._inference_executor
+        if self._inference_workers is not None:
+            command_env[asgi.EXECUTOR_WORKERS_ENV_KEY] = str(self._inference_workers)
         if not self._no_conda and ENV in self._config:
             conda_env_path = os.path.join(local_path, self._config[ENV])
+            if self._asgi:
+                # uvicorn must be installed in the environment in which the server runs
+                command = " && ".join([_CHECK_UVICORN_INSTALLED_COMMAND, command])
             return _execute_in_conda_env(
                 conda_env_path, command, self._install_mlflow, command_env=command_env
             )
         else:
-            _logger.info("=== Running command '%s'", command)
-            if os.name != "nt":
-                subprocess.Popen(["bash", "-c", command], env=command_env).wait()
-            else:
-                subprocess.Popen(command, env=command_env).wait()
+            if self._asgi:
+                _check_uvicorn_installed()
+            _run_server_command(command, command_env)
 
     def can_score_model(self):
         if self._no_conda:
@@ -142,6 +222,67 @@ class PyFuncBackend(FlavorBackend):
         )
 
 
+def _get_wsgi_server_command(host, port, nworkers, nthreads=None, preload=False):
+    if os.name != "nt":
+        # With --preload, gunicorn loads the model before forking its workers, which share the
+        # memory pages of the model until they write to them
+        return (
+            "gunicorn --timeout=60 -b {host}:{port} -w {nworkers}{threads_opt}{preload_opt}"
+            " ${{GUNICORN_CMD_ARGS}} -- mlflow.pyfunc.scoring_server.wsgi:app"
+        ).format(
+            host=host,
+            port=port,
+            nworkers=nworkers,
+            threads_opt=" --threads {}".format(nthreads) if nthreads else "",
+            preload_opt=" --preload" if preload else "",
+        )
+    return (
+        "waitress-serve --host={host} --port={port}{threads_opt} "
+        "--ident=mlflow mlflow.pyfunc.scoring_server.wsgi:app"
+    ).format(
+        host=host, port=port, threads_opt=" --threads={}".format(nthreads) if nthreads else "",
+    )
+
+
+def _run_server_command(command, command_env):
+    _logger.info("=== Running command '%s'", command)
+    if os.name != "nt":
+        subprocess.Popen(["bash", "-c", command], env=command_env).wait()
+    else:
+        subprocess.Popen(command, env=command_env).wait()
+
+
+def serve_multi_model(
+    port, host, workers=1, model_root_uri=None, max_models=None, max_cache_size_mb=None
+):
+    """
+    Serve the models of a model root URI, or of the model registry, from the scoring server in
+    multi-model mode. The models are served in the current environment.
+    """
+    # Validate the configuration before starting the server
+    multi_model._get_cache_config(max_models, max_cache_size_mb)
+    command_env = os.environ.copy()
+    command_env[multi_model._SERVER_MULTI_MODEL] = "true"
+    if model_root_uri is not None:
+        command_env[multi_model.MODEL_ROOT_ENV_KEY] = model_root_uri
+    if max_models is not None:
+        command_env[multi_model.MAX_MODELS_ENV_KEY] = str(max_models)
+    if max_cache_size_mb is not None:
+        command_env[multi_model.MAX_CACHE_SIZE_MB_ENV_KEY] = str(max_cache_size_mb)
+    command = _get_wsgi_server_command(host, port, workers or 1, _MULTI_MODEL_THREADS)
+    _run_server_command(command, command_env)
+
+
+def _check_uvicorn_installed():
+    try:
+        import uvicorn  # noqa: F401
+    except ImportError:
+        raise MlflowException(
+            "The ASGI scoring server requires uvicorn. Please install it with"
+            " `pip install uvicorn`."
+        )
+
+
 def _execute_in_conda_env(conda_env_path, command, install_mlflow, command_env=None):
     if command_env is None:
         command_env = os.environ
@@ -3,21 +3,22 @@ Scoring server for python model format.
 The passed int model is expected to have function:
    predict(pandas.Dataframe) -> pandas.DataFrame
 
-Input, expected in text/csv or application/json format,
+Input, expected in text/csv, application/json, Apache Arrow stream or Parquet format,
 is parsed into pandas.DataFrame and passed to the model.
 
 Defines two endpoints:
     /ping used for health check
     /invocations used for scoring
 """
-from collections import OrderedDict
 import flask
+from io import BytesIO
 import json
 import logging
 import numpy as np
 import os
 import pandas as pd
 import sys
+import time
 import traceback
 
 # NB: We need to be careful what we import form mlflow here. Scoring server is used from within
@@ -39,7 +40,10 @@ try:
     from mlflow.pyfunc import load_model, PyFuncModel
 except ImportError:
     from mlflow.pyfunc import load_pyfunc as load_model
-from mlflow.protos.databricks_pb2 import MALFORMED_REQUEST, BAD_REQUEST
+from mlflow.protos.databricks_pb2 import MALFORMED_REQUEST, BAD_REQUEST, INVALID_PARAMETER_VALUE
+from mlflow.pyfunc.scoring_server import arrow_utils
+from mlflow.pyfunc.scoring_server.batching import PredictionBatcher
+from mlflow.pyfunc.scoring_server.parsing import dataframe_from_json_object, loads_json
 from mlflow.server.handlers import catch_mlflow_exception
 
 try:
@@ -54,13 +58,21 @@ CONTENT_TYPE_JSON = "application/json"
 CONTENT_TYPE_JSON_RECORDS_ORIENTED = "application/json; format=pandas-records"
 CONTENT_TYPE_JSON_SPLIT_ORIENTED = "application/json; format=pandas-split"
 CONTENT_TYPE_JSON_SPLIT_NUMPY = "application/json-numpy-split"
+CONTENT_TYPE_ARROW_STREAM = "application/vnd.apache.arrow.stream"
+CONTENT_TYPE_PARQUET = "application/vnd.apache.parquet"
 
 CONTENT_TYPES = [
     CONTENT_TYPE_CSV,
     CONTENT_TYPE_JSON,
     CONTENT_TYPE_JSON_SPLIT_NUMPY,
+    CONTENT_TYPE_ARROW_STREAM,
+    CONTENT_TYPE_PARQUET,
 ]
 
+# Content types of the predictions returned by the server, selected by the Accept header of the
+# requests. Predictions are returned as JSON by default.
+RESPONSE_CONTENT_TYPES = [CONTENT_TYPE_JSON, CONTENT_TYPE_ARROW_STREAM, CONTENT_TYPE_PARQUET]
+
 CONTENT_TYPE_FORMAT_RECORDS_ORIENTED = "pandas-records"
 CONTENT_TYPE_FORMAT_SPLIT_ORIENTED = "pandas-split"
 
@@ -68,17 +80,26 @@ FORMATS = [CONTENT_TYPE_FORMAT_RECORDS_ORIENTED, CONTENT_TYPE_FORMAT_SPLIT_ORIEN
 
 PREDICTIONS_WRAPPER_ATTR_NAME_ENV_KEY = "PREDICTIONS_WRAPPER_ATTR_NAME"
 
+# Adaptive micro-batching of concurrent requests, disabled unless the maximum batch size is
+# greater than 1
+MAX_BATCH_SIZE_ENV_KEY = "MLFLOW_SCORING_SERVER_MAX_BATCH_SIZE"
+MAX_BATCH_LATENCY_MS_ENV_KEY = "MLFLOW_SCORING_SERVER_MAX_BATCH_LATENCY_MS"
+DEFAULT_MAX_BATCH_LATENCY_MS = 5
+
+# Set to make predictions for the input example of the served model before serving requests
+WARMUP_ENV_KEY = "MLFLOW_SCORING_SERVER_WARMUP"
+
 _logger = logging.getLogger(__name__)
 
 
 def infer_and_parse_json_input(json_input, schema: Schema = None):
     """
-    :param json_input: A JSON-formatted string representation of TF serving input or a Pandas
-                       DataFrame, or a stream containing such a string representation.
+    :param json_input: A JSON-formatted string or bytes representation of TF serving input or a
+                       Pandas DataFrame.
     :param schema: Optional schema specification to be used during parsing.
     """
     try:
-        decoded_input = json.loads(json_input)
+        decoded_input = loads_json(json_input)
     except json.decoder.JSONDecodeError:
         _handle_serving_error(
             error_message=(
@@ -89,7 +110,7 @@ def infer_and_parse_json_input(json_input, schema: Schema = None):
         )
 
     if isinstance(decoded_input, list):
-        return parse_json_input(json_input=json_input, orient="records", schema=schema)
+        return _parse_decoded_json_input(json_input, decoded_input, orient="records", schema=schema)
     elif isinstance(decoded_input, dict):
         if "instances" in decoded_input or "inputs" in decoded_input:
             try:
@@ -99,7 +120,9 @@ def infer_and_parse_json_input(json_input, schema: Schema = None):
                     error_message=(ex.message), error_code=MALFORMED_REQUEST,
                 )
         else:
-            return parse_json_input(json_input=json_input, orient="split", schema=schema)
+            return _parse_decoded_json_input(
+                json_input, decoded_input, orient="split", schema=schema
+            )
     else:
         _handle_serving_error(
             error_message=(
@@ -133,6 +156,29 @@ def parse_json_input(json_input, orient="split", schema: Schema = None):
         )
 
 
+def _parse_decoded_json_input(json_input, decoded_input, orient, schema: Schema = None):
+    """
+    Build a Pandas DataFrame from the already decoded JSON input `decoded_input`, falling back to
+    parsing the original `json_input` with :py:func:`parse_json_input` if it is not supported by
+    the fast path.
+    """
+    df = dataframe_from_json_object(decoded_input, orient=orient, schema=schema)
+    if df is not None:
+        return df
+    if isinstance(json_input, bytes):
+        json_input = json_input.decode("utf-8")
+    return parse_json_input(json_input=json_input, orient=orient, schema=schema)
+
+
+def _parse_json_input_from_bytes(json_input, orient, schema: Schema = None):
+    try:
+        decoded_input = loads_json(json_input)
+    except json.decoder.JSONDecodeError:
+        # Let pandas report the error
+        return parse_json_input(json_input=json_input.decode("utf-8"), orient=orient, schema=schema)
+    return _parse_decoded_json_input(json_input, decoded_input, orient=orient, schema=schema)
+
+
 def parse_csv_input(csv_input):
     """
     :param csv_input: A CSV-formatted string representation of a Pandas DataFrame, or a stream
@@ -154,12 +200,12 @@ def parse_csv_input(csv_input):
 
 def parse_split_oriented_json_input_to_numpy(json_input):
     """
-    :param json_input: A JSON-formatted string representation of a Pandas DataFrame with split
-                       orient, or a stream containing such a string representation.
+    :param json_input: A JSON-formatted string or bytes representation of a Pandas DataFrame with
+                       split orient.
     """
 
     try:
-        json_input_list = json.loads(json_input, object_pairs_hook=OrderedDict)
+        json_input_list = loads_json(json_input)
         return pd.DataFrame(
             index=json_input_list["index"],
             data=np.array(json_input_list["data"], dtype=object),
@@ -177,6 +223,45 @@ def parse_split_oriented_json_input_to_numpy(json_input):
         )
 
 
+def _parse_arrow_table(read_table, data, format_name, schema: Schema = None):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        # The content type is supported, but the environment of the model lacks pyarrow
+        raise MlflowException(
+            "pyarrow is required to parse {} inputs. Please install it with"
+            " `pip install pyarrow`.".format(format_name),
+            error_code=BAD_REQUEST,
+        )
+    try:
+        table = read_table(data)
+    except Exception:
+        _handle_serving_error(
+            error_message=(
+                "Failed to parse input as {format_name}. Ensure that the input is a valid"
+                " {format_name} table.".format(format_name=format_name)
+            ),
+            error_code=MALFORMED_REQUEST,
+        )
+    return arrow_utils.table_to_dataframe(table, schema)
+
+
+def parse_arrow_input(arrow_input, schema: Schema = None):
+    """
+    :param arrow_input: A table serialized in the Apache Arrow IPC streaming format, as bytes.
+    :param schema: Optional schema specification to be used during parsing.
+    """
+    return _parse_arrow_table(arrow_utils.read_arrow_stream, arrow_input, "Arrow", schema)
+
+
+def parse_parquet_input(parquet_input, schema: Schema = None):
+    """
+    :param parquet_input: A table serialized as a Parquet file, as bytes.
+    :param schema: Optional schema specification to be used during parsing.
+    """
+    return _parse_arrow_table(arrow_utils.read_parquet, parquet_input, "Parquet", schema)
+
+
 def predictions_to_json(raw_predictions, output):
     predictions = _get_jsonable_obj(raw_predictions, pandas_orient="records")
     wrapper_attr_name = os.environ.get(PREDICTIONS_WRAPPER_ATTR_NAME_ENV_KEY, None)
@@ -206,13 +291,243 @@ def _handle_serving_error(error_message, error_code, include_traceback=True):
     reraise(MlflowException, e)
 
 
-def init(model: PyFuncModel):
+class _UnsupportedContentType(Exception):
+    """
+    Raised when the content type or charset of a request is not supported. The scoring servers
+    respond to such requests with HTTP status code 415.
+    """
+
+
+def _parse_invocation_input(content_type, request_data, input_schema: Schema = None):
+    """
+    Parse the body of an ``/invocations`` request according to its content type.
+
+    :param content_type: Value of the ``Content-Type`` header of the request.
+    :param request_data: Body of the request, as bytes.
+    :param input_schema: Optional input schema of the served model.
+    """
+    # Content-Type can include other attributes like CHARSET
+    # Content-type RFC: https://datatracker.ietf.org/doc/html/rfc2045#section-5.1
+    # TODO: Suport ";" in quoted parameter values
+    type_parts = (content_type or "").split(";")
+    type_parts = list(map(str.strip, type_parts))
+    mime_type = type_parts[0]
+    parameter_value_pairs = type_parts[1:]
+    parameter_values = {}
+    for parameter_value_pair in parameter_value_pairs:
+        (key, _, value) = parameter_value_pair.partition("=")
+        parameter_values[key] = value
+
+    charset = parameter_values.get("charset", "utf-8").lower()
+    if charset != "utf-8":
+        raise _UnsupportedContentType("The scoring server only supports UTF-8")
+
+    content_format = parameter_values.get("format")
+
+    # Convert from CSV to pandas
+    # The body is parsed straight from bytes, without decoding it into an intermediate string
+    if mime_type == CONTENT_TYPE_CSV and not content_format:
+        return parse_csv_input(csv_input=BytesIO(request_data))
+    elif mime_type == CONTENT_TYPE_JSON and not content_format:
+        return infer_and_parse_json_input(request_data, input_schema)
+    elif mime_type == CONTENT_TYPE_JSON and content_format == CONTENT_TYPE_FORMAT_SPLIT_ORIENTED:
+        return _parse_json_input_from_bytes(request_data, orient="split", schema=input_schema)
+    elif mime_type == CONTENT_TYPE_JSON and content_format == CONTENT_TYPE_FORMAT_RECORDS_ORIENTED:
+        return _parse_json_input_from_bytes(request_data, orient="records", schema=input_schema)
+    elif mime_type == CONTENT_TYPE_JSON_SPLIT_NUMPY and not content_format:
+        return parse_split_oriented_json_input_to_numpy(request_data)
+    elif mime_type == CONTENT_TYPE_ARROW_STREAM and not content_format:
+        return parse_arrow_input(request_data, input_schema)
+    elif mime_type == CONTENT_TYPE_PARQUET and not content_format:
+        return parse_parquet_input(request_data, input_schema)
+    else:
+        raise _UnsupportedContentType(
+            "This predictor only supports the following content types and formats:"
+            " Types: {supported_content_types}; Formats: {formats}."
+            " Got '{received_content_type}'.".format(
+                supported_content_types=CONTENT_TYPES,
+                formats=FORMATS,
+                received_content_type=content_type,
+            )
+        )
+
+
+def _get_response_content_type(accept):
+    """
+    Select the content type of the predictions from the value of the ``Accept`` header of a
+    request: the supported type with the highest quality value (``q`` parameter), the first one
+    listed among those with the same quality value, or JSON. Wildcards accept JSON.
+    """
+    best_content_type, best_quality = CONTENT_TYPE_JSON, 0.0
+    for media_range in (accept or "").split(","):
+        mime_type, _, parameters = media_range.partition(";")
+        mime_type = mime_type.strip().lower()
+        if mime_type in ("*/*", "application/*"):
+            mime_type = CONTENT_TYPE_JSON
+        if mime_type not in RESPONSE_CONTENT_TYPES:
+            continue
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    pass
+        if quality > best_quality:
+            best_content_type, best_quality = mime_type, quality
+    return best_content_type
+
+
+def _predictions_to_bytes(raw_predictions, content_type):
+    try:
+        table = arrow_utils.predictions_to_arrow_table(raw_predictions)
+        if content_type == CONTENT_TYPE_ARROW_STREAM:
+            return arrow_utils.write_arrow_stream(table)
+        return arrow_utils.write_parquet(table)
+    except ImportError:
+        raise MlflowException(
+            "Returning predictions as {} requires pyarrow. Please install it with"
+            " `pip install pyarrow`.".format(content_type),
+            error_code=BAD_REQUEST,
+        )
+    except Exception:
+        _handle_serving_error(
+            error_message=(
+                "Failed to serialize the predictions as {}. Request JSON predictions"
+                " instead.".format(content_type)
+            ),
+            error_code=BAD_REQUEST,
+        )
+
+
+def _predict_and_serialize(predict, data, content_type=CONTENT_TYPE_JSON):
+    """
+    Make predictions for the parsed input `data` with the `predict` function and return them
+    serialized in the specified content type, one of ``RESPONSE_CONTENT_TYPES``.
+    """
+    try:
+        raw_predictions = predict(data)
+    except MlflowException as e:
+        _handle_serving_error(
+            error_message=e.message, error_code=BAD_REQUEST, include_traceback=False
+        )
+    except Exception:
+        _handle_serving_error(
+            error_message=(
+                "Encountered an unexpected error while evaluating the model. Verify"
+                " that the serialized input Dataframe is compatible with the model for"
+                " inference."
+            ),
+            error_code=BAD_REQUEST,
+        )
+    if content_type != CONTENT_TYPE_JSON:
+        return _predictions_to_bytes(raw_predictions, content_type)
+    result = StringIO()
+    predictions_to_json(raw_predictions, result)
+    return result.getvalue()
+
+
+def _get_batching_config(max_batch_size=None, max_batch_latency_ms=None):
+    if max_batch_size is None:
+        max_batch_size = os.environ.get(MAX_BATCH_SIZE_ENV_KEY) or 1
+    if max_batch_latency_ms is None:
+        max_batch_latency_ms = (
+            os.environ.get(MAX_BATCH_LATENCY_MS_ENV_KEY) or DEFAULT_MAX_BATCH_LATENCY_MS
+        )
+    try:
+        max_batch_size = int(max_batch_size)
+        max_batch_latency_ms = float(max_batch_latency_ms)
+    except ValueError:
+        max_batch_size = max_batch_latency_ms = -1
+    if max_batch_size <= 0 or max_batch_latency_ms < 0:
+        raise MlflowException(
+            "Invalid batching configuration: the maximum batch size must be a positive integer"
+            " and the maximum batch latency a non-negative number of milliseconds.",
+            error_code=INVALID_PARAMETER_VALUE,
+        )
+    return max_batch_size, max_batch_latency_ms
+
+
+def _get_batched_predict_fn(predict_fn, max_batch_size=None, max_batch_latency_ms=None):
+    """
+    Return `predict_fn`, wrapped by a :py:class:`PredictionBatcher` if batching is enabled by the
+    specified arguments or the corresponding environment variables.
+    """
+    max_batch_size, max_batch_latency_ms = _get_batching_config(
+        max_batch_size, max_batch_latency_ms
+    )
+    if max_batch_size > 1:
+        return PredictionBatcher(predict_fn, max_batch_size, max_batch_latency_ms).predict
+    return predict_fn
+
+
+def _warm_up(model: PyFuncModel, model_uri):
+    """
+    Make predictions for the input example saved with the model, if it has one, so that the lazy
+    initialization of the model, e.g. graph tracing, JIT compilation or the optimization of
+    inference sessions, happens before the server starts serving requests. Failures are logged
+    and do not prevent the model from being served.
+    """
+    from mlflow.models.utils import _read_example
+    from mlflow.utils.file_utils import local_file_uri_to_path
+
+    try:
+        input_example = _read_example(model.metadata, local_file_uri_to_path(model_uri))
+        if input_example is None:
+            _logger.warning("Skipping the warm-up of the model, which has no input example.")
+            return
+        start_time = time.monotonic()
+        _predict_and_serialize(model.predict, input_example)
+        _logger.info("Warmed up the model in %.3f seconds.", time.monotonic() - start_time)
+    except Exception:
+        _logger.warning("Failed to warm up the model with its input example.", exc_info=True)
+
+
+def _load_model_metadata(model_uri):
+    """
+    Load the MLmodel file of a model, without downloading the other files of the model.
+    """
+    from mlflow.models.model import MLMODEL_FILE_NAME, Model
+    from mlflow.store.artifact.models_artifact_repo import ModelsArtifactRepository
+    from mlflow.tracking.artifact_utils import _download_artifact_from_uri
+    from mlflow.utils.uri import append_to_uri_path
+
+    if ModelsArtifactRepository.is_models_uri(model_uri):
+        # The files of a registered model cannot be addressed by appending to its URI
+        model_uri = ModelsArtifactRepository.get_underlying_uri(model_uri)
+    return Model.load(_download_artifact_from_uri(append_to_uri_path(model_uri, MLMODEL_FILE_NAME)))
+
+
+def _load_model_for_serving(model_uri):
+    """
+    Load the model served by the scoring server, and warm it up if enabled by the environment of
+    the server.
+    """
+    model = load_model(model_uri)
+    if os.environ.get(WARMUP_ENV_KEY, "").lower() == "true":
+        _warm_up(model, model_uri)
+    return model
+
+
+def init(model: PyFuncModel, max_batch_size=None, max_batch_latency_ms=None):
 
     """
     Initialize the server. Loads pyfunc model from the path.
+
+    :param model: The model to serve.
+    :param max_batch_size: Maximum number of rows of the batches into which the inputs of
+                           concurrent requests are merged before being scored. Batching is
+                           disabled if it is 1. Defaults to the value of the
+                           ``MLFLOW_SCORING_SERVER_MAX_BATCH_SIZE`` environment variable, or 1.
+    :param max_batch_latency_ms: Maximum time, in milliseconds, for which a request waits for
+                                 other requests to fill up its batch. Defaults to the value of the
+                                 ``MLFLOW_SCORING_SERVER_MAX_BATCH_LATENCY_MS`` environment
+                                 variable, or 5.
     """
     app = flask.Flask(__name__)
     input_schema = model.metadata.get_input_schema()
+    predict = _get_batched_predict_fn(model.predict, max_batch_size, max_batch_latency_ms)
 
     @app.route("/ping", methods=["GET"])
     def ping():  # pylint: disable=unused-variable
@@ -232,104 +547,61 @@ def init(model: PyFuncModel):
         we take data as CSV or json, convert it to a Pandas DataFrame or Numpy,
         generate predictions and convert them back to json.
         """
-
-        # Content-Type can include other attributes like CHARSET
-        # Content-type RFC: https://datatracker.ietf.org/doc/html/rfc2045#section-5.1
-        # TODO: Suport ";" in quoted parameter values
-        type_parts = flask.request.content_type.split(";")
-        type_parts = list(map(str.strip, type_parts))
-        mime_type = type_parts[0]
-        parameter_value_pairs = type_parts[1:]
-        parameter_values = {}
-        for parameter_value_pair in parameter_value_pairs:
-            (key, _, value) = parameter_value_pair.partition("=")
-            parameter_values[key] = value
-
-        charset = parameter_values.get("charset", "utf-8").lower()
-        if charset != "utf-8":
-            return flask.Response(
-                response="The scoring server only supports UTF-8",
-                status=415,
-                mimetype="text/plain",
-            )
-
-        content_format = parameter_values.get("format")
-
-        # Convert from CSV to pandas
-        if mime_type == CONTENT_TYPE_CSV and not content_format:
-            data = flask.request.data.decode("utf-8")
-            csv_input = StringIO(data)
-            data = parse_csv_input(csv_input=csv_input)
-        elif mime_type == CONTENT_TYPE_JSON and not content_format:
-            json_str = flask.request.data.decode("utf-8")
-            data = infer_and_parse_json_input(json_str, input_schema)
-        elif (
-            mime_type == CONTENT_TYPE_JSON and content_format == CONTENT_TYPE_FORMAT_SPLIT_ORIENTED
-        ):
-            data = parse_json_input(
-                json_input=StringIO(flask.request.data.decode("utf-8")),
-                orient="split",
-                schema=input_schema,
-            )
-        elif (
-            mime_type == CONTENT_TYPE_JSON
-            and content_format == CONTENT_TYPE_FORMAT_RECORDS_ORIENTED
-        ):
-            data = parse_json_input(
-                json_input=StringIO(flask.request.data.decode("utf-8")),
-                orient="records",
-                schema=input_schema,
-            )
-        elif mime_type == CONTENT_TYPE_JSON_SPLIT_NUMPY and not content_format:
-            data = parse_split_oriented_json_input_to_numpy(flask.request.data.decode("utf-8"))
-        else:
-            return flask.Response(
-                response=(
-                    "This predictor only supports the following content types and formats:"
-                    " Types: {supported_content_types}; Formats: {formats}."
-                    " Got '{received_content_type}'.".format(
-                        supported_content_types=CONTENT_TYPES,
-                        formats=FORMATS,
-                        received_content_type=flask.request.content_type,
-                    )
-                ),
-                status=415,
-                mimetype="text/plain",
-            )
-
-        # Do the prediction
-
         try:
-            raw_predictions = model.predict(data)
-        except MlflowException as e:
-            _handle_serving_error(
-                error_message=e.message, error_code=BAD_REQUEST, include_traceback=False
-            )
-        except Exception:
-            _handle_serving_error(
-                error_message=(
-                    "Encountered an unexpected error while evaluating the model. Verify"
-                    " that the serialized input Dataframe is compatible with the model for"
-                    " inference."
-                ),
-                error_code=BAD_REQUEST,
+            data = _parse_invocation_input(
+                flask.request.content_type, flask.request.data, input_schema
             )
-        result = StringIO()
-        predictions_to_json(raw_predictions, result)
-        return flask.Response(response=result.getvalue(), status=200, mimetype="application/json")
+        except _UnsupportedContentType as e:
+            return flask.Response(response=str(e), status=415, mimetype="text/plain")
+        response_content_type = _get_response_content_type(flask.request.headers.get("Accept"))
+        result = _predict_and_serialize(predict, data, response_content_type)
+        return flask.Response(response=result, status=200, mimetype=response_content_type)
 
     return app
 
 
-def _predict(model_uri, input_path, output_path, content_type, json_format):
+def _predict(
+    model_uri,
+    input_path,
+    output_path,
+    content_type,
+    json_format,
+    chunk_size=None,
+    workers=1,
+    output_format=None,
+):
+    if chunk_size is not None or workers > 1 or output_format is not None:
+        from mlflow.pyfunc.scoring_server import chunked_predict
+
+        return chunked_predict.predict_in_chunks(
+            model_uri,
+            input_path,
+            output_path,
+            content_type,
+            json_format,
+            chunk_size=chunk_size,
+            workers=workers,
+            output_format=output_format,
+        )
+
     pyfunc_model = load_model(model_uri)
-    if input_path is None:
+    if content_type in ("arrow", "parquet"):
+        if input_path is None:
+            data = sys.stdin.buffer.read()
+        else:
+            with open(input_path, "rb") as f:
+                data = f.read()
+    elif input_path is None:
         input_path = sys.stdin
 
     if content_type == "json":
         df = parse_json_input(input_path, orient=json_format)
     elif content_type == "csv":
         df = parse_csv_input(input_path)
+    elif content_type == "arrow":
+        df = parse_arrow_input(data)
+    elif content_type == "parquet":
+        df = parse_parquet_input(data)
     else:
         raise Exception("Unknown content type '{}'".format(content_type))
 
@@ -0,0 +1,153 @@
+"""
+Apache Arrow and Parquet inputs and outputs of the scoring server. These formats carry typed
+columns, so that large batches are scored without encoding and parsing text. They require
+`pyarrow <https://arrow.apache.org/docs/python/>`_, which is imported lazily.
+
+If the served model has a column-based signature, the columns of the input table are converted to
+the types of the signature on the Arrow table, before it is converted to a pandas DataFrame. Only
+the conversions allowed by the schema enforcement of pyfunc models are applied, e.g. integers are
+upcast to longs, and the other columns are left to the schema enforcement, which rejects them.
+"""
+import numpy as np
+import pandas as pd
+
+from mlflow.types import DataType, Schema
+
+# Name of the column of the tables of predictions that are not DataFrames
+PREDICTIONS_COLUMN_NAME = "predictions"
+
+
+def read_arrow_stream(data):
+    """
+    Read a table in the Arrow IPC streaming format from bytes, without copying them.
+    """
+    import pyarrow as pa
+
+    with pa.ipc.open_stream(pa.py_buffer(data)) as reader:
+        return reader.read_all()
+
+
+def read_parquet(data):
+    """
+    Read a Parquet file from bytes.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    return pq.read_table(pa.BufferReader(data))
+
+
+def _get_arrow_cast(arrow_type, data_type):
+    """
+    Return the Arrow type to which a column of type `arrow_type` is converted to match the MLflow
+    type `data_type`, or ``None`` if the column must not be converted.
+    """
+    import pyarrow as pa
+    import pyarrow.types as pat
+
+    if data_type == DataType.string:
+        return pa.string() if pat.is_large_string(arrow_type) else None
+    if data_type == DataType.binary:
+        return pa.binary() if pat.is_large_binary(arrow_type) else None
+    if data_type == DataType.datetime:
+        return pa.timestamp("ns") if pat.is_date(arrow_type) else None
+    if data_type == DataType.boolean or not (
+        pat.is_integer(arrow_type) or pat.is_floating(arrow_type)
+    ):
+        return None
+
+    target = pa.from_numpy_dtype(data_type.to_numpy())
+    if arrow_type == target:
+        return None
+    # Same upcasts as `mlflow.pyfunc._enforce_mlflow_datatype`
+    if pat.is_signed_integer(arrow_type) and pat.is_signed_integer(target):
+        is_upcast = arrow_type.bit_width <= target.bit_width
+    elif pat.is_unsigned_integer(arrow_type) and pat.is_signed_integer(target):
+        is_upcast = arrow_type.bit_width < target.bit_width
+    elif pat.is_integer(arrow_type) and target == pa.float64():
+        is_upcast = arrow_type.bit_width <= 32
+    elif pat.is_floating(arrow_type) and pat.is_floating(target):
+        is_upcast = arrow_type.bit_width <= target.bit_width
+    else:
+        is_upcast = False
+    return target if is_upcast else None
+
+
+def table_to_dataframe(table, schema: Schema = None):
+    """
+    Convert an Arrow table to a pandas DataFrame, converting its columns to the types of the
+    column-based `schema` first.
+    """
+    import pyarrow as pa
+
+    types_mapper = None
+    if schema is not None and not schema.is_tensor_spec() and schema.has_input_names():
+        names = table.column_names
+        for name, data_type in zip(schema.input_names(), schema.input_types()):
+            if name not in names:
+                # Missing columns are reported by the schema enforcement
+                continue
+            i = names.index(name)
+            target = _get_arrow_cast(table.schema.types[i], data_type)
+            if target is not None:
+                table = table.set_column(i, name, table.column(i).cast(target))
+        string_type = DataType.string.to_pandas()
+        if DataType.string in schema.input_types() and not isinstance(string_type, np.dtype):
+            # Build the string columns of the schema directly with the pandas string type
+            types_mapper = {pa.string(): string_type}.get
+    return table.to_pandas(split_blocks=True, types_mapper=types_mapper)
+
+
+def _predictions_to_dataframe(predictions):
+    if isinstance(predictions, pd.DataFrame):
+        return predictions
+    if isinstance(predictions, pd.Series):
+        return predictions.to_frame(name=predictions.name or PREDICTIONS_COLUMN_NAME)
+    if isinstance(predictions, dict):
+        return pd.DataFrame(
+            {
+                name: list(values) if np.ndim(values) > 1 else values
+                for name, values in predictions.items()
+            }
+        )
+    predictions = np.asarray(predictions)
+    if predictions.ndim == 0:
+        raise ValueError("Scalar predictions cannot be converted to a table")
+    # Multidimensional predictions are stored as a column of lists
+    values = list(predictions) if predictions.ndim > 1 else predictions
+    return pd.DataFrame({PREDICTIONS_COLUMN_NAME: values})
+
+
+def predictions_to_arrow_table(predictions):
+    """
+    Convert predictions to an Arrow table. DataFrames and dictionaries of arrays are converted
+    column by column, and other predictions are stored in a single column named
+    ``predictions``.
+    """
+    import pyarrow as pa
+
+    return pa.Table.from_pandas(_predictions_to_dataframe(predictions), preserve_index=False)
+
+
+def write_arrow_stream(table):
+    """
+    Serialize an Arrow table in the Arrow IPC streaming format.
+    """
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def write_parquet(table):
+    """
+    Serialize an Arrow table as a Parquet file.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,276 @@
+"""
+ASGI implementation of the pyfunc scoring server, with the same ``/ping`` and ``/invocations``
+routes and content types as the WSGI server defined in :py:mod:`mlflow.pyfunc.scoring_server`.
+
+Requests are parsed on the event loop and predictions are made on a bounded pool of threads, or
+of processes, so that a single worker process can serve many concurrent requests with one copy of
+the model if the model is I/O-bound or releases the GIL. The application only depends on an ASGI
+server, such as `uvicorn <https://www.uvicorn.org/>`_:
+
+.. code-block:: bash
+
+    uvicorn --factory mlflow.pyfunc.scoring_server.asgi:create_app
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from mlflow.exceptions import MlflowException
+from mlflow.protos.databricks_pb2 import INVALID_PARAMETER_VALUE
+from mlflow.pyfunc import scoring_server
+
+EXECUTOR_ENV_KEY = "MLFLOW_SCORING_SERVER_EXECUTOR"
+EXECUTOR_WORKERS_ENV_KEY = "MLFLOW_SCORING_SERVER_EXECUTOR_WORKERS"
+EXECUTOR_TYPES = ["thread", "process"]
+
+# Model loaded by each process of the process pool executor, and barrier shared by the processes
+_process_model = None
+_process_barrier = None
+
+
+def _load_process_model(model_uri, barrier):
+    global _process_model, _process_barrier
+    _process_barrier = barrier
+    _process_model = scoring_server._load_model_for_serving(model_uri)
+
+
+def _wait_for_process_models():
+    # Each process blocks until all the processes of the pool loaded their model, so that one
+    # call per process completes only once every process is started and ready
+    _process_barrier.wait()
+
+
+def _predict_in_process(data):
+    return _process_model.predict(data)
+
+
+def _get_default_executor_workers():
+    # Same default as `concurrent.futures.ThreadPoolExecutor`
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def _get_executor_config(executor_type=None, executor_workers=None):
+    executor_type = executor_type or os.environ.get(EXECUTOR_ENV_KEY) or "thread"
+    if executor_workers is None:
+        executor_workers = (
+            os.environ.get(EXECUTOR_WORKERS_ENV_KEY) or _get_default_executor_workers()
+        )
+    try:
+        executor_workers = int(executor_workers)
+    except ValueError:
+        executor_workers = 0
+    if executor_type not in EXECUTOR_TYPES or executor_workers <= 0:
+        raise MlflowException(
+            "Invalid inference executor configuration: the executor type must be one of {} and"
+            " the number of executor workers a positive integer. Got '{}' and '{}'.".format(
+                EXECUTOR_TYPES, executor_type, executor_workers
+            ),
+            error_code=INVALID_PARAMETER_VALUE,
+        )
+    return executor_type, executor_workers
+
+
+async def _read_body(receive):
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+async def _send_response(send, status, body, content_type):
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class ScoringApp(object):
+    """
+    ASGI application serving a pyfunc model. Use :py:func:`init` to create one.
+    """
+
+    def __init__(self, input_schema, predict, executor, process_pool=None, process_workers=None):
+        self._input_schema = input_schema
+        self._predict = predict
+        self._executor = executor
+        self._process_pool = process_pool
+        self._process_workers = process_workers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._handle_lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._handle_http(scope, receive, send)
+
+    async def _handle_lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self._start_process_pool()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": repr(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._executor.shutdown(wait=False)
+                if self._process_pool is not None:
+                    # Waits for the worker processes to exit, off the event loop
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, self._process_pool.shutdown
+                    )
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _start_process_pool(self):
+        """
+        Start all the processes of the process executor, which start on demand otherwise, and
+        wait for them to load and warm up the model before the server reports being ready.
+        """
+        if self._process_pool is None:
+            return
+        await asyncio.gather(
+            *[
+                asyncio.wrap_future(self._process_pool.submit(_wait_for_process_models))
+                for _ in range(self._process_workers)
+            ]
+        )
+
+    async def _handle_http(self, scope, receive, send):
+        path = scope["path"]
+        method = scope["method"]
+        if path == "/ping":
+            if method not in ("GET", "HEAD"):
+                await _send_response(send, 405, "Method Not Allowed", "text/plain")
+                return
+            # The application is only created once the model could be loaded
+            await _send_response(send, 200, "\n", "application/json")
+        elif path == "/invocations":
+            if method != "POST":
+                await _send_response(send, 405, "Method Not Allowed", "text/plain")
+                return
+            body = await _read_body(receive)
+            if body is None:
+                return
+            headers = {}
+            for name, value in scope["headers"]:
+                if name in (b"content-type", b"accept"):
+                    headers[name] = value.decode("latin-1")
+            status, response, response_content_type = await self._invocations(
+                headers.get(b"content-type"), headers.get(b"accept"), body
+            )
+            await _send_response(send, status, response, response_content_type)
+        else:
+            await _send_response(send, 404, "Not Found", "text/plain")
+
+    async def _invocations(self, content_type, accept, body):
+        try:
+            data = scoring_server._parse_invocation_input(content_type, body, self._input_schema)
+            response_content_type = scoring_server._get_response_content_type(accept)
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._executor,
+                scoring_server._predict_and_serialize,
+                self._predict,
+                data,
+                response_content_type,
+            )
+            return 200, result, response_content_type
+        except scoring_server._UnsupportedContentType as e:
+            return 415, str(e), "text/plain"
+        except MlflowException as e:
+            return e.get_http_status_code(), e.serialize_as_json(), "application/json"
+
+
+def init(
+    model,
+    executor_type=None,
+    executor_workers=None,
+    model_uri=None,
+    max_batch_size=None,
+    max_batch_latency_ms=None,
+):
+    """
+    Create an ASGI application serving the specified pyfunc model.
+
+    :param model: The model to serve. It may be ``None`` with the ``"process"`` executor, in
+                  which case only the metadata of the model is loaded by the calling process.
+    :param executor_type: ``"thread"`` to make predictions on a pool of threads sharing `model`,
+                          or ``"process"`` to make them on a pool of processes that each load the
+                          model from `model_uri`, for models that hold the GIL. Defaults to the
+                          value of the ``MLFLOW_SCORING_SERVER_EXECUTOR`` environment variable,
+                          or ``"thread"``.
+    :param executor_workers: Maximum number of concurrent predictions. Defaults to the value of
+                             the ``MLFLOW_SCORING_SERVER_EXECUTOR_WORKERS`` environment variable,
+                             or to the number of CPUs plus 4, up to 32.
+    :param model_uri: URI of the model, required by the ``"process"`` executor.
+    :param max_batch_size: See :py:func:`mlflow.pyfunc.scoring_server.init`.
+    :param max_batch_latency_ms: See :py:func:`mlflow.pyfunc.scoring_server.init`.
+    """
+    executor_type, executor_workers = _get_executor_config(executor_type, executor_workers)
+    if executor_type == "process":
+        if model_uri is None:
+            raise MlflowException(
+                "The process inference executor requires the URI of the model",
+                error_code=INVALID_PARAMETER_VALUE,
+            )
+        mp_context = multiprocessing.get_context()
+        process_pool = ProcessPoolExecutor(
+            max_workers=executor_workers,
+            mp_context=mp_context,
+            initializer=_load_process_model,
+            initargs=(model_uri, mp_context.Barrier(executor_workers)),
+        )
+        model_metadata = (
+            model.metadata if model is not None else scoring_server._load_model_metadata(model_uri)
+        )
+
+        def predict_fn(data):
+            return process_pool.submit(_predict_in_process, data).result()
+
+    else:
+        process_pool = None
+        model_metadata = model.metadata
+        predict_fn = model.predict
+
+    predict = scoring_server._get_batched_predict_fn(
+        predict_fn, max_batch_size, max_batch_latency_ms
+    )
+    # Threads of the process executor only wait for the processes, which bound the concurrency
+    executor = ThreadPoolExecutor(
+        max_workers=executor_workers, thread_name_prefix="mlflow-scoring-server"
+    )
+    return ScoringApp(
+        model_metadata.get_input_schema(), predict, executor, process_pool, executor_workers
+    )
+
+
+def create_app():
+    """
+    Create the ASGI application serving the model whose URI is specified by the environment of
+    the server, as configured by ``mlflow models serve``.
+    """
+    model_uri = os.environ[scoring_server._SERVER_MODEL_PATH]
+    executor_type, _ = _get_executor_config()
+    if executor_type == "process":
+        # The model is only loaded by the processes of the executor, which make the predictions
+        return init(None, model_uri=model_uri)
+    return init(scoring_server._load_model_for_serving(model_uri), model_uri=model_uri)
+
+
+__all__ = ["ScoringApp", "init", "create_app"]
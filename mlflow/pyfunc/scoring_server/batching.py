@@ -0,0 +1,207 @@
+"""
+Adaptive micro-batching of the predictions made by the scoring server.
+
+Vectorized models, such as scikit-learn, XGBoost, ONNX or PyTorch models, spend most of the time
+of small predictions on per-call overhead. When batching is enabled, the inputs of concurrent
+requests are queued and merged into a single batch, which is scored with one ``predict`` call
+before its predictions are split back between the requests. Batching is only appropriate for
+models whose prediction for a row does not depend on the other rows of the input.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+_logger = logging.getLogger(__name__)
+
+
+class _PendingRequest(object):
+    __slots__ = ["data", "num_rows", "merge_key", "enqueued_at", "done", "result", "error"]
+
+    def __init__(self, data, num_rows, merge_key):
+        self.data = data
+        self.num_rows = num_rows
+        self.merge_key = merge_key
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _get_merge_key(data):
+    """
+    Return a tuple whose first element identifies the inputs that can be merged with `data` and
+    whose second element is the number of rows of `data`, or ``(None, None)`` if `data` cannot be
+    merged with other inputs.
+    """
+    if isinstance(data, pd.DataFrame):
+        dtypes = tuple(str(dtype) for dtype in data.dtypes)
+        return ("pandas", tuple(data.columns), dtypes), len(data)
+    if isinstance(data, np.ndarray) and data.ndim >= 1:
+        return ("numpy", data.dtype.str, data.shape[1:]), data.shape[0]
+    if (
+        isinstance(data, dict)
+        and data
+        and all(isinstance(v, np.ndarray) and v.ndim >= 1 for v in data.values())
+    ):
+        num_rows = {v.shape[0] for v in data.values()}
+        if len(num_rows) == 1:
+            specs = tuple(sorted((k, v.dtype.str, v.shape[1:]) for k, v in data.items()))
+            return ("tensors", specs), num_rows.pop()
+    return None, None
+
+
+def _merge_inputs(inputs):
+    first = inputs[0]
+    if isinstance(first, pd.DataFrame):
+        return pd.concat(inputs, ignore_index=True)
+    if isinstance(first, np.ndarray):
+        return np.concatenate(inputs)
+    return {key: np.concatenate([data[key] for data in inputs]) for key in first}
+
+
+def _get_num_predictions(predictions):
+    if isinstance(predictions, (pd.DataFrame, pd.Series, np.ndarray, list)):
+        return len(predictions)
+    if isinstance(predictions, dict) and predictions:
+        lengths = {
+            len(v) if isinstance(v, (np.ndarray, list)) else None for v in predictions.values()
+        }
+        if len(lengths) == 1:
+            return lengths.pop()
+    return None
+
+
+def _slice_predictions(predictions, start, end):
+    if isinstance(predictions, (pd.DataFrame, pd.Series)):
+        return predictions.iloc[start:end]
+    if isinstance(predictions, dict):
+        return {key: value[start:end] for key, value in predictions.items()}
+    return predictions[start:end]
+
+
+def _split_predictions(predictions, sizes):
+    """
+    Split the predictions made for a merged batch into the predictions of its inputs, whose
+    numbers of rows are `sizes`. Return ``None`` if the predictions cannot be split, e.g. if the
+    model does not return one prediction per row.
+    """
+    if _get_num_predictions(predictions) != sum(sizes):
+        return None
+    results = []
+    start = 0
+    for size in sizes:
+        results.append(_slice_predictions(predictions, start, start + size))
+        start += size
+    return results
+
+
+class PredictionBatcher(object):
+    """
+    Merges the inputs of concurrent :py:meth:`predict` calls into batches of at most
+    `max_batch_size` rows and scores each batch with a single call to `predict_fn`, from a
+    background thread. A batch is scored as soon as it is full or once its first input has waited
+    for `max_latency_ms` milliseconds. Only inputs of the same kind, i.e. DataFrames with the same
+    columns and types or arrays with the same types and shapes, are merged. Inputs that cannot be
+    merged or that contain at least `max_batch_size` rows are scored directly.
+
+    If scoring a batch fails, or if its predictions cannot be split back between its inputs, the
+    inputs of the batch are scored one by one, so that errors are reported to the request that
+    caused them.
+    """
+
+    def __init__(self, predict_fn, max_batch_size, max_latency_ms):
+        self._predict_fn = predict_fn
+        self._max_batch_size = max_batch_size
+        self._max_latency = max_latency_ms / 1000.0
+        self._condition = threading.Condition()
+        self._queue = deque()
+        self._worker = None
+        self._worker_pid = None
+
+    def predict(self, data):
+        merge_key, num_rows = _get_merge_key(data)
+        if merge_key is None or num_rows >= self._max_batch_size:
+            return self._predict_fn(data)
+
+        request = _PendingRequest(data, num_rows, merge_key)
+        with self._condition:
+            self._ensure_worker_started()
+            self._queue.append(request)
+            self._condition.notify()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _ensure_worker_started(self):
+        # The worker is started lazily, and restarted in forked processes, as threads do not
+        # survive forks, e.g. when gunicorn loads the application before forking its workers
+        if self._worker is None or self._worker_pid != os.getpid():
+            self._worker = threading.Thread(
+                target=self._run, name="mlflow-prediction-batcher", daemon=True
+            )
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._predict_batch(batch)
+            except BaseException as e:
+                for request in batch:
+                    if not request.done.is_set():
+                        request.error = e
+                        request.done.set()
+
+    def _next_batch(self):
+        with self._condition:
+            while not self._queue:
+                self._condition.wait()
+            first = self._queue.popleft()
+            batch = [first]
+            num_rows = first.num_rows
+            deadline = first.enqueued_at + self._max_latency
+            while num_rows < self._max_batch_size:
+                # Take the queued inputs that can be merged into the batch, leaving the others
+                # queued for the next batches
+                for request in list(self._queue):
+                    if (
+                        request.merge_key == first.merge_key
+                        and num_rows + request.num_rows <= self._max_batch_size
+                    ):
+                        self._queue.remove(request)
+                        batch.append(request)
+                        num_rows += request.num_rows
+                remaining = deadline - time.monotonic()
+                if num_rows >= self._max_batch_size or remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return batch
+
+    def _predict_batch(self, batch):
+        results = None
+        if len(batch) > 1:
+            try:
+                predictions = self._predict_fn(_merge_inputs([request.data for request in batch]))
+                results = _split_predictions(predictions, [request.num_rows for request in batch])
+            except Exception:
+                _logger.debug("Failed to score a batch of %d inputs", len(batch), exc_info=True)
+            if results is None:
+                _logger.debug("Scoring the %d inputs of the batch separately", len(batch))
+        if results is None:
+            for request in batch:
+                try:
+                    request.result = self._predict_fn(request.data)
+                except Exception as e:
+                    request.error = e
+                request.done.set()
+        else:
+            for request, result in zip(batch, results):
+                request.result = result
+                request.done.set()
@@ -0,0 +1,326 @@
+"""
+Chunked batch scoring of ``mlflow models predict``, for inputs that do not fit in memory or that
+are scored faster on several cores.
+
+The input is read in chunks of rows, which are scored by a pool of worker processes that each load
+the model once. Predictions are written as soon as they are made, in the order of the input rows,
+and at most two chunks per worker are read ahead, so that memory usage is bounded by the chunk
+size rather than by the size of the input. CSV inputs are read incrementally, Arrow inputs batch by
+batch and Parquet inputs row group by row group. JSON inputs are single documents, which are
+parsed at once before being scored in chunks.
+
+The schema of Parquet outputs is fixed by the first chunk, with the types of the columns declared
+by the output signature of the model, so that a column of integers in the first chunk is written
+as floats if the signature declares doubles.
+"""
+import collections
+import functools
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from mlflow.exceptions import MlflowException
+from mlflow.protos.databricks_pb2 import INVALID_PARAMETER_VALUE, MALFORMED_REQUEST
+from mlflow.pyfunc import scoring_server
+from mlflow.pyfunc.scoring_server import arrow_utils
+from mlflow.types import DataType
+
+OUTPUT_FORMAT_JSON_LINES = "json-lines"
+OUTPUT_FORMAT_CSV = "csv"
+OUTPUT_FORMAT_PARQUET = "parquet"
+OUTPUT_FORMATS = [OUTPUT_FORMAT_JSON_LINES, OUTPUT_FORMAT_CSV, OUTPUT_FORMAT_PARQUET]
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# URI and model loaded by each worker process, on its first chunk
+_worker_model = (None, None)
+
+
+def _predict_chunk(model_uri, chunk):
+    global _worker_model
+    if _worker_model[0] != model_uri:
+        _worker_model = (model_uri, scoring_server.load_model(model_uri))
+    return arrow_utils._predictions_to_dataframe(_worker_model[1].predict(chunk))
+
+
+def _rebatch_arrow(batches, chunk_size):
+    """
+    Group Arrow record batches into tables of `chunk_size` rows, except for the last one.
+    """
+    import pyarrow as pa
+
+    pending, num_rows = [], 0
+    for batch in batches:
+        while batch.num_rows > 0:
+            num_taken = min(chunk_size - num_rows, batch.num_rows)
+            pending.append(batch.slice(0, num_taken))
+            num_rows += num_taken
+            batch = batch.slice(num_taken)
+            if num_rows == chunk_size:
+                yield pa.Table.from_batches(pending)
+                pending, num_rows = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending)
+
+
+def _read_arrow_batches(input_path, content_type):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise MlflowException(
+            "Reading {} inputs requires pyarrow. Please install it with"
+            " `pip install pyarrow`.".format(content_type),
+            error_code=INVALID_PARAMETER_VALUE,
+        )
+    source = input_path if input_path is not None else sys.stdin.buffer
+    if content_type == "arrow":
+        with pa.ipc.open_stream(source) as reader:
+            yield from reader
+    else:
+        if input_path is None:
+            # Parquet files are read from their footer, which requires a seekable input
+            source = pa.BufferReader(source.read())
+        parquet_file = pq.ParquetFile(source)
+        for i in range(parquet_file.num_row_groups):
+            yield from parquet_file.read_row_group(i).to_batches()
+
+
+def _read_chunks(input_path, content_type, json_format, chunk_size):
+    """
+    Read the input in DataFrames of at most `chunk_size` rows.
+    """
+    if content_type == "csv":
+        yield from pd.read_csv(
+            input_path if input_path is not None else sys.stdin, chunksize=chunk_size
+        )
+    elif content_type in ("arrow", "parquet"):
+        batches = _read_arrow_batches(input_path, content_type)
+        for table in _rebatch_arrow(batches, chunk_size):
+            yield arrow_utils.table_to_dataframe(table)
+    elif content_type == "json":
+        df = scoring_server.parse_json_input(
+            input_path if input_path is not None else sys.stdin, orient=json_format
+        )
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start : start + chunk_size]
+    else:
+        raise Exception("Unknown content type '{}'".format(content_type))
+
+
+def _read_chunks_or_raise(input_path, content_type, json_format, chunk_size):
+    chunks = _read_chunks(input_path, content_type, json_format, chunk_size)
+    while True:
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        except MlflowException:
+            raise
+        except Exception:
+            scoring_server._handle_serving_error(
+                error_message=(
+                    "Failed to read the input as {}. Ensure that the input is a valid {} file"
+                    " containing a table.".format(content_type, content_type.upper())
+                ),
+                error_code=MALFORMED_REQUEST,
+            )
+        yield chunk
+
+
+def _map_in_order(executor, fn, iterable, max_pending):
+    """
+    Like ``executor.map(fn, iterable)``, but only reads up to `max_pending` items of `iterable`
+    ahead of the results.
+    """
+    pending = collections.deque()
+    try:
+        for item in iterable:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+class _JsonLinesWriter(object):
+    def __init__(self, output):
+        self._output = output
+
+    def write(self, predictions):
+        if len(predictions) == 0:
+            return
+        lines = predictions.to_json(orient="records", lines=True)
+        self._output.write(lines if lines.endswith("\n") else lines + "\n")
+
+    def close(self):
+        pass
+
+
+class _CsvWriter(object):
+    def __init__(self, output):
+        self._output = output
+        self._write_header = True
+
+    def write(self, predictions):
+        predictions.to_csv(self._output, index=False, header=self._write_header)
+        self._write_header = False
+
+    def close(self):
+        pass
+
+
+def _get_arrow_type(data_type):
+    import pyarrow as pa
+
+    if data_type == DataType.string:
+        return pa.string()
+    if data_type == DataType.binary:
+        return pa.binary()
+    if data_type == DataType.datetime:
+        return pa.timestamp("ns")
+    return pa.from_numpy_dtype(data_type.to_numpy())
+
+
+def _get_declared_column_types(model_uri):
+    """
+    Return the Arrow types of the prediction columns declared by the output signature of the
+    model, by column name.
+    """
+    output_schema = scoring_server._load_model_metadata(model_uri).get_output_schema()
+    if output_schema is None or output_schema.is_tensor_spec():
+        return {}
+    if output_schema.has_input_names():
+        names = output_schema.input_names()
+    elif len(output_schema.inputs) == 1:
+        # Unnamed predictions are written to a single column
+        names = [arrow_utils.PREDICTIONS_COLUMN_NAME]
+    else:
+        return {}
+    return {name: _get_arrow_type(spec.type) for name, spec in zip(names, output_schema.inputs)}
+
+
+class _ParquetWriter(object):
+    def __init__(self, output, column_types=None):
+        self._output = output
+        self._column_types = column_types or {}
+        self._writer = None
+
+    def write(self, predictions):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(predictions, preserve_index=False)
+        if self._writer is None:
+            schema = pa.schema(
+                [
+                    field.with_type(self._column_types.get(field.name, field.type))
+                    for field in table.schema
+                ],
+                metadata=table.schema.metadata,
+            )
+            self._writer = pq.ParquetWriter(self._output, schema)
+        if not table.schema.equals(self._writer.schema):
+            # e.g. a column of integers in a chunk is a column of floats with NaNs in another
+            try:
+                table = table.cast(self._writer.schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, ValueError) as e:
+                raise MlflowException(
+                    "The predictions of a chunk cannot be converted to the schema of the Parquet"
+                    " output, which is that of the first chunk with the types declared by the"
+                    " output signature of the model: {}. Declare the types of the predictions in"
+                    " the output signature of the model, or use the '{}' or '{}' output"
+                    " format.".format(e, OUTPUT_FORMAT_JSON_LINES, OUTPUT_FORMAT_CSV),
+                    error_code=INVALID_PARAMETER_VALUE,
+                )
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+_WRITERS = {
+    OUTPUT_FORMAT_JSON_LINES: _JsonLinesWriter,
+    OUTPUT_FORMAT_CSV: _CsvWriter,
+    OUTPUT_FORMAT_PARQUET: _ParquetWriter,
+}
+
+
+def _validate_config(chunk_size, workers, output_format):
+    if (
+        not isinstance(chunk_size, int)
+        or chunk_size <= 0
+        or not isinstance(workers, int)
+        or workers <= 0
+    ):
+        raise MlflowException(
+            "Invalid chunked prediction configuration: the chunk size and the number of workers"
+            " must be positive integers.",
+            error_code=INVALID_PARAMETER_VALUE,
+        )
+    if output_format not in OUTPUT_FORMATS:
+        raise MlflowException(
+            "Unknown output format '{}'. It must be one of {}.".format(
+                output_format, OUTPUT_FORMATS
+            ),
+            error_code=INVALID_PARAMETER_VALUE,
+        )
+
+
+def predict_in_chunks(
+    model_uri,
+    input_path,
+    output_path,
+    content_type,
+    json_format,
+    chunk_size=None,
+    workers=1,
+    output_format=None,
+):
+    """
+    Score the input in chunks of `chunk_size` rows with `workers` processes, and write the
+    predictions of each chunk as soon as they are made, in the order of the input rows.
+
+    :param output_format: One of ``OUTPUT_FORMATS``. Defaults to ``json-lines``, in which each
+                          prediction is a JSON object on its own line.
+    """
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    output_format = output_format or OUTPUT_FORMAT_JSON_LINES
+    _validate_config(chunk_size, workers, output_format)
+    if output_format == OUTPUT_FORMAT_PARQUET:
+        output = open(output_path, "wb") if output_path is not None else sys.stdout.buffer
+    else:
+        output = open(output_path, "w", newline="") if output_path is not None else sys.stdout
+
+    chunks = _read_chunks_or_raise(input_path, content_type, json_format, chunk_size)
+    predict_chunk = functools.partial(_predict_chunk, model_uri)
+    executor = results = writer = None
+    try:
+        if output_format == OUTPUT_FORMAT_PARQUET:
+            writer = _ParquetWriter(output, _get_declared_column_types(model_uri))
+        else:
+            writer = _WRITERS[output_format](output)
+        if workers == 1:
+            results = map(predict_chunk, chunks)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            results = _map_in_order(executor, predict_chunk, chunks, max_pending=2 * workers)
+        for predictions in results:
+            writer.write(predictions)
+    finally:
+        if executor is not None:
+            # Cancel the chunks that are not scored yet if scoring failed
+            results.close()
+            executor.shutdown(wait=True)
+        if writer is not None:
+            # Also if scoring failed, so that the output is not written to after being closed
+            writer.close()
+        if output_path is not None:
+            output.close()
+        else:
+            output.flush()
@@ -0,0 +1,261 @@
+"""
+Multi-model mode of the pyfunc scoring server, in which a single server process serves many
+models. Requests are routed by model name and version:
+
+    /ping used for health check
+    /models used to list the loaded models and the metrics of the model cache
+    /models/<name>/<version>/invocations used for scoring
+
+The model of a request is resolved to the URI ``<model root>/<name>/<version>`` if the server has
+a model root URI, or to the registered model URI ``models:/<name>/<version>`` otherwise, where the
+version can also be a stage. Stages are resolved to their latest version on each request, so that
+the models of a stage are served as soon as they are transitioned to it. Models are downloaded to a
+directory of their own and loaded with :py:func:`mlflow.pyfunc.load_model` on their first request,
+and are kept in a :py:class:`ModelCache <mlflow.utils.model_cache.ModelCache>`. The directory of a
+model is deleted once it is evicted from the cache and no request uses it anymore. All models are
+served in the environment of the server.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import flask
+
+from mlflow.exceptions import MlflowException
+from mlflow.protos.databricks_pb2 import INVALID_PARAMETER_VALUE, RESOURCE_DOES_NOT_EXIST
+from mlflow.pyfunc import scoring_server
+from mlflow.server.handlers import catch_mlflow_exception
+from mlflow.store.artifact.models_artifact_repo import ModelsArtifactRepository
+from mlflow.store.artifact.utils.models import _parse_model_uri
+from mlflow.tracking import MlflowClient
+from mlflow.tracking.artifact_utils import _download_artifact_from_uri
+from mlflow.utils.model_cache import ModelCache, _get_model_size_bytes
+from mlflow.utils.uri import append_to_uri_path
+
+# Set to serve models in multi-model mode from `mlflow.pyfunc.scoring_server.wsgi`
+_SERVER_MULTI_MODEL = "__pyfunc_multi_model__"
+
+MODEL_ROOT_ENV_KEY = "MLFLOW_SCORING_SERVER_MODEL_ROOT"
+MAX_MODELS_ENV_KEY = "MLFLOW_SCORING_SERVER_MAX_MODELS"
+MAX_CACHE_SIZE_MB_ENV_KEY = "MLFLOW_SCORING_SERVER_MAX_CACHE_SIZE_MB"
+DEFAULT_MAX_MODELS = 32
+
+
+class _DownloadedModel(object):
+    __slots__ = ["local_dir", "num_users", "evicted"]
+
+    def __init__(self, local_dir):
+        self.local_dir = local_dir
+        self.num_users = 0
+        self.evicted = False
+
+
+class _ModelLoader(object):
+    """
+    Loads each model from a download directory owned by its cache entry. Requests acquire the
+    models they use, and the directory of a model is deleted once the model is evicted from the
+    cache and no request uses it anymore, since models may read their files when predicting.
+    """
+
+    def __init__(self):
+        # Downloads by id of their loaded model, which evicted entries and requests keep alive
+        self._downloads = {}
+        self._lock = threading.Lock()
+
+    def load(self, model_uri):
+        local_dir = tempfile.mkdtemp()
+        try:
+            local_path = _download_artifact_from_uri(model_uri, output_path=local_dir)
+            model = scoring_server.load_model(local_path)
+        except BaseException:
+            shutil.rmtree(local_dir, ignore_errors=True)
+            raise
+        with self._lock:
+            self._downloads[id(model)] = _DownloadedModel(local_dir)
+        return model, _get_model_size_bytes(local_path)
+
+    def acquire(self, model):
+        """
+        Acquire a model for the duration of a request. Return ``False`` if the model was evicted
+        and its files deleted, in which case it must be loaded again.
+        """
+        with self._lock:
+            download = self._downloads.get(id(model))
+            if download is None:
+                return False
+            download.num_users += 1
+            return True
+
+    def release(self, model):
+        with self._lock:
+            download = self._downloads[id(model)]
+            download.num_users -= 1
+            unused_dir = self._pop_unused_dir(model, download)
+        if unused_dir is not None:
+            shutil.rmtree(unused_dir, ignore_errors=True)
+
+    def evict(self, model_uri, model):  # pylint: disable=unused-argument
+        with self._lock:
+            download = self._downloads.get(id(model))
+            if download is None:
+                return
+            download.evicted = True
+            unused_dir = self._pop_unused_dir(model, download)
+        if unused_dir is not None:
+            shutil.rmtree(unused_dir, ignore_errors=True)
+
+    def _pop_unused_dir(self, model, download):
+        if not download.evicted or download.num_users > 0:
+            return None
+        del self._downloads[id(model)]
+        return download.local_dir
+
+
+def _score(model):
+    try:
+        data = scoring_server._parse_invocation_input(
+            flask.request.content_type, flask.request.data, model.metadata.get_input_schema(),
+        )
+    except scoring_server._UnsupportedContentType as e:
+        return flask.Response(response=str(e), status=415, mimetype="text/plain")
+    response_content_type = scoring_server._get_response_content_type(
+        flask.request.headers.get("Accept")
+    )
+    result = scoring_server._predict_and_serialize(model.predict, data, response_content_type)
+    return flask.Response(response=result, status=200, mimetype=response_content_type)
+
+
+def _resolve_model_uri(model_uri):
+    """
+    Resolve a ``models:/<name>/<stage>`` URI to the URI of the latest version of the stage, so that
+    the cache is keyed by concrete versions.
+    """
+    if not ModelsArtifactRepository.is_models_uri(model_uri):
+        return model_uri
+    name, _, stage = _parse_model_uri(model_uri)
+    if stage is None:
+        return model_uri
+    latest = MlflowClient().get_latest_versions(name, [stage])
+    if len(latest) == 0:
+        raise MlflowException(
+            "No versions of model '{}' in stage '{}'.".format(name, stage),
+            error_code=RESOURCE_DOES_NOT_EXIST,
+        )
+    return "models:/{}/{}".format(name, latest[0].version)
+
+
+def _get_model_uri(model_root_uri, name, version):
+    if name in (".", "..") or version in (".", ".."):
+        raise MlflowException(
+            "Invalid model name '{}' or version '{}'.".format(name, version),
+            error_code=INVALID_PARAMETER_VALUE,
+        )
+    if model_root_uri is None:
+        return "models:/{}/{}".format(name, version)
+    return append_to_uri_path(model_root_uri, name, version)
+
+
+def _get_cache_config(max_models=None, max_cache_size_mb=None):
+    if max_models is None:
+        max_models = os.environ.get(MAX_MODELS_ENV_KEY) or DEFAULT_MAX_MODELS
+    if max_cache_size_mb is None:
+        max_cache_size_mb = os.environ.get(MAX_CACHE_SIZE_MB_ENV_KEY) or None
+    try:
+        max_models = int(max_models)
+        max_cache_size_mb = float(max_cache_size_mb) if max_cache_size_mb is not None else None
+    except ValueError:
+        max_models = -1
+    if max_models <= 0 or (max_cache_size_mb is not None and max_cache_size_mb <= 0):
+        raise MlflowException(
+            "Invalid model cache configuration: the maximum number of models must be a positive"
+            " integer and the maximum cache size a positive number of megabytes.",
+            error_code=INVALID_PARAMETER_VALUE,
+        )
+    return max_models, max_cache_size_mb
+
+
+def init(model_root_uri=None, max_models=None, max_cache_size_mb=None, load_fn=None):
+    """
+    Initialize the multi-model server.
+
+    :param model_root_uri: URI of the directory containing the models, in ``<name>/<version>``
+                           subdirectories. Defaults to the value of the
+                           ``MLFLOW_SCORING_SERVER_MODEL_ROOT`` environment variable. If it is not
+                           set, models are loaded from the model registry.
+    :param max_models: Maximum number of models kept in memory. Defaults to the value of the
+                       ``MLFLOW_SCORING_SERVER_MAX_MODELS`` environment variable, or 32.
+    :param max_cache_size_mb: Maximum total size, in megabytes, of the files of the models kept in
+                              memory. Defaults to the value of the
+                              ``MLFLOW_SCORING_SERVER_MAX_CACHE_SIZE_MB`` environment variable, or
+                              no limit.
+    :param load_fn: Function loading the model of a URI, which returns a tuple of the model and of
+                    its estimated size in bytes. Defaults to downloading the model to a temporary
+                    directory, which is deleted when the model is evicted, and loading it with
+                    :py:func:`mlflow.pyfunc.load_model`.
+    """
+    if model_root_uri is None:
+        model_root_uri = os.environ.get(MODEL_ROOT_ENV_KEY) or None
+    max_models, max_cache_size_mb = _get_cache_config(max_models, max_cache_size_mb)
+    max_size_bytes = int(max_cache_size_mb * 1024 * 1024) if max_cache_size_mb else None
+    on_evict = None
+    if load_fn is None:
+        loader = _ModelLoader()
+        load_fn, on_evict = loader.load, loader.evict
+    else:
+        loader = None
+    cache = ModelCache(
+        load_fn, max_models=max_models, max_size_bytes=max_size_bytes, on_evict=on_evict
+    )
+    app = flask.Flask(__name__)
+    app.model_cache = cache
+
+    def acquire_model(model_uri):
+        while True:
+            model = cache.get(model_uri)
+            # A model evicted since it was looked up is loaded again by the next lookup
+            if loader is None or loader.acquire(model):
+                return model
+
+    @app.route("/ping", methods=["GET"])
+    def ping():  # pylint: disable=unused-variable
+        return flask.Response(response="\n", status=200, mimetype="application/json")
+
+    @app.route("/models", methods=["GET"])
+    def models():  # pylint: disable=unused-variable
+        """
+        List the loaded models, from the least to the most recently used, and the metrics of the
+        model cache.
+        """
+        result = {"models": cache.keys(), "cache": cache.stats()}
+        return flask.Response(response=json.dumps(result), status=200, mimetype="application/json")
+
+    @app.route("/models/<name>/<version>/invocations", methods=["POST"])
+    @catch_mlflow_exception
+    def transformation(name, version):  # pylint: disable=unused-variable
+        model_uri = _get_model_uri(model_root_uri, name, version)
+        try:
+            model_uri = _resolve_model_uri(model_uri)
+            model = acquire_model(model_uri)
+        except MlflowException:
+            raise
+        except Exception:
+            scoring_server._handle_serving_error(
+                error_message="Failed to load model '{}'.".format(model_uri),
+                error_code=RESOURCE_DOES_NOT_EXIST,
+            )
+        try:
+            return _score(model)
+        finally:
+            if loader is not None:
+                loader.release(model)
+
+    return app
+
+
+def create_app():
+    """
+    Create the multi-model server, configured by environment variables.
+    """
+    return init()
@@ -0,0 +1,202 @@
+"""
+Fast-path parsing of the JSON inputs of the scoring server.
+
+Request bodies are decoded once, straight from bytes and with
+`orjson <https://github.com/ijl/orjson>`_ if it is installed, and the DataFrame is built from the
+decoded document. If the served model has a column-based signature, each column is converted
+directly into an array of the type of the signature, instead of being inferred and then cast by
+``pandas.read_json``.
+
+The fast path only handles the inputs for which it yields the same DataFrame as
+``pandas.read_json``, which applies a few heuristics, e.g. to parse the dates of columns with
+date-like names. :py:func:`dataframe_from_json_object` returns ``None`` for the other inputs,
+which must then be parsed by ``pandas.read_json``.
+"""
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from mlflow.types import DataType, Schema
+
+# Integers greater than this value, in seconds since the epoch, are parsed as dates if they label
+# the index of a DataFrame, see `pandas.io.json._json.Parser._try_convert_to_date`
+_MIN_STAMP = 31536000
+
+
+def loads_json(data):
+    """
+    Decode a JSON document from bytes or a string, with orjson if it is installed.
+
+    :raises json.JSONDecodeError: If the document is not valid JSON.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is strict, e.g. it does not accept NaN values: decode the documents that it
+            # rejects with the standard library
+            pass
+    return json.loads(data)
+
+
+def _is_date_like_column(name):
+    # Column names whose values are parsed as dates by `pandas.read_json`
+    name = name.lower()
+    return (
+        name.endswith("_at")
+        or name.endswith("_time")
+        or name in ("modified", "date", "datetime")
+        or name.startswith("timestamp")
+    )
+
+
+def _is_numeric_string(name):
+    try:
+        float(name)
+        return True
+    except ValueError:
+        return False
+
+
+def _has_default_columns_handling(columns):
+    return (
+        len(columns) > 0
+        and all(isinstance(name, str) for name in columns)
+        and len(set(columns)) == len(columns)
+        and not any(_is_date_like_column(name) or _is_numeric_string(name) for name in columns)
+    )
+
+
+def _has_default_index_handling(index):
+    # NB: The checks of this module map builtins over the values of the inputs, which is much
+    # faster than evaluating Python expressions for each value of large inputs
+    return index is None or (set(map(type, index)) == {int} and max(index) <= _MIN_STAMP)
+
+
+def _get_column_types(schema, columns):
+    if schema is None:
+        return None
+    if schema.is_tensor_spec() or not schema.has_input_names():
+        return False
+    types = dict(zip(schema.input_names(), zip(schema.input_types(), schema.pandas_types())))
+    if set(types) != set(columns):
+        return False
+    if any(data_type == DataType.datetime for data_type, _ in types.values()):
+        return False
+    return [types[name] for name in columns]
+
+
+# Kinds of the arrays inferred from the JSON values of numeric and boolean columns that are cast to
+# the type of the column, like `pandas.read_json` casts the columns that it infers
+_COMPATIBLE_KINDS = {
+    DataType.boolean: "b",
+    DataType.integer: "i",
+    DataType.long: "i",
+    DataType.float: "if",
+    DataType.double: "if",
+}
+
+
+def _typed_column(values, data_type, pandas_type):
+    """
+    Convert the JSON values of a column to the type of the column in the schema, or return
+    ``None`` if they are not of a compatible type.
+    """
+    if data_type in (DataType.string, DataType.binary):
+        if set(map(type, values)) != {str}:
+            return None
+        if data_type == DataType.binary:
+            return np.array([base64.decodebytes(bytes(x, "utf8")) for x in values], dtype=object)
+        strings = np.array(values, dtype=object)
+        if isinstance(pandas_type, np.dtype):
+            return strings
+        return pd.array(strings, dtype=pandas_type)
+    inferred = np.array(values)
+    if inferred.ndim != 1 or inferred.dtype.kind not in _COMPATIBLE_KINDS.get(data_type, ""):
+        return None
+    return inferred.astype(pandas_type, copy=False)
+
+
+def _fill_missing_values(df):
+    # `pandas.read_json(..., dtype=False)` replaces the missing values of each column with NaN
+    columns = [df.iloc[:, i] for i in range(df.shape[1])]
+    if not any(column.isna().any() for column in columns):
+        return df
+    filled = pd.DataFrame(
+        {i: column.fillna(np.nan) for i, column in enumerate(columns)}, index=df.index
+    )
+    filled.columns = df.columns
+    return filled
+
+
+def dataframe_from_json_object(decoded, orient, schema: Schema = None):
+    """
+    Build a DataFrame from a decoded JSON document in the pandas `split` or `records` orient.
+
+    :param decoded: The decoded document, a dictionary for the `split` orient or a list of
+                    dictionaries for the `records` orient.
+    :param orient: ``"split"`` or ``"records"``.
+    :param schema: Optional input schema of the model. The columns of column-based schemas are
+                   converted directly to the types of the schema.
+    :return: The DataFrame, or ``None`` if the document must be parsed with ``pandas.read_json``.
+    """
+    try:
+        if orient == "split":
+            if not isinstance(decoded, dict) or not set(decoded) <= {"columns", "index", "data"}:
+                return None
+            columns = decoded.get("columns")
+            rows = decoded.get("data")
+            index = decoded.get("index")
+            if not isinstance(columns, list) or not isinstance(rows, list) or not rows:
+                return None
+            if set(map(type, rows)) != {list} or set(map(len, rows)) != {len(columns)}:
+                return None
+            if index is not None and (not isinstance(index, list) or len(index) != len(rows)):
+                return None
+        elif orient == "records":
+            if not isinstance(decoded, list) or not decoded or not isinstance(decoded[0], dict):
+                return None
+            keys = decoded[0].keys()
+            columns = list(keys)
+            rows = decoded
+            index = None
+            # Records with missing or additional keys are handled by pandas
+            if not all(isinstance(row, dict) and row.keys() == keys for row in rows):
+                return None
+        else:
+            return None
+
+        if not _has_default_columns_handling(columns) or not _has_default_index_handling(index):
+            return None
+
+        column_types = _get_column_types(schema, columns)
+        if column_types is False:
+            return None
+        if column_types is None:
+            if orient == "split":
+                df = pd.DataFrame(data=rows, columns=columns, index=index)
+            else:
+                df = pd.DataFrame(rows)
+            return _fill_missing_values(df)
+
+        if orient == "split":
+            column_values = list(zip(*rows))
+        else:
+            column_values = [[row[name] for row in rows] for name in columns]
+        typed_columns = {}
+        for name, values, (data_type, pandas_type) in zip(columns, column_values, column_types):
+            typed_columns[name] = _typed_column(values, data_type, pandas_type)
+            if typed_columns[name] is None:
+                return None
+        if index is not None:
+            index = pd.Index(np.array(index))
+        return pd.DataFrame(typed_columns, index=index)
+    except (TypeError, ValueError, KeyError, OverflowError):
+        return None
@@ -1,6 +1,11 @@
 import os
 from mlflow.pyfunc import scoring_server
-from mlflow.pyfunc import load_model
+from mlflow.pyfunc.scoring_server import multi_model
 
 
-app = scoring_server.init(load_model(os.environ[scoring_server._SERVER_MODEL_PATH]))
+if os.environ.get(multi_model._SERVER_MULTI_MODEL):
+    app = multi_model.create_app()
+else:
+    app = scoring_server.init(
+        scoring_server._load_model_for_serving(os.environ[scoring_server._SERVER_MODEL_PATH])
+    )
@@ -1,10 +1,25 @@
+import hashlib
 import os
 import shutil
 import tempfile
+import threading
 import zipfile
 
 from pyspark.files import SparkFiles
 
+from mlflow.exceptions import MlflowException
+from mlflow.protos.databricks_pb2 import INVALID_PARAMETER_VALUE
+from mlflow.utils.model_cache import ModelCache, _get_model_size_bytes
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MAX_MODELS_ENV_KEY = "MLFLOW_SPARK_MODEL_CACHE_MAX_MODELS"
+MAX_CACHE_SIZE_MB_ENV_KEY = "MLFLOW_SPARK_MODEL_CACHE_MAX_SIZE_MB"
+DEFAULT_MAX_MODELS = 16
+
 
 class SparkModelCache(object):
     """Caches models in memory on Spark Executors, to avoid continually reloading from disk.
@@ -14,52 +29,207 @@ class SparkModelCache(object):
     Python's module loading behavior for classes in different modules. In this case, we
     are relying on the fact that Python will load a module at-most-once, and can therefore
     store per-process state in a static map.
+
+    Each Python worker keeps the loaded models in a least recently used :py:class:`ModelCache
+    <mlflow.utils.model_cache.ModelCache>`, bounded by the ``MLFLOW_SPARK_MODEL_CACHE_MAX_MODELS``
+    (16 by default) and ``MLFLOW_SPARK_MODEL_CACHE_MAX_SIZE_MB`` (no limit by default) environment
+    variables of the executors. The Python workers of an executor share the directories the
+    archives are extracted to, and the directory of a model is deleted when the last worker using
+    it evicts the model.
     """
 
-    # Map from unique name --> loaded model.
-    _models = {}
+    # Cache of the loaded models of this Python process, created on first use.
+    _cache = None
+    _cache_lock = threading.Lock()
 
-    # Number of cache hits we've had, for testing purposes.
-    _cache_hits = 0
+    # Map from id of a loaded model --> lock file held while this process uses its extracted
+    # directory. Keying by model rather than by archive path keeps the lock of a model that is
+    # evicted while another request of this process loads the same archive again.
+    _extraction_locks = {}
+
+    # Map from (Spark application ID, digest of the model directory) --> archive path, on the
+    # driver.
+    _archives = {}
 
     def __init__(self):
         pass
 
+    @staticmethod
+    def _get_model_digest(model_path):
+        """Return a digest of the relative paths and contents of the files of a model directory."""
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(model_path):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                relative_path = os.path.relpath(path, model_path).replace(os.sep, "/")
+                digest.update(
+                    "{}\0{}\0".format(relative_path, os.path.getsize(path)).encode("utf-8")
+                )
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(chunk)
+        return digest.hexdigest()
+
     @staticmethod
     def add_local_model(spark, model_path):
         """Given a SparkSession and a model_path which refers to a pyfunc directory locally,
         we will zip the directory up, enable it to be distributed to executors, and return
         the "archive_path", which should be used as the path in get_or_load().
+
+        Archives are identified by the contents of the model directory: adding a model whose
+        contents were already added to the Spark application returns the existing archive, which
+        is neither created nor distributed again.
         """
-        _, archive_basepath = tempfile.mkstemp()
+        digest = SparkModelCache._get_model_digest(model_path)
+        key = (spark.sparkContext.applicationId, digest)
+        archive_path = SparkModelCache._archives.get(key)
+        if archive_path is not None:
+            if not os.path.exists(archive_path):
+                # Spark serves added files to the executors from their path on the driver, and
+                # rejects adding another file of the same name: recreate the deleted archive.
+                SparkModelCache._make_archive(model_path, archive_path)
+            return archive_path
+
         # NB: We must archive the directory as Spark.addFile does not support non-DFS
-        # directories when recursive=True.
-        archive_path = shutil.make_archive(archive_basepath, "zip", model_path)
+        # directories when recursive=True. Executors look up files by name, so the name of the
+        # archive identifies its contents.
+        archive_path = os.path.join(tempfile.mkdtemp(), "mlflow-model-{}.zip".format(digest))
+        SparkModelCache._make_archive(model_path, archive_path)
         spark.sparkContext.addFile(archive_path)
+        SparkModelCache._archives[key] = archive_path
         return archive_path
 
+    @staticmethod
+    def _make_archive(model_path, archive_path):
+        archive_dir = os.path.dirname(archive_path)
+        os.makedirs(archive_dir, exist_ok=True)
+        # Write the archive next to its path first, so that it is never served partially written
+        temp_dir = tempfile.mkdtemp(dir=archive_dir)
+        try:
+            temp_path = shutil.make_archive(os.path.join(temp_dir, "model"), "zip", model_path)
+            os.replace(temp_path, archive_path)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
     @staticmethod
     def get_or_load(archive_path):
         """Given a path returned by add_local_model(), this method will return the loaded model.
-        If this Python process ever loaded the model before, we will reuse that copy.
+        If this Python process ever loaded the model before and has not evicted it, we will reuse
+        that copy.
+        """
+        return SparkModelCache._get_cache().get(archive_path)
+
+    @staticmethod
+    def stats():
+        """Return the metrics of the model cache of this Python process, such as its numbers of
+        hits, misses and evictions.
         """
-        if archive_path in SparkModelCache._models:
-            SparkModelCache._cache_hits += 1
-            return SparkModelCache._models[archive_path]
+        return SparkModelCache._get_cache().stats()
 
+    @staticmethod
+    def _get_cache():
+        with SparkModelCache._cache_lock:
+            if SparkModelCache._cache is None:
+                max_models, max_size_bytes = SparkModelCache._get_cache_config()
+                SparkModelCache._cache = ModelCache(
+                    SparkModelCache._load,
+                    max_models=max_models,
+                    max_size_bytes=max_size_bytes,
+                    on_evict=SparkModelCache._release,
+                )
+            return SparkModelCache._cache
+
+    @staticmethod
+    def _get_cache_config():
+        max_models = os.environ.get(MAX_MODELS_ENV_KEY) or DEFAULT_MAX_MODELS
+        max_cache_size_mb = os.environ.get(MAX_CACHE_SIZE_MB_ENV_KEY) or None
+        try:
+            max_models = int(max_models)
+            max_cache_size_mb = float(max_cache_size_mb) if max_cache_size_mb is not None else None
+        except ValueError:
+            max_models = -1
+        if max_models <= 0 or (max_cache_size_mb is not None and max_cache_size_mb <= 0):
+            raise MlflowException(
+                "Invalid Spark model cache configuration: {} must be a positive integer and {} a"
+                " positive number of megabytes.".format(
+                    MAX_MODELS_ENV_KEY, MAX_CACHE_SIZE_MB_ENV_KEY
+                ),
+                error_code=INVALID_PARAMETER_VALUE,
+            )
+        max_size_bytes = int(max_cache_size_mb * 1024 * 1024) if max_cache_size_mb else None
+        return max_models, max_size_bytes
+
+    @staticmethod
+    def _get_extraction_root():
+        # The root directory of SparkFiles is shared by the Python workers of an executor and is
+        # deleted by Spark at the end of the application
+        return os.path.join(SparkFiles.getRootDirectory(), "mlflow-models")
+
+    @staticmethod
+    def _get_extraction_path(archive_path):
+        name = os.path.splitext(os.path.basename(archive_path))[0]
+        return os.path.join(SparkModelCache._get_extraction_root(), name)
+
+    @staticmethod
+    def _load(archive_path):
         # BUG: Despite the documentation of SparkContext.addFile() and SparkFiles.get() in Scala
         # and Python, it turns out that we actually need to use the basename as the input to
         # SparkFiles.get(), as opposed to the (absolute) path.
-        archive_path_basename = os.path.basename(archive_path)
-        local_path = SparkFiles.get(archive_path_basename)
-        temp_dir = tempfile.mkdtemp()
-        zip_ref = zipfile.ZipFile(local_path, "r")
-        zip_ref.extractall(temp_dir)
-        zip_ref.close()
-
-        # We must rely on a supposed cyclic import here because we want this behavior
-        # on the Spark Executors (i.e., don't try to pickle the load_model function).
-        from mlflow.pyfunc import load_pyfunc  # pylint: disable=cyclic-import
-
-        SparkModelCache._models[archive_path] = load_pyfunc(temp_dir)
-        return SparkModelCache._models[archive_path]
+        local_path = SparkFiles.get(os.path.basename(archive_path))
+        model_path = SparkModelCache._get_extraction_path(archive_path)
+        extraction_root = os.path.dirname(model_path)
+        if not os.path.isdir(extraction_root):
+            os.makedirs(extraction_root, exist_ok=True)
+
+        # NB: A shared lock on the model directory is held as long as the model is cached, so that
+        # other Python workers do not delete the directory while it is in use.
+        lock_file = None
+        if fcntl is not None:
+            lock_file = open(model_path + ".lock", "a")
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+        try:
+            if not os.path.isdir(model_path):
+                temp_dir = tempfile.mkdtemp(dir=extraction_root)
+                with zipfile.ZipFile(local_path, "r") as zip_ref:
+                    zip_ref.extractall(temp_dir)
+                try:
+                    os.rename(temp_dir, model_path)
+                except OSError:
+                    # Another Python worker extracted the model first
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                    if not os.path.isdir(model_path):
+                        raise
+
+            # We must rely on a supposed cyclic import here because we want this behavior
+            # on the Spark Executors (i.e., don't try to pickle the load_model function).
+            from mlflow.pyfunc import load_pyfunc  # pylint: disable=cyclic-import
+
+            model = load_pyfunc(model_path)
+        except BaseException:
+            if lock_file is not None:
+                lock_file.close()
+            raise
+        SparkModelCache._extraction_locks[id(model)] = lock_file
+        return model, _get_model_size_bytes(model_path)
+
+    @staticmethod
+    def _release(archive_path, model):
+        lock_file = SparkModelCache._extraction_locks.pop(id(model), None)
+        if lock_file is None:
+            # Without file locks, the directories are left for Spark to delete with the application
+            return
+        try:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # Other Python workers still use the model
+                return
+            model_path = SparkModelCache._get_extraction_path(archive_path)
+            if os.path.isdir(model_path):
+                # Move the directory away first, so that it is never seen partially deleted
+                deleted_path = tempfile.mkdtemp(dir=os.path.dirname(model_path))
+                os.rename(model_path, os.path.join(deleted_path, "model"))
+                shutil.rmtree(deleted_path, ignore_errors=True)
+        finally:
+            lock_file.close()
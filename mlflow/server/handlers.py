@@ -1,9 +1,12 @@
 # Define all the service endpoint handlers here.
+import hashlib
 import json
 import os
 import re
 
 import logging
+import threading
+from collections import OrderedDict
 from functools import wraps
 
 from flask import Response, request, send_file
@@ -21,7 +24,9 @@ from mlflow.protos.service_pb2 import (
     MlflowService,
     GetExperiment,
     GetRun,
+    GetRuns,
     SearchRuns,
+    AggregateRuns,
     ListArtifacts,
     GetMetricHistory,
     CreateRun,
@@ -65,18 +70,33 @@ from mlflow.protos.model_registry_pb2 import (
 )
 from mlflow.protos.databricks_pb2 import RESOURCE_DOES_NOT_EXIST, INVALID_PARAMETER_VALUE
 from mlflow.store.artifact.artifact_repository_registry import get_artifact_repository
+from mlflow.store.artifact.content_addressed import resolve_blob_pointers
 from mlflow.store.db.db_types import DATABASE_ENGINES
+from mlflow.server.request_coalescer import RequestCoalescer, ALL_TAGS
 from mlflow.tracking._model_registry.registry import ModelRegistryStoreRegistry
 from mlflow.tracking._tracking_service.registry import TrackingStoreRegistry
 from mlflow.utils.proto_json_utils import message_to_json, parse_dict
-from mlflow.utils.validation import _validate_batch_log_api_req
+from mlflow.utils.validation import _validate_batch_log_api_req, _validate_get_runs_request
 from mlflow.utils.string_utils import is_string_type
 from mlflow.tracking.registry import UnsupportedModelRegistryStoreURIException
 
 _logger = logging.getLogger(__name__)
 _tracking_store = None
 _model_registry_store = None
+_search_coalescer = None
 STATIC_PREFIX_ENV_VAR = "_MLFLOW_STATIC_PREFIX"
+# Number of seconds for which SearchRuns and ListExperiments results are cached by each server
+# worker. Identical concurrent requests are always coalesced, even if caching is disabled.
+SEARCH_CACHE_TTL_ENV_VAR = "MLFLOW_SERVER_SEARCH_CACHE_TTL"
+# Tag identifying cached ListExperiments results, see ``RequestCoalescer.invalidate``
+_EXPERIMENT_LIST_TAG = ("experiments",)
+_MAX_TRACKED_RUN_EXPERIMENTS = 10000
+_run_experiment_ids = OrderedDict()
+_run_experiment_ids_lock = threading.Lock()
+# ETags of artifact files, keyed by the path, size and modification time of the files
+_MAX_CACHED_FILE_ETAGS = 10000
+_file_etags = OrderedDict()
+_file_etags_lock = threading.Lock()
 
 
 class TrackingStoreRegistryWrapper(TrackingStoreRegistry):
@@ -120,6 +140,16 @@ _tracking_store_registry = TrackingStoreRegistryWrapper()
 _model_registry_store_registry = ModelRegistryStoreRegistryWrapper()
 
 
+def _maybe_instrument_store(store, store_name):
+    from mlflow.server import PROMETHEUS_EXPORTER_ENV_VAR
+
+    if os.environ.get(PROMETHEUS_EXPORTER_ENV_VAR):
+        from mlflow.server.prometheus_exporter import instrument_store
+
+        return instrument_store(store, store_name)
+    return store
+
+
 def _get_tracking_store(backend_store_uri=None, default_artifact_root=None):
     from mlflow.server import BACKEND_STORE_URI_ENV_VAR, ARTIFACT_ROOT_ENV_VAR
 
@@ -127,7 +157,9 @@ def _get_tracking_store(backend_store_uri=None, default_artifact_root=None):
     if _tracking_store is None:
         store_uri = backend_store_uri or os.environ.get(BACKEND_STORE_URI_ENV_VAR, None)
         artifact_root = default_artifact_root or os.environ.get(ARTIFACT_ROOT_ENV_VAR, None)
-        _tracking_store = _tracking_store_registry.get_store(store_uri, artifact_root)
+        _tracking_store = _maybe_instrument_store(
+            _tracking_store_registry.get_store(store_uri, artifact_root), "tracking"
+        )
     return _tracking_store
 
 
@@ -137,10 +169,63 @@ def _get_model_registry_store(backend_store_uri=None):
     global _model_registry_store
     if _model_registry_store is None:
         store_uri = backend_store_uri or os.environ.get(BACKEND_STORE_URI_ENV_VAR, None)
-        _model_registry_store = _model_registry_store_registry.get_store(store_uri)
+        _model_registry_store = _maybe_instrument_store(
+            _model_registry_store_registry.get_store(store_uri), "model_registry"
+        )
     return _model_registry_store
 
 
+def _get_search_coalescer():
+    global _search_coalescer
+    if _search_coalescer is None:
+        ttl_seconds = float(os.environ.get(SEARCH_CACHE_TTL_ENV_VAR, 0))
+        _search_coalescer = RequestCoalescer(ttl_seconds=ttl_seconds)
+    return _search_coalescer
+
+
+def _experiment_tag(experiment_id):
+    return ("experiment", str(experiment_id))
+
+
+def _remember_run_experiment(run_id, experiment_id):
+    with _run_experiment_ids_lock:
+        _run_experiment_ids[run_id] = str(experiment_id)
+        _run_experiment_ids.move_to_end(run_id)
+        while len(_run_experiment_ids) > _MAX_TRACKED_RUN_EXPERIMENTS:
+            _run_experiment_ids.popitem(last=False)
+
+
+def _invalidate_experiment_searches(experiment_id):
+    _get_search_coalescer().invalidate([_EXPERIMENT_LIST_TAG, _experiment_tag(experiment_id)])
+
+
+def _get_run_experiment_id(run_id):
+    with _run_experiment_ids_lock:
+        experiment_id = _run_experiment_ids.get(run_id)
+    if experiment_id is None:
+        # The run was created or searched by another server worker
+        try:
+            experiment_id = _get_tracking_store().get_run(run_id).info.experiment_id
+        except MlflowException:
+            return None
+        _remember_run_experiment(run_id, experiment_id)
+    return experiment_id
+
+
+def _invalidate_run_searches(run_id):
+    """
+    Discard cached search results that may contain the specified run. Runs are mapped to their
+    experiments using the runs observed in search results and run creations, and by looking up the
+    runs that have not been observed by this server worker. Writes to runs that cannot be looked
+    up invalidate all cached search results.
+    """
+    experiment_id = _get_run_experiment_id(run_id)
+    if experiment_id is None:
+        _get_search_coalescer().invalidate(ALL_TAGS)
+    else:
+        _get_search_coalescer().invalidate([_experiment_tag(experiment_id)])
+
+
 def initialize_backend_stores(backend_store_uri=None, default_artifact_root=None):
     _get_tracking_store(backend_store_uri, default_artifact_root)
     try:
@@ -196,15 +281,53 @@ def _get_request_message(request_message, flask_request=request):
     return request_message
 
 
+def _compute_file_etag(filename, chunk_size=1024 * 1024):
+    """
+    Compute a content-based ETag for the specified file. Remote artifact repositories download
+    artifacts to a fresh temporary location on every request, so validators derived from the
+    file's path or modification time would never match across requests.
+    """
+    md5 = hashlib.md5()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _get_file_etag(filename):
+    """
+    Return the ETag of the specified file, hashing its contents only if the file was not hashed
+    before with the same size and modification time. Artifacts of local repositories are served
+    from their stable location, so they are hashed once rather than on every request.
+    """
+    stat = os.stat(filename)
+    key = (filename, stat.st_size, stat.st_mtime_ns)
+    with _file_etags_lock:
+        etag = _file_etags.get(key)
+        if etag is not None:
+            _file_etags.move_to_end(key)
+            return etag
+    etag = _compute_file_etag(filename)
+    with _file_etags_lock:
+        _file_etags[key] = etag
+        while len(_file_etags) > _MAX_CACHED_FILE_ETAGS:
+            _file_etags.popitem(last=False)
+    return etag
+
+
 def _send_artifact(artifact_repository, path):
     filename = os.path.abspath(artifact_repository.download_artifacts(path))
     extension = os.path.splitext(filename)[-1].replace(".", "")
     # Always send artifacts as attachments to prevent the browser from displaying them on our web
     # server's domain, which might enable XSS.
+    # The conditional request is evaluated once, against the content-based ETag, rather than by
+    # send_file against its own ETag derived from the path of the (possibly temporary) file
     if extension in _TEXT_EXTENSIONS:
-        return send_file(filename, mimetype="text/plain", as_attachment=True)
+        response = send_file(filename, mimetype="text/plain", as_attachment=True, conditional=False)
     else:
-        return send_file(filename, as_attachment=True)
+        response = send_file(filename, as_attachment=True, conditional=False)
+    response.set_etag(_get_file_etag(filename))
+    return response.make_conditional(request)
 
 
 def catch_mlflow_exception(func):
@@ -261,6 +384,7 @@ def _create_experiment():
     experiment_id = _get_tracking_store().create_experiment(
         request_message.name, request_message.artifact_location
     )
+    _get_search_coalescer().invalidate([_EXPERIMENT_LIST_TAG])
     response_message = CreateExperiment.Response()
     response_message.experiment_id = experiment_id
     response = Response(mimetype="application/json")
@@ -274,9 +398,7 @@ def _get_experiment():
     response_message = GetExperiment.Response()
     experiment = _get_tracking_store().get_experiment(request_message.experiment_id).to_proto()
     response_message.experiment.MergeFrom(experiment)
-    response = Response(mimetype="application/json")
-    response.set_data(message_to_json(response_message))
-    return response
+    return _wrap_conditional_response(response_message)
 
 
 @catch_mlflow_exception
@@ -300,6 +422,7 @@ def _get_experiment_by_name():
 def _delete_experiment():
     request_message = _get_request_message(DeleteExperiment())
     _get_tracking_store().delete_experiment(request_message.experiment_id)
+    _invalidate_experiment_searches(request_message.experiment_id)
     response_message = DeleteExperiment.Response()
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -310,6 +433,7 @@ def _delete_experiment():
 def _restore_experiment():
     request_message = _get_request_message(RestoreExperiment())
     _get_tracking_store().restore_experiment(request_message.experiment_id)
+    _invalidate_experiment_searches(request_message.experiment_id)
     response_message = RestoreExperiment.Response()
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -323,6 +447,7 @@ def _update_experiment():
         _get_tracking_store().rename_experiment(
             request_message.experiment_id, request_message.new_name
         )
+        _invalidate_experiment_searches(request_message.experiment_id)
     response_message = UpdateExperiment.Response()
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -340,6 +465,8 @@ def _create_run():
         start_time=request_message.start_time,
         tags=tags,
     )
+    _remember_run_experiment(run.info.run_id, run.info.experiment_id)
+    _get_search_coalescer().invalidate([_experiment_tag(run.info.experiment_id)])
 
     response_message = CreateRun.Response()
     response_message.run.MergeFrom(run.to_proto())
@@ -355,6 +482,7 @@ def _update_run():
     updated_info = _get_tracking_store().update_run_info(
         run_id, request_message.status, request_message.end_time
     )
+    _invalidate_run_searches(run_id)
     response_message = UpdateRun.Response(run_info=updated_info.to_proto())
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -365,6 +493,7 @@ def _update_run():
 def _delete_run():
     request_message = _get_request_message(DeleteRun())
     _get_tracking_store().delete_run(request_message.run_id)
+    _invalidate_run_searches(request_message.run_id)
     response_message = DeleteRun.Response()
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -375,6 +504,7 @@ def _delete_run():
 def _restore_run():
     request_message = _get_request_message(RestoreRun())
     _get_tracking_store().restore_run(request_message.run_id)
+    _invalidate_run_searches(request_message.run_id)
     response_message = RestoreRun.Response()
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -389,6 +519,7 @@ def _log_metric():
     )
     run_id = request_message.run_id or request_message.run_uuid
     _get_tracking_store().log_metric(run_id, metric)
+    _invalidate_run_searches(run_id)
     response_message = LogMetric.Response()
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -401,6 +532,7 @@ def _log_param():
     param = Param(request_message.key, request_message.value)
     run_id = request_message.run_id or request_message.run_uuid
     _get_tracking_store().log_param(run_id, param)
+    _invalidate_run_searches(run_id)
     response_message = LogParam.Response()
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -412,6 +544,7 @@ def _set_experiment_tag():
     request_message = _get_request_message(SetExperimentTag())
     tag = ExperimentTag(request_message.key, request_message.value)
     _get_tracking_store().set_experiment_tag(request_message.experiment_id, tag)
+    _invalidate_experiment_searches(request_message.experiment_id)
     response_message = SetExperimentTag.Response()
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -424,6 +557,7 @@ def _set_tag():
     tag = RunTag(request_message.key, request_message.value)
     run_id = request_message.run_id or request_message.run_uuid
     _get_tracking_store().set_tag(run_id, tag)
+    _invalidate_run_searches(run_id)
     response_message = SetTag.Response()
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -434,6 +568,7 @@ def _set_tag():
 def _delete_tag():
     request_message = _get_request_message(DeleteTag())
     _get_tracking_store().delete_tag(request_message.run_id, request_message.key)
+    _invalidate_run_searches(request_message.run_id)
     response_message = DeleteTag.Response()
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -446,9 +581,18 @@ def _get_run():
     response_message = GetRun.Response()
     run_id = request_message.run_id or request_message.run_uuid
     response_message.run.MergeFrom(_get_tracking_store().get_run(run_id).to_proto())
-    response = Response(mimetype="application/json")
-    response.set_data(message_to_json(response_message))
-    return response
+    return _wrap_conditional_response(response_message)
+
+
+@catch_mlflow_exception
+def _get_runs():
+    request_message = _get_request_message(GetRuns())
+    run_ids = list(request_message.run_ids)
+    _validate_get_runs_request(run_ids)
+    runs = _get_tracking_store().get_runs(run_ids)
+    response_message = GetRuns.Response()
+    response_message.runs.extend([run.to_proto() for run in runs])
+    return _wrap_response(response_message)
 
 
 @catch_mlflow_exception
@@ -463,9 +607,24 @@ def _search_runs():
     experiment_ids = request_message.experiment_ids
     order_by = request_message.order_by
     page_token = request_message.page_token
-    run_entities = _get_tracking_store().search_runs(
-        experiment_ids, filter_string, run_view_type, max_results, order_by, page_token
+    key = (
+        "search_runs",
+        tuple(experiment_ids),
+        filter_string,
+        run_view_type,
+        max_results,
+        tuple(order_by),
+        page_token,
     )
+    run_entities = _get_search_coalescer().execute(
+        key,
+        lambda: _get_tracking_store().search_runs(
+            experiment_ids, filter_string, run_view_type, max_results, order_by, page_token
+        ),
+        tags=[_experiment_tag(experiment_id) for experiment_id in experiment_ids],
+    )
+    for run in run_entities:
+        _remember_run_experiment(run.info.run_id, run.info.experiment_id)
     response_message.runs.extend([r.to_proto() for r in run_entities])
     if run_entities.token:
         response_message.next_page_token = run_entities.token
@@ -474,6 +633,36 @@ def _search_runs():
     return response
 
 
+@catch_mlflow_exception
+def _aggregate_runs():
+    request_message = _get_request_message(AggregateRuns())
+    run_view_type = ViewType.ACTIVE_ONLY
+    if request_message.HasField("run_view_type"):
+        run_view_type = ViewType.from_proto(request_message.run_view_type)
+    filter_string = request_message.filter
+    experiment_ids = list(request_message.experiment_ids)
+    group_by = list(request_message.group_by)
+    aggregations = list(request_message.aggregations)
+    key = (
+        "aggregate_runs",
+        tuple(experiment_ids),
+        filter_string,
+        run_view_type,
+        tuple(group_by),
+        tuple(aggregations),
+    )
+    groups = _get_search_coalescer().execute(
+        key,
+        lambda: _get_tracking_store().aggregate_runs(
+            experiment_ids, filter_string, run_view_type, group_by, aggregations
+        ),
+        tags=[_experiment_tag(experiment_id) for experiment_id in experiment_ids],
+    )
+    response_message = AggregateRuns.Response()
+    response_message.groups.extend([group.to_proto() for group in groups])
+    return _wrap_response(response_message)
+
+
 @catch_mlflow_exception
 def _list_artifacts():
     request_message = _get_request_message(ListArtifacts())
@@ -484,9 +673,10 @@ def _list_artifacts():
         path = None
     run_id = request_message.run_id or request_message.run_uuid
     run = _get_tracking_store().get_run(run_id)
-    artifact_entities = _get_artifact_repo(run).list_artifacts(path)
+    artifact_repo = _get_artifact_repo(run)
+    artifact_entities = resolve_blob_pointers(artifact_repo.list_artifacts(path))
     response_message.files.extend([a.to_proto() for a in artifact_entities])
-    response_message.root_uri = _get_artifact_repo(run).artifact_uri
+    response_message.root_uri = artifact_repo.artifact_uri
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
     return response
@@ -499,9 +689,7 @@ def _get_metric_history():
     run_id = request_message.run_id or request_message.run_uuid
     metric_entites = _get_tracking_store().get_metric_history(run_id, request_message.metric_key)
     response_message.metrics.extend([m.to_proto() for m in metric_entites])
-    response = Response(mimetype="application/json")
-    response.set_data(message_to_json(response_message))
-    return response
+    return _wrap_conditional_response(response_message)
 
 
 @catch_mlflow_exception
@@ -511,7 +699,11 @@ def _list_experiments():
     # https://googleapis.dev/python/protobuf/latest/google/protobuf/message.html
     # #google.protobuf.message.Message.ListFields
     params = {field.name: val for field, val in request_message.ListFields()}
-    experiment_entities = _get_tracking_store().list_experiments(**params)
+    experiment_entities = _get_search_coalescer().execute(
+        ("list_experiments", tuple(sorted(params.items()))),
+        lambda: _get_tracking_store().list_experiments(**params),
+        tags=[_EXPERIMENT_LIST_TAG],
+    )
     response_message = ListExperiments.Response()
     response_message.experiments.extend([e.to_proto() for e in experiment_entities])
     if experiment_entities.token:
@@ -536,6 +728,7 @@ def _log_batch():
     _get_tracking_store().log_batch(
         run_id=request_message.run_id, metrics=metrics, params=params, tags=tags
     )
+    _invalidate_run_searches(request_message.run_id)
     response_message = LogBatch.Response()
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -566,6 +759,7 @@ def _log_model():
     _get_tracking_store().record_logged_model(
         run_id=request_message.run_id, mlflow_model=Model.from_dict(model)
     )
+    _invalidate_run_searches(request_message.run_id)
     response_message = LogModel.Response()
     response = Response(mimetype="application/json")
     response.set_data(message_to_json(response_message))
@@ -578,6 +772,18 @@ def _wrap_response(response_message):
     return response
 
 
+def _wrap_conditional_response(response_message):
+    """
+    Serialize the response message like ``_wrap_response``, attaching an ETag derived from the
+    serialized payload. If the request carries a matching ``If-None-Match`` header, the response
+    is converted to a bodiless ``304 Not Modified`` so that polling clients can reuse the
+    representation they already hold.
+    """
+    response = _wrap_response(response_message)
+    response.add_etag()
+    return response.make_conditional(request)
+
+
 @catch_mlflow_exception
 def _create_registered_model():
     request_message = _get_request_message(CreateRegisteredModel())
@@ -860,7 +1066,9 @@ HANDLERS = {
     LogBatch: _log_batch,
     LogModel: _log_model,
     GetRun: _get_run,
+    GetRuns: _get_runs,
     SearchRuns: _search_runs,
+    AggregateRuns: _aggregate_runs,
     ListArtifacts: _list_artifacts,
     GetMetricHistory: _get_metric_history,
     ListExperiments: _list_experiments,
@@ -1,32 +1,197 @@
-from prometheus_flask_exporter.multiprocess import GunicornInternalPrometheusMetrics
-from flask import request
-
-
-def activate_prometheus_exporter(app):
-    metrics = GunicornInternalPrometheusMetrics(app, export_defaults=False)
-
-    endpoint = app.view_functions
-    histogram = metrics.histogram(
-        "mlflow_requests_by_status_and_path",
-        "Request latencies and count by status and path",
-        labels={
-            "status": lambda r: r.status_code,
-            "path": lambda: change_path_for_metric(request.path),
-        },
-    )
-    for func_name, func in endpoint.items():
-        if func_name in ["_search_runs", "_log_metric", "_log_param", "_set_tag", "_create_run"]:
-            app.view_functions[func_name] = histogram(func)
-
-    return app
-
-
-def change_path_for_metric(path):
-    """
-    Replace the '/' in the metric path by '_' so grafana can correctly use it.
-    :param path: path of the metric (example: runs/search)
-    :return: path with '_' instead of '/'
-    """
-    if "mlflow/" in path:
-        path = path.split("mlflow/")[-1]
-    return path.replace("/", "_")
+import functools
+import inspect
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_flask_exporter.multiprocess import GunicornInternalPrometheusMetrics
+from flask import g, request
+
+# Flask endpoint names of the routes that serve artifact contents
+_ARTIFACT_ENDPOINTS = ["serve_artifacts", "serve_model_version_artifact"]
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+_PAYLOAD_SIZE_BUCKETS = tuple(4 ** i for i in range(4, 16))
+_THROUGHPUT_BUCKETS = tuple(1024 * 4 ** i for i in range(0, 12))
+
+HANDLER_LATENCY = Histogram(
+    "mlflow_handler_latency_seconds",
+    "Latency of MLflow server request handlers",
+    ["handler", "method", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+REQUEST_PAYLOAD_SIZE = Histogram(
+    "mlflow_request_payload_size_bytes",
+    "Size of request payloads received by MLflow server request handlers",
+    ["handler"],
+    buckets=_PAYLOAD_SIZE_BUCKETS,
+)
+RESPONSE_PAYLOAD_SIZE = Histogram(
+    "mlflow_response_payload_size_bytes",
+    "Size of response payloads returned by MLflow server request handlers",
+    ["handler"],
+    buckets=_PAYLOAD_SIZE_BUCKETS,
+)
+ARTIFACT_BYTES_SERVED = Counter(
+    "mlflow_artifact_bytes_served",
+    "Number of artifact bytes served by the MLflow server",
+    ["handler"],
+)
+ARTIFACT_THROUGHPUT = Histogram(
+    "mlflow_artifact_throughput_bytes_per_second",
+    "Throughput of artifact downloads served by the MLflow server",
+    ["handler"],
+    buckets=_THROUGHPUT_BUCKETS,
+)
+STORE_METHOD_LATENCY = Histogram(
+    "mlflow_store_method_latency_seconds",
+    "Latency of tracking and model registry store methods",
+    ["store", "backend", "method", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "mlflow_db_pool_checked_out_connections",
+    "Number of database connections currently checked out of the SQLAlchemy pool",
+    ["store"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "mlflow_db_pool_overflow_connections",
+    "Number of overflow connections currently opened by the SQLAlchemy pool",
+    ["store"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_ACQUIRE_LATENCY = Histogram(
+    "mlflow_db_pool_connection_acquire_seconds",
+    "Time spent waiting to acquire a database connection from the SQLAlchemy pool",
+    ["store"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+
+def activate_prometheus_exporter(app):
+    metrics = GunicornInternalPrometheusMetrics(app, export_defaults=False)
+
+    endpoint = app.view_functions
+    histogram = metrics.histogram(
+        "mlflow_requests_by_status_and_path",
+        "Request latencies and count by status and path",
+        labels={
+            "status": lambda r: r.status_code,
+            "path": lambda: change_path_for_metric(request.path),
+        },
+    )
+    for func_name, func in endpoint.items():
+        if func_name in ["_search_runs", "_log_metric", "_log_param", "_set_tag", "_create_run"]:
+            app.view_functions[func_name] = histogram(func)
+
+    app.before_request(_start_request_timer)
+    app.after_request(_observe_request)
+
+    return app
+
+
+def change_path_for_metric(path):
+    """
+    Replace the '/' in the metric path by '_' so grafana can correctly use it.
+    :param path: path of the metric (example: runs/search)
+    :return: path with '_' instead of '/'
+    """
+    if "mlflow/" in path:
+        path = path.split("mlflow/")[-1]
+    return path.replace("/", "_")
+
+
+def _start_request_timer():
+    g.mlflow_request_start_time = time.time()
+
+
+def _observe_request(response):
+    start_time = getattr(g, "mlflow_request_start_time", None)
+    # Requests that are not routed to a handler (e.g. 404s) would otherwise create a label value
+    # per unknown path
+    handler = request.endpoint
+    if start_time is None or handler is None:
+        return response
+
+    elapsed = time.time() - start_time
+    HANDLER_LATENCY.labels(handler, request.method, response.status_code).observe(elapsed)
+    if request.content_length is not None:
+        REQUEST_PAYLOAD_SIZE.labels(handler).observe(request.content_length)
+    response_size = response.content_length
+    if response_size is not None:
+        RESPONSE_PAYLOAD_SIZE.labels(handler).observe(response_size)
+        if handler in _ARTIFACT_ENDPOINTS and response.status_code == 200:
+            ARTIFACT_BYTES_SERVED.labels(handler).inc(response_size)
+            ARTIFACT_THROUGHPUT.labels(handler).observe(response_size / max(elapsed, 1e-6))
+    return response
+
+
+def _timed_store_method(store_name, backend, method_name, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start_time = time.time()
+        status = "success"
+        try:
+            return method(*args, **kwargs)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            STORE_METHOD_LATENCY.labels(store_name, backend, method_name, status).observe(
+                time.time() - start_time
+            )
+
+    return wrapper
+
+
+def _instrument_sqlalchemy_pool(store_name, engine):
+    import sqlalchemy
+
+    pool = engine.pool
+    if getattr(pool, "_mlflow_prometheus_instrumented", False):
+        return
+
+    def update_pool_gauges(*_):
+        # Only queue-based pools (i.e. not the ones used for SQLite) track checkouts and overflow
+        if hasattr(pool, "checkedout"):
+            DB_POOL_CHECKED_OUT.labels(store_name).set(pool.checkedout())
+        if hasattr(pool, "overflow"):
+            DB_POOL_OVERFLOW.labels(store_name).set(max(pool.overflow(), 0))
+
+    sqlalchemy.event.listen(pool, "checkout", update_pool_gauges)
+    sqlalchemy.event.listen(pool, "checkin", update_pool_gauges)
+
+    connect = pool.connect
+
+    @functools.wraps(connect)
+    def timed_connect(*args, **kwargs):
+        start_time = time.time()
+        try:
+            return connect(*args, **kwargs)
+        finally:
+            DB_POOL_ACQUIRE_LATENCY.labels(store_name).observe(time.time() - start_time)
+
+    pool.connect = timed_connect
+    pool._mlflow_prometheus_instrumented = True
+
+
+def instrument_store(store, store_name):
+    """
+    Record the latency of every public method of the specified tracking or model registry store
+    and, for SQLAlchemy-based stores, the state of the database connection pool.
+
+    :param store: The store instance to instrument. Its methods are wrapped in place.
+    :param store_name: Name identifying the store in metric labels, e.g. ``tracking``.
+    :return: The instrumented store.
+    """
+    backend = type(store).__name__
+    for method_name, method in inspect.getmembers(store, inspect.ismethod):
+        if not method_name.startswith("_"):
+            setattr(
+                store, method_name, _timed_store_method(store_name, backend, method_name, method)
+            )
+
+    engine = getattr(store, "engine", None)
+    if engine is not None and hasattr(engine, "pool"):
+        _instrument_sqlalchemy_pool(store_name, engine)
+    return store
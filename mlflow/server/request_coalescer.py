@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Wildcard invalidation tag that matches every cached result
+ALL_TAGS = object()
+
+
+class _Call(object):
+    def __init__(self, tags):
+        self.tags = tags
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class RequestCoalescer(object):
+    """
+    Deduplicates identical concurrent requests so that only one of them executes the underlying
+    (typically expensive) store query, while the others wait for and share its result. Results can
+    optionally be retained for a short time-to-live so that identical requests issued in quick
+    succession are also served without querying the store.
+
+    Each result is associated with a set of tags (e.g. the experiment IDs a search covered). Writes
+    invalidate cached results by tag; a result computed concurrently with an invalidation of one of
+    its tags is returned to the callers that joined the request before the invalidation, but never
+    cached. Requests made after the invalidation execute ``func`` again, so that they observe the
+    write that caused it.
+
+    :param ttl_seconds: Number of seconds for which results are cached after they are computed. If
+                        ``0``, results are only shared between concurrent in-flight requests.
+    :param max_entries: Maximum number of cached results. The least recently used result is
+                        evicted once this limit is exceeded.
+    """
+
+    def __init__(self, ttl_seconds=0, max_entries=1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        # Maps request keys to tuples of (expiration time, tags, result)
+        self._results = OrderedDict()
+        # Generation counters used to detect invalidations that race with in-flight requests
+        self._tag_generations = {}
+        self._global_generation = 0
+
+    def _generations(self, tags):
+        return self._global_generation, tuple(self._tag_generations.get(tag, 0) for tag in tags)
+
+    def execute(self, key, func, tags=()):
+        """
+        Return the result of ``func()``, sharing it with all concurrent callers that pass the same
+        ``key``.
+
+        :param key: Hashable key identifying the request.
+        :param func: Zero-argument callable computing the result.
+        :param tags: Iterable of hashable tags used to invalidate the result. See
+                     :py:meth:`invalidate`.
+        """
+        tags = tuple(tags)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                expiration_time, _, result = cached
+                if expiration_time > time.time():
+                    self._results.move_to_end(key)
+                    return result
+                del self._results[key]
+
+            call = self._in_flight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call(tags)
+                self._in_flight[key] = call
+                generations = self._generations(tags)
+
+        if not is_leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                # The call may have been detached by an invalidation and replaced by a newer one
+                if self._in_flight.get(key) is call:
+                    del self._in_flight[key]
+                if (
+                    call.exception is None
+                    and self.ttl_seconds > 0
+                    and generations == self._generations(tags)
+                ):
+                    self._results[key] = (time.time() + self.ttl_seconds, tags, call.result)
+                    self._results.move_to_end(key)
+                    while len(self._results) > self.max_entries:
+                        self._results.popitem(last=False)
+            call.done.set()
+        return call.result
+
+    def invalidate(self, tags=ALL_TAGS):
+        """
+        Discard cached results associated with any of the specified tags, and detach in-flight
+        requests associated with them, so that later identical requests do not join a request that
+        started before the invalidation.
+
+        :param tags: Iterable of tags, or ``ALL_TAGS`` to discard every cached result.
+        """
+        with self._lock:
+            if tags is ALL_TAGS:
+                self._global_generation += 1
+                self._results.clear()
+                self._in_flight.clear()
+                return
+            tags = set(tags)
+            for tag in tags:
+                self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+            stale_keys = [
+                key for key, (_, result_tags, _) in self._results.items() if tags & set(result_tags)
+            ]
+            for key in stale_keys:
+                del self._results[key]
+            stale_keys = [key for key, call in self._in_flight.items() if tags & set(call.tags)]
+            for key in stale_keys:
+                del self._in_flight[key]
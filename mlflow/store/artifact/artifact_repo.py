@@ -1,13 +1,122 @@
+import hashlib
+import json
 import os
 import posixpath
+import shutil
 import tempfile
+import threading
 from abc import abstractmethod, ABCMeta
+from concurrent.futures import ThreadPoolExecutor
 
+from mlflow.utils.file_utils import relative_path_to_artifact_path
 from mlflow.utils.validation import path_not_unique, bad_path_message
 
 from mlflow.exceptions import MlflowException
+from mlflow.store.artifact.content_addressed import (
+    download_blob,
+    download_file_or_blob,
+    find_blob_pointer,
+    get_dedup_uri,
+    read_blob_pointer,
+    upload_deduplicated,
+)
+from mlflow.store.artifact.streaming import TemporaryFileReader
 from mlflow.protos.databricks_pb2 import INVALID_PARAMETER_VALUE, RESOURCE_DOES_NOT_EXIST
 
+# Maximum number of threads used to upload the files of a directory
+UPLOAD_MAX_WORKERS_ENV_VAR = "MLFLOW_ARTIFACT_UPLOAD_MAX_WORKERS"
+# Maximum number of threads used to download the files of a directory
+DOWNLOAD_MAX_WORKERS_ENV_VAR = "MLFLOW_ARTIFACT_DOWNLOAD_MAX_WORKERS"
+# Maximum number of threads used to delete the objects of a directory in batches
+DELETE_MAX_WORKERS_ENV_VAR = "MLFLOW_ARTIFACT_DELETE_MAX_WORKERS"
+# Maximum total size of the files being uploaded concurrently, in bytes
+UPLOAD_MAX_INFLIGHT_BYTES_ENV_VAR = "MLFLOW_ARTIFACT_UPLOAD_MAX_INFLIGHT_BYTES"
+_DEFAULT_UPLOAD_MAX_INFLIGHT_BYTES = 512 * 1024 * 1024
+
+
+def _get_max_workers(env_var):
+    # By default, use at most 8 threads or 2 * the number of CPU cores available on the system
+    # (whichever is smaller), as for Databricks artifact uploads
+    num_cpus = os.cpu_count() or 4
+    return max(int(os.environ.get(env_var, min(num_cpus * 2, 8))), 1)
+
+
+def _get_upload_max_workers():
+    return _get_max_workers(UPLOAD_MAX_WORKERS_ENV_VAR)
+
+
+def _get_download_max_workers():
+    return _get_max_workers(DOWNLOAD_MAX_WORKERS_ENV_VAR)
+
+
+def _get_delete_max_workers():
+    return _get_max_workers(DELETE_MAX_WORKERS_ENV_VAR)
+
+
+def _get_upload_max_inflight_bytes():
+    return int(
+        os.environ.get(UPLOAD_MAX_INFLIGHT_BYTES_ENV_VAR, _DEFAULT_UPLOAD_MAX_INFLIGHT_BYTES)
+    )
+
+
+def _walk_artifact_tree(artifact_dir_path, list_dir):
+    """
+    Walk an artifact directory tree, calling ``list_dir(path)`` to obtain the ``FileInfo`` objects
+    describing the contents of each directory, and return the tuple described in
+    ``ArtifactRepository._list_artifact_tree``.
+    """
+    file_infos = []
+    empty_dir_paths = []
+    dir_paths = [artifact_dir_path]
+    while dir_paths:
+        dir_path = dir_paths.pop()
+        dir_content = [  # prevent infinite loop, sometimes the dir is recursively included
+            file_info
+            for file_info in list_dir(dir_path)
+            if file_info.path != "." and file_info.path != dir_path
+        ]
+        if not dir_content:
+            empty_dir_paths.append(dir_path)
+        for file_info in dir_content:
+            if file_info.is_dir:
+                dir_paths.append(file_info.path)
+            else:
+                file_infos.append(file_info)
+    return file_infos, empty_dir_paths
+
+
+def _compute_fingerprint(entries):
+    """
+    Compute a fingerprint of an artifact from ``(object name, version)`` pairs describing the
+    stored objects it is made of, or return ``None`` if there are no such objects.
+    """
+    if not entries:
+        return None
+    return hashlib.sha256(json.dumps(sorted(entries)).encode("utf-8")).hexdigest()
+
+
+class _InflightBytesLimiter(object):
+    """
+    Bounds the total size of the files being uploaded concurrently. A file larger than the limit
+    is admitted once no other file is in flight, so that it can still be uploaded.
+    """
+
+    def __init__(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._inflight_bytes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, num_bytes):
+        with self._condition:
+            while self._inflight_bytes > 0 and self._inflight_bytes + num_bytes > self._max_bytes:
+                self._condition.wait()
+            self._inflight_bytes += num_bytes
+
+    def release(self, num_bytes):
+        with self._condition:
+            self._inflight_bytes -= num_bytes
+            self._condition.notify_all()
+
 
 class ArtifactRepository:
     """
@@ -17,6 +126,9 @@ class ArtifactRepository:
 
     __metaclass__ = ABCMeta
 
+    # Whether ``_download_file`` may be called concurrently from several threads
+    _supports_concurrent_downloads = True
+
     def __init__(self, artifact_uri):
         self.artifact_uri = artifact_uri
 
@@ -45,6 +157,82 @@ class ArtifactRepository:
         """
         pass
 
+    def _upload_files_concurrently(self, local_dir, upload_file, skip_non_regular_files=False):
+        """
+        Upload the files in the specified local directory using a bounded thread pool. The number
+        of threads is configured by the ``MLFLOW_ARTIFACT_UPLOAD_MAX_WORKERS`` environment
+        variable, and the total size of the files being uploaded at any time is bounded by the
+        ``MLFLOW_ARTIFACT_UPLOAD_MAX_INFLIGHT_BYTES`` environment variable. Failures are
+        collected and reported in a single exception once all uploads have completed.
+
+        If the ``MLFLOW_ARTIFACT_DEDUP_URI`` environment variable is set, files are stored in
+        the content-addressed blob area that it refers to and pointers to the blobs are uploaded
+        in their place (see :py:mod:`mlflow.store.artifact.content_addressed`).
+
+        :param local_dir: Directory of local artifacts to upload.
+        :param upload_file: Function called as ``upload_file(local_file, artifact_file_path)``
+                            to upload a single file, where ``artifact_file_path`` is the
+                            POSIX-style path of the file relative to ``local_dir``. It is called
+                            concurrently from several threads, so any client it uses must be
+                            thread-safe; clients should be shared rather than created per file.
+        :param skip_non_regular_files: If ``True``, the directory entries that are not regular
+                                       files, such as broken symbolic links, are skipped rather
+                                       than failing the upload.
+        """
+        local_dir = os.path.abspath(local_dir)
+        staged_uploads = []
+        for (root, _, filenames) in os.walk(local_dir):
+            rel_path = ""
+            if root != local_dir:
+                rel_path = relative_path_to_artifact_path(os.path.relpath(root, local_dir))
+            for f in filenames:
+                if skip_non_regular_files and not os.path.isfile(os.path.join(root, f)):
+                    continue
+                staged_uploads.append((os.path.join(root, f), posixpath.join(rel_path, f)))
+
+        dedup_uri = get_dedup_uri()
+        if dedup_uri is not None:
+            upload_pointer = upload_file
+
+            def upload_file(local_file, artifact_file_path):
+                upload_deduplicated(dedup_uri, local_file, artifact_file_path, upload_pointer)
+
+        limiter = _InflightBytesLimiter(_get_upload_max_inflight_bytes())
+
+        def upload(local_file, artifact_file_path, num_bytes):
+            try:
+                upload_file(local_file, artifact_file_path)
+            finally:
+                limiter.release(num_bytes)
+
+        inflight_uploads = {}
+        failed_uploads = {}
+        with ThreadPoolExecutor(max_workers=_get_upload_max_workers()) as executor:
+            for local_file, artifact_file_path in staged_uploads:
+                num_bytes = os.path.getsize(local_file)
+                # Blocks until enough of the previously submitted uploads have completed
+                limiter.acquire(num_bytes)
+                inflight_uploads[local_file] = executor.submit(
+                    upload, local_file, artifact_file_path, num_bytes
+                )
+
+            # Join futures to ensure that all artifacts have been uploaded prior to returning
+            for local_file, upload_future in inflight_uploads.items():
+                try:
+                    upload_future.result()
+                except Exception as e:
+                    failed_uploads[local_file] = repr(e)
+
+        if len(failed_uploads) > 0:
+            raise MlflowException(
+                message=(
+                    "The following failures occurred while uploading one or more artifacts"
+                    " to {artifact_root}: {failures}".format(
+                        artifact_root=self.artifact_uri, failures=failed_uploads
+                    )
+                )
+            )
+
     @abstractmethod
     def list_artifacts(self, path):
         """
@@ -57,6 +245,21 @@ class ArtifactRepository:
         """
         pass
 
+    def list_artifacts_recursive(self, path=None):
+        """
+        Return all the file artifacts for this run_id under path, including those contained in
+        subdirectories. Directories themselves are not listed. If path is a file, returns an
+        empty list.
+
+        The default implementation calls ``list_artifacts`` once per directory. Artifact
+        repositories backed by object stores override it with a single flat listing.
+
+        :param path: Relative source path that contains desired artifacts
+
+        :return: List of artifacts as FileInfo listed under path, with their sizes.
+        """
+        return sorted(self._list_artifact_tree(path)[0], key=lambda f: f.path)
+
     def _is_directory(self, artifact_path):
         listing = self.list_artifacts(artifact_path)
         return len(listing) > 0
@@ -89,10 +292,113 @@ class ArtifactRepository:
             os.makedirs(local_dir_path, exist_ok=True)
         return local_file_path
 
+    def _list_artifact_tree(self, artifact_dir_path):
+        """
+        List the file artifacts contained in the specified artifact directory and in all of its
+        subdirectories, along with the directories that do not contain any artifact. The default
+        implementation calls ``list_artifacts`` once per directory; artifact repositories that
+        can list a whole tree more efficiently (e.g. with ``list_artifacts_recursive``) should
+        override this method.
+
+        :param artifact_dir_path: Relative, POSIX-style path of an artifact directory.
+        :return: A tuple whose first element is a list of ``FileInfo`` objects describing the file
+                 artifacts and whose second element is a list of the relative, POSIX-style paths
+                 of the empty directories.
+        """
+        return _walk_artifact_tree(artifact_dir_path, self.list_artifacts)
+
+    def _download_file_or_blob(self, remote_file_path, local_path):
+        # Deduplicated files are stored as pointers to content-addressed blobs, which are
+        # downloaded to the original file name
+        download_file_or_blob(self, remote_file_path, local_path)
+
+    def _download_files_concurrently(self, src_artifact_paths, dst_local_dir_path):
+        """
+        Download the specified file artifacts to the local filesystem directory specified by
+        `dst_local_dir_path` using a bounded thread pool. The number of threads is configured by
+        the ``MLFLOW_ARTIFACT_DOWNLOAD_MAX_WORKERS`` environment variable. Failures are collected
+        and reported in a single exception once all downloads have completed.
+
+        :param src_artifact_paths: A list of relative, POSIX-style paths referring to file
+                                   artifacts stored within the repository's artifact root location.
+        :param dst_local_dir_path: Absolute path of the local filesystem destination directory to
+                                   which to download the specified artifacts. A given artifact may
+                                   be written to a subdirectory of `dst_local_dir_path` if its
+                                   source path contains subdirectories.
+        """
+        max_workers = _get_download_max_workers() if self._supports_concurrent_downloads else 1
+        inflight_downloads = {}
+        failed_downloads = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for src_artifact_path in src_artifact_paths:
+                local_destination_file_path = self._create_download_destination(
+                    src_artifact_path=src_artifact_path, dst_local_dir_path=dst_local_dir_path
+                )
+                inflight_downloads[src_artifact_path] = executor.submit(
+                    self._download_file_or_blob,
+                    remote_file_path=src_artifact_path,
+                    local_path=local_destination_file_path,
+                )
+
+            # Join futures to ensure that all artifacts have been downloaded prior to returning
+            for src_artifact_path, download_future in inflight_downloads.items():
+                try:
+                    download_future.result()
+                except Exception as e:
+                    failed_downloads[src_artifact_path] = repr(e)
+
+        if len(failed_downloads) > 0:
+            raise MlflowException(
+                message=(
+                    "The following failures occurred while downloading one or more"
+                    " artifacts from {artifact_root}: {failures}".format(
+                        artifact_root=self.artifact_uri, failures=failed_downloads
+                    )
+                )
+            )
+
+    def _delete_in_batches_concurrently(self, object_names, batch_size, delete_batch):
+        """
+        Delete the specified stored objects in batches of at most `batch_size` objects, using the
+        bulk deletion API of the underlying store, from a bounded thread pool. The number of
+        threads is configured by the ``MLFLOW_ARTIFACT_DELETE_MAX_WORKERS`` environment variable.
+        Failures are collected and reported in a single exception once all batches have been
+        processed.
+
+        :param object_names: List of the names of the objects to delete.
+        :param batch_size: Maximum number of objects deleted by a single bulk request.
+        :param delete_batch: Function called as ``delete_batch(batch)`` with a list of object
+                             names to delete them, which raises if any of them is not deleted.
+                             It is called concurrently from several threads.
+        """
+        batches = [
+            object_names[i : i + batch_size] for i in range(0, len(object_names), batch_size)
+        ]
+        failed_deletions = {}
+        with ThreadPoolExecutor(max_workers=_get_delete_max_workers()) as executor:
+            inflight_deletions = [
+                (batch, executor.submit(delete_batch, batch)) for batch in batches
+            ]
+            for batch, deletion_future in inflight_deletions:
+                try:
+                    deletion_future.result()
+                except Exception as e:
+                    failed_deletions["{} ({} objects)".format(batch[0], len(batch))] = repr(e)
+
+        if len(failed_deletions) > 0:
+            raise MlflowException(
+                message=(
+                    "The following failures occurred while deleting one or more batches of"
+                    " artifacts from {artifact_root}: {failures}".format(
+                        artifact_root=self.artifact_uri, failures=failed_deletions
+                    )
+                )
+            )
+
     def download_artifacts(self, artifact_path, dst_path=None):
         """
         Download an artifact file or directory to a local directory if applicable, and return a
-        local path for it.
+        local path for it. The files of a directory are downloaded concurrently.
         The caller is responsible for managing the lifecycle of the downloaded artifacts.
 
         :param artifact_path: Relative source path to the desired artifacts.
@@ -105,8 +411,7 @@ class ArtifactRepository:
         :return: Absolute path of the local filesystem location containing the desired artifacts.
         """
 
-        # TODO: Probably need to add a more efficient method to stream just a single artifact
-        #       without downloading it, or to get a pre-signed URL for cloud storage.
+        # TODO: Probably need to add a method to get a pre-signed URL for cloud storage.
         def download_artifact(src_artifact_path, dst_local_dir_path):
             """
             Download the file artifact specified by `src_artifact_path` to the local filesystem
@@ -126,33 +431,31 @@ class ArtifactRepository:
             local_destination_file_path = self._create_download_destination(
                 src_artifact_path=src_artifact_path, dst_local_dir_path=dst_local_dir_path
             )
-            self._download_file(
-                remote_file_path=src_artifact_path, local_path=local_destination_file_path
-            )
+            # The file may have been stored as a pointer to a content-addressed blob, which can
+            # only be the case if deduplicated storage is configured
+            pointer = None
+            if get_dedup_uri() is not None:
+                pointer_path = self._find_blob_pointer(src_artifact_path.rstrip("/"))
+                if pointer_path is not None:
+                    pointer = read_blob_pointer(self, pointer_path)
+            if pointer is not None:
+                download_blob(pointer, pointer_path, local_destination_file_path)
+            else:
+                self._download_file(
+                    remote_file_path=src_artifact_path, local_path=local_destination_file_path
+                )
             return local_destination_file_path
 
         def download_artifact_dir(src_artifact_dir_path, dst_local_dir_path):
-            local_dir = os.path.join(dst_local_dir_path, src_artifact_dir_path)
-            dir_content = [  # prevent infinite loop, sometimes the dir is recursively included
-                file_info
-                for file_info in self.list_artifacts(src_artifact_dir_path)
-                if file_info.path != "." and file_info.path != src_artifact_dir_path
-            ]
-            if not dir_content:  # empty dir
-                if not os.path.exists(local_dir):
-                    os.makedirs(local_dir, exist_ok=True)
-            else:
-                for file_info in dir_content:
-                    if file_info.is_dir:
-                        download_artifact_dir(
-                            src_artifact_dir_path=file_info.path,
-                            dst_local_dir_path=dst_local_dir_path,
-                        )
-                    else:
-                        download_artifact(
-                            src_artifact_path=file_info.path, dst_local_dir_path=dst_local_dir_path
-                        )
-            return local_dir
+            # List the whole directory tree before downloading its files concurrently
+            file_infos, empty_dir_paths = self._list_artifact_tree(src_artifact_dir_path)
+            for empty_dir_path in empty_dir_paths:
+                os.makedirs(os.path.join(dst_local_dir_path, empty_dir_path), exist_ok=True)
+            self._download_files_concurrently(
+                src_artifact_paths=[file_info.path for file_info in file_infos],
+                dst_local_dir_path=dst_local_dir_path,
+            )
+            return os.path.join(dst_local_dir_path, src_artifact_dir_path)
 
         if dst_path is None:
             dst_path = tempfile.mkdtemp()
@@ -183,6 +486,91 @@ class ArtifactRepository:
         else:
             return download_artifact(src_artifact_path=artifact_path, dst_local_dir_path=dst_path)
 
+    def open(self, artifact_path):
+        """
+        Open the file artifact at the specified path for reading and return a readable, seekable
+        binary file object. The caller is responsible for closing it, e.g. with a ``with``
+        statement.
+
+        The default implementation downloads the artifact to a temporary directory, which is
+        removed when the file object is closed. Artifact repositories that can read byte ranges
+        of stored files override it to stream artifacts without staging them on disk.
+
+        :param artifact_path: Relative source path to the desired file artifact.
+        :return: Binary file object.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            local_path = self.download_artifacts(artifact_path, tmp_dir)
+            if os.path.isdir(local_path):
+                raise MlflowException(
+                    "Cannot open the artifact '{}' as it is a directory".format(artifact_path),
+                    error_code=INVALID_PARAMETER_VALUE,
+                )
+            return TemporaryFileReader(local_path, tmp_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def upload_bytes(self, data, artifact_file):
+        """
+        Write bytes to the file artifact at the specified path, replacing it if it exists.
+
+        The default implementation stages the bytes in a temporary file, which is logged with
+        ``log_artifact``. Artifact repositories that can write objects from memory override it.
+
+        :param data: Bytes to write.
+        :param artifact_file: Relative, POSIX-style path of the file artifact to write,
+                              e.g. ``"dir/data.json"``.
+        """
+        artifact_dir, file_name = posixpath.split(posixpath.normpath(artifact_file))
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            local_file = os.path.join(tmp_dir, file_name)
+            with open(local_file, "wb") as f:
+                f.write(data)
+            self.log_artifact(local_file, artifact_dir or None)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _get_artifact_fingerprint(self, artifact_path):
+        """
+        Return a string that identifies the current contents of the specified artifact file or
+        directory, e.g. a hash of the names and ETags of the underlying stored objects. The
+        fingerprint must change whenever the artifact is modified, as it is used to key the local
+        download cache. Artifact repositories that cannot compute such a fingerprint return
+        ``None``, in which case their artifacts are never cached.
+
+        :param artifact_path: Relative source path to the artifact.
+        """
+        return None
+
+    def _file_exists(self, artifact_path):
+        """
+        Return whether the specified artifact file exists. Artifact repositories that can check
+        the existence of a single stored object without listing its directory override this
+        method.
+
+        :param artifact_path: Relative, POSIX-style path of an artifact file.
+        """
+        parent_listing = self.list_artifacts(posixpath.dirname(artifact_path) or None)
+        return any(
+            file_info.path == artifact_path and not file_info.is_dir for file_info in parent_listing
+        )
+
+    def _find_blob_pointer(self, artifact_path):
+        """
+        Return the path of the pointer to a content-addressed blob standing for the specified
+        artifact file, or ``None`` if the file is stored as is or does not exist.
+
+        :param artifact_path: Relative, POSIX-style path of an artifact file.
+        """
+        parent_listing = self.list_artifacts(posixpath.dirname(artifact_path) or None)
+        file_paths = [file_info.path for file_info in parent_listing if not file_info.is_dir]
+        if artifact_path in file_paths:
+            return None
+        return find_blob_pointer(file_paths, artifact_path)
+
     @abstractmethod
     def _download_file(self, remote_file_path, local_path):
         """
@@ -5,7 +5,14 @@ import urllib.parse
 
 from mlflow.entities import FileInfo
 from mlflow.exceptions import MlflowException
-from mlflow.store.artifact.artifact_repo import ArtifactRepository
+from mlflow.store.artifact.artifact_repo import ArtifactRepository, _compute_fingerprint
+from mlflow.store.artifact.streaming import open_range_reader
+from mlflow.utils.download_utils import Checksum, RemoteFile, download_resumably
+
+
+# Maximum number of subrequests in a blob batch request, see
+# https://docs.microsoft.com/en-us/rest/api/storageservices/blob-batch
+_MAX_BLOBS_PER_BATCH = 256
 
 
 class AzureBlobArtifactRepository(ArtifactRepository):
@@ -76,17 +83,19 @@ class AzureBlobArtifactRepository(ArtifactRepository):
         container_client = self.client.get_container_client(container)
         if artifact_path:
             dest_path = posixpath.join(dest_path, artifact_path)
-        local_dir = os.path.abspath(local_dir)
-        for (root, _, filenames) in os.walk(local_dir):
-            upload_path = dest_path
-            if root != local_dir:
-                rel_path = os.path.relpath(root, local_dir)
-                upload_path = posixpath.join(dest_path, rel_path)
-            for f in filenames:
-                remote_file_path = posixpath.join(upload_path, f)
-                local_file_path = os.path.join(root, f)
-                with open(local_file_path, "rb") as file:
-                    container_client.upload_blob(remote_file_path, file)
+
+        def upload_file(local_file, artifact_file_path):
+            with open(local_file, "rb") as file:
+                container_client.upload_blob(posixpath.join(dest_path, artifact_file_path), file)
+
+        # Container clients are thread-safe, so a single client is shared by all upload threads
+        self._upload_files_concurrently(local_dir, upload_file)
+
+    def upload_bytes(self, data, artifact_file):
+        (container, _, dest_path) = self.parse_wasbs_uri(self.artifact_uri)
+        container_client = self.client.get_container_client(container)
+        dest_path = posixpath.join(dest_path, posixpath.normpath(artifact_file))
+        container_client.upload_blob(dest_path, data, overwrite=True)
 
     def list_artifacts(self, path=None):
         # Newer versions of `azure-storage-blob` (>= 12.4.0) provide a public
@@ -128,12 +137,138 @@ class AzureBlobArtifactRepository(ArtifactRepository):
             return []
         return sorted(infos, key=lambda f: f.path)
 
+    def list_artifacts_recursive(self, path=None):
+        (container, _, artifact_path) = self.parse_wasbs_uri(self.artifact_uri)
+        container_client = self.client.get_container_client(container)
+        dest_path = artifact_path
+        if path:
+            dest_path = posixpath.join(dest_path, path)
+        infos = []
+        prefix = dest_path if dest_path.endswith("/") else dest_path + "/"
+        # Unlike `walk_blobs`, `list_blobs` does not group the blobs of subdirectories, so that
+        # the whole tree is listed by a single paginated listing
+        for r in container_client.list_blobs(name_starts_with=prefix):
+            if not r.name.startswith(artifact_path):
+                raise MlflowException(
+                    "The name of the listed Azure blob does not begin with the specified"
+                    " artifact path. Artifact path: {artifact_path}. Blob name:"
+                    " {blob_name}".format(artifact_path=artifact_path, blob_name=r.name)
+                )
+            # Skip the empty blobs created by some tools to represent directories
+            if r.name.endswith("/"):
+                continue
+            file_name = posixpath.relpath(path=r.name, start=artifact_path)
+            infos.append(FileInfo(file_name, False, r.size))
+        return sorted(infos, key=lambda f: f.path)
+
+    def _get_artifact_fingerprint(self, artifact_path):
+        (container, account, dest_path) = self.parse_wasbs_uri(self.artifact_uri)
+        container_client = self.client.get_container_client(container)
+        if artifact_path:
+            dest_path = posixpath.join(dest_path, artifact_path)
+        dest_path = dest_path.rstrip("/")
+        dir_prefix = dest_path + "/" if dest_path else ""
+        entries = [
+            (posixpath.join(account, container, r.name), r.etag)
+            for r in container_client.list_blobs(name_starts_with=dest_path)
+            if r.name == dest_path or r.name.startswith(dir_prefix)
+        ]
+        return _compute_fingerprint(entries)
+
+    def _list_artifact_tree(self, artifact_dir_path):
+        # Object stores have no notion of empty directories
+        return self.list_artifacts_recursive(artifact_dir_path), []
+
+    def _file_exists(self, artifact_path):
+        from azure.core.exceptions import ResourceNotFoundError
+
+        (container, _, remote_root_path) = self.parse_wasbs_uri(self.artifact_uri)
+        container_client = self.client.get_container_client(container)
+        remote_full_path = posixpath.join(remote_root_path, artifact_path)
+        try:
+            container_client.get_blob_client(remote_full_path).get_blob_properties()
+        except ResourceNotFoundError:
+            return False
+        return True
+
     def _download_file(self, remote_file_path, local_path):
+        from azure.core import MatchConditions
+
         (container, _, remote_root_path) = self.parse_wasbs_uri(self.artifact_uri)
         container_client = self.client.get_container_client(container)
         remote_full_path = posixpath.join(remote_root_path, remote_file_path)
-        with open(local_path, "wb") as file:
-            container_client.download_blob(remote_full_path).readinto(file)
+        # The properties of the blob are read from the first download response rather than
+        # requested beforehand
+        first_properties = []
+
+        def fetch(start, output_file):
+            if first_properties:
+                # Pinning the ETag guarantees that a resumed download reads the same version of
+                # the blob, even if it is overwritten in the meantime
+                downloader = container_client.download_blob(
+                    remote_full_path,
+                    offset=start or None,
+                    etag=first_properties[0].etag,
+                    match_condition=MatchConditions.IfNotModified,
+                )
+            else:
+                downloader = container_client.download_blob(remote_full_path, offset=start or None)
+                first_properties.append(downloader.properties)
+            downloader.readinto(output_file)
+            return _get_remote_file(first_properties[0])
+
+        download_resumably(local_path, fetch, posixpath.join(self.artifact_uri, remote_file_path))
+
+    def open(self, artifact_path):
+        from azure.core import MatchConditions
+        from azure.core.exceptions import ResourceNotFoundError
+
+        (container, _, remote_root_path) = self.parse_wasbs_uri(self.artifact_uri)
+        container_client = self.client.get_container_client(container)
+        remote_full_path = posixpath.join(remote_root_path, artifact_path)
+        try:
+            properties = container_client.get_blob_client(remote_full_path).get_blob_properties()
+        except ResourceNotFoundError:
+            # The file may be missing or stored as a pointer to a content-addressed blob
+            return super().open(artifact_path)
+
+        def read_range(start, length):
+            # Pinning the ETag guarantees that all ranges are read from the same version of the
+            # blob, even if it is overwritten while the stream is open
+            return container_client.download_blob(
+                remote_full_path,
+                offset=start,
+                length=length,
+                etag=properties.etag,
+                match_condition=MatchConditions.IfNotModified,
+            ).readall()
+
+        return open_range_reader(read_range, properties.size)
 
     def delete_artifacts(self, artifact_path=None):
-        raise MlflowException("Not implemented yet")
+        (container, _, dest_path) = self.parse_wasbs_uri(self.artifact_uri)
+        container_client = self.client.get_container_client(container)
+        if artifact_path:
+            dest_path = posixpath.join(dest_path, artifact_path)
+        dest_path = dest_path.rstrip("/")
+        dir_prefix = dest_path + "/" if dest_path else ""
+        blob_names = [
+            r.name
+            for r in container_client.list_blobs(name_starts_with=dest_path)
+            if r.name == dest_path or r.name.startswith(dir_prefix)
+        ]
+        # Container clients are thread-safe, so a single client is shared by all threads.
+        # `delete_blobs` raises if any of the blobs of the batch is not deleted.
+        self._delete_in_batches_concurrently(
+            blob_names, _MAX_BLOBS_PER_BATCH, lambda batch: container_client.delete_blobs(*batch),
+        )
+
+
+def _get_remote_file(properties):
+    content_settings = properties.content_settings
+    if content_settings.content_encoding == "gzip":
+        # Compressed blobs may be decompressed when downloaded, in which case their stored size
+        # and checksum do not describe the file
+        return None
+    content_md5 = content_settings.content_md5
+    return RemoteFile(properties.size, Checksum("md5", bytes(content_md5)) if content_md5 else None)
@@ -4,6 +4,7 @@ import sys
 import click
 
 from mlflow.store.artifact.artifact_repository_registry import get_artifact_repository
+from mlflow.store.artifact.content_addressed import resolve_blob_pointers
 from mlflow.tracking import _get_store
 from mlflow.tracking.artifact_utils import _download_artifact_from_uri
 from mlflow.utils.proto_json_utils import message_to_json
@@ -84,7 +85,7 @@ def list_artifacts(run_id, artifact_path):
     store = _get_store()
     artifact_uri = store.get_run(run_id).info.artifact_uri
     artifact_repo = get_artifact_repository(artifact_uri)
-    file_infos = artifact_repo.list_artifacts(artifact_path)
+    file_infos = resolve_blob_pointers(artifact_repo.list_artifacts(artifact_path))
     print(_file_infos_to_json(file_infos))
 
 
@@ -0,0 +1,101 @@
+"""
+Bounded pool of reusable connections for artifact repositories whose clients are not thread-safe,
+such as FTP and SFTP connections.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+_logger = logging.getLogger(__name__)
+
+
+class ConnectionPool(object):
+    """
+    Pool of at most `max_size` connections created on demand by `create_connection`. Each
+    connection is used by a single thread at a time. Connections that stayed idle for longer than
+    `max_idle_seconds` are closed rather than reused, as servers commonly drop idle sessions.
+
+    :param is_connection_error: Optional function called as
+                                ``is_connection_error(connection, exception)`` when an exception
+                                is raised while a connection is used, which returns whether the
+                                connection itself failed. Connections are only discarded after
+                                such errors, and are reused after other errors, e.g. a missing
+                                remote file. If unspecified, connections are discarded after any
+                                error.
+    """
+
+    def __init__(self, create_connection, max_size, max_idle_seconds=60, is_connection_error=None):
+        self._create_connection = create_connection
+        self._max_idle_seconds = max_idle_seconds
+        self._is_connection_error = is_connection_error or (lambda connection, exception: True)
+        self._slots = threading.BoundedSemaphore(max(max_size, 1))
+        self._lock = threading.Lock()
+        # Idle connections and the time at which they were released, most recent last
+        self._idle_connections = []
+
+    def add(self, connection):
+        """
+        Add an already established connection to the pool, e.g. one created eagerly to validate
+        the configuration of a repository.
+        """
+        with self._lock:
+            self._idle_connections.append((connection, time.time()))
+
+    @contextmanager
+    def connection(self):
+        """
+        Yield a connection of the pool, blocking until one is available. Connections are
+        discarded if a connection error is raised while they are used, as they may be in an
+        inconsistent state.
+        """
+        with self._slots:
+            connection = self._acquire_idle_connection()
+            if connection is None:
+                connection = self._create_connection()
+            try:
+                yield connection
+            except Exception as e:
+                if self._is_connection_error(connection, e):
+                    _close_quietly(connection)
+                else:
+                    self.add(connection)
+                raise
+            except BaseException:
+                _close_quietly(connection)
+                raise
+            self.add(connection)
+
+    def _acquire_idle_connection(self):
+        now = time.time()
+        with self._lock:
+            # Idle connections are ordered by release time, so expired connections come first
+            num_expired = 0
+            for _, released_at in self._idle_connections:
+                if now - released_at <= self._max_idle_seconds:
+                    break
+                num_expired += 1
+            expired_connections = [c for c, _ in self._idle_connections[:num_expired]]
+            del self._idle_connections[:num_expired]
+            # Reuse the most recently released connection, which is the most likely to be alive
+            connection = self._idle_connections.pop()[0] if self._idle_connections else None
+        for expired_connection in expired_connections:
+            _close_quietly(expired_connection)
+        return connection
+
+    def close(self):
+        """
+        Close the idle connections of the pool.
+        """
+        with self._lock:
+            idle_connections = self._idle_connections
+            self._idle_connections = []
+        for connection, _ in idle_connections:
+            _close_quietly(connection)
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        _logger.debug("Failed to close a pooled connection", exc_info=True)
@@ -0,0 +1,287 @@
+"""
+Opt-in deduplicated, content-addressed storage of artifact files.
+
+When the ``MLFLOW_ARTIFACT_DEDUP_URI`` environment variable is set to an artifact URI (typically
+a directory under the artifact root, e.g. ``s3://my-bucket/mlflow-blobs``), the files logged by
+``log_artifacts`` are stored once in that "blob area", under a path derived from the SHA-256 hash
+of their contents, and are skipped if a blob with the same contents already exists. In place of
+each file, the run receives a lightweight pointer file named ``<file name>.<size>.mlflow-blob``,
+which records the hash and size of the blob. ``download_artifacts`` downloads the referenced blobs
+to the original file names, and artifact listings report the original names and the sizes recorded
+in the pointer names, without reading the pointers.
+
+Pointers are only looked for if ``MLFLOW_ARTIFACT_DEDUP_URI`` is set: otherwise, files named like
+pointers are listed and downloaded as any other file. Downloaded files named like pointers whose
+contents are not valid pointers are also kept as they are.
+
+Pointer files are artifacts, which any user can write, so they do not record the location of
+their blob: blobs are always read from the blob area configured by ``MLFLOW_ARTIFACT_DEDUP_URI``,
+at the path derived from the hash, which must be a SHA-256 hex digest. Downloading deduplicated
+artifacts therefore requires the same ``MLFLOW_ARTIFACT_DEDUP_URI`` as logging them.
+
+Blobs are never deleted when the runs referencing them are deleted.
+"""
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import threading
+
+from mlflow.entities import FileInfo
+from mlflow.exceptions import MlflowException
+from mlflow.protos.databricks_pb2 import INVALID_STATE
+
+DEDUP_URI_ENV_VAR = "MLFLOW_ARTIFACT_DEDUP_URI"
+BLOB_POINTER_SUFFIX = ".mlflow-blob"
+_BLOB_POINTER_VERSION = 1
+# Name of a pointer: the name of the original file, and its size
+_BLOB_POINTER_NAME_PATTERN = re.compile(r"^(.+)\.(\d+)" + re.escape(BLOB_POINTER_SUFFIX) + "$")
+_HASH_CHUNK_SIZE = 1024 * 1024
+_SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# Blobs are immutable, so blobs known to exist do not need to be checked again
+_existing_blobs_lock = threading.Lock()
+_existing_blobs = set()
+
+
+def get_dedup_uri():
+    """
+    Return the URI of the blob area configured by the ``MLFLOW_ARTIFACT_DEDUP_URI`` environment
+    variable, or ``None`` if deduplicated storage is disabled.
+    """
+    return os.environ.get(DEDUP_URI_ENV_VAR) or None
+
+
+def parse_blob_pointer_path(path):
+    """
+    Return a tuple of the path of the original file and of its size if `path` is named like a blob
+    pointer, or ``None`` otherwise.
+    """
+    match = _BLOB_POINTER_NAME_PATTERN.match(path)
+    if match is None:
+        return None
+    return match.group(1), int(match.group(2))
+
+
+def is_blob_pointer(path):
+    return parse_blob_pointer_path(path) is not None
+
+
+def find_blob_pointer(file_paths, file_path):
+    """
+    Return the path of the pointer standing for `file_path` among `file_paths`, or ``None``.
+    """
+    for path in file_paths:
+        parsed = parse_blob_pointer_path(path)
+        if parsed is not None and parsed[0] == file_path:
+            return path
+    return None
+
+
+def _compute_sha256(local_file):
+    sha256 = hashlib.sha256()
+    with open(local_file, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _get_blob_path(sha256):
+    # Blobs are sharded by hash prefix to keep the directories of the blob area small
+    return posixpath.join("sha256", sha256[:2], sha256)
+
+
+def _ensure_blob_exists(dedup_uri, local_file, sha256):
+    from mlflow.store.artifact.artifact_repository_registry import get_artifact_repository
+
+    blob_path = _get_blob_path(sha256)
+    blob_uri = posixpath.join(dedup_uri, blob_path)
+    with _existing_blobs_lock:
+        if blob_uri in _existing_blobs:
+            return blob_uri
+
+    blob_repo = get_artifact_repository(dedup_uri)
+    blob_dir = posixpath.dirname(blob_path)
+    if not blob_repo._file_exists(blob_path):
+        # `log_artifact` names artifacts after the local file, so the file is staged under its hash
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            staged_file = os.path.join(tmp_dir, sha256)
+            try:
+                os.link(local_file, staged_file)
+            except OSError:
+                shutil.copyfile(local_file, staged_file)
+            blob_repo.log_artifact(staged_file, blob_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    with _existing_blobs_lock:
+        _existing_blobs.add(blob_uri)
+    return blob_uri
+
+
+def upload_deduplicated(dedup_uri, local_file, artifact_file_path, upload_file):
+    """
+    Upload the specified file to the blob area unless a blob with the same contents already
+    exists, and upload a pointer to the blob in place of the file.
+
+    :param dedup_uri: URI of the blob area.
+    :param local_file: Path of the local file to upload.
+    :param artifact_file_path: Relative, POSIX-style path of the file in the run's artifacts.
+    :param upload_file: Function called as ``upload_file(local_file, artifact_file_path)`` to
+                        upload the pointer file to the run's artifacts.
+    """
+    sha256 = _compute_sha256(local_file)
+    _ensure_blob_exists(dedup_uri, local_file, sha256)
+    pointer = {
+        "version": _BLOB_POINTER_VERSION,
+        "sha256": sha256,
+        "size": os.path.getsize(local_file),
+    }
+    pointer_suffix = ".{}{}".format(pointer["size"], BLOB_POINTER_SUFFIX)
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        pointer_file = os.path.join(tmp_dir, os.path.basename(local_file) + pointer_suffix)
+        with open(pointer_file, "w") as f:
+            json.dump(pointer, f)
+        upload_file(pointer_file, artifact_file_path + pointer_suffix)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _load_blob_pointer(local_pointer, pointer_path):
+    """
+    Return the contents of the downloaded pointer file `local_pointer`, or ``None`` if it is not a
+    valid pointer to a blob, in which case it is an ordinary file named like a pointer.
+    """
+    try:
+        with open(local_pointer) as f:
+            pointer = json.load(f)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(pointer, dict) or pointer.get("version") != _BLOB_POINTER_VERSION:
+        return None
+    sha256, size = pointer.get("sha256"), pointer.get("size")
+    if (
+        not isinstance(sha256, str)
+        or not _SHA256_PATTERN.match(sha256)
+        or not isinstance(size, int)
+        or size != parse_blob_pointer_path(pointer_path)[1]
+    ):
+        return None
+    return pointer
+
+
+def read_blob_pointer(repo, pointer_path):
+    """
+    Return the contents of the pointer artifact `pointer_path`, or ``None`` if it is not a valid
+    pointer to a blob.
+    """
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        local_pointer = os.path.join(tmp_dir, posixpath.basename(pointer_path))
+        repo._download_file(remote_file_path=pointer_path, local_path=local_pointer)
+        return _load_blob_pointer(local_pointer, pointer_path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def download_blob(pointer, pointer_path, local_path):
+    """
+    Download the blob referenced by the specified pointer to `local_path`.
+
+    :param pointer: The contents of the pointer, as returned by ``read_blob_pointer``.
+    :param pointer_path: Relative, POSIX-style path of the pointer in its artifact repository.
+    :param local_path: The path to which to save the blob.
+    """
+    from mlflow.store.artifact.artifact_repository_registry import get_artifact_repository
+
+    dedup_uri = get_dedup_uri()
+    if dedup_uri is None:
+        raise MlflowException(
+            "The artifact '{}' is stored as a pointer to a deduplicated blob. Set the {}"
+            " environment variable to the URI of the blob area to download it.".format(
+                pointer_path, DEDUP_URI_ENV_VAR
+            ),
+            error_code=INVALID_STATE,
+        )
+    # The blob is always read from the configured blob area, never from a location chosen by the
+    # author of the pointer
+    blob_path = _get_blob_path(pointer["sha256"])
+    get_artifact_repository(dedup_uri)._download_file(
+        remote_file_path=blob_path, local_path=local_path
+    )
+    if _compute_sha256(local_path) != pointer["sha256"]:
+        os.remove(local_path)
+        raise MlflowException(
+            "The contents of the blob {} referenced by the artifact '{}' do not match their"
+            " hash".format(blob_path, pointer_path)
+        )
+
+
+def download_file_or_blob(repo, remote_file_path, local_path):
+    """
+    Download the specified file artifact to `local_path` or, if deduplicated storage is
+    configured and the file is a pointer to a blob, download the blob to the original file name.
+    """
+    parsed = parse_blob_pointer_path(remote_file_path) if get_dedup_uri() is not None else None
+    repo._download_file(remote_file_path=remote_file_path, local_path=local_path)
+    if parsed is None:
+        return
+    pointer = _load_blob_pointer(local_path, remote_file_path)
+    if pointer is None:
+        return
+    original_path = os.path.join(os.path.dirname(local_path), posixpath.basename(parsed[0]))
+    download_blob(pointer, remote_file_path, original_path)
+    os.remove(local_path)
+
+
+def download_blob_to_shared_dir(repo, pointer_path, file_name):
+    """
+    Download the blob referenced by the specified pointer artifact to a file named `file_name`, in
+    a directory of the local temporary directory that is specific to the blob. The file is reused
+    by later calls for the same blob and name, so that serving a deduplicated artifact repeatedly
+    does not accumulate copies of it.
+
+    :return: The path of the local file, or ``None`` if the artifact is not a valid pointer.
+    """
+    pointer = read_blob_pointer(repo, pointer_path)
+    if pointer is None:
+        return None
+    blob_dir = os.path.join(tempfile.gettempdir(), "mlflow-blobs", pointer["sha256"])
+    local_path = os.path.join(blob_dir, file_name)
+    if os.path.isfile(local_path):
+        return local_path
+    os.makedirs(blob_dir, exist_ok=True)
+    # Download to a temporary name first, so that concurrent callers never see a partial file
+    tmp_path = tempfile.mkstemp(dir=blob_dir)[1]
+    try:
+        download_blob(pointer, pointer_path, tmp_path)
+        os.replace(tmp_path, local_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return local_path
+
+
+def resolve_blob_pointers(file_infos):
+    """
+    Replace the pointers in the specified artifact listing with the files they stand for, if
+    deduplicated storage is configured. Pointers are identified and resolved by their names only,
+    without reading them.
+
+    :param file_infos: List of FileInfo objects, as returned by ``list_artifacts``.
+    :return: List of FileInfo objects with the original paths and sizes of deduplicated files.
+    """
+    if get_dedup_uri() is None:
+        return file_infos
+    resolved = []
+    for file_info in file_infos:
+        parsed = None if file_info.is_dir else parse_blob_pointer_path(file_info.path)
+        if parsed is not None:
+            file_info = FileInfo(parsed[0], False, parsed[1])
+        resolved.append(file_info)
+    return sorted(resolved, key=lambda f: f.path)
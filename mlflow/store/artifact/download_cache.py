@@ -0,0 +1,332 @@
+"""
+On-disk cache of downloaded artifacts, shared by all the processes of a machine.
+
+Artifacts are cached under the directory specified by the ``MLFLOW_ARTIFACT_CACHE_DIR``
+environment variable; caching is disabled when it is not set. Cache entries are keyed by a
+fingerprint of the artifact computed by its artifact repository (e.g. from the names and ETags of
+the underlying objects), so that modified artifacts are downloaded again. The least recently used
+entries are evicted once the total size of the cache exceeds
+``MLFLOW_ARTIFACT_CACHE_MAX_SIZE_BYTES``.
+
+Cached files are returned to callers as hard links by default, which cost no additional disk
+space and remain valid after the corresponding cache entry is evicted. Callers must therefore not
+modify downloaded files in place. ``MLFLOW_ARTIFACT_CACHE_LINK_MODE`` can be set to ``symlink``
+(for cache directories on a different filesystem, with the caveat that the links break once the
+entry is evicted) or ``copy``.
+"""
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+
+from mlflow.exceptions import MlflowException
+from mlflow.protos.databricks_pb2 import INVALID_PARAMETER_VALUE
+
+_logger = logging.getLogger(__name__)
+
+ARTIFACT_CACHE_DIR_ENV_VAR = "MLFLOW_ARTIFACT_CACHE_DIR"
+ARTIFACT_CACHE_MAX_SIZE_BYTES_ENV_VAR = "MLFLOW_ARTIFACT_CACHE_MAX_SIZE_BYTES"
+ARTIFACT_CACHE_LINK_MODE_ENV_VAR = "MLFLOW_ARTIFACT_CACHE_LINK_MODE"
+_DEFAULT_MAX_SIZE_BYTES = 10 * 1024 ** 3
+
+LINK_MODE_HARDLINK = "hardlink"
+LINK_MODE_SYMLINK = "symlink"
+LINK_MODE_COPY = "copy"
+_LINK_MODES = [LINK_MODE_HARDLINK, LINK_MODE_SYMLINK, LINK_MODE_COPY]
+
+_METADATA_FILE_NAME = "metadata.json"
+_CONTENT_DIR_NAME = "content"
+
+# Hit and miss counters of the current process, see `get_download_cache_stats`
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "uncacheable": 0, "evictions": 0, "bytes_downloaded": 0}
+
+
+def _increment_stat(name, value=1):
+    with _stats_lock:
+        _stats[name] += value
+
+
+_LOOKUP_RESULTS = {"hits": "hit", "misses": "miss", "uncacheable": "uncacheable artifact"}
+
+
+def _record_lookup(stat_name, repo, artifact_path):
+    _increment_stat(stat_name)
+    _logger.debug(
+        "Artifact cache %s for '%s' of %s",
+        _LOOKUP_RESULTS[stat_name],
+        artifact_path,
+        repo.artifact_uri,
+    )
+
+
+def get_download_cache_stats():
+    """
+    Return the artifact download cache statistics of the current process, as a dictionary with
+    the following keys. This is the supported way of monitoring the cache, e.g. to report its hit
+    rate from a model server; each lookup is also logged at the ``DEBUG`` level.
+
+    - ``hits``: Number of downloads served from the cache.
+    - ``misses``: Number of downloads of cacheable artifacts that were not cached yet.
+    - ``uncacheable``: Number of downloads of artifacts whose repository cannot fingerprint them.
+    - ``evictions``: Number of cache entries evicted by the current process.
+    - ``bytes_downloaded``: Number of bytes downloaded to populate the cache.
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+@contextlib.contextmanager
+def _file_lock(path, shared=False):
+    """
+    Hold an advisory lock on the specified file, which is created if it does not exist. Shared
+    locks are only supported on POSIX systems and are exclusive on Windows.
+    """
+    with open(path, "a+") as f:
+        if sys.platform == "win32":
+            import msvcrt
+
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # `LK_LOCK` gives up after 10 seconds
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _get_dir_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files
+    )
+
+
+class DownloadCache(object):
+    """
+    Content-addressed, size-bounded cache of downloaded artifacts. Cache entries are populated
+    atomically and concurrent processes coordinate through file locks, so that an artifact is
+    downloaded only once even if it is requested by several processes at the same time.
+
+    :param cache_dir: Local directory in which downloaded artifacts are cached.
+    :param max_size_bytes: Maximum total size of the cached artifacts. The least recently used
+                           entries are evicted once it is exceeded. Artifacts larger than this
+                           limit are not cached.
+    :param link_mode: How cached files are returned to callers: ``hardlink``, ``symlink`` or
+                      ``copy``.
+    """
+
+    def __init__(self, cache_dir, max_size_bytes=_DEFAULT_MAX_SIZE_BYTES, link_mode=None):
+        link_mode = link_mode or LINK_MODE_HARDLINK
+        if link_mode not in _LINK_MODES:
+            raise MlflowException(
+                "Invalid artifact cache link mode '{}'. Must be one of {}.".format(
+                    link_mode, _LINK_MODES
+                ),
+                error_code=INVALID_PARAMETER_VALUE,
+            )
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.link_mode = link_mode
+        self._entries_dir = os.path.join(self.cache_dir, "entries")
+        self._locks_dir = os.path.join(self.cache_dir, "locks")
+        self._tmp_dir = os.path.join(self.cache_dir, "tmp")
+        for directory in [self._entries_dir, self._locks_dir, self._tmp_dir]:
+            os.makedirs(directory, exist_ok=True)
+        # Held in shared mode while entries are read and in exclusive mode while they are evicted
+        self._eviction_lock_path = os.path.join(self.cache_dir, "eviction.lock")
+
+    @staticmethod
+    def _get_key(fingerprint, artifact_path):
+        return hashlib.sha256(
+            json.dumps([fingerprint, artifact_path or ""]).encode("utf-8")
+        ).hexdigest()
+
+    def download_artifacts(self, repo, artifact_path, dst_path=None):
+        """
+        Download an artifact file or directory through the cache, with the same semantics as
+        :py:meth:`ArtifactRepository.download_artifacts`.
+
+        :param repo: The artifact repository from which to download the artifact.
+        :param artifact_path: Relative source path to the desired artifacts.
+        :param dst_path: Absolute path of the local filesystem destination directory to which to
+                         download the specified artifacts. This directory must already exist.
+                         If unspecified, a new uniquely-named directory is created.
+
+        :return: Absolute path of the local filesystem location containing the desired artifacts.
+        """
+        fingerprint = repo._get_artifact_fingerprint(artifact_path)
+        if fingerprint is None:
+            _record_lookup("uncacheable", repo, artifact_path)
+            return repo.download_artifacts(artifact_path=artifact_path, dst_path=dst_path)
+
+        if dst_path is None:
+            dst_path = tempfile.mkdtemp()
+        dst_path = os.path.abspath(dst_path)
+
+        key = self._get_key(fingerprint, artifact_path)
+        local_path = self._materialize(key, dst_path)
+        if local_path is not None:
+            _record_lookup("hits", repo, artifact_path)
+            return local_path
+
+        with _file_lock(os.path.join(self._locks_dir, key + ".lock")):
+            # Another process may have populated the entry while we were waiting for the lock
+            local_path = self._materialize(key, dst_path)
+            if local_path is not None:
+                _record_lookup("hits", repo, artifact_path)
+                return local_path
+
+            _record_lookup("misses", repo, artifact_path)
+            staging_dir = os.path.join(self._tmp_dir, uuid.uuid4().hex)
+            content_dir = os.path.join(staging_dir, _CONTENT_DIR_NAME)
+            os.makedirs(content_dir)
+            try:
+                downloaded_path = repo.download_artifacts(
+                    artifact_path=artifact_path, dst_path=content_dir
+                )
+                size = _get_dir_size(content_dir)
+                _increment_stat("bytes_downloaded", size)
+                if size > self.max_size_bytes:
+                    _logger.debug(
+                        "Not caching artifact '%s' of %s, whose size (%d bytes) exceeds the"
+                        " maximum artifact cache size",
+                        artifact_path,
+                        repo.artifact_uri,
+                        size,
+                    )
+                    return self._link_tree(content_dir, downloaded_path, dst_path, move=True)
+                metadata = {
+                    "artifact_uri": repo.artifact_uri,
+                    "artifact_path": artifact_path,
+                    "local_path": os.path.relpath(downloaded_path, content_dir),
+                    "size": size,
+                }
+                with open(os.path.join(staging_dir, _METADATA_FILE_NAME), "w") as f:
+                    json.dump(metadata, f)
+                os.rename(staging_dir, os.path.join(self._entries_dir, key))
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+        local_path = self._materialize(key, dst_path)
+        self.evict()
+        if local_path is None:
+            # The entry was evicted by another process before it could be materialized
+            return repo.download_artifacts(artifact_path=artifact_path, dst_path=dst_path)
+        return local_path
+
+    def _materialize(self, key, dst_path):
+        """
+        Link the cached files of the specified entry into `dst_path`, or return ``None`` if the
+        entry is not cached.
+        """
+        entry_dir = os.path.join(self._entries_dir, key)
+        with _file_lock(self._eviction_lock_path, shared=True):
+            metadata_path = os.path.join(entry_dir, _METADATA_FILE_NAME)
+            if not os.path.exists(metadata_path):
+                return None
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            # The modification time of the metadata file records when the entry was last used
+            os.utime(metadata_path)
+            content_dir = os.path.join(entry_dir, _CONTENT_DIR_NAME)
+            return self._link_tree(
+                content_dir, os.path.join(content_dir, metadata["local_path"]), dst_path
+            )
+
+    def _link_file(self, src, dst, move):
+        if move:
+            os.replace(src, dst)
+        elif self.link_mode == LINK_MODE_SYMLINK:
+            os.symlink(src, dst)
+        elif self.link_mode == LINK_MODE_HARDLINK:
+            try:
+                os.link(src, dst)
+            except OSError:
+                # Hard links are not supported across filesystems and by some filesystems
+                shutil.copyfile(src, dst)
+        else:
+            shutil.copyfile(src, dst)
+
+    def _link_tree(self, content_dir, src_path, dst_path, move=False):
+        """
+        Reproduce the files and directories of `content_dir` in `dst_path` and return the path in
+        `dst_path` corresponding to `src_path`.
+        """
+        for root, dirs, files in os.walk(content_dir):
+            dst_root = os.path.normpath(os.path.join(dst_path, os.path.relpath(root, content_dir)))
+            for d in dirs:
+                os.makedirs(os.path.join(dst_root, d), exist_ok=True)
+            for f in files:
+                dst_file = os.path.join(dst_root, f)
+                if os.path.lexists(dst_file):
+                    os.remove(dst_file)
+                self._link_file(os.path.join(root, f), dst_file, move)
+        rel_path = os.path.relpath(src_path, content_dir)
+        return dst_path if rel_path == "." else os.path.join(dst_path, rel_path)
+
+    def evict(self):
+        """
+        Evict the least recently used entries until the total size of the cache is within its
+        limit.
+        """
+        with _file_lock(self._eviction_lock_path):
+            entries = []
+            for key in os.listdir(self._entries_dir):
+                metadata_path = os.path.join(self._entries_dir, key, _METADATA_FILE_NAME)
+                try:
+                    with open(metadata_path) as f:
+                        size = json.load(f)["size"]
+                    entries.append((os.path.getmtime(metadata_path), key, size))
+                except (OSError, ValueError, KeyError):
+                    continue
+            total_size = sum(size for _, _, size in entries)
+            for _, key, size in sorted(entries):
+                if total_size <= self.max_size_bytes:
+                    break
+                # Renaming the entry first removes it atomically from the cache
+                trash_dir = os.path.join(self._tmp_dir, uuid.uuid4().hex)
+                os.rename(os.path.join(self._entries_dir, key), trash_dir)
+                shutil.rmtree(trash_dir, ignore_errors=True)
+                total_size -= size
+                _increment_stat("evictions")
+                _logger.debug("Evicted artifact cache entry %s of %d bytes", key, size)
+
+
+def get_download_cache():
+    """
+    Return the artifact download cache configured by the ``MLFLOW_ARTIFACT_CACHE_DIR``,
+    ``MLFLOW_ARTIFACT_CACHE_MAX_SIZE_BYTES`` and ``MLFLOW_ARTIFACT_CACHE_LINK_MODE`` environment
+    variables, or ``None`` if caching is disabled.
+    """
+    cache_dir = os.environ.get(ARTIFACT_CACHE_DIR_ENV_VAR)
+    if not cache_dir:
+        return None
+    return DownloadCache(
+        cache_dir,
+        max_size_bytes=int(
+            os.environ.get(ARTIFACT_CACHE_MAX_SIZE_BYTES_ENV_VAR, _DEFAULT_MAX_SIZE_BYTES)
+        ),
+        link_mode=os.environ.get(ARTIFACT_CACHE_LINK_MODE_ENV_VAR),
+    )
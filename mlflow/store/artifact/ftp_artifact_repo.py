@@ -1,13 +1,18 @@
 import os
 import ftplib
 from ftplib import FTP
-from contextlib import contextmanager
 
 import posixpath
 import urllib.parse
 
 from mlflow.entities.file_info import FileInfo
-from mlflow.store.artifact.artifact_repo import ArtifactRepository
+from mlflow.store.artifact.artifact_repo import (
+    ArtifactRepository,
+    _get_download_max_workers,
+    _get_upload_max_workers,
+    _walk_artifact_tree,
+)
+from mlflow.store.artifact.connection_pool import ConnectionPool
 from mlflow.utils.file_utils import relative_path_to_artifact_path
 from mlflow.exceptions import MlflowException
 
@@ -29,15 +34,27 @@ class FTPArtifactRepository(ArtifactRepository):
         if self.config["host"] is None:
             self.config["host"] = "localhost"
 
+        # Logging in takes several round trips, so connections are reused across operations
+        self._connection_pool = ConnectionPool(
+            self._connect,
+            max_size=max(_get_upload_max_workers(), _get_download_max_workers()),
+            is_connection_error=_is_connection_error,
+        )
+
         super().__init__(artifact_uri)
 
-    @contextmanager
-    def get_ftp_client(self):
+    def _connect(self):
         ftp = FTP()
         ftp.connect(self.config["host"], self.config["port"])
         ftp.login(self.config["username"], self.config["password"])
-        yield ftp
-        ftp.close()
+        return ftp
+
+    def get_ftp_client(self):
+        """
+        Return a context manager yielding an FTP connection of the repository's connection pool,
+        for the exclusive use of the calling thread.
+        """
+        return self._connection_pool.connection()
 
     @staticmethod
     def _is_dir(ftp, full_file_path):
@@ -48,14 +65,25 @@ class FTPArtifactRepository(ArtifactRepository):
             return False
 
     @staticmethod
-    def _mkdir(ftp, artifact_dir):
+    def _mkdir(ftp, artifact_dir, known_dirs=None):
+        """
+        Create the specified directory and its missing parents.
+
+        :param known_dirs: Optional set of the directories known to exist, which is updated with
+                           the created directories. It is used to check each directory only once
+                           when creating many directories with the same parents.
+        """
+        if known_dirs is not None and artifact_dir in known_dirs:
+            return
         try:
             if not FTPArtifactRepository._is_dir(ftp, artifact_dir):
                 ftp.mkd(artifact_dir)
         except ftplib.error_perm:
             head, _ = posixpath.split(artifact_dir)
-            FTPArtifactRepository._mkdir(ftp, head)
-            FTPArtifactRepository._mkdir(ftp, artifact_dir)
+            FTPArtifactRepository._mkdir(ftp, head, known_dirs)
+            FTPArtifactRepository._mkdir(ftp, artifact_dir, known_dirs)
+        if known_dirs is not None:
+            known_dirs.add(artifact_dir)
 
     @staticmethod
     def _size(ftp, full_file_path):
@@ -75,19 +103,28 @@ class FTPArtifactRepository(ArtifactRepository):
     def log_artifacts(self, local_dir, artifact_path=None):
         dest_path = posixpath.join(self.path, artifact_path) if artifact_path else self.path
 
+        # Create the directory tree first, including empty directories, so that files can be
+        # uploaded in any order. Each directory is only checked once.
         local_dir = os.path.abspath(local_dir)
-        for (root, _, filenames) in os.walk(local_dir):
-            upload_path = dest_path
-            if root != local_dir:
-                rel_path = os.path.relpath(root, local_dir)
-                rel_upload_path = relative_path_to_artifact_path(rel_path)
-                upload_path = posixpath.join(dest_path, rel_upload_path)
-            if not filenames:
-                with self.get_ftp_client() as ftp:
-                    self._mkdir(ftp, upload_path)
-            for f in filenames:
-                if os.path.isfile(os.path.join(root, f)):
-                    self.log_artifact(os.path.join(root, f), upload_path)
+        known_dirs = set()
+        with self.get_ftp_client() as ftp:
+            for (root, _, _) in os.walk(local_dir):
+                upload_path = dest_path
+                if root != local_dir:
+                    rel_path = os.path.relpath(root, local_dir)
+                    rel_upload_path = relative_path_to_artifact_path(rel_path)
+                    upload_path = posixpath.join(dest_path, rel_upload_path)
+                self._mkdir(ftp, upload_path, known_dirs)
+
+        def upload_file(local_file, artifact_file_path):
+            upload_dir, file_name = posixpath.split(posixpath.join(dest_path, artifact_file_path))
+            with self.get_ftp_client() as ftp:
+                ftp.cwd(upload_dir)
+                with open(local_file, "rb") as f:
+                    ftp.storbinary("STOR " + file_name, f)
+
+        # Files are uploaded concurrently over the pooled connections
+        self._upload_files_concurrently(local_dir, upload_file, skip_non_regular_files=True)
 
     def _is_directory(self, artifact_path):
         artifact_dir = self.path
@@ -101,22 +138,42 @@ class FTPArtifactRepository(ArtifactRepository):
             list_dir = posixpath.join(artifact_dir, path) if path else artifact_dir
             if not self._is_dir(ftp, list_dir):
                 return []
-            artifact_files = ftp.nlst(list_dir)
-            artifact_files = list(filter(lambda x: x != "." and x != "..", artifact_files))
-            # Make sure artifact_files is a list of file names because ftp.nlst
-            # may return absolute paths.
-            artifact_files = [os.path.basename(f) for f in artifact_files]
-            infos = []
-            for file_name in artifact_files:
-                file_path = file_name if path is None else posixpath.join(path, file_name)
-                full_file_path = posixpath.join(list_dir, file_name)
-                if self._is_dir(ftp, full_file_path):
-                    infos.append(FileInfo(file_path, True, None))
-                else:
-                    size = self._size(ftp, full_file_path)
-                    infos.append(FileInfo(file_path, False, size))
+            return self._list_dir(ftp, list_dir, path)
+
+    @staticmethod
+    def _list_dir(ftp, list_dir, path):
+        artifact_files = ftp.nlst(list_dir)
+        artifact_files = list(filter(lambda x: x != "." and x != "..", artifact_files))
+        # Make sure artifact_files is a list of file names because ftp.nlst
+        # may return absolute paths.
+        artifact_files = [os.path.basename(f) for f in artifact_files]
+        infos = []
+        for file_name in artifact_files:
+            file_path = file_name if path is None else posixpath.join(path, file_name)
+            full_file_path = posixpath.join(list_dir, file_name)
+            if FTPArtifactRepository._is_dir(ftp, full_file_path):
+                infos.append(FileInfo(file_path, True, None))
+            else:
+                size = FTPArtifactRepository._size(ftp, full_file_path)
+                infos.append(FileInfo(file_path, False, size))
         return infos
 
+    def _list_artifact_tree(self, artifact_dir_path):
+        # The tree is listed over a single connection, and the subdirectories found by listing
+        # their parent are not checked again
+        with self.get_ftp_client() as ftp:
+            root_dir = (
+                posixpath.join(self.path, artifact_dir_path) if artifact_dir_path else self.path
+            )
+            if not self._is_dir(ftp, root_dir):
+                return [], []
+            return _walk_artifact_tree(
+                artifact_dir_path,
+                lambda path: self._list_dir(
+                    ftp, posixpath.join(self.path, path) if path else self.path, path
+                ),
+            )
+
     def _download_file(self, remote_file_path, local_path):
         remote_full_path = (
             posixpath.join(self.path, remote_file_path) if remote_file_path else self.path
@@ -127,3 +184,12 @@ class FTPArtifactRepository(ArtifactRepository):
 
     def delete_artifacts(self, artifact_path=None):
         raise MlflowException("Not implemented yet")
+
+
+def _is_connection_error(ftp, error):
+    # pylint: disable=unused-argument
+    # Permanent errors, e.g. a missing remote file, are replies to a command, after which the
+    # session can still be used. Other errors may leave the session in an inconsistent state.
+    return isinstance(
+        error, (EOFError, OSError, ftplib.error_reply, ftplib.error_temp, ftplib.error_proto)
+    )
@@ -1,12 +1,19 @@
 import os
+from mimetypes import guess_type
 
 import posixpath
 import urllib.parse
 
 from mlflow.entities import FileInfo
-from mlflow.store.artifact.artifact_repo import ArtifactRepository
-from mlflow.utils.file_utils import relative_path_to_artifact_path
 from mlflow.exceptions import MlflowException
+from mlflow.protos.databricks_pb2 import RESOURCE_DOES_NOT_EXIST
+from mlflow.store.artifact.artifact_repo import ArtifactRepository, _compute_fingerprint
+from mlflow.store.artifact.streaming import open_range_reader
+from mlflow.utils.download_utils import RemoteFile, checksum_from_base64, download_resumably
+
+# Maximum number of calls in a batch request, see
+# https://cloud.google.com/storage/docs/batch#overview
+_MAX_CALLS_PER_BATCH = 100
 
 
 class GCSArtifactRepository(ArtifactRepository):
@@ -60,18 +67,21 @@ class GCSArtifactRepository(ArtifactRepository):
         (bucket, dest_path) = self.parse_gcs_uri(self.artifact_uri)
         if artifact_path:
             dest_path = posixpath.join(dest_path, artifact_path)
+        # The bucket and its underlying client are shared by all upload threads
         gcs_bucket = self._get_bucket(bucket)
-
-        local_dir = os.path.abspath(local_dir)
-        for (root, _, filenames) in os.walk(local_dir):
-            upload_path = dest_path
-            if root != local_dir:
-                rel_path = os.path.relpath(root, local_dir)
-                rel_path = relative_path_to_artifact_path(rel_path)
-                upload_path = posixpath.join(dest_path, rel_path)
-            for f in filenames:
-                path = posixpath.join(upload_path, f)
-                gcs_bucket.blob(path).upload_from_filename(os.path.join(root, f))
+        self._upload_files_concurrently(
+            local_dir,
+            lambda local_file, artifact_file_path: gcs_bucket.blob(
+                posixpath.join(dest_path, artifact_file_path)
+            ).upload_from_filename(local_file),
+        )
+
+    def upload_bytes(self, data, artifact_file):
+        (bucket, dest_path) = self.parse_gcs_uri(self.artifact_uri)
+        dest_path = posixpath.join(dest_path, posixpath.normpath(artifact_file))
+        # As for `upload_from_filename`, the content type is guessed from the file name
+        content_type = guess_type(dest_path)[0] or "application/octet-stream"
+        self._get_bucket(bucket).blob(dest_path).upload_from_string(data, content_type=content_type)
 
     def list_artifacts(self, path=None):
         (bucket, artifact_path) = self.parse_gcs_uri(self.artifact_uri)
@@ -103,11 +113,112 @@ class GCSArtifactRepository(ArtifactRepository):
 
         return [FileInfo(path[len(artifact_path) + 1 : -1], True, None) for path in dir_paths]
 
+    def list_artifacts_recursive(self, path=None):
+        (bucket, artifact_path) = self.parse_gcs_uri(self.artifact_uri)
+        dest_path = artifact_path
+        if path:
+            dest_path = posixpath.join(dest_path, path)
+        prefix = dest_path if dest_path.endswith("/") else dest_path + "/"
+
+        infos = []
+        # Without a delimiter, the blobs of all subdirectories are listed by a single paginated
+        # listing
+        for result in self._get_bucket(bucket).list_blobs(prefix=prefix):
+            # Skip the empty blobs created by some tools to represent directories
+            if result.name.endswith("/"):
+                continue
+            blob_path = result.name[len(artifact_path) + 1 :]
+            infos.append(FileInfo(blob_path, False, result.size))
+
+        return sorted(infos, key=lambda f: f.path)
+
+    def _get_artifact_fingerprint(self, artifact_path):
+        (bucket, dest_path) = self.parse_gcs_uri(self.artifact_uri)
+        if artifact_path:
+            dest_path = posixpath.join(dest_path, artifact_path)
+        dest_path = dest_path.rstrip("/")
+        dir_prefix = dest_path + "/" if dest_path else ""
+        entries = [
+            (posixpath.join(bucket, blob.name), blob.etag)
+            for blob in self._get_bucket(bucket).list_blobs(prefix=dest_path)
+            if blob.name == dest_path or blob.name.startswith(dir_prefix)
+        ]
+        return _compute_fingerprint(entries)
+
+    def _list_artifact_tree(self, artifact_dir_path):
+        # Object stores have no notion of empty directories
+        return self.list_artifacts_recursive(artifact_dir_path), []
+
+    def _file_exists(self, artifact_path):
+        (bucket, remote_root_path) = self.parse_gcs_uri(self.artifact_uri)
+        remote_full_path = posixpath.join(remote_root_path, artifact_path)
+        return self._get_bucket(bucket).blob(remote_full_path).exists()
+
     def _download_file(self, remote_file_path, local_path):
+        from google.api_core.exceptions import NotFound
+
         (bucket, remote_root_path) = self.parse_gcs_uri(self.artifact_uri)
         remote_full_path = posixpath.join(remote_root_path, remote_file_path)
-        gcs_bucket = self._get_bucket(bucket)
-        gcs_bucket.blob(remote_full_path).download_to_filename(local_path)
+        # The checksums and generation of the blob are read from the headers of the download
+        # response rather than requested beforehand
+        blob = self._get_bucket(bucket).blob(remote_full_path)
+        description = "gs://{}/{}".format(bucket, remote_full_path)
+
+        def fetch(start, output_file):
+            try:
+                # Once a response recorded the generation of the blob, the download is resumed
+                # from the same version of the object
+                blob.download_to_file(output_file, start=start or None)
+            except NotFound:
+                raise MlflowException(
+                    "The file {} does not exist".format(description),
+                    error_code=RESOURCE_DOES_NOT_EXIST,
+                )
+            if blob.content_encoding == "gzip":
+                # Blobs stored gzip-compressed are decompressed when downloaded (decompressive
+                # transcoding), so their stored size and checksums do not describe the file
+                return None
+            # Composite objects have no MD5 hash, but all objects have a CRC32C checksum
+            return RemoteFile(
+                blob.size,
+                checksum_from_base64("md5", blob.md5_hash)
+                or checksum_from_base64("crc32c", blob.crc32c),
+            )
+
+        download_resumably(local_path, fetch, description)
+
+    def open(self, artifact_path):
+        (bucket, remote_root_path) = self.parse_gcs_uri(self.artifact_uri)
+        remote_full_path = posixpath.join(remote_root_path, artifact_path)
+        blob = self._get_bucket(bucket).get_blob(remote_full_path)
+        if blob is None:
+            # The file may be missing or stored as a pointer to a content-addressed blob
+            return super().open(artifact_path)
+        # `download_as_string` is deprecated in favor of `download_as_bytes` in newer versions of
+        # `google-cloud-storage`
+        download = getattr(blob, "download_as_bytes", None) or blob.download_as_string
+        return open_range_reader(
+            lambda start, length: download(start=start, end=start + length - 1), blob.size
+        )
 
     def delete_artifacts(self, artifact_path=None):
-        raise MlflowException("Not implemented yet")
+        (bucket, dest_path) = self.parse_gcs_uri(self.artifact_uri)
+        if artifact_path:
+            dest_path = posixpath.join(dest_path, artifact_path)
+        dest_path = dest_path.rstrip("/")
+        dir_prefix = dest_path + "/" if dest_path else ""
+        blob_names = [
+            blob.name
+            for blob in self._get_bucket(bucket).list_blobs(prefix=dest_path)
+            if blob.name == dest_path or blob.name.startswith(dir_prefix)
+        ]
+
+        def delete_batch(batch):
+            # Batches are tracked by the client that creates them, so each thread uses its own
+            # client rather than sharing one
+            gcs_bucket = self._get_bucket(bucket)
+            with gcs_bucket.client.batch():
+                for blob_name in batch:
+                    gcs_bucket.delete_blob(blob_name)
+
+        self._delete_in_batches_concurrently(blob_names, _MAX_CALLS_PER_BATCH, delete_batch)
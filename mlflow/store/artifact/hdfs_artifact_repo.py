@@ -1,12 +1,13 @@
 import os
 import posixpath
 import tempfile
-from contextlib import contextmanager
+from contextlib import contextmanager, ExitStack
 import urllib.parse
 
 from mlflow.entities import FileInfo
 from mlflow.exceptions import MlflowException
 from mlflow.store.artifact.artifact_repo import ArtifactRepository
+from mlflow.store.artifact.streaming import open_range_reader
 from mlflow.utils.file_utils import mkdir, relative_path_to_artifact_path
 
 
@@ -36,6 +37,12 @@ class HdfsArtifactRepository(ArtifactRepository):
             with hdfs.open(destination, "wb") as output:
                 output.write(open(local_file, "rb").read())
 
+    def upload_bytes(self, data, artifact_file):
+        hdfs_path = _resolve_base_path(self.path, posixpath.normpath(artifact_file))
+        with hdfs_system(scheme=self.scheme, host=self.host, port=self.port) as hdfs:
+            with hdfs.open(hdfs_path, "wb") as output:
+                output.write(data)
+
     def log_artifacts(self, local_dir, artifact_path=None):
         """
             Log artifacts in hdfs.
@@ -50,7 +57,8 @@ class HdfsArtifactRepository(ArtifactRepository):
             if not hdfs.exists(hdfs_base_path):
                 hdfs.mkdir(hdfs_base_path)
 
-            for subdir_path, _, files in os.walk(local_dir):
+            # Create the remote directories first so that files can be uploaded in any order
+            for subdir_path, _, _ in os.walk(local_dir):
 
                 relative_path = _relative_path_local(local_dir, subdir_path)
 
@@ -63,11 +71,14 @@ class HdfsArtifactRepository(ArtifactRepository):
                 if not hdfs.exists(hdfs_subdir_path):
                     hdfs.mkdir(hdfs_subdir_path)
 
-                for each_file in files:
-                    source = os.path.join(subdir_path, each_file)
-                    destination = posixpath.join(hdfs_subdir_path, each_file)
-                    with hdfs.open(destination, "wb") as output_stream:
-                        output_stream.write(open(source, "rb").read())
+            def upload_file(source, artifact_file_path):
+                destination = posixpath.join(hdfs_base_path, artifact_file_path)
+                with hdfs.open(destination, "wb") as output_stream:
+                    with open(source, "rb") as input_stream:
+                        output_stream.write(input_stream.read())
+
+            # The HDFS connection is shared by all upload threads
+            self._upload_files_concurrently(local_dir, upload_file)
 
     def list_artifacts(self, path=None):
         """
@@ -145,6 +156,33 @@ class HdfsArtifactRepository(ArtifactRepository):
                     _download_hdfs_file(hdfs, path, local_path)
             return local_dir
 
+    def open(self, artifact_path):
+        """
+            Open an artifact file in hdfs for streaming reads. The hdfs connection remains open
+            until the returned file object is closed.
+        :param artifact_path: Relative source path to the desired file artifact
+        """
+        hdfs_path = _resolve_base_path(self.path, artifact_path)
+        exit_stack = ExitStack()
+        try:
+            hdfs = exit_stack.enter_context(
+                hdfs_system(scheme=self.scheme, host=self.host, port=self.port)
+            )
+            if not hdfs.exists(hdfs_path) or hdfs.isdir(hdfs_path):
+                exit_stack.close()
+                return super().open(artifact_path)
+            size = hdfs.info(hdfs_path).get("size")
+            hdfs_file = exit_stack.enter_context(hdfs.open(hdfs_path, "rb"))
+        except Exception:
+            exit_stack.close()
+            raise
+
+        def read_range(start, length):
+            hdfs_file.seek(start)
+            return hdfs_file.read(length)
+
+        return open_range_reader(read_range, size, on_close=exit_stack.close)
+
     def _download_file(self, remote_file_path, local_path):
         raise MlflowException("This is not implemented. Should never be called.")
 
@@ -1,8 +1,15 @@
-import distutils.dir_util as dir_util
 import os
+import posixpath
 import shutil
+import tempfile
 
 from mlflow.store.artifact.artifact_repo import ArtifactRepository, verify_artifact_path
+from mlflow.store.artifact.content_addressed import (
+    download_blob_to_shared_dir,
+    find_blob_pointer,
+    get_dedup_uri,
+    is_blob_pointer,
+)
 from mlflow.utils.file_utils import (
     mkdir,
     list_all,
@@ -55,7 +62,18 @@ class LocalArtifactRepository(ArtifactRepository):
         )
         if not os.path.exists(artifact_dir):
             mkdir(artifact_dir)
-        dir_util.copy_tree(src=local_dir, dst=artifact_dir, preserve_mode=0, preserve_times=0)
+        # Create the directory tree first, including empty directories, so that files can be
+        # copied in any order
+        local_dir = os.path.abspath(local_dir)
+        for (root, _, _) in os.walk(local_dir):
+            if root != local_dir:
+                mkdir(os.path.join(artifact_dir, os.path.relpath(root, local_dir)))
+        self._upload_files_concurrently(
+            local_dir,
+            lambda local_file, artifact_file_path: shutil.copyfile(
+                local_file, os.path.join(artifact_dir, os.path.normpath(artifact_file_path))
+            ),
+        )
 
     def download_artifacts(self, artifact_path, dst_path=None):
         """
@@ -75,10 +93,46 @@ class LocalArtifactRepository(ArtifactRepository):
         # NOTE: The artifact_path is expected to be in posix format.
         # Posix paths work fine on windows but just in case we normalize it here.
         local_artifact_path = os.path.join(self.artifact_dir, os.path.normpath(artifact_path))
+        # Deduplicated files are stored as pointers to blobs, which must be downloaded. Pointers
+        # are only written, and only looked for, if deduplicated storage is configured.
+        if get_dedup_uri() is not None:
+            local_pointer = _find_local_blob_pointer(local_artifact_path)
+            if local_pointer is not None:
+                local_path = download_blob_to_shared_dir(
+                    self,
+                    relative_path_to_artifact_path(
+                        os.path.relpath(local_pointer, self.artifact_dir)
+                    ),
+                    os.path.basename(local_artifact_path),
+                )
+                if local_path is not None:
+                    return local_path
+            if os.path.isdir(local_artifact_path) and _contains_blob_pointers(local_artifact_path):
+                # As for remote artifact repositories, the caller owns the downloaded directory
+                return super().download_artifacts(artifact_path, tempfile.mkdtemp())
         if not os.path.exists(local_artifact_path):
             raise IOError("No such file or directory: '{}'".format(local_artifact_path))
         return os.path.abspath(local_artifact_path)
 
+    def open(self, artifact_path):
+        """
+        Artifacts tracked by ``LocalArtifactRepository`` already exist on the local filesystem, so
+        files are opened in place rather than copied.
+        """
+        local_artifact_path = os.path.join(self.artifact_dir, os.path.normpath(artifact_path))
+        if os.path.isfile(local_artifact_path):
+            return open(local_artifact_path, "rb")
+        # Deduplicated files are stored as pointers to blobs, which must be downloaded
+        return super().open(artifact_path)
+
+    def upload_bytes(self, data, artifact_file):
+        artifact_dir = posixpath.dirname(posixpath.normpath(artifact_file))
+        verify_artifact_path(artifact_dir)
+        local_artifact_path = os.path.join(self.artifact_dir, os.path.normpath(artifact_file))
+        mkdir(os.path.dirname(local_artifact_path))
+        with open(local_artifact_path, "wb") as f:
+            f.write(data)
+
     def list_artifacts(self, path=None):
         # NOTE: The path is expected to be in posix format.
         # Posix paths work fine on windows but just in case we normalize it here.
@@ -97,6 +151,9 @@ class LocalArtifactRepository(ArtifactRepository):
         else:
             return []
 
+    def _file_exists(self, artifact_path):
+        return os.path.isfile(os.path.join(self.artifact_dir, os.path.normpath(artifact_path)))
+
     def _download_file(self, remote_file_path, local_path):
         # NOTE: The remote_file_path is expected to be in posix format.
         # Posix paths work fine on windows but just in case we normalize it here.
@@ -108,3 +165,15 @@ class LocalArtifactRepository(ArtifactRepository):
             os.path.join(self._artifact_dir, artifact_path) if artifact_path else self._artifact_dir
         )
         shutil.rmtree(local_file_uri_to_path(artifact_path))
+
+
+def _find_local_blob_pointer(local_path):
+    local_dir, name = os.path.split(local_path.rstrip(os.sep))
+    if not name or os.path.exists(local_path) or not os.path.isdir(local_dir):
+        return None
+    pointer_name = find_blob_pointer(os.listdir(local_dir), name)
+    return os.path.join(local_dir, pointer_name) if pointer_name is not None else None
+
+
+def _contains_blob_pointers(local_dir):
+    return any(is_blob_pointer(f) for _, _, files in os.walk(local_dir) for f in files)
@@ -109,6 +109,12 @@ class ModelsArtifactRepository(ArtifactRepository):
         """
         return self.repo.download_artifacts(artifact_path, dst_path)
 
+    def open(self, artifact_path):
+        return self.repo.open(artifact_path)
+
+    def _get_artifact_fingerprint(self, artifact_path):
+        return self.repo._get_artifact_fingerprint(artifact_path)
+
     def _download_file(self, remote_file_path, local_path):
         """
         Download the file at the specified relative remote path and saves
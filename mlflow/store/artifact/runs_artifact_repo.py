@@ -124,6 +124,15 @@ class RunsArtifactRepository(ArtifactRepository):
         """
         return self.repo.download_artifacts(artifact_path, dst_path)
 
+    def open(self, artifact_path):
+        return self.repo.open(artifact_path)
+
+    def upload_bytes(self, data, artifact_file):
+        self.repo.upload_bytes(data, artifact_file)
+
+    def _get_artifact_fingerprint(self, artifact_path):
+        return self.repo._get_artifact_fingerprint(artifact_path)
+
     def _download_file(self, remote_file_path, local_path):
         """
         Download the file at the specified relative remote path and saves
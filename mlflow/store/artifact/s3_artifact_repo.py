@@ -1,4 +1,6 @@
 import os
+import threading
+from collections import OrderedDict
 from mimetypes import guess_type
 
 import posixpath
@@ -7,8 +9,109 @@ import urllib.parse
 from mlflow import data
 from mlflow.entities import FileInfo
 from mlflow.exceptions import MlflowException
-from mlflow.store.artifact.artifact_repo import ArtifactRepository
-from mlflow.utils.file_utils import relative_path_to_artifact_path
+from mlflow.protos.databricks_pb2 import INVALID_PARAMETER_VALUE
+from mlflow.store.artifact.artifact_repo import (
+    ArtifactRepository,
+    _compute_fingerprint,
+    _get_download_max_workers,
+    _get_upload_max_workers,
+)
+from mlflow.store.artifact.streaming import open_range_reader
+from mlflow.utils.download_utils import (
+    RemoteFile,
+    checksum_from_s3_etag,
+    partial_download,
+    verify_download,
+)
+
+# Environment variables configuring the boto3 managed transfers used to upload and download files,
+# mapped to the corresponding `boto3.s3.transfer.TransferConfig` arguments. Files larger than the
+# multipart threshold are transferred in parts of the multipart chunk size (in bytes), using up to
+# the maximum concurrency threads per file.
+_TRANSFER_CONFIG_ENV_VARS = OrderedDict(
+    [
+        ("multipart_threshold", "MLFLOW_S3_MULTIPART_THRESHOLD"),
+        ("multipart_chunksize", "MLFLOW_S3_MULTIPART_CHUNKSIZE"),
+        ("max_concurrency", "MLFLOW_S3_MAX_CONCURRENCY"),
+    ]
+)
+# Default `max_concurrency` of boto3 managed transfers
+_DEFAULT_TRANSFER_MAX_CONCURRENCY = 10
+# Default size of the connection pool of botocore clients
+_DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+# Environment variables from which boto3 resolves credentials and regions. Cached clients are
+# keyed by their values, so that changing them takes effect for subsequently created repositories.
+_CLIENT_ENV_VARS = [
+    "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY",
+    "AWS_SESSION_TOKEN",
+    "AWS_PROFILE",
+    "AWS_DEFAULT_REGION",
+    "AWS_CONFIG_FILE",
+    "AWS_SHARED_CREDENTIALS_FILE",
+]
+_MAX_CACHED_CLIENTS = 16
+# Maximum number of objects deleted by a single `DeleteObjects` request
+_MAX_KEYS_PER_DELETE = 1000
+
+# Creating a boto3 client takes tens of milliseconds, and repositories are created for each
+# operation, so clients are shared by all repositories with the same configuration. boto3 clients
+# are thread-safe, but creating them is not.
+_s3_clients_lock = threading.Lock()
+_s3_clients = OrderedDict()
+
+
+def _get_transfer_config_args():
+    transfer_config_args = {}
+    for arg_name, env_var in _TRANSFER_CONFIG_ENV_VARS.items():
+        value = os.environ.get(env_var)
+        if not value:
+            continue
+        try:
+            transfer_config_args[arg_name] = int(value)
+        except ValueError:
+            raise MlflowException(
+                "The value of the {} environment variable must be an integer, got '{}'".format(
+                    env_var, value
+                ),
+                error_code=INVALID_PARAMETER_VALUE,
+            )
+        if transfer_config_args[arg_name] <= 0:
+            raise MlflowException(
+                "The value of the {} environment variable must be positive, got '{}'".format(
+                    env_var, value
+                ),
+                error_code=INVALID_PARAMETER_VALUE,
+            )
+    return transfer_config_args
+
+
+def _get_max_pool_connections():
+    # Each of the threads transferring the files of a directory runs up to `max_concurrency`
+    # threads of its own, which share the connection pool of the client
+    max_concurrency = _get_transfer_config_args().get(
+        "max_concurrency", _DEFAULT_TRANSFER_MAX_CONCURRENCY
+    )
+    max_workers = max(_get_upload_max_workers(), _get_download_max_workers())
+    return max(_DEFAULT_MAX_POOL_CONNECTIONS, max_concurrency * max_workers)
+
+
+class _ObjectMetadataProvider(object):
+    """
+    Subscriber of an s3transfer download that provides the size and ETag of the object from a
+    ``head_object`` response, so that the transfer does not request them again.
+    """
+
+    def __init__(self, head):
+        self._head = head
+
+    def on_queued(self, future, **kwargs):
+        # pylint: disable=unused-argument
+        future.meta.provide_transfer_size(self._head["ContentLength"])
+        # Older versions of s3transfer do not pin multipart downloads to an ETag
+        if hasattr(future.meta, "provide_object_etag"):
+            future.meta.provide_object_etag(self._head.get("ETag"))
 
 
 class S3ArtifactRepository(ArtifactRepository):
@@ -60,16 +163,47 @@ class S3ArtifactRepository(ArtifactRepository):
             from botocore import UNSIGNED
 
             signature_version = UNSIGNED
-        return boto3.client(
-            "s3",
-            config=Config(signature_version=signature_version),
-            endpoint_url=s3_endpoint_url,
-            verify=verify,
+
+        max_pool_connections = _get_max_pool_connections()
+        client_key = (
+            s3_endpoint_url,
+            verify,
+            signature_version,
+            max_pool_connections,
+            tuple(os.environ.get(env_var) for env_var in _CLIENT_ENV_VARS),
         )
+        with _s3_clients_lock:
+            s3_client = _s3_clients.get(client_key)
+            if s3_client is None:
+                s3_client = boto3.client(
+                    "s3",
+                    config=Config(
+                        signature_version=signature_version,
+                        max_pool_connections=max_pool_connections,
+                    ),
+                    endpoint_url=s3_endpoint_url,
+                    verify=verify,
+                )
+                if len(_s3_clients) >= _MAX_CACHED_CLIENTS:
+                    _s3_clients.popitem(last=False)
+                _s3_clients[client_key] = s3_client
+            return s3_client
 
-    def _upload_file(self, s3_client, local_file, bucket, key):
+    @staticmethod
+    def get_s3_transfer_config():
+        """
+        Return the ``boto3.s3.transfer.TransferConfig`` used to upload and download files, as
+        configured by the ``MLFLOW_S3_MULTIPART_THRESHOLD``, ``MLFLOW_S3_MULTIPART_CHUNKSIZE`` and
+        ``MLFLOW_S3_MAX_CONCURRENCY`` environment variables. boto3 defaults apply to the
+        settings that are not configured.
+        """
+        from boto3.s3.transfer import TransferConfig
+
+        return TransferConfig(**_get_transfer_config_args())
+
+    def _get_upload_extra_args(self, file_name):
         extra_args = dict()
-        guessed_type, guessed_encoding = guess_type(local_file)
+        guessed_type, guessed_encoding = guess_type(file_name)
         if guessed_type is not None:
             extra_args["ContentType"] = guessed_type
         if guessed_encoding is not None:
@@ -77,7 +211,16 @@ class S3ArtifactRepository(ArtifactRepository):
         environ_extra_args = self.get_s3_file_upload_extra_args()
         if environ_extra_args is not None:
             extra_args.update(environ_extra_args)
-        s3_client.upload_file(Filename=local_file, Bucket=bucket, Key=key, ExtraArgs=extra_args)
+        return extra_args
+
+    def _upload_file(self, s3_client, local_file, bucket, key):
+        s3_client.upload_file(
+            Filename=local_file,
+            Bucket=bucket,
+            Key=key,
+            ExtraArgs=self._get_upload_extra_args(local_file),
+            Config=self.get_s3_transfer_config(),
+        )
 
     def log_artifact(self, local_file, artifact_path=None):
         (bucket, dest_path) = data.parse_s3_uri(self.artifact_uri)
@@ -92,21 +235,25 @@ class S3ArtifactRepository(ArtifactRepository):
         (bucket, dest_path) = data.parse_s3_uri(self.artifact_uri)
         if artifact_path:
             dest_path = posixpath.join(dest_path, artifact_path)
+        # boto3 clients are thread-safe, so a single client is shared by all upload threads
         s3_client = self._get_s3_client()
-        local_dir = os.path.abspath(local_dir)
-        for (root, _, filenames) in os.walk(local_dir):
-            upload_path = dest_path
-            if root != local_dir:
-                rel_path = os.path.relpath(root, local_dir)
-                rel_path = relative_path_to_artifact_path(rel_path)
-                upload_path = posixpath.join(dest_path, rel_path)
-            for f in filenames:
-                self._upload_file(
-                    s3_client=s3_client,
-                    local_file=os.path.join(root, f),
-                    bucket=bucket,
-                    key=posixpath.join(upload_path, f),
-                )
+        self._upload_files_concurrently(
+            local_dir,
+            lambda local_file, artifact_file_path: self._upload_file(
+                s3_client=s3_client,
+                local_file=local_file,
+                bucket=bucket,
+                key=posixpath.join(dest_path, artifact_file_path),
+            ),
+        )
+
+    def upload_bytes(self, data, artifact_file):
+        # The `data` argument shadows the `mlflow.data` module
+        (bucket, dest_path) = self.parse_s3_uri(self.artifact_uri)
+        dest_path = posixpath.join(dest_path, posixpath.normpath(artifact_file))
+        self._get_s3_client().put_object(
+            Body=data, Bucket=bucket, Key=dest_path, **self._get_upload_extra_args(dest_path)
+        )
 
     def list_artifacts(self, path=None):
         (bucket, artifact_path) = data.parse_s3_uri(self.artifact_uri)
@@ -140,6 +287,53 @@ class S3ArtifactRepository(ArtifactRepository):
                 infos.append(FileInfo(file_rel_path, False, file_size))
         return sorted(infos, key=lambda f: f.path)
 
+    @staticmethod
+    def _list_objects(s3_client, bucket, prefix):
+        """
+        Yield every object whose key starts with the specified prefix, without grouping the
+        objects of subdirectories, using as few paginated list requests as possible.
+        """
+        paginator = s3_client.get_paginator("list_objects_v2")
+        for result in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in result.get("Contents", []):
+                yield obj
+
+    def list_artifacts_recursive(self, path=None):
+        (bucket, artifact_path) = data.parse_s3_uri(self.artifact_uri)
+        dest_path = artifact_path
+        if path:
+            dest_path = posixpath.join(dest_path, path)
+        infos = []
+        prefix = dest_path + "/" if dest_path else ""
+        for obj in self._list_objects(self._get_s3_client(), bucket, prefix):
+            file_path = obj.get("Key")
+            self._verify_listed_object_contains_artifact_path_prefix(
+                listed_object_path=file_path, artifact_path=artifact_path
+            )
+            # Skip the empty objects created by some tools to represent directories
+            if file_path.endswith("/"):
+                continue
+            file_rel_path = posixpath.relpath(path=file_path, start=artifact_path)
+            infos.append(FileInfo(file_rel_path, False, int(obj.get("Size"))))
+        return sorted(infos, key=lambda f: f.path)
+
+    def _get_artifact_fingerprint(self, artifact_path):
+        (bucket, dest_path) = data.parse_s3_uri(self.artifact_uri)
+        if artifact_path:
+            dest_path = posixpath.join(dest_path, artifact_path)
+        dest_path = dest_path.rstrip("/")
+        dir_prefix = dest_path + "/" if dest_path else ""
+        entries = [
+            (posixpath.join(bucket, obj.get("Key")), obj.get("ETag"))
+            for obj in self._list_objects(self._get_s3_client(), bucket, dest_path)
+            if obj.get("Key") == dest_path or obj.get("Key").startswith(dir_prefix)
+        ]
+        return _compute_fingerprint(entries)
+
+    def _list_artifact_tree(self, artifact_dir_path):
+        # Object stores have no notion of empty directories
+        return self.list_artifacts_recursive(artifact_dir_path), []
+
     @staticmethod
     def _verify_listed_object_contains_artifact_path_prefix(listed_object_path, artifact_path):
         if not listed_object_path.startswith(artifact_path):
@@ -151,22 +345,107 @@ class S3ArtifactRepository(ArtifactRepository):
                 )
             )
 
+    def _file_exists(self, artifact_path):
+        from botocore.exceptions import ClientError
+
+        (bucket, s3_root_path) = data.parse_s3_uri(self.artifact_uri)
+        s3_full_path = posixpath.join(s3_root_path, artifact_path)
+        try:
+            self._get_s3_client().head_object(Bucket=bucket, Key=s3_full_path)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
     def _download_file(self, remote_file_path, local_path):
         (bucket, s3_root_path) = data.parse_s3_uri(self.artifact_uri)
         s3_full_path = posixpath.join(s3_root_path, remote_file_path)
         s3_client = self._get_s3_client()
-        s3_client.download_file(bucket, s3_full_path, local_path)
+        head = s3_client.head_object(Bucket=bucket, Key=s3_full_path)
+        # Pinning the version of the object in versioned buckets guarantees that all parts are
+        # read from the same version, even if the object is overwritten during the download
+        extra_args = {"VersionId": head["VersionId"]} if head.get("VersionId") else {}
+        remote_file = RemoteFile(
+            head["ContentLength"],
+            checksum_from_s3_etag(
+                head.get("ETag"), head.get("ServerSideEncryption"), head.get("SSECustomerAlgorithm")
+            ),
+        )
+        # boto3 downloads large objects as concurrent range requests and retries the parts whose
+        # connection drops, so that interrupted downloads resume from the failed parts. The size
+        # and ETag of the object are provided to the transfer, which otherwise requests them again.
+        from boto3.s3.transfer import create_transfer_manager
+
+        with partial_download(local_path) as partial_path, create_transfer_manager(
+            s3_client, self.get_s3_transfer_config()
+        ) as transfer_manager:
+            transfer_manager.download(
+                bucket,
+                s3_full_path,
+                partial_path,
+                extra_args=extra_args,
+                subscribers=[_ObjectMetadataProvider(head)],
+            ).result()
+            verify_download(partial_path, remote_file, "s3://{}/{}".format(bucket, s3_full_path))
+
+    def open(self, artifact_path):
+        from botocore.exceptions import ClientError
+
+        (bucket, s3_root_path) = data.parse_s3_uri(self.artifact_uri)
+        s3_full_path = posixpath.join(s3_root_path, artifact_path)
+        s3_client = self._get_s3_client()
+        try:
+            head = s3_client.head_object(Bucket=bucket, Key=s3_full_path)
+        except ClientError:
+            # The file may be missing or stored as a pointer to a content-addressed blob
+            return super().open(artifact_path)
+
+        def read_range(start, length):
+            # Pinning the ETag guarantees that all ranges are read from the same version of the
+            # object, even if it is overwritten while the stream is open
+            response = s3_client.get_object(
+                Bucket=bucket,
+                Key=s3_full_path,
+                Range="bytes={}-{}".format(start, start + length - 1),
+                IfMatch=head["ETag"],
+            )
+            return response["Body"].read()
+
+        return open_range_reader(read_range, head["ContentLength"])
 
     def delete_artifacts(self, artifact_path=None):
         (bucket, dest_path) = data.parse_s3_uri(self.artifact_uri)
         if artifact_path:
             dest_path = posixpath.join(dest_path, artifact_path)
+        dest_path = dest_path.rstrip("/")
+        dir_prefix = dest_path + "/" if dest_path else ""
 
         s3_client = self._get_s3_client()
-        list_objects = s3_client.list_objects(Bucket=bucket, Prefix=dest_path).get("Contents", [])
-        for to_delete_obj in list_objects:
-            file_path = to_delete_obj.get("Key")
+        # Materialize the listing before deleting objects so that deletions do not interfere
+        # with the pagination of the listing
+        keys = []
+        for obj in self._list_objects(s3_client, bucket, dest_path):
+            file_path = obj.get("Key")
             self._verify_listed_object_contains_artifact_path_prefix(
                 listed_object_path=file_path, artifact_path=dest_path
             )
-            s3_client.delete_object(Bucket=bucket, Key=file_path)
+            # Skip the objects of sibling artifacts whose names start with the artifact name
+            if file_path == dest_path or file_path.startswith(dir_prefix):
+                keys.append(file_path)
+
+        def delete_batch(batch):
+            response = s3_client.delete_objects(
+                Bucket=bucket, Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            # Failures to delete individual objects are reported in the response
+            errors = response.get("Errors", [])
+            if errors:
+                raise MlflowException(
+                    "Failed to delete {} objects: {}".format(
+                        len(errors),
+                        ", ".join("{} ({})".format(e.get("Key"), e.get("Code")) for e in errors),
+                    )
+                )
+
+        self._delete_in_batches_concurrently(keys, _MAX_KEYS_PER_DELETE, delete_batch)
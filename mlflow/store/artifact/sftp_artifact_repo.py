@@ -1,24 +1,20 @@
 import os
-import sys
+import threading
+from contextlib import contextmanager
 
 import posixpath
 import urllib.parse
 
 from mlflow.entities import FileInfo
-from mlflow.store.artifact.artifact_repo import ArtifactRepository
+from mlflow.store.artifact.artifact_repo import (
+    ArtifactRepository,
+    _get_download_max_workers,
+    _get_upload_max_workers,
+    _walk_artifact_tree,
+)
+from mlflow.store.artifact.connection_pool import ConnectionPool
 from mlflow.exceptions import MlflowException
-
-
-# Based on: https://stackoverflow.com/a/58466685
-def _put_r_for_windows(sftp, local_dir, remote_dir, preserve_mtime=False):
-    for entry in os.listdir(local_dir):
-        local_path = os.path.join(local_dir, entry)
-        remote_path = posixpath.join(remote_dir, entry)
-        if os.path.isdir(local_path):
-            sftp.mkdir(remote_path)
-            _put_r_for_windows(sftp, local_path, remote_path, preserve_mtime)
-        else:
-            sftp.put(local_path, remote_path, preserve_mtime=preserve_mtime)
+from mlflow.utils.file_utils import relative_path_to_artifact_path
 
 
 class SFTPArtifactRepository(ArtifactRepository):
@@ -36,7 +32,11 @@ class SFTPArtifactRepository(ArtifactRepository):
         self.path = parsed.path
 
         if client:
+            # The provided client is owned by the caller, so it is neither pooled nor ever closed
+            # by the repository, and is used by one thread at a time
             self.sftp = client
+            self._connection_pool = None
+            self._client_lock = threading.Lock()
         else:
             import pysftp
             import paramiko
@@ -67,47 +67,135 @@ class SFTPArtifactRepository(ArtifactRepository):
             if "identityfile" in user_config:
                 self.config["private_key"] = user_config["identityfile"][0]
 
+            # Establishing SSH sessions takes several round trips, so connections are reused
+            # across operations. The first connection is established eagerly, so that invalid
+            # configurations are reported when the repository is created.
             self.sftp = pysftp.Connection(**self.config)
+            self._connection_pool = ConnectionPool(
+                lambda: pysftp.Connection(**self.config),
+                max_size=max(_get_upload_max_workers(), _get_download_max_workers()),
+                is_connection_error=_is_connection_error,
+            )
+            self._connection_pool.add(self.sftp)
 
         super().__init__(artifact_uri)
 
+    @contextmanager
+    def _get_sftp_client(self):
+        """
+        Yield an SFTP connection for the exclusive use of the calling thread: a connection of the
+        repository's connection pool, or the client provided when creating the repository.
+        """
+        if self._connection_pool is None:
+            with self._client_lock:
+                yield self.sftp
+        else:
+            with self._connection_pool.connection() as sftp:
+                yield sftp
+
+    @staticmethod
+    def _makedirs(sftp, remote_dir, known_dirs):
+        """
+        Create the specified directory and its missing parents, unless it is in the set of the
+        directories known to exist, which is updated with the created directories.
+        """
+        if remote_dir not in known_dirs:
+            sftp.makedirs(remote_dir)
+            # `makedirs` ensures that all the parents of the directory exist as well
+            while remote_dir not in known_dirs and remote_dir not in ("", "/"):
+                known_dirs.add(remote_dir)
+                remote_dir = posixpath.dirname(remote_dir)
+
     def log_artifact(self, local_file, artifact_path=None):
         artifact_dir = posixpath.join(self.path, artifact_path) if artifact_path else self.path
-        self.sftp.makedirs(artifact_dir)
-        self.sftp.put(local_file, posixpath.join(artifact_dir, os.path.basename(local_file)))
+        with self._get_sftp_client() as sftp:
+            sftp.makedirs(artifact_dir)
+            sftp.put(local_file, posixpath.join(artifact_dir, os.path.basename(local_file)))
 
     def log_artifacts(self, local_dir, artifact_path=None):
         artifact_dir = posixpath.join(self.path, artifact_path) if artifact_path else self.path
-        self.sftp.makedirs(artifact_dir)
-        if sys.platform == "win32":
-            _put_r_for_windows(self.sftp, local_dir, artifact_dir)
-        else:
-            self.sftp.put_r(local_dir, artifact_dir)
+
+        # Create the directory tree first, including empty directories, so that files can be
+        # uploaded in any order. Each directory is only checked once.
+        local_dir = os.path.abspath(local_dir)
+        known_dirs = set()
+        with self._get_sftp_client() as sftp:
+            for (root, _, _) in os.walk(local_dir):
+                remote_dir = artifact_dir
+                if root != local_dir:
+                    rel_path = relative_path_to_artifact_path(os.path.relpath(root, local_dir))
+                    remote_dir = posixpath.join(artifact_dir, rel_path)
+                self._makedirs(sftp, remote_dir, known_dirs)
+
+        def upload_file(local_file, artifact_file_path):
+            with self._get_sftp_client() as sftp:
+                sftp.put(local_file, posixpath.join(artifact_dir, artifact_file_path))
+
+        # Files are uploaded concurrently over the pooled connections
+        self._upload_files_concurrently(local_dir, upload_file)
 
     def _is_directory(self, artifact_path):
         artifact_dir = self.path
         path = posixpath.join(artifact_dir, artifact_path) if artifact_path else artifact_dir
-        return self.sftp.isdir(path)
+        with self._get_sftp_client() as sftp:
+            return sftp.isdir(path)
 
     def list_artifacts(self, path=None):
         artifact_dir = self.path
         list_dir = posixpath.join(artifact_dir, path) if path else artifact_dir
-        if not self.sftp.isdir(list_dir):
-            return []
-        artifact_files = self.sftp.listdir(list_dir)
+        with self._get_sftp_client() as sftp:
+            if not sftp.isdir(list_dir):
+                return []
+            return self._list_dir(sftp, list_dir, path)
+
+    @staticmethod
+    def _list_dir(sftp, list_dir, path):
+        artifact_files = sftp.listdir(list_dir)
         infos = []
         for file_name in artifact_files:
             file_path = file_name if path is None else posixpath.join(path, file_name)
             full_file_path = posixpath.join(list_dir, file_name)
-            if self.sftp.isdir(full_file_path):
+            if sftp.isdir(full_file_path):
                 infos.append(FileInfo(file_path, True, None))
             else:
-                infos.append(FileInfo(file_path, False, self.sftp.stat(full_file_path).st_size))
+                infos.append(FileInfo(file_path, False, sftp.stat(full_file_path).st_size))
         return infos
 
+    def _list_artifact_tree(self, artifact_dir_path):
+        # The tree is listed over a single connection, and the subdirectories found by listing
+        # their parent are not checked again
+        with self._get_sftp_client() as sftp:
+            root_dir = (
+                posixpath.join(self.path, artifact_dir_path) if artifact_dir_path else self.path
+            )
+            if not sftp.isdir(root_dir):
+                return [], []
+            return _walk_artifact_tree(
+                artifact_dir_path,
+                lambda path: self._list_dir(
+                    sftp, posixpath.join(self.path, path) if path else self.path, path
+                ),
+            )
+
     def _download_file(self, remote_file_path, local_path):
         remote_full_path = posixpath.join(self.path, remote_file_path)
-        self.sftp.get(remote_full_path, local_path)
+        with self._get_sftp_client() as sftp:
+            sftp.get(remote_full_path, local_path)
 
     def delete_artifacts(self, artifact_path=None):
         raise MlflowException("Not implemented yet")
+
+
+def _is_connection_error(sftp, error):
+    import paramiko
+
+    if isinstance(error, (paramiko.SSHException, EOFError)):
+        return True
+    if isinstance(error, OSError):
+        # The server reports errors about files, e.g. a missing remote file, as `IOError`s after
+        # which the session can still be used, unlike errors of the underlying transport
+        try:
+            return not sftp.sftp_client.get_channel().get_transport().is_active()
+        except Exception:
+            return True
+    return False
@@ -0,0 +1,103 @@
+"""
+Readable binary streams over stored artifact files, as returned by ``ArtifactRepository.open``.
+"""
+import io
+import shutil
+
+# Size of the byte ranges requested from the artifact store when reading small amounts of data
+STREAM_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class _RangeReader(io.RawIOBase):
+    """
+    Seekable raw stream over a stored file of known size, which reads the byte ranges requested by
+    its consumer on demand.
+    """
+
+    def __init__(self, read_range, size, on_close=None):
+        self._read_range = read_range
+        self._size = size
+        self._position = 0
+        self._on_close = on_close
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError("Invalid whence value: {}".format(whence))
+        if position < 0:
+            raise ValueError("Negative seek position: {}".format(position))
+        self._position = position
+        return position
+
+    def readinto(self, b):
+        length = min(len(b), self._size - self._position)
+        if length <= 0:
+            return 0
+        data = self._read_range(self._position, length)
+        b[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def readall(self):
+        # Read the remainder of the file with a single request
+        length = self._size - self._position
+        if length <= 0:
+            return b""
+        data = self._read_range(self._position, length)
+        self._position += len(data)
+        return data
+
+    def close(self):
+        if not self.closed:
+            try:
+                super().close()
+            finally:
+                if self._on_close is not None:
+                    self._on_close()
+
+
+def open_range_reader(read_range, size, on_close=None):
+    """
+    Return a buffered, seekable binary stream over a stored file.
+
+    :param read_range: Function called as ``read_range(start, length)`` that returns the bytes of
+                       the file in the range ``[start, start + length)``. ``length`` is always
+                       positive and the range never extends past the end of the file.
+    :param size: Size of the file, in bytes.
+    :param on_close: Optional function called when the stream is closed, e.g. to release the
+                     connection used to read the file.
+    """
+    return io.BufferedReader(
+        _RangeReader(read_range, size, on_close), buffer_size=STREAM_CHUNK_SIZE
+    )
+
+
+class TemporaryFileReader(io.BufferedReader):
+    """
+    Binary stream over a file staged in a temporary directory, which is removed when the stream is
+    closed.
+    """
+
+    def __init__(self, local_path, tmp_dir):
+        super().__init__(io.FileIO(local_path, "rb"))
+        self._tmp_dir = tmp_dir
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
@@ -2,7 +2,7 @@ from abc import abstractmethod, ABCMeta
 
 from mlflow.entities import ViewType
 from mlflow.store.entities.paged_list import PagedList
-from mlflow.store.tracking import SEARCH_MAX_RESULTS_DEFAULT
+from mlflow.store.tracking import SEARCH_MAX_RESULTS_DEFAULT, SEARCH_MAX_RESULTS_THRESHOLD
 
 
 class AbstractStore:
@@ -123,6 +123,19 @@ class AbstractStore:
         """
         pass
 
+    def get_runs(self, run_ids):
+        """
+        Fetch multiple runs from the backend store. Stores should override this method with an
+        implementation that fetches all of the runs at once; the default implementation fetches
+        them one at a time with :py:meth:`get_run`.
+
+        :param run_ids: List of unique run identifiers.
+
+        :return: A list of :py:class:`mlflow.entities.Run` objects in the same order as
+                 ``run_ids``. Raises an exception if any of the runs does not exist.
+        """
+        return [self.get_run(run_id) for run_id in run_ids]
+
     @abstractmethod
     def update_run_info(self, run_id, run_status, end_time):
         """
@@ -261,6 +274,42 @@ class AbstractStore:
         """
         pass
 
+    def aggregate_runs(self, experiment_ids, filter_string, run_view_type, group_by, aggregations):
+        """
+        Aggregate the latest metric values of the runs that match the given search filter within
+        the experiments. Stores should override this method with an implementation that computes
+        the aggregates in the backend; the default implementation fetches all matching runs with
+        :py:meth:`search_runs` and aggregates them in memory.
+
+        :param experiment_ids: List of experiment ids to scope the aggregation
+        :param filter_string: A search filter string.
+        :param run_view_type: ACTIVE_ONLY, DELETED_ONLY, or ALL runs
+        :param group_by: List of params, tags or attributes to group runs by, e.g.
+                         ``params.model_type``.
+        :param aggregations: List of aggregations, e.g. ``avg(metrics.accuracy)``,
+                             ``p90(metrics.latency)`` or ``count(*)``.
+
+        :return: A list of :py:class:`RunAggregationGroup <mlflow.entities.RunAggregationGroup>`
+            objects, one for each distinct combination of group-by values.
+        """
+        from mlflow.utils.search_utils import SearchUtils
+
+        runs = []
+        page_token = None
+        while True:
+            page = self.search_runs(
+                experiment_ids,
+                filter_string,
+                run_view_type,
+                max_results=SEARCH_MAX_RESULTS_THRESHOLD,
+                page_token=page_token,
+            )
+            runs.extend(page)
+            page_token = page.token
+            if not page_token or len(page) == 0:
+                break
+        return SearchUtils.aggregate(runs, group_by, aggregations)
+
     def list_run_infos(
         self,
         experiment_id,
@@ -5,6 +5,7 @@ import sys
 import shutil
 
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 from mlflow.entities import (
     Experiment,
@@ -528,6 +529,20 @@ class FileStore(AbstractStore):
             )
         return self._get_run_from_info(run_info)
 
+    def get_runs(self, run_ids):
+        """
+        Note: Will get both active and deleted runs.
+        """
+        run_ids = list(run_ids)
+        if not run_ids:
+            return []
+        # Reading a run requires a filesystem access per metric, param, and tag, so runs are read
+        # concurrently to overlap I/O latency (e.g. when the store resides on a network filesystem)
+        num_cpus = os.cpu_count() or 4
+        num_workers = min(len(run_ids), num_cpus * 2, 16)
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            return list(executor.map(self.get_run, run_ids))
+
     def _get_run_from_info(self, run_info):
         metrics = self._get_all_metrics(run_info)
         params = self._get_all_params(run_info)
@@ -762,6 +777,16 @@ class FileStore(AbstractStore):
         runs, next_page_token = SearchUtils.paginate(sorted_runs, page_token, max_results)
         return runs, next_page_token
 
+    def aggregate_runs(self, experiment_ids, filter_string, run_view_type, group_by, aggregations):
+        from mlflow.utils.search_utils import SearchUtils
+
+        runs = []
+        for experiment_id in experiment_ids:
+            run_infos = self._list_run_infos(experiment_id, run_view_type)
+            runs.extend(self._get_run_from_info(r) for r in run_infos)
+        filtered = SearchUtils.filter(runs, filter_string)
+        return SearchUtils.aggregate(filtered, group_by, aggregations)
+
     def log_metric(self, run_id, metric):
         _validate_run_id(run_id)
         _validate_metric_name(metric.key)
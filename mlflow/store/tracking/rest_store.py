@@ -1,4 +1,4 @@
-from mlflow.entities import Experiment, Run, RunInfo, Metric, ViewType
+from mlflow.entities import Experiment, Run, RunInfo, Metric, ViewType, RunAggregationGroup
 from mlflow.exceptions import MlflowException
 from mlflow.protos import databricks_pb2
 from mlflow.protos.service_pb2 import (
@@ -6,7 +6,9 @@ from mlflow.protos.service_pb2 import (
     MlflowService,
     GetExperiment,
     GetRun,
+    GetRuns,
     SearchRuns,
+    AggregateRuns,
     ListExperiments,
     GetMetricHistory,
     LogMetric,
@@ -27,14 +29,21 @@ from mlflow.protos.service_pb2 import (
 )
 from mlflow.store.tracking.abstract_store import AbstractStore
 from mlflow.store.entities.paged_list import PagedList
+from mlflow.utils import chunk_list
 from mlflow.utils.proto_json_utils import message_to_json
+from mlflow.utils.validation import MAX_RUNS_PER_GET_RUNS_REQUEST
 from mlflow.utils.rest_utils import (
     call_endpoint,
     extract_api_info_for_service,
+    ConditionalResponseCache,
     _REST_API_PATH_PREFIX,
 )
 
 _METHOD_TO_INFO = extract_api_info_for_service(MlflowService, _REST_API_PATH_PREFIX)
+# Read APIs whose responses are cached and revalidated against the server using ETags. The cache
+# is shared across store instances because a new store is constructed for most client calls.
+_CONDITIONAL_GET_APIS = frozenset([GetExperiment, GetRun, GetMetricHistory])
+_conditional_response_cache = ConditionalResponseCache()
 
 
 class RestStore(AbstractStore):
@@ -53,6 +62,15 @@ class RestStore(AbstractStore):
     def _call_endpoint(self, api, json_body):
         endpoint, method = _METHOD_TO_INFO[api]
         response_proto = api.Response()
+        if api in _CONDITIONAL_GET_APIS:
+            return call_endpoint(
+                self.get_host_creds(),
+                endpoint,
+                method,
+                json_body,
+                response_proto,
+                response_cache=_conditional_response_cache,
+            )
         return call_endpoint(self.get_host_creds(), endpoint, method, json_body, response_proto)
 
     def list_experiments(
@@ -132,6 +150,22 @@ class RestStore(AbstractStore):
         response_proto = self._call_endpoint(GetRun, req_body)
         return Run.from_proto(response_proto.run)
 
+    def get_runs(self, run_ids):
+        """
+        Fetch multiple runs from backend store, requesting at most
+        ``MAX_RUNS_PER_GET_RUNS_REQUEST`` runs per REST request.
+
+        :param run_ids: List of unique run identifiers
+
+        :return: A list of Run objects in the same order as ``run_ids``
+        """
+        runs = []
+        for run_ids_chunk in chunk_list(list(run_ids), MAX_RUNS_PER_GET_RUNS_REQUEST):
+            req_body = message_to_json(GetRuns(run_ids=run_ids_chunk))
+            response_proto = self._call_endpoint(GetRuns, req_body)
+            runs.extend(Run.from_proto(proto_run) for proto_run in response_proto.runs)
+        return runs
+
     def update_run_info(self, run_id, run_status, end_time):
         """ Updates the metadata of the specified run. """
         req_body = message_to_json(
@@ -264,6 +298,20 @@ class RestStore(AbstractStore):
             next_page_token = response_proto.next_page_token
         return runs, next_page_token
 
+    def aggregate_runs(self, experiment_ids, filter_string, run_view_type, group_by, aggregations):
+        experiment_ids = [str(experiment_id) for experiment_id in experiment_ids]
+        req_body = message_to_json(
+            AggregateRuns(
+                experiment_ids=experiment_ids,
+                filter=filter_string,
+                run_view_type=ViewType.to_proto(run_view_type),
+                group_by=group_by,
+                aggregations=aggregations,
+            )
+        )
+        response_proto = self._call_endpoint(AggregateRuns, req_body)
+        return [RunAggregationGroup.from_proto(group) for group in response_proto.groups]
+
     def delete_run(self, run_id):
         req_body = message_to_json(DeleteRun(run_id=run_id))
         self._call_endpoint(DeleteRun, req_body)
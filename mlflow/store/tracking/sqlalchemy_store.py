@@ -2,6 +2,7 @@ import json
 import logging
 import uuid
 import threading
+from collections import OrderedDict
 
 import math
 import sqlalchemy
@@ -51,6 +52,9 @@ from mlflow.utils.mlflow_tags import MLFLOW_LOGGED_MODELS
 
 _logger = logging.getLogger(__name__)
 
+# Maximum number of run IDs bound to a single IN query by `SqlAlchemyStore.get_runs`
+_MAX_RUN_IDS_PER_QUERY = 500
+
 # For each database table, fetch its columns and define an appropriate attribute for each column
 # on the table's associated object representation (Mapper). This is necessary to ensure that
 # columns defined via backreference are available as Mapper instance attributes (e.g.,
@@ -538,6 +542,36 @@ class SqlAlchemyStore(AbstractStore):
             run = self._get_run(run_uuid=run_id, session=session, eager=True)
             return run.to_mlflow_entity()
 
+    def get_runs(self, run_ids):
+        run_ids = list(run_ids)
+        if not run_ids:
+            return []
+        unique_run_ids = list(OrderedDict.fromkeys(run_ids))
+        runs_by_id = {}
+        with self.ManagedSessionMaker() as session:
+            # Load the runs with IN queries of at most _MAX_RUN_IDS_PER_QUERY IDs, which stay below
+            # the limit of bind parameters of older SQLite builds (999), eagerly loading their
+            # summary metrics, params, and tags with one additional query per attribute (rather
+            # than per run)
+            for start in range(0, len(unique_run_ids), _MAX_RUN_IDS_PER_QUERY):
+                sql_runs = (
+                    session.query(SqlRun)
+                    .options(*self._get_eager_run_query_options())
+                    .filter(
+                        SqlRun.run_uuid.in_(unique_run_ids[start : start + _MAX_RUN_IDS_PER_QUERY])
+                    )
+                    .all()
+                )
+                runs_by_id.update(
+                    (sql_run.run_uuid, sql_run.to_mlflow_entity()) for sql_run in sql_runs
+                )
+        missing_run_ids = [run_id for run_id in run_ids if run_id not in runs_by_id]
+        if missing_run_ids:
+            raise MlflowException(
+                "Runs with ids={} not found".format(missing_run_ids), RESOURCE_DOES_NOT_EXIST
+            )
+        return [runs_by_id[run_id] for run_id in run_ids]
+
     def restore_run(self, run_id):
         with self.ManagedSessionMaker() as session:
             run = self._get_run(run_uuid=run_id, session=session)
@@ -800,6 +834,86 @@ class SqlAlchemyStore(AbstractStore):
 
         return runs, next_page_token
 
+    def aggregate_runs(self, experiment_ids, filter_string, run_view_type, group_by, aggregations):
+        import numpy as np
+
+        group_bys = [SearchUtils.parse_group_by_for_aggregate_runs(key) for key in group_by]
+        parsed_aggregations = [
+            SearchUtils.parse_aggregation_for_aggregate_runs(aggregation)
+            for aggregation in aggregations
+        ]
+        stages = set(LifecycleStage.view_type_to_stages(run_view_type))
+
+        with self.ManagedSessionMaker() as session:
+            parsed_filters = SearchUtils.parse_search_filter(filter_string)
+            filter_joins = _get_sqlalchemy_filter_clauses(parsed_filters, session)
+            group_by_columns, group_by_joins = _get_group_by_columns(group_bys, session)
+            metric_keys = {key for _, key, _ in parsed_aggregations if key is not None}
+            metric_values, metric_joins = _get_latest_metric_value_columns(metric_keys, session)
+
+            def query_runs(*columns):
+                query = session.query(*columns).select_from(SqlRun)
+                for j in filter_joins:
+                    query = query.join(j, j.c.run_uuid == SqlRun.run_uuid)
+                # Outer joins keep runs without a value for a group-by key or aggregated metric
+                for j in group_by_joins + metric_joins:
+                    query = query.outerjoin(j, j.c.run_uuid == SqlRun.run_uuid)
+                return query.filter(
+                    SqlRun.experiment_id.in_(experiment_ids),
+                    SqlRun.lifecycle_stage.in_(stages),
+                    *_get_attributes_filtering_clauses(parsed_filters)
+                )
+
+            # Min, max, avg and count are computed by the database. Percentiles are not supported
+            # by every database (e.g. SQLite and MySQL), so only the relevant metric values are
+            # fetched and percentiles are computed from them.
+            aggregate_columns = [sqlalchemy.func.count(SqlRun.run_uuid)]
+            for function, key, _ in parsed_aggregations:
+                if key is None:
+                    aggregate_columns.append(sqlalchemy.func.count(SqlRun.run_uuid))
+                elif function in SearchUtils.AGGREGATION_FUNCTIONS:
+                    aggregate_columns.append(getattr(sqlalchemy.func, function)(metric_values[key]))
+                else:
+                    aggregate_columns.append(sql.null())
+            aggregated_rows = (
+                query_runs(*(group_by_columns + aggregate_columns))
+                .group_by(*group_by_columns)
+                .all()
+            )
+            num_group_by_columns = len(group_by_columns)
+            groups = {}
+            for row in aggregated_rows:
+                # Without group-by keys, the database returns a single row even if no run matches
+                if row[num_group_by_columns] > 0:
+                    aggregated_values = [
+                        None if value is None else float(value)
+                        for value in row[num_group_by_columns + 1 :]
+                    ]
+                    groups[tuple(row[:num_group_by_columns])] = aggregated_values
+
+            percentile_metric_keys = {
+                key
+                for function, key, _ in parsed_aggregations
+                if function == SearchUtils.PERCENTILE_AGGREGATION_FUNCTION
+            }
+            percentile_values = {}
+            for key in percentile_metric_keys:
+                rows = query_runs(*(group_by_columns + [metric_values[key]])).filter(
+                    metric_values[key].isnot(None)
+                )
+                for row in rows:
+                    group_values = tuple(row[:num_group_by_columns])
+                    percentile_values.setdefault((group_values, key), []).append(row[-1])
+
+        for group_values, aggregated_values in groups.items():
+            for i, (function, key, percentile) in enumerate(parsed_aggregations):
+                if function == SearchUtils.PERCENTILE_AGGREGATION_FUNCTION:
+                    values = percentile_values.get((group_values, key))
+                    aggregated_values[i] = (
+                        float(np.percentile(values, percentile)) if values else None
+                    )
+        return SearchUtils.create_aggregation_groups(group_by, aggregations, groups.items())
+
     def log_batch(self, run_id, metrics, params, tags):
         _validate_run_id(run_id)
         _validate_batch_log_data(metrics, params, tags)
@@ -904,6 +1018,41 @@ def _get_sqlalchemy_filter_clauses(parsed, session):
     return filters
 
 
+def _get_group_by_columns(group_bys, session):
+    """
+    Creates the columns holding the group-by values of runs, along with the SqlAlchemy subqueries
+    that must be outer-joined to SqlRun to make param and tag values available.
+    """
+    columns = []
+    joins = []
+    for key_type, key in group_bys:
+        if SearchUtils.is_attribute(key_type, "="):
+            columns.append(getattr(SqlRun, SqlRun.get_attribute_name(key)))
+            continue
+        entity = SqlParam if SearchUtils.is_param(key_type, "=") else SqlTag
+        subquery = session.query(entity).filter(entity.key == key).subquery()
+        joins.append(subquery)
+        columns.append(subquery.c.value)
+    return columns, joins
+
+
+def _get_latest_metric_value_columns(metric_keys, session):
+    """
+    Creates a column holding the latest value of each of the specified metrics, or NULL if the
+    value is NaN, along with the SqlAlchemy subqueries that must be outer-joined to SqlRun to make
+    these values available.
+    """
+    columns = {}
+    joins = []
+    for key in metric_keys:
+        subquery = session.query(SqlLatestMetric).filter(SqlLatestMetric.key == key).subquery()
+        joins.append(subquery)
+        columns[key] = sql.case(
+            [(subquery.c.is_nan == sqlalchemy.true(), sql.null())], else_=subquery.c.value
+        )
+    return columns, joins
+
+
 def _get_orderby_clauses(order_by_list, session):
     """Sorts a set of runs based on their natural ordering and an overriding set of order_bys.
     Runs are naturally ordered first by start time descending, then by run id for tie-breaking.
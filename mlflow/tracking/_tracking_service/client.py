@@ -19,6 +19,7 @@ from mlflow.utils.validation import (
 )
 from mlflow.entities import Param, Metric, RunStatus, RunTag, ViewType, ExperimentTag
 from mlflow.store.artifact.artifact_repository_registry import get_artifact_repository
+from mlflow.store.artifact.content_addressed import resolve_blob_pointers
 from mlflow.utils.mlflow_tags import MLFLOW_USER
 from mlflow.utils.string_utils import is_string_type
 from mlflow.utils.uri import add_databricks_profile_info_to_artifact_uri
@@ -64,6 +65,19 @@ class TrackingServiceClient(object):
         _validate_run_id(run_id)
         return self.store.get_run(run_id)
 
+    def get_runs(self, run_ids):
+        """
+        Fetch multiple runs from backend store in a single batched request.
+
+        :param run_ids: List of unique identifiers for the runs.
+
+        :return: A list of :py:class:`mlflow.entities.Run` objects in the same order as
+                 ``run_ids``. Raises an exception if any of the runs does not exist.
+        """
+        for run_id in run_ids:
+            _validate_run_id(run_id)
+        return self.store.get_runs(run_ids)
+
     def get_metric_history(self, run_id, key):
         """
         Return a list of metric objects corresponding to all values logged for a given metric.
@@ -333,6 +347,16 @@ class TrackingServiceClient(object):
         """
         self._get_artifact_repo(run_id).log_artifacts(local_dir, artifact_path)
 
+    def upload_bytes(self, run_id, data, artifact_file):
+        """
+        Write bytes to an artifact file of a run, without staging them in a local file when the
+        artifact store supports it.
+
+        :param data: Bytes to write.
+        :param artifact_file: The run-relative artifact file path in posixpath format.
+        """
+        self._get_artifact_repo(run_id).upload_bytes(data, artifact_file)
+
     def list_artifacts(self, run_id, path=None):
         """
         List the artifacts for a run.
@@ -342,7 +366,8 @@ class TrackingServiceClient(object):
                      or the root artifact path.
         :return: List of :py:class:`mlflow.entities.FileInfo`
         """
-        return self._get_artifact_repo(run_id).list_artifacts(path)
+        artifact_repo = self._get_artifact_repo(run_id)
+        return resolve_blob_pointers(artifact_repo.list_artifacts(path))
 
     def download_artifacts(self, run_id, path, dst_path=None):
         """
@@ -360,6 +385,16 @@ class TrackingServiceClient(object):
         """
         return self._get_artifact_repo(run_id).download_artifacts(path, dst_path)
 
+    def open_artifact(self, run_id, path):
+        """
+        Open an artifact file of a run for reading.
+
+        :param run_id: The run to read the artifact from.
+        :param path: Relative source path to the desired file artifact.
+        :return: Readable, seekable binary file object, which must be closed by the caller.
+        """
+        return self._get_artifact_repo(run_id).open(path)
+
     def set_terminated(self, run_id, status=None, end_time=None):
         """Set a run's status to terminated.
 
@@ -422,3 +457,36 @@ class TrackingServiceClient(object):
             order_by=order_by,
             page_token=page_token,
         )
+
+    def aggregate_runs(
+        self,
+        experiment_ids,
+        group_by=None,
+        aggregations=None,
+        filter_string="",
+        run_view_type=ViewType.ACTIVE_ONLY,
+    ):
+        """
+        Aggregate the latest metric values of the runs that fit the search criteria.
+
+        :param experiment_ids: List of experiment IDs, or a single int or string id.
+        :param group_by: List of params, tags or attributes to group runs by
+                         (e.g., "params.model_type").
+        :param aggregations: List of aggregations to compute for each group
+                             (e.g., "avg(metrics.accuracy)", "p90(metrics.latency)" or "count(*)").
+        :param filter_string: Filter query string, defaults to aggregating all runs.
+        :param run_view_type: one of enum values ACTIVE_ONLY, DELETED_ONLY, or ALL runs
+                              defined in :py:class:`mlflow.entities.ViewType`.
+
+        :return: A list of :py:class:`RunAggregationGroup <mlflow.entities.RunAggregationGroup>`
+                 objects, one for each distinct combination of group-by values.
+        """
+        if isinstance(experiment_ids, int) or is_string_type(experiment_ids):
+            experiment_ids = [experiment_ids]
+        return self.store.aggregate_runs(
+            experiment_ids=experiment_ids,
+            filter_string=filter_string,
+            run_view_type=run_view_type,
+            group_by=group_by or [],
+            aggregations=aggregations or [],
+        )
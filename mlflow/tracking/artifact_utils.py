@@ -12,6 +12,7 @@ from mlflow.exceptions import MlflowException
 from mlflow.protos.databricks_pb2 import INVALID_PARAMETER_VALUE
 from mlflow.store.artifact.artifact_repository_registry import get_artifact_repository
 from mlflow.store.artifact.dbfs_artifact_repo import DbfsRestArtifactRepository
+from mlflow.store.artifact.download_cache import get_download_cache
 from mlflow.store.artifact.models_artifact_repo import ModelsArtifactRepository
 from mlflow.tracking._tracking_service.utils import _get_store
 from mlflow.utils.uri import add_databricks_profile_info_to_artifact_uri, append_to_uri_path
@@ -80,9 +81,13 @@ def _download_artifact_from_uri(artifact_uri, output_path=None):
         parsed_uri = parsed_uri._replace(path=posixpath.dirname(parsed_uri.path))
         root_uri = prefix + urllib.parse.urlunparse(parsed_uri)
 
-    return get_artifact_repository(artifact_uri=root_uri).download_artifacts(
-        artifact_path=artifact_path, dst_path=output_path
-    )
+    repo = get_artifact_repository(artifact_uri=root_uri)
+    download_cache = get_download_cache()
+    if download_cache is not None:
+        return download_cache.download_artifacts(
+            repo, artifact_path=artifact_path, dst_path=output_path
+        )
+    return repo.download_artifacts(artifact_path=artifact_path, dst_path=output_path)
 
 
 def _upload_artifacts_to_databricks(
@@ -11,9 +11,19 @@ import posixpath
 import sys
 import tempfile
 import yaml
-from typing import Any, Dict, Sequence, List, Optional, Union, TYPE_CHECKING
-
-from mlflow.entities import Experiment, Run, RunInfo, Param, Metric, RunTag, FileInfo, ViewType
+from typing import Any, BinaryIO, Dict, Sequence, List, Optional, Union, TYPE_CHECKING
+
+from mlflow.entities import (
+    Experiment,
+    Run,
+    RunInfo,
+    Param,
+    Metric,
+    RunTag,
+    FileInfo,
+    ViewType,
+    RunAggregationGroup,
+)
 from mlflow.store.entities.paged_list import PagedList
 from mlflow.entities.model_registry import RegisteredModel, ModelVersion
 from mlflow.entities.model_registry.model_version_stages import ALL_STAGES
@@ -149,6 +159,42 @@ class MlflowClient(object):
         """
         return self._tracking_client.get_run(run_id)
 
+    def get_runs(self, run_ids: List[str]) -> List[Run]:
+        """
+        Fetch multiple runs from backend store. This is equivalent to calling
+        :py:meth:`get_run` for each run ID, but fetches all of the runs in a single request to
+        the backend store (or, for a remote tracking server, in one REST request per 1000 runs).
+
+        :param run_ids: List of unique identifiers for the runs.
+
+        :return: A list of :py:class:`mlflow.entities.Run` objects in the same order as
+                 ``run_ids``. Raises an exception if any of the runs does not exist.
+
+        .. code-block:: python
+            :caption: Example
+
+            import mlflow
+            from mlflow.tracking import MlflowClient
+
+            run_ids = []
+            for i in range(3):
+                with mlflow.start_run() as run:
+                    mlflow.log_param("p", i)
+                run_ids.append(run.info.run_id)
+
+            client = MlflowClient()
+            for run in client.get_runs(run_ids):
+                print("run_id: {}, params: {}".format(run.info.run_id, run.data.params))
+
+        .. code-block:: text
+            :caption: Output
+
+            run_id: 8bfc4ad5f5b94d4cb1a0b9b6f2d34c3b, params: {'p': '0'}
+            run_id: 51b4e1fc1bbd4e1a8ec55b6c01a11b5f, params: {'p': '1'}
+            run_id: 0c8c4e4c2e1a4b64b0f8d5c7c8e24b7d, params: {'p': '2'}
+        """
+        return self._tracking_client.get_runs(run_ids)
+
     def get_metric_history(self, run_id: str, key: str) -> List[Metric]:
         """
         Return a list of metric objects corresponding to all values logged for a given metric.
@@ -1021,9 +1067,7 @@ class MlflowClient(object):
             # Log HTML text
             client.log_text(run.info.run_id, "<h1>header</h1>", "index.html")
         """
-        with self._log_artifact_helper(run_id, artifact_file) as tmp_path:
-            with open(tmp_path, "w") as f:
-                f.write(text)
+        self._tracking_client.upload_bytes(run_id, text.encode("utf-8"), artifact_file)
 
     def log_dict(self, run_id: str, dictionary: Any, artifact_file: str) -> None:
         """
@@ -1061,13 +1105,12 @@ class MlflowClient(object):
         """
         extension = os.path.splitext(artifact_file)[1]
 
-        with self._log_artifact_helper(run_id, artifact_file) as tmp_path:
-            with open(tmp_path, "w") as f:
-                # Specify `indent` to prettify the output
-                if extension in [".yml", ".yaml"]:
-                    yaml.dump(dictionary, f, indent=2, default_flow_style=False)
-                else:
-                    json.dump(dictionary, f, indent=2)
+        # Specify `indent` to prettify the output
+        if extension in [".yml", ".yaml"]:
+            text = yaml.dump(dictionary, indent=2, default_flow_style=False)
+        else:
+            text = json.dumps(dictionary, indent=2)
+        self._tracking_client.upload_bytes(run_id, text.encode("utf-8"), artifact_file)
 
     def log_figure(
         self,
@@ -1388,6 +1431,39 @@ class MlflowClient(object):
         """
         return self._tracking_client.download_artifacts(run_id, path, dst_path)
 
+    def open_artifact(self, run_id: str, path: str) -> BinaryIO:
+        """
+        Open an artifact file of a run for reading, without downloading it to the local
+        filesystem when the artifact store supports streaming reads. Artifacts stored in Amazon
+        S3, Google Cloud Storage, Azure Blob Storage and HDFS are read in chunks on demand, using
+        ranged requests, and local artifacts are opened in place.
+
+        :param run_id: The run to read the artifact from.
+        :param path: Relative source path to the desired file artifact.
+        :return: Readable, seekable binary file object. The caller is responsible for closing it,
+                 e.g. with a ``with`` statement.
+
+        .. code-block:: python
+            :caption: Example
+
+            import mlflow
+            from mlflow.tracking import MlflowClient
+
+            with mlflow.start_run() as run:
+                mlflow.log_text("header\n" + "row\n" * 1000, "data/table.csv")
+
+            # Read the first line of the artifact without downloading the whole file
+            client = MlflowClient()
+            with client.open_artifact(run.info.run_id, "data/table.csv") as f:
+                print(f.readline())
+
+        .. code-block:: text
+            :caption: Output
+
+            b'header\n'
+        """
+        return self._tracking_client.open_artifact(run_id, path)
+
     def set_terminated(
         self, run_id: str, status: Optional[str] = None, end_time: Optional[int] = None
     ) -> None:
@@ -1587,6 +1663,70 @@ class MlflowClient(object):
             experiment_ids, filter_string, run_view_type, max_results, order_by, page_token
         )
 
+    def aggregate_runs(
+        self,
+        experiment_ids: List[str],
+        group_by: Optional[List[str]] = None,
+        aggregations: Optional[List[str]] = None,
+        filter_string: str = "",
+        run_view_type: int = ViewType.ACTIVE_ONLY,
+    ) -> List[RunAggregationGroup]:
+        """
+        Aggregate the latest metric values of the runs that fit the search criteria, optionally
+        grouped by params, tags or run attributes. The aggregates are computed by the tracking
+        backend, so runs do not need to be fetched with :py:meth:`search_runs` first.
+
+        :param experiment_ids: List of experiment IDs, or a single int or string id.
+        :param group_by: List of params, tags or attributes to group runs by
+                         (e.g., "params.model_type"). The attributes that can be grouped by are
+                         ``experiment_id``, ``status`` and ``user_id``. If not specified, all
+                         matching runs are aggregated as a single group.
+        :param aggregations: List of aggregations to compute for each group. Supported functions
+                             are ``min``, ``max``, ``avg``, ``count`` and percentiles such as
+                             ``p90``, applied to metrics (e.g., "avg(metrics.accuracy)").
+                             ``count(*)`` counts the runs of a group. NaN values are ignored.
+        :param filter_string: Filter query string, defaults to aggregating all runs.
+        :param run_view_type: one of enum values ACTIVE_ONLY, DELETED_ONLY, or ALL runs
+                              defined in :py:class:`mlflow.entities.ViewType`.
+
+        :return: A list of :py:class:`RunAggregationGroup <mlflow.entities.RunAggregationGroup>`
+                 objects, one for each distinct combination of group-by values, ordered by
+                 these values.
+
+        .. code-block:: python
+            :caption: Example
+
+            import mlflow
+            from mlflow.tracking import MlflowClient
+
+            experiment_id = mlflow.create_experiment("Model Comparison")
+            for model_type, accuracy in [("cnn", 0.9), ("cnn", 0.8), ("rnn", 0.7)]:
+                with mlflow.start_run(experiment_id=experiment_id):
+                    mlflow.log_param("model_type", model_type)
+                    mlflow.log_metric("accuracy", accuracy)
+
+            client = MlflowClient()
+            groups = client.aggregate_runs(
+                experiment_id,
+                group_by=["params.model_type"],
+                aggregations=["avg(metrics.accuracy)", "count(*)"],
+            )
+            for group in groups:
+                print("group_by: {}".format(group.group_by))
+                print("aggregations: {}".format(group.aggregations))
+
+        .. code-block:: text
+            :caption: Output
+
+            group_by: OrderedDict([('params.model_type', 'cnn')])
+            aggregations: OrderedDict([('avg(metrics.accuracy)', 0.85), ('count(*)', 2.0)])
+            group_by: OrderedDict([('params.model_type', 'rnn')])
+            aggregations: OrderedDict([('avg(metrics.accuracy)', 0.7), ('count(*)', 1.0)])
+        """
+        return self._tracking_client.aggregate_runs(
+            experiment_ids, group_by, aggregations, filter_string, run_view_type
+        )
+
     # Registry API
 
     # Registered Model Methods
@@ -0,0 +1,195 @@
+"""
+Utilities for downloading large files reliably. Downloads are written to a partial file next to
+their destination, resumed from the last received byte when the connection drops, verified
+against the size and checksum reported by the storage service and only then atomically renamed
+into place, so that a destination file is never left truncated or corrupted.
+"""
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from mlflow.exceptions import MlflowException
+from mlflow.protos.databricks_pb2 import INVALID_PARAMETER_VALUE
+
+_logger = logging.getLogger(__name__)
+
+PARTIAL_DOWNLOAD_SUFFIX = ".partial"
+MAX_ATTEMPTS_ENV_VAR = "MLFLOW_ARTIFACT_DOWNLOAD_MAX_ATTEMPTS"
+_DEFAULT_MAX_ATTEMPTS = 5
+# Delay before resuming an interrupted download, multiplied by the number of failed attempts
+_RESUME_BACKOFF_SECONDS = 1
+_CHECKSUM_CHUNK_SIZE = 1024 * 1024
+_S3_MD5_ETAG_REGEX = re.compile(r"^[0-9a-fA-F]{32}$")
+
+
+class Checksum(namedtuple("Checksum", ["algorithm", "digest"])):
+    """
+    Checksum of the contents of a file: the ``digest`` bytes computed with the ``"md5"`` or
+    ``"crc32c"`` algorithm.
+    """
+
+
+class RemoteFile(namedtuple("RemoteFile", ["size", "checksum"])):
+    """
+    Size in bytes and :py:class:`Checksum` of a stored file, as reported by the storage service.
+    Either may be ``None`` if the service does not report it.
+    """
+
+
+def checksum_from_base64(algorithm, value):
+    """
+    Return the :py:class:`Checksum` encoded as base64 in `value`, as reported by GCS and Azure
+    Blob Storage, or ``None`` if `value` is empty or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return Checksum(algorithm, base64.b64decode(value, validate=True))
+    except (binascii.Error, TypeError, ValueError):
+        return None
+
+
+def checksum_from_s3_etag(etag, server_side_encryption=None, sse_customer_algorithm=None):
+    """
+    Return the MD5 checksum of an S3 object derived from its ETag, or ``None`` if the ETag is not
+    an MD5 digest of the object's contents. This is the case of objects uploaded in several parts,
+    whose ETags end with ``-<number of parts>``, and of objects encrypted with KMS or customer
+    provided keys.
+    """
+    if not etag or sse_customer_algorithm:
+        return None
+    if server_side_encryption and server_side_encryption.startswith("aws:kms"):
+        return None
+    etag = etag.strip('"')
+    if not _S3_MD5_ETAG_REGEX.match(etag):
+        return None
+    return Checksum("md5", bytes.fromhex(etag))
+
+
+def _get_max_attempts():
+    max_attempts = os.environ.get(MAX_ATTEMPTS_ENV_VAR, _DEFAULT_MAX_ATTEMPTS)
+    try:
+        max_attempts = int(max_attempts)
+    except ValueError:
+        max_attempts = 0
+    if max_attempts <= 0:
+        raise MlflowException(
+            "Invalid value for the environment variable {}: '{}'. Expected a positive"
+            " integer.".format(MAX_ATTEMPTS_ENV_VAR, os.environ.get(MAX_ATTEMPTS_ENV_VAR)),
+            error_code=INVALID_PARAMETER_VALUE,
+        )
+    return max_attempts
+
+
+def _new_hash(algorithm):
+    if algorithm == "md5":
+        return hashlib.md5()
+    if algorithm == "crc32c":
+        try:
+            import google_crc32c
+        except ImportError:
+            return None
+        return google_crc32c.Checksum()
+    return None
+
+
+def verify_download(local_path, remote_file, description):
+    """
+    Verify that the downloaded file at `local_path` matches the size and checksum of the stored
+    file. Checksums computed with an algorithm that is not available locally are not verified.
+
+    :param local_path: Path of the downloaded file.
+    :param remote_file: :py:class:`RemoteFile` describing the stored file, or ``None``.
+    :param description: Description of the stored file used in error messages, e.g. its URI.
+    """
+    if remote_file is None:
+        return
+    if remote_file.size is not None:
+        size = os.path.getsize(local_path)
+        if size != remote_file.size:
+            raise MlflowException(
+                "The download of {} is incomplete: received {} bytes out of {}".format(
+                    description, size, remote_file.size
+                )
+            )
+    checksum = remote_file.checksum
+    if checksum is None:
+        return
+    file_hash = _new_hash(checksum.algorithm)
+    if file_hash is None:
+        _logger.debug(
+            "Skipping the verification of the %s checksum of %s", checksum.algorithm, description
+        )
+        return
+    with open(local_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHECKSUM_CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+    if file_hash.digest() != checksum.digest:
+        raise MlflowException(
+            "The {} checksum of the downloaded file does not match the checksum of {}".format(
+                checksum.algorithm, description
+            )
+        )
+
+
+@contextmanager
+def partial_download(local_path):
+    """
+    Yield the path of a partial file to which to download the file destined to `local_path`. The
+    partial file is renamed to `local_path` if the block exits normally and removed otherwise.
+    """
+    partial_path = local_path + PARTIAL_DOWNLOAD_SUFFIX
+    try:
+        yield partial_path
+        os.replace(partial_path, local_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+
+def download_resumably(local_path, fetch, description):
+    """
+    Download a file to `local_path`, resuming the download from the last received byte if it is
+    interrupted, and verify it before moving it into place. An interrupted download is resumed
+    at most ``MLFLOW_ARTIFACT_DOWNLOAD_MAX_ATTEMPTS - 1`` times, as long as each attempt makes
+    progress; failures that occur before any data is received are raised immediately.
+
+    :param local_path: The path to which to save the downloaded file.
+    :param fetch: Function called as ``fetch(start, output_file)`` that writes the contents of
+                  the stored file from the byte offset `start` to its end to `output_file`, which
+                  is positioned at `start`, and returns a :py:class:`RemoteFile` describing the
+                  stored file. If the storage service returns the whole file rather than the
+                  requested range, `fetch` must rewind and truncate `output_file` first. Every
+                  call must read the same version of the stored file.
+    :param description: Description of the stored file used in log and error messages.
+    """
+    max_attempts = _get_max_attempts()
+    with partial_download(local_path) as partial_path:
+        open(partial_path, "wb").close()
+        attempt = 1
+        while True:
+            start = os.path.getsize(partial_path)
+            try:
+                with open(partial_path, "r+b") as output_file:
+                    output_file.seek(start)
+                    remote_file = fetch(start, output_file)
+                break
+            except Exception as e:
+                received = os.path.getsize(partial_path)
+                if received <= start or attempt >= max_attempts:
+                    raise
+                _logger.warning(
+                    "The download of %s was interrupted after %d bytes (%r). Resuming it.",
+                    description,
+                    received,
+                    e,
+                )
+                time.sleep(_RESUME_BACKOFF_SECONDS * attempt)
+                attempt += 1
+        verify_download(partial_path, remote_file, description)
@@ -22,6 +22,12 @@ except ImportError:
 
 from mlflow.entities import FileInfo
 from mlflow.exceptions import MissingConfigException
+from mlflow.utils.download_utils import (
+    RemoteFile,
+    checksum_from_base64,
+    checksum_from_s3_etag,
+    download_resumably,
+)
 from mlflow.utils.rest_utils import cloud_storage_http_request
 
 ENCODING = "utf-8"
@@ -421,18 +427,78 @@ def yield_file_in_chunks(file, chunk_size=100000000):
                 break
 
 
+def _get_remote_file_from_http_headers(headers):
+    if (
+        headers.get("Content-Encoding", "identity") != "identity"
+        or headers.get("x-goog-stored-content-encoding", "identity") != "identity"
+    ):
+        # The size and checksum reported for encoded contents do not describe the decoded file,
+        # including GCS objects stored gzip-compressed and served decompressed (transcoding)
+        return RemoteFile(None, None)
+    size = None
+    content_range = headers.get("Content-Range")
+    if content_range and "/" in content_range:
+        total_size = content_range.rsplit("/", 1)[1]
+        size = int(total_size) if total_size.isdigit() else None
+    elif headers.get("Content-Length", "").isdigit():
+        size = int(headers["Content-Length"])
+    # Azure Blob Storage reports the MD5 of the whole blob in `x-ms-blob-content-md5` for range
+    # requests, GCS reports it in `x-goog-hash` and S3 ETags are MD5 digests in most cases
+    checksum = checksum_from_base64(
+        "md5", headers.get("x-ms-blob-content-md5") or headers.get("Content-MD5")
+    )
+    if checksum is None:
+        for goog_hash in headers.get("x-goog-hash", "").split(","):
+            algorithm, _, value = goog_hash.strip().partition("=")
+            if algorithm in ("md5", "crc32c"):
+                checksum = checksum_from_base64(algorithm, value)
+                if algorithm == "md5":
+                    break
+    if checksum is None and "x-amz-request-id" in headers:
+        checksum = checksum_from_s3_etag(
+            headers.get("ETag"),
+            headers.get("x-amz-server-side-encryption"),
+            headers.get("x-amz-server-side-encryption-customer-algorithm"),
+        )
+    return RemoteFile(size, checksum)
+
+
 def download_file_using_http_uri(http_uri, download_path, chunk_size=100000000):
     """
     Downloads a file specified using the `http_uri` to a local `download_path`. This function
     uses a `chunk_size` to ensure an OOM error is not raised a large file is downloaded.
+    Interrupted downloads are resumed with HTTP range requests, and the downloaded file is
+    verified against the size and checksum reported by the server before being moved to
+    `download_path`.
 
     Note : This function is meant to download files using presigned urls from various cloud
             providers.
     """
-    with cloud_storage_http_request("get", http_uri, stream=True) as response:
-        response.raise_for_status()
-        with open(download_path, "wb") as output_file:
+    # Description of the file returned by the first response, whose ETag pins the version of
+    # the file read by subsequent range requests
+    first_response = {}
+
+    def fetch(start, output_file):
+        headers = {}
+        if start > 0:
+            headers["Range"] = "bytes={}-".format(start)
+            if first_response.get("etag"):
+                headers["If-Match"] = first_response["etag"]
+        with cloud_storage_http_request("get", http_uri, stream=True, headers=headers) as response:
+            response.raise_for_status()
+            if start > 0 and response.status_code != 206:
+                # The server ignored the range and returned the whole file
+                output_file.seek(0)
+                output_file.truncate()
+            if not first_response:
+                first_response["etag"] = response.headers.get("ETag")
+                first_response["remote_file"] = _get_remote_file_from_http_headers(response.headers)
             for chunk in response.iter_content(chunk_size=chunk_size):
                 if not chunk:
                     break
                 output_file.write(chunk)
+        return first_response["remote_file"]
+
+    # Signed URLs carry credentials in their query string, which is left out of messages
+    description = urllib.parse.urlparse(http_uri)._replace(query="").geturl()
+    download_resumably(download_path, fetch, description)
@@ -0,0 +1,162 @@
+"""
+Least recently used cache of loaded models, shared by the multi-model scoring server and by the
+model cache of Spark executors.
+
+Models are loaded lazily, on their first request, and evicted in least recently used order when
+the cache holds more than a maximum number of models or more than a maximum total size. Concurrent
+requests for a model that is being loaded wait for the same load, instead of each loading a copy
+of the model.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+_logger = logging.getLogger(__name__)
+
+
+def _get_model_size_bytes(local_path):
+    # The size of the model files is an estimate of the memory used by the loaded model
+    if os.path.isfile(local_path):
+        return os.path.getsize(local_path)
+    size = 0
+    for root, _, files in os.walk(local_path):
+        size += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return size
+
+
+class _CacheEntry(object):
+    __slots__ = ["model", "size_bytes"]
+
+    def __init__(self, model, size_bytes):
+        self.model = model
+        self.size_bytes = size_bytes
+
+
+class ModelCache(object):
+    """
+    Thread-safe LRU cache of models, bounded by a number of models and a total size in bytes.
+
+    :param load_fn: Function loading the model of a key. It returns a tuple of the model and of its
+                    estimated size in bytes.
+    :param max_models: Maximum number of models in the cache, or ``None`` for no limit.
+    :param max_size_bytes: Maximum total size of the models in the cache, or ``None`` for no limit.
+                           The most recently used model is never evicted, even if it is larger
+                           than this limit.
+    :param on_evict: Optional function called with the key and the model of each evicted model,
+                     outside of the lock of the cache, for example to release resources of the
+                     model.
+    """
+
+    def __init__(self, load_fn, max_models=None, max_size_bytes=None, on_evict=None):
+        self._load_fn = load_fn
+        self._on_evict = on_evict
+        self._max_models = max_models
+        self._max_size_bytes = max_size_bytes
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._deduplicated_loads = 0
+        self._load_failures = 0
+        self._evictions = 0
+        self._load_time_seconds = 0.0
+
+    def get(self, key):
+        """
+        Return the model of `key`, loading it if it is not in the cache.
+
+        :raises: The exception raised by the load function if the model cannot be loaded. Failed
+                 loads are not cached, so that the next request loads the model again.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.model
+            future = self._loading.get(key)
+            if future is None:
+                future = self._loading[key] = Future()
+                self._misses += 1
+                wait_for_load = False
+            else:
+                self._deduplicated_loads += 1
+                wait_for_load = True
+        if wait_for_load:
+            # Wait for the request that is already loading the model
+            return future.result()
+
+        start_time = time.monotonic()
+        try:
+            model, size_bytes = self._load_fn(key)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+                self._load_failures += 1
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._loading[key]
+            self._load_time_seconds += time.monotonic() - start_time
+            self._entries[key] = _CacheEntry(model, size_bytes)
+            self._size_bytes += size_bytes
+            evicted = self._evict()
+        future.set_result(model)
+        if self._on_evict is not None:
+            for evicted_key, evicted_entry in evicted:
+                try:
+                    self._on_evict(evicted_key, evicted_entry.model)
+                except Exception:
+                    _logger.warning(
+                        "Failed to release evicted model '%s'", evicted_key, exc_info=True
+                    )
+        return model
+
+    def _is_full(self):
+        return (self._max_models is not None and len(self._entries) > self._max_models) or (
+            self._max_size_bytes is not None and self._size_bytes > self._max_size_bytes
+        )
+
+    def _evict(self):
+        evicted = []
+        while len(self._entries) > 1 and self._is_full():
+            key, entry = self._entries.popitem(last=False)
+            self._size_bytes -= entry.size_bytes
+            self._evictions += 1
+            evicted.append((key, entry))
+            _logger.info("Evicted model '%s' from the model cache", key)
+        if self._is_full():
+            _logger.warning(
+                "The model cache holds a single model of %d bytes, which exceeds its maximum size",
+                self._size_bytes,
+            )
+        return evicted
+
+    def keys(self):
+        """Return the keys of the cached models, from the least to the most recently used."""
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self):
+        """
+        Return a dictionary of metrics of the cache: its number of models and total size, and the
+        numbers of hits, misses, loads shared by concurrent requests, failed loads and evictions.
+        """
+        with self._lock:
+            return {
+                "models": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_models": self._max_models,
+                "max_size_bytes": self._max_size_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "deduplicated_loads": self._deduplicated_loads,
+                "load_failures": self._load_failures,
+                "evictions": self._evictions,
+                "load_time_seconds": self._load_time_seconds,
+            }
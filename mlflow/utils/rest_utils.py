@@ -1,7 +1,9 @@
 import base64
 import json
+import threading
 import requests
 import urllib3
+from collections import OrderedDict
 from contextlib import contextmanager
 from packaging.version import Version
 from requests.adapters import HTTPAdapter
@@ -83,6 +85,7 @@ def http_request(
     backoff_factor=2,
     retry_codes=_TRANSIENT_FAILURE_RESPONSE_CODES,
     timeout=10,
+    extra_headers=None,
     **kwargs
 ):
     """
@@ -102,6 +105,8 @@ def http_request(
     :param retry_codes: a list of HTTP response error codes that qualifies for retry.
     :param timeout: wait for timeout seconds for response from remote server for connect and
       read request.
+    :param extra_headers: a dictionary of additional headers to send with the request, e.g.
+      conditional request headers such as ``If-None-Match``.
     :param kwargs: Additional keyword arguments to pass to `requests.Session.request()`
 
     :return: requests.Response object.
@@ -119,6 +124,8 @@ def http_request(
     headers = dict({**_DEFAULT_HEADERS, **resolve_request_headers()})
     if auth_str:
         headers["Authorization"] = auth_str
+    if extra_headers:
+        headers.update(extra_headers)
 
     if host_creds.server_cert_path is None:
         verify = not host_creds.ignore_tls_verification
@@ -202,11 +209,62 @@ def extract_api_info_for_service(service, path_prefix):
     return res
 
 
-def call_endpoint(host_creds, endpoint, method, json_body, response_proto):
+class ConditionalResponseCache(object):
+    """
+    Thread-safe, bounded LRU cache of REST response bodies along with the ``ETag`` validators the
+    server returned for them. Cached validators are sent back to the server in an
+    ``If-None-Match`` header, allowing the server to answer with an empty ``304 Not Modified``
+    response when the requested resource has not changed.
+
+    :param max_entries: Maximum number of responses to retain. The least recently used response
+                        is evicted once this limit is exceeded.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        :return: A tuple of ``(etag, response_text)`` for the specified key, or ``None`` if no
+                 response is cached for it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, etag, response_text):
+        with self._lock:
+            self._entries[key] = (etag, response_text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def call_endpoint(host_creds, endpoint, method, json_body, response_proto, response_cache=None):
+    """
+    Call the specified REST endpoint and parse the JSON response into ``response_proto``.
+
+    :param response_cache: Optional :py:class:`ConditionalResponseCache`. If specified and the
+                           request is a ``GET``, the ETag of a previously cached response is sent
+                           as an ``If-None-Match`` header and the cached response body is reused
+                           when the server replies with ``304 Not Modified``.
+    """
     # Convert json string to json dictionary, to pass to requests
     if json_body:
         json_body = json.loads(json_body)
     if method == "GET":
+        if response_cache is not None:
+            return _call_conditional_get_endpoint(
+                host_creds, endpoint, json_body, response_proto, response_cache
+            )
         response = http_request(
             host_creds=host_creds, endpoint=endpoint, method=method, params=json_body
         )
@@ -220,6 +278,26 @@ def call_endpoint(host_creds, endpoint, method, json_body, response_proto):
     return response_proto
 
 
+def _call_conditional_get_endpoint(host_creds, endpoint, params, response_proto, response_cache):
+    cache_key = (host_creds.host, endpoint, json.dumps(params, sort_keys=True))
+    cached = response_cache.get(cache_key)
+    request_kwargs = {}
+    if cached is not None:
+        request_kwargs["extra_headers"] = {"If-None-Match": cached[0]}
+    response = http_request(
+        host_creds=host_creds, endpoint=endpoint, method="GET", params=params, **request_kwargs
+    )
+    if cached is not None and response.status_code == 304:
+        response_text = cached[1]
+    else:
+        response_text = verify_rest_response(response, endpoint).text
+        etag = response.headers.get("ETag")
+        if isinstance(etag, str):
+            response_cache.put(cache_key, etag, response_text)
+    parse_dict(js_dict=json.loads(response_text), message=response_proto)
+    return response_proto
+
+
 @contextmanager
 def cloud_storage_http_request(
     method,
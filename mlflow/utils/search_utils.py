@@ -17,7 +17,7 @@ from sqlparse.sql import (
 )
 from sqlparse.tokens import Token as TokenType
 
-from mlflow.entities import RunInfo
+from mlflow.entities import RunInfo, RunAggregationGroup
 from mlflow.exceptions import MlflowException
 from mlflow.protos.databricks_pb2 import INVALID_PARAMETER_VALUE
 
@@ -41,6 +41,11 @@ class SearchUtils(object):
     VALID_MODEL_VERSIONS_SEARCH_COMPARATORS = set(["=", "IN"])
     VALID_SEARCH_ATTRIBUTE_KEYS = set(RunInfo.get_searchable_attributes())
     VALID_ORDER_BY_ATTRIBUTE_KEYS = set(RunInfo.get_orderable_attributes())
+    VALID_GROUP_BY_ATTRIBUTE_KEYS = set(["experiment_id", "status", "user_id"])
+    AGGREGATION_FUNCTIONS = set(["min", "max", "avg", "count"])
+    PERCENTILE_AGGREGATION_FUNCTION = "percentile"
+    _AGGREGATION_REGEX = re.compile(r"^\s*(\w+(?:\.\d+)?)\s*\((.*)\)\s*$")
+    _PERCENTILE_REGEX = re.compile(r"^p(\d+(?:\.\d+)?)$")
     _METRIC_IDENTIFIER = "metric"
     _ALTERNATE_METRIC_IDENTIFIERS = set(["metrics"])
     _PARAM_IDENTIFIER = "parameter"
@@ -400,6 +405,154 @@ class SearchUtils(object):
 
         return [run for run in runs if run_matches(run)]
 
+    @classmethod
+    def parse_group_by_for_aggregate_runs(cls, group_by):
+        """
+        Parse a group-by key such as ``params.model_type`` into a ``(key_type, key)`` tuple. Runs
+        can be grouped by params, tags, and the attributes in ``VALID_GROUP_BY_ATTRIBUTE_KEYS``.
+        """
+        identifier = cls._get_identifier(group_by.strip(), cls.VALID_GROUP_BY_ATTRIBUTE_KEYS)
+        if identifier["type"] == cls._METRIC_IDENTIFIER:
+            raise MlflowException(
+                "Invalid group_by key '{}'. Runs can only be grouped by params, tags or the "
+                "attributes {}.".format(group_by, sorted(cls.VALID_GROUP_BY_ATTRIBUTE_KEYS)),
+                error_code=INVALID_PARAMETER_VALUE,
+            )
+        return identifier["type"], identifier["key"]
+
+    @classmethod
+    def parse_aggregation_for_aggregate_runs(cls, aggregation):
+        """
+        Parse an aggregation such as ``avg(metrics.accuracy)``, ``p90(metrics.latency)`` or
+        ``count(*)`` into a ``(function, metric_key, percentile)`` tuple. ``metric_key`` is
+        ``None`` for ``count(*)`` and ``percentile`` is ``None`` for functions other than
+        percentiles.
+        """
+        match = cls._AGGREGATION_REGEX.match(aggregation)
+        if match is None:
+            raise MlflowException(
+                "Invalid aggregation '{}'. Aggregations should be specified as "
+                "'<function>(metrics.<key>)' or 'count(*)'.".format(aggregation),
+                error_code=INVALID_PARAMETER_VALUE,
+            )
+        function, argument = match.group(1).lower(), match.group(2).strip()
+        percentile = None
+        percentile_match = cls._PERCENTILE_REGEX.match(function)
+        if percentile_match is not None:
+            function = cls.PERCENTILE_AGGREGATION_FUNCTION
+            percentile = float(percentile_match.group(1))
+            if percentile > 100:
+                raise MlflowException(
+                    "Invalid percentile in aggregation '{}'. Percentiles must be between 0 and "
+                    "100.".format(aggregation),
+                    error_code=INVALID_PARAMETER_VALUE,
+                )
+        elif function not in cls.AGGREGATION_FUNCTIONS:
+            raise MlflowException(
+                "Invalid aggregation function '{}' in aggregation '{}'. Valid functions are {} "
+                "and percentiles such as 'p90'.".format(
+                    function, aggregation, sorted(cls.AGGREGATION_FUNCTIONS)
+                ),
+                error_code=INVALID_PARAMETER_VALUE,
+            )
+
+        if argument == "*":
+            if function != "count":
+                raise MlflowException(
+                    "Invalid aggregation '{}'. Only 'count' can be applied to '*'.".format(
+                        aggregation
+                    ),
+                    error_code=INVALID_PARAMETER_VALUE,
+                )
+            return function, None, percentile
+        identifier = cls._get_identifier(argument, cls.VALID_SEARCH_ATTRIBUTE_KEYS)
+        if identifier["type"] != cls._METRIC_IDENTIFIER:
+            raise MlflowException(
+                "Invalid aggregation '{}'. Only metrics can be aggregated.".format(aggregation),
+                error_code=INVALID_PARAMETER_VALUE,
+            )
+        return function, identifier["key"], percentile
+
+    @classmethod
+    def _get_value_for_group_by(cls, run, key_type, key):
+        if key_type == cls._PARAM_IDENTIFIER:
+            return run.data.params.get(key)
+        elif key_type == cls._TAG_IDENTIFIER:
+            return run.data.tags.get(key)
+        else:
+            return getattr(run.info, key)
+
+    @classmethod
+    def create_aggregation_groups(cls, group_by_list, aggregation_list, rows):
+        """
+        Create :py:class:`RunAggregationGroup <mlflow.entities.RunAggregationGroup>` objects from
+        ``(group_by_values, aggregated_values)`` tuples, ordered by their group-by values. Groups
+        without a value for a group-by key are ordered last.
+        """
+        groups = [
+            RunAggregationGroup(
+                zip(group_by_list, [None if v is None else str(v) for v in group_by_values]),
+                zip(aggregation_list, aggregated_values),
+            )
+            for group_by_values, aggregated_values in rows
+        ]
+        return sorted(
+            groups, key=lambda group: [(v is None, v or "") for v in group.group_by.values()]
+        )
+
+    @classmethod
+    def aggregate(cls, runs, group_by_list, aggregation_list):
+        """
+        Aggregate the latest metric values of a set of runs, grouped by the specified params, tags
+        or attributes. NaN metric values are ignored.
+
+        :return: List of :py:class:`RunAggregationGroup <mlflow.entities.RunAggregationGroup>`
+                 objects, one for each distinct combination of group-by values.
+        """
+        import numpy as np
+
+        group_bys = [cls.parse_group_by_for_aggregate_runs(g) for g in group_by_list]
+        aggregations = [cls.parse_aggregation_for_aggregate_runs(a) for a in aggregation_list]
+
+        group_indices = {}
+        for index, run in enumerate(runs):
+            group_values = tuple(
+                cls._get_value_for_group_by(run, key_type, key) for key_type, key in group_bys
+            )
+            group_indices.setdefault(group_values, []).append(index)
+
+        metric_values = {
+            key: np.array([run.data.metrics.get(key, np.nan) for run in runs], dtype=np.float64)
+            for _, key, _ in aggregations
+            if key is not None
+        }
+
+        def compute(function, key, percentile, indices):
+            if key is None:
+                return float(len(indices))
+            values = metric_values[key][indices]
+            values = values[~np.isnan(values)]
+            if function == "count":
+                return float(len(values))
+            if len(values) == 0:
+                return None
+            if function == "min":
+                return float(np.min(values))
+            elif function == "max":
+                return float(np.max(values))
+            elif function == "avg":
+                return float(np.mean(values))
+            return float(np.percentile(values, percentile))
+
+        rows = []
+        for group_values, indices in group_indices.items():
+            aggregated_values = [
+                compute(function, key, percentile, indices)
+                for function, key, percentile in aggregations
+            ]
+            rows.append((group_values, aggregated_values))
+        return cls.create_aggregation_groups(group_by_list, aggregation_list, rows)
+
     @classmethod
     def _validate_order_by_and_generate_token(cls, order_by):
         try:
@@ -34,6 +34,7 @@ MAX_ENTITY_KEY_LENGTH = 250
 MAX_MODEL_REGISTRY_TAG_KEY_LENGTH = 250
 MAX_MODEL_REGISTRY_TAG_VALUE_LENGTH = 5000
 MAX_EXPERIMENTS_LISTED_PER_PAGE = 50000
+MAX_RUNS_PER_GET_RUNS_REQUEST = 1000
 
 _UNSUPPORTED_DB_TYPE_MSG = "Supported database engines are {%s}" % ", ".join(DATABASE_ENGINES)
 
@@ -233,6 +234,19 @@ def _validate_batch_limit(entity_name, limit, length):
         raise MlflowException(error_msg, error_code=INVALID_PARAMETER_VALUE)
 
 
+def _validate_get_runs_request(run_ids):
+    if len(run_ids) > MAX_RUNS_PER_GET_RUNS_REQUEST:
+        raise MlflowException(
+            "A GetRuns request can contain at most {limit} run IDs. Got {count} run IDs. Please "
+            "split up the run IDs across multiple requests and try again.".format(
+                limit=MAX_RUNS_PER_GET_RUNS_REQUEST, count=len(run_ids)
+            ),
+            error_code=INVALID_PARAMETER_VALUE,
+        )
+    for run_id in run_ids:
+        _validate_run_id(run_id)
+
+
 def _validate_batch_log_limits(metrics, params, tags):
     """Validate that the provided batched logging arguments are within expected limits."""
     _validate_batch_limit(entity_name="metrics", limit=MAX_METRICS_PER_BATCH, length=len(metrics))
@@ -93,7 +93,8 @@ setup(
     extras_require={
         "extras": [
             "scikit-learn",
-            # Required to log artifacts and models to HDFS artifact locations
+            # Required to log artifacts and models to HDFS artifact locations, and to score
+            # Arrow and Parquet inputs with the scoring server
             "pyarrow",
             # Required to log artifacts and models to AWS S3 artifact locations
             "boto3",
@@ -0,0 +1,14 @@
+from mlflow.entities import RunAggregationGroup
+
+
+def test_creation_and_hydration():
+    group_by = [("params.model_type", "cnn"), ("tags.team", None)]
+    aggregations = [("avg(metrics.accuracy)", 0.85), ("max(metrics.loss)", None)]
+    group = RunAggregationGroup(group_by, aggregations)
+    assert list(group.group_by.items()) == group_by
+    assert list(group.aggregations.items()) == aggregations
+
+    proto = group.to_proto()
+    assert not proto.group_by[1].HasField("value")
+    assert not proto.aggregations[1].HasField("value")
+    assert RunAggregationGroup.from_proto(proto) == group
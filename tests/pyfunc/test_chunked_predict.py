@@ -0,0 +1,236 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from click.testing import CliRunner
+
+import mlflow.pyfunc
+from mlflow.exceptions import MlflowException
+from mlflow.models import cli as models_cli
+from mlflow.models.signature import ModelSignature
+from mlflow.pyfunc import PythonModel
+from mlflow.pyfunc.scoring_server import chunked_predict
+from mlflow.types import ColSpec, Schema
+from mlflow.utils.file_utils import path_to_local_file_uri
+
+
+class ChunkRecordingModel(PythonModel):
+    def predict(self, context, model_input):
+        return pd.DataFrame(
+            {"y": model_input["x"].values * 2, "chunk_size": len(model_input), "pid": os.getpid()}
+        )
+
+
+@pytest.fixture
+def model_uri(tmpdir):
+    model_path = tmpdir.join("model").strpath
+    mlflow.pyfunc.save_model(model_path, python_model=ChunkRecordingModel(), pip_requirements=[])
+    return path_to_local_file_uri(model_path)
+
+
+@pytest.fixture
+def input_df():
+    return pd.DataFrame({"x": range(10)})
+
+
+def read_json_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_csv_input_is_scored_in_chunks_and_written_as_json_lines(tmpdir, model_uri, input_df):
+    input_path = tmpdir.join("input.csv").strpath
+    output_path = tmpdir.join("output.jsonl").strpath
+    input_df.to_csv(input_path, index=False)
+    chunked_predict.predict_in_chunks(
+        model_uri, input_path, output_path, "csv", "split", chunk_size=4
+    )
+    predictions = read_json_lines(output_path)
+    assert [p["y"] for p in predictions] == [2 * x for x in range(10)]
+    assert [p["chunk_size"] for p in predictions] == [4] * 8 + [2] * 2
+    assert {p["pid"] for p in predictions} == {os.getpid()}
+
+
+def test_chunks_are_scored_by_worker_processes_in_input_order(tmpdir, model_uri):
+    input_path = tmpdir.join("input.csv").strpath
+    output_path = tmpdir.join("output.csv").strpath
+    pd.DataFrame({"x": range(100)}).to_csv(input_path, index=False)
+    chunked_predict.predict_in_chunks(
+        model_uri,
+        input_path,
+        output_path,
+        "csv",
+        "split",
+        chunk_size=7,
+        workers=2,
+        output_format="csv",
+    )
+    predictions = pd.read_csv(output_path)
+    assert predictions["y"].tolist() == [2 * x for x in range(100)]
+    assert os.getpid() not in predictions["pid"].tolist()
+
+
+def test_parquet_input_is_rebatched_and_written_as_parquet(tmpdir, model_uri, input_df):
+    input_path = tmpdir.join("input.parquet").strpath
+    output_path = tmpdir.join("output.parquet").strpath
+    pq.write_table(pa.Table.from_pandas(input_df), input_path, row_group_size=3)
+    chunked_predict.predict_in_chunks(
+        model_uri,
+        input_path,
+        output_path,
+        "parquet",
+        "split",
+        chunk_size=4,
+        output_format="parquet",
+    )
+    predictions = pq.read_table(output_path).to_pandas()
+    assert predictions["y"].tolist() == [2 * x for x in range(10)]
+    assert predictions["chunk_size"].tolist() == [4] * 8 + [2] * 2
+
+
+def test_arrow_and_json_inputs_are_scored_in_chunks(tmpdir, model_uri, input_df):
+    arrow_path = tmpdir.join("input.arrow").strpath
+    with pa.OSFile(arrow_path, "wb") as sink, pa.ipc.new_stream(
+        sink, pa.Schema.from_pandas(input_df)
+    ) as writer:
+        writer.write_table(pa.Table.from_pandas(input_df), max_chunksize=3)
+    json_path = tmpdir.join("input.json").strpath
+    input_df.to_json(json_path, orient="split")
+    for input_path, content_type in [(arrow_path, "arrow"), (json_path, "json")]:
+        output_path = tmpdir.join("output-{}.jsonl".format(content_type)).strpath
+        chunked_predict.predict_in_chunks(
+            model_uri, input_path, output_path, content_type, "split", chunk_size=5
+        )
+        predictions = read_json_lines(output_path)
+        assert [p["y"] for p in predictions] == [2 * x for x in range(10)]
+        assert [p["chunk_size"] for p in predictions] == [5] * 10
+
+
+def test_chunks_are_read_ahead_of_the_predictions_up_to_a_limit():
+    read = []
+
+    def items():
+        for i in range(10):
+            read.append(i)
+            yield i
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = chunked_predict._map_in_order(executor, lambda i: i * 2, items(), max_pending=3)
+        assert next(results) == 0
+        assert read == [0, 1, 2]
+        assert list(results) == [2 * i for i in range(1, 10)]
+
+
+class MixedTypesModel(PythonModel):
+    def predict(self, context, model_input):
+        # Integers in the first chunk, and floats in the others
+        return pd.DataFrame(
+            {"y": model_input["x"].values * (1 if model_input["x"].iloc[0] == 0 else 1.5)}
+        )
+
+
+def test_parquet_output_columns_have_the_types_of_the_output_signature(tmpdir, input_df):
+    input_path = tmpdir.join("input.csv").strpath
+    input_df.to_csv(input_path, index=False)
+    model_path = tmpdir.join("model").strpath
+    mlflow.pyfunc.save_model(
+        model_path,
+        python_model=MixedTypesModel(),
+        signature=ModelSignature(
+            inputs=Schema([ColSpec("long", "x")]), outputs=Schema([ColSpec("double", "y")])
+        ),
+        pip_requirements=[],
+    )
+    assert chunked_predict._get_declared_column_types(model_path) == {"y": pa.float64()}
+    output_path = tmpdir.join("output.parquet").strpath
+    chunked_predict.predict_in_chunks(
+        model_path, input_path, output_path, "csv", "split", chunk_size=4, output_format="parquet"
+    )
+    predictions = pq.read_table(output_path)
+    assert predictions.schema.field("y").type == pa.float64()
+    assert predictions.column("y").to_pylist() == [0, 1, 2, 3] + [1.5 * x for x in range(4, 10)]
+
+
+def test_parquet_output_rejects_chunks_incompatible_with_the_first_chunk(tmpdir, input_df):
+    input_path = tmpdir.join("input.csv").strpath
+    input_df.to_csv(input_path, index=False)
+    model_path = tmpdir.join("model").strpath
+    mlflow.pyfunc.save_model(model_path, python_model=MixedTypesModel(), pip_requirements=[])
+    assert chunked_predict._get_declared_column_types(model_path) == {}
+    with pytest.raises(MlflowException, match="cannot be converted to the schema of the Parquet"):
+        chunked_predict.predict_in_chunks(
+            model_path,
+            input_path,
+            tmpdir.join("output.parquet").strpath,
+            "csv",
+            "split",
+            chunk_size=4,
+            output_format="parquet",
+        )
+
+
+def test_invalid_inputs_and_configurations_are_rejected(tmpdir, model_uri):
+    input_path = tmpdir.join("input.parquet").strpath
+    with open(input_path, "w") as f:
+        f.write("not parquet")
+    output_path = tmpdir.join("output.jsonl").strpath
+    with pytest.raises(MlflowException, match="Failed to read the input as parquet"):
+        chunked_predict.predict_in_chunks(model_uri, input_path, output_path, "parquet", "split")
+    with pytest.raises(MlflowException, match="Invalid chunked prediction configuration"):
+        chunked_predict.predict_in_chunks(
+            model_uri, input_path, output_path, "parquet", "split", workers=0
+        )
+    with pytest.raises(MlflowException, match="Unknown output format"):
+        chunked_predict.predict_in_chunks(
+            model_uri, input_path, output_path, "parquet", "split", output_format="xml"
+        )
+
+
+def test_predict_cli_scores_in_chunks(tmpdir, model_uri, input_df):
+    input_path = tmpdir.join("input.csv").strpath
+    output_path = tmpdir.join("output.csv").strpath
+    input_df.to_csv(input_path, index=False)
+    result = CliRunner().invoke(
+        models_cli.predict,
+        [
+            "-m",
+            model_uri,
+            "-i",
+            input_path,
+            "-o",
+            output_path,
+            "-t",
+            "csv",
+            "--no-conda",
+            "--chunk-size",
+            "3",
+            "--workers",
+            "2",
+            "--output-format",
+            "csv",
+        ],
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    predictions = pd.read_csv(output_path)
+    assert predictions["y"].tolist() == [2 * x for x in range(10)]
+    assert predictions["chunk_size"].tolist() == [3] * 9 + [1]
+
+
+def test_predict_cli_rejects_chunked_options_for_other_backends(tmpdir, model_uri):
+    backend = mock.Mock()
+    with mock.patch.object(models_cli, "_get_flavor_backend", return_value=backend):
+        for options in [["--chunk-size", "3"], ["--workers", "2"], ["--output-format", "csv"]]:
+            with pytest.raises(MlflowException, match="only apply to python_function models"):
+                CliRunner().invoke(
+                    models_cli.predict,
+                    ["-m", model_uri, "-i", tmpdir.join("input.csv").strpath, "-t", "csv"]
+                    + options,
+                    catch_exceptions=False,
+                )
+    backend.predict.assert_not_called()
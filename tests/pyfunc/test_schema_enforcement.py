@@ -0,0 +1,141 @@
+import warnings
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import mlflow.pyfunc
+from mlflow.exceptions import MlflowException
+from mlflow.models import Model
+from mlflow.models.signature import ModelSignature
+from mlflow.pyfunc import _SchemaEnforcer, _enforce_schema, PyFuncModel
+from mlflow.types import ColSpec, Schema, TensorSpec
+
+SCHEMA = Schema(
+    [
+        ColSpec("integer", "a"),
+        ColSpec("long", "b"),
+        ColSpec("float", "c"),
+        ColSpec("double", "d"),
+        ColSpec("string", "e"),
+        ColSpec("boolean", "f"),
+        ColSpec("binary", "g"),
+        ColSpec("datetime", "h"),
+    ]
+)
+
+
+def matching_input():
+    return pd.DataFrame(
+        {
+            "a": np.array([1, 2], dtype=np.int32),
+            "b": np.array([1, 2], dtype=np.int64),
+            "c": np.array([1.5, 2.5], dtype=np.float32),
+            "d": np.array([1.5, 2.5], dtype=np.float64),
+            "e": pd.array(["x", "y"], dtype=SCHEMA.pandas_types()[4]),
+            "f": [True, False],
+            "g": np.array([b"x", b"yy"]),
+            "h": np.array(["2021-01-01", "2021-01-02"], dtype="datetime64[s]"),
+        },
+        index=[3, 7],
+    )
+
+
+def converted_input():
+    return pd.DataFrame(
+        {
+            "h": ["2021-01-01", "2021-01-02"],
+            "extra": [0, 1],
+            "a": np.array([1, 2], dtype=np.int8),
+            "b": np.array([1, 2], dtype=np.uint16),
+            "c": np.array([1.5, 2.5], dtype=np.float32),
+            "d": np.array([1, 2], dtype=np.int32),
+            "e": ["x", "y"],
+            "f": np.array([True, False], dtype=object),
+            "g": [b"x", b"yy"],
+        }
+    )
+
+
+@pytest.mark.parametrize("make_input", [matching_input, converted_input])
+def test_enforced_inputs_match_the_legacy_enforcement(make_input):
+    enforcer = _SchemaEnforcer(SCHEMA)
+    expected = _enforce_schema(make_input(), SCHEMA)
+    for _ in range(2):
+        pd.testing.assert_frame_equal(enforcer.enforce(make_input()), expected)
+
+
+def test_inputs_without_names_match_the_legacy_enforcement():
+    schema = Schema([ColSpec("long"), ColSpec("double")])
+    df = pd.DataFrame({"x": np.array([1], dtype=np.int32), "y": [1.5], "z": ["extra"]})
+    pd.testing.assert_frame_equal(
+        _SchemaEnforcer(schema).enforce(df), _enforce_schema(df.copy(), schema)
+    )
+    with pytest.raises(MlflowException, match="declares 2 inputs  but the provided value only has"):
+        _SchemaEnforcer(schema).enforce(df[["x"]])
+
+
+def test_plans_are_compiled_once_per_combination_of_columns_and_types():
+    enforcer = _SchemaEnforcer(SCHEMA)
+    with mock.patch.object(enforcer, "_compile_plan", wraps=enforcer._compile_plan) as compile_mock:
+        enforcer.enforce(matching_input())
+        enforcer.enforce(matching_input().iloc[:1])
+        assert compile_mock.call_count == 1
+        enforcer.enforce(converted_input())
+        assert compile_mock.call_count == 2
+
+
+def test_only_mismatched_columns_are_converted():
+    with mock.patch(
+        "mlflow.pyfunc._enforce_mlflow_datatype", wraps=mlflow.pyfunc._enforce_mlflow_datatype
+    ) as enforce_mock:
+        _SchemaEnforcer(SCHEMA).enforce(matching_input())
+        enforce_mock.assert_not_called()
+        _SchemaEnforcer(SCHEMA).enforce(converted_input())
+        assert [c[0][0] for c in enforce_mock.call_args_list] == ["a", "b", "d", "e", "f", "h"]
+
+
+def test_enforced_inputs_are_copies():
+    df = matching_input()
+    enforced = _SchemaEnforcer(SCHEMA).enforce(df)
+    enforced["a"] = 0
+    enforced["extra"] = 1
+    pd.testing.assert_frame_equal(df, matching_input())
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", pd.errors.SettingWithCopyWarning)
+        _SchemaEnforcer(SCHEMA).enforce(converted_input())["a"] = 0
+
+
+def test_errors_match_the_legacy_enforcement():
+    enforcer = _SchemaEnforcer(SCHEMA)
+    with pytest.raises(MlflowException, match=r"Model is missing inputs \['h'\]"):
+        enforcer.enforce(matching_input().drop(columns=["h"]))
+    df = matching_input().assign(b=[1.5, 2.5])
+    with pytest.raises(MlflowException, match="Incompatible input types for column b"):
+        enforcer.enforce(df)
+    # The plans of invalid inputs are cached, and the errors are raised again
+    with pytest.raises(MlflowException, match="Incompatible input types for column b"):
+        enforcer.enforce(df)
+
+
+def test_other_inputs_are_enforced_by_the_legacy_enforcement():
+    enforcer = _SchemaEnforcer(Schema([ColSpec("long", "a"), ColSpec("double", "b")]))
+    df = pd.DataFrame([[1, 2.0]], columns=["a", "a"])
+    with mock.patch("mlflow.pyfunc._enforce_schema") as enforce_mock:
+        enforcer.enforce([{"a": 1, "b": 2.0}])
+        enforcer.enforce(df)
+    assert enforce_mock.call_count == 2
+    tensor_schema = Schema([TensorSpec(np.dtype(np.float32), (-1, 2))])
+    x = np.zeros((3, 2), dtype=np.float32)
+    np.testing.assert_array_equal(_SchemaEnforcer(tensor_schema).enforce(x), x)
+
+
+def test_pyfunc_model_enforces_its_current_signature():
+    model_impl = mock.Mock()
+    model_impl.predict.side_effect = lambda data: data
+    meta = Model(signature=ModelSignature(inputs=Schema([ColSpec("long", "a")])))
+    model = PyFuncModel(model_meta=meta, model_impl=model_impl)
+    assert model.predict(pd.DataFrame({"a": np.array([1], dtype=np.int32)}))["a"].dtype == np.int64
+    meta.signature = ModelSignature(inputs=Schema([ColSpec("double", "a")]))
+    assert model.predict(pd.DataFrame({"a": np.array([1], dtype=np.int32)}))["a"].dtype == float
@@ -0,0 +1,243 @@
+import json
+import sys
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from click.testing import CliRunner
+
+import mlflow.pyfunc
+import mlflow.pyfunc.scoring_server as pyfunc_scoring_server
+from mlflow.exceptions import MlflowException
+from mlflow.models import cli as models_cli
+from mlflow.models.signature import ModelSignature
+from mlflow.pyfunc import PythonModel
+from mlflow.pyfunc.scoring_server import arrow_utils
+from mlflow.types import ColSpec, DataType, Schema
+
+
+class TypeRecordingModel(PythonModel):
+    def predict(self, context, model_input):
+        return pd.DataFrame(
+            {
+                "sum": model_input["a"] + model_input["b"],
+                "dtypes": [",".join(str(t) for t in model_input.dtypes)] * len(model_input),
+            }
+        )
+
+
+SCHEMA = Schema([ColSpec("long", "a"), ColSpec("double", "b"), ColSpec("string", "c")])
+
+
+@pytest.fixture
+def model_path(tmpdir):
+    path = tmpdir.join("model").strpath
+    mlflow.pyfunc.save_model(
+        path,
+        python_model=TypeRecordingModel(),
+        signature=ModelSignature(inputs=SCHEMA),
+        pip_requirements=[],
+    )
+    return path
+
+
+@pytest.fixture
+def client(model_path):
+    return pyfunc_scoring_server.init(mlflow.pyfunc.load_model(model_path)).test_client()
+
+
+def arrow_table():
+    return pa.table(
+        {
+            "a": pa.array([1, 2, 3], type=pa.int32()),
+            "b": pa.array([0.5, 1.5, 2.5], type=pa.float32()),
+            "c": pa.array(["x", "y", "z"], type=pa.large_string()),
+        }
+    )
+
+
+def to_arrow_stream(table):
+    return arrow_utils.write_arrow_stream(table)
+
+
+def to_parquet(table):
+    return arrow_utils.write_parquet(table)
+
+
+@pytest.mark.parametrize(
+    "content_type, serialize",
+    [
+        (pyfunc_scoring_server.CONTENT_TYPE_ARROW_STREAM, to_arrow_stream),
+        (pyfunc_scoring_server.CONTENT_TYPE_PARQUET, to_parquet),
+    ],
+)
+def test_arrow_inputs_are_converted_to_the_schema_types(client, content_type, serialize):
+    response = client.post(
+        "/invocations", data=serialize(arrow_table()), headers={"Content-Type": content_type}
+    )
+    assert response.status_code == 200
+    assert response.content_type == "application/json"
+    predictions = json.loads(response.data)
+    assert [p["sum"] for p in predictions] == [1.5, 3.5, 5.5]
+    assert predictions[0]["dtypes"] == "int64,float64,{}".format(DataType.string.to_pandas())
+
+
+@pytest.mark.parametrize(
+    "accept, read",
+    [
+        (pyfunc_scoring_server.CONTENT_TYPE_ARROW_STREAM, arrow_utils.read_arrow_stream),
+        (pyfunc_scoring_server.CONTENT_TYPE_PARQUET, arrow_utils.read_parquet),
+    ],
+)
+def test_predictions_are_returned_in_the_accepted_format(client, accept, read):
+    response = client.post(
+        "/invocations",
+        data=to_arrow_stream(arrow_table()),
+        headers={
+            "Content-Type": pyfunc_scoring_server.CONTENT_TYPE_ARROW_STREAM,
+            "Accept": "text/html, {};q=0.9, application/json;q=0.8".format(accept),
+        },
+    )
+    assert response.status_code == 200
+    assert response.content_type == accept
+    predictions = read(response.data)
+    assert predictions.column("sum").to_pylist() == [1.5, 3.5, 5.5]
+
+
+def test_incompatible_arrow_columns_are_rejected_by_schema_enforcement(client):
+    table = arrow_table().set_column(1, "b", pa.array([1, 2, 3], type=pa.int64()))
+    response = client.post(
+        "/invocations",
+        data=to_arrow_stream(table),
+        headers={"Content-Type": pyfunc_scoring_server.CONTENT_TYPE_ARROW_STREAM},
+    )
+    assert response.status_code == 400
+    assert "Incompatible input types" in json.loads(response.data)["message"]
+
+
+def test_malformed_arrow_inputs_are_reported(client):
+    response = client.post(
+        "/invocations",
+        data=b"not an arrow stream",
+        headers={"Content-Type": pyfunc_scoring_server.CONTENT_TYPE_ARROW_STREAM},
+    )
+    assert json.loads(response.data)["error_code"] == "MALFORMED_REQUEST"
+
+
+def test_only_schema_compatible_columns_are_cast():
+    schema = Schema(
+        [
+            ColSpec("long", "int8"),
+            ColSpec("integer", "int64"),
+            ColSpec("long", "uint64"),
+            ColSpec("double", "uint32"),
+            ColSpec("float", "double"),
+            ColSpec("datetime", "date"),
+        ]
+    )
+    table = pa.table(
+        {
+            "int8": pa.array([1], type=pa.int8()),
+            "int64": pa.array([1], type=pa.int64()),
+            "uint64": pa.array([1], type=pa.uint64()),
+            "uint32": pa.array([1], type=pa.uint32()),
+            "double": pa.array([1.0], type=pa.float64()),
+            "date": pa.array([0], type=pa.date32()),
+            "extra": pa.array([1], type=pa.int8()),
+        }
+    )
+    df = arrow_utils.table_to_dataframe(table, schema)
+    assert [str(t) for t in df.dtypes] == [
+        "int64",
+        "int64",
+        "uint64",
+        "float64",
+        "float64",
+        "datetime64[ns]",
+        "int8",
+    ]
+
+
+def test_predictions_are_converted_to_tables():
+    def convert(predictions):
+        return arrow_utils.predictions_to_arrow_table(predictions).to_pydict()
+
+    assert convert(np.array([1, 2])) == {"predictions": [1, 2]}
+    assert convert([[1, 2], [3, 4]]) == {"predictions": [[1, 2], [3, 4]]}
+    assert convert(pd.Series([1.5], name="y")) == {"y": [1.5]}
+    assert convert({"y": np.array([[1], [2]]), "z": np.array([3, 4])}) == {
+        "y": [[1], [2]],
+        "z": [3, 4],
+    }
+    with pytest.raises(ValueError, match="Scalar predictions"):
+        convert(1.0)
+
+
+def test_response_content_type_defaults_to_json():
+    get_content_type = pyfunc_scoring_server._get_response_content_type
+    assert get_content_type(None) == pyfunc_scoring_server.CONTENT_TYPE_JSON
+    assert get_content_type("*/*") == pyfunc_scoring_server.CONTENT_TYPE_JSON
+    assert get_content_type("application/json, application/vnd.apache.parquet") == (
+        pyfunc_scoring_server.CONTENT_TYPE_JSON
+    )
+    assert get_content_type("Application/Vnd.Apache.Parquet") == (
+        pyfunc_scoring_server.CONTENT_TYPE_PARQUET
+    )
+
+
+def test_response_content_type_honors_quality_values():
+    get_content_type = pyfunc_scoring_server._get_response_content_type
+    assert get_content_type("application/json;q=0.5, application/vnd.apache.parquet") == (
+        pyfunc_scoring_server.CONTENT_TYPE_PARQUET
+    )
+    assert get_content_type("application/vnd.apache.parquet;q=0.5, */*") == (
+        pyfunc_scoring_server.CONTENT_TYPE_JSON
+    )
+    assert get_content_type(
+        "application/vnd.apache.arrow.stream; q=0.9, application/vnd.apache.parquet;q=0.9"
+    ) == (pyfunc_scoring_server.CONTENT_TYPE_ARROW_STREAM)
+    assert get_content_type("application/vnd.apache.parquet;q=0") == (
+        pyfunc_scoring_server.CONTENT_TYPE_JSON
+    )
+
+
+def test_arrow_inputs_require_pyarrow():
+    with mock.patch.dict(sys.modules, {"pyarrow": None}), pytest.raises(
+        MlflowException, match="pyarrow is required to parse parquet inputs"
+    ):
+        pyfunc_scoring_server._parse_arrow_table(None, b"", "parquet")
+
+
+@pytest.mark.parametrize("content_type", ["arrow", "parquet"])
+def test_predict_cli_reads_arrow_inputs(model_path, tmpdir, content_type):
+    input_path = tmpdir.join("input").strpath
+    output_path = tmpdir.join("output.json").strpath
+    if content_type == "arrow":
+        data = to_arrow_stream(arrow_table())
+    else:
+        data = to_parquet(arrow_table())
+    with open(input_path, "wb") as f:
+        f.write(data)
+    result = CliRunner().invoke(
+        models_cli.predict,
+        ["-m", model_path, "-i", input_path, "-o", output_path, "-t", content_type, "--no-conda",],
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    with open(output_path) as f:
+        assert [p["sum"] for p in json.load(f)] == [1.5, 3.5, 5.5]
+
+
+def test_parquet_files_written_by_pandas_are_accepted(client, tmpdir):
+    path = tmpdir.join("input.parquet").strpath
+    pd.DataFrame({"a": [1], "b": [2.0], "c": ["x"]}).to_parquet(path)
+    with open(path, "rb") as f:
+        response = client.post(
+            "/invocations",
+            data=f.read(),
+            headers={"Content-Type": pyfunc_scoring_server.CONTENT_TYPE_PARQUET},
+        )
+    assert response.status_code == 200
+    assert json.loads(response.data)[0]["sum"] == 3.0
@@ -0,0 +1,358 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+import mlflow.pyfunc
+import mlflow.pyfunc.scoring_server as pyfunc_scoring_server
+from mlflow.exceptions import MlflowException
+from mlflow.models import cli as models_cli
+from mlflow.pyfunc import PythonModel
+from mlflow.pyfunc.scoring_server import arrow_utils, asgi
+
+_concurrency_lock = threading.Lock()
+
+
+class SlowModel(PythonModel):
+    """
+    Model that waits for 100ms without holding the GIL, like a model calling a remote service.
+    """
+
+    def __init__(self):
+        self.max_concurrency = 0
+        self._concurrency = 0
+
+    def predict(self, context, model_input):
+        with _concurrency_lock:
+            self._concurrency += 1
+            self.max_concurrency = max(self.max_concurrency, self._concurrency)
+        time.sleep(0.1)
+        with _concurrency_lock:
+            self._concurrency -= 1
+        if (model_input["x"] < 0).any():
+            raise MlflowException("Negative inputs are not supported")
+        return model_input["x"] + 1
+
+
+@pytest.fixture
+def model_path(tmpdir):
+    path = tmpdir.join("model").strpath
+    mlflow.pyfunc.save_model(path, python_model=SlowModel(), pip_requirements=[])
+    return path
+
+
+@pytest.fixture
+def slow_model(model_path):
+    return mlflow.pyfunc.load_model(model_path)
+
+
+async def request(app, method, path, body=b"", content_type=None):
+    headers = [(b"content-type", content_type.encode())] if content_type else []
+    scope = {"type": "http", "method": method, "path": path, "headers": headers}
+    # Send the body in two chunks to exercise the streaming of request bodies
+    messages = [
+        {"type": "http.request", "body": body[:5], "more_body": True},
+        {"type": "http.request", "body": body[5:], "more_body": False},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    headers = dict(sent[0]["headers"])
+    return sent[0]["status"], headers[b"content-type"].decode(), sent[1]["body"]
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def test_ping_and_unknown_routes(slow_model):
+    app = asgi.init(slow_model)
+    assert run(request(app, "GET", "/ping")) == (200, "application/json", b"\n")
+    assert run(request(app, "POST", "/ping"))[0] == 405
+    assert run(request(app, "GET", "/invocations"))[0] == 405
+    assert run(request(app, "GET", "/unknown"))[0] == 404
+
+
+@pytest.mark.parametrize(
+    "content_type, body",
+    [
+        (pyfunc_scoring_server.CONTENT_TYPE_JSON, '{"columns": ["x"], "data": [[1], [2]]}'),
+        (pyfunc_scoring_server.CONTENT_TYPE_JSON_RECORDS_ORIENTED, '[{"x": 1}, {"x": 2}]'),
+        (pyfunc_scoring_server.CONTENT_TYPE_CSV, "x\n1\n2\n"),
+    ],
+)
+def test_invocations_accept_the_content_types_of_the_wsgi_server(slow_model, content_type, body):
+    app = asgi.init(slow_model)
+    status, response_content_type, response = run(
+        request(app, "POST", "/invocations", body.encode(), content_type)
+    )
+    assert status == 200
+    assert response_content_type == "application/json"
+    assert json.loads(response) == [{"x": 2}, {"x": 3}]
+
+
+def test_invocations_report_errors(slow_model):
+    app = asgi.init(slow_model)
+    status, content_type, _ = run(request(app, "POST", "/invocations", b"x\n1\n", "text/plain"))
+    assert (status, content_type) == (415, "text/plain")
+
+    status, _, response = run(
+        request(app, "POST", "/invocations", b"{not json", pyfunc_scoring_server.CONTENT_TYPE_JSON)
+    )
+    wsgi_response = (
+        pyfunc_scoring_server.init(slow_model)
+        .test_client()
+        .post(
+            "/invocations",
+            data="{not json",
+            headers={"Content-Type": pyfunc_scoring_server.CONTENT_TYPE_JSON},
+        )
+    )
+    assert status == wsgi_response.status_code
+    assert json.loads(response)["error_code"] == "MALFORMED_REQUEST"
+
+    status, _, response = run(
+        request(app, "POST", "/invocations", b"x\n-1\n", pyfunc_scoring_server.CONTENT_TYPE_CSV)
+    )
+    assert status == 400
+    assert json.loads(response) == {
+        "error_code": "BAD_REQUEST",
+        "message": "Negative inputs are not supported",
+    }
+
+
+def test_concurrent_predictions_are_bounded_by_the_executor(slow_model):
+    app = asgi.init(slow_model, executor_type="thread", executor_workers=4)
+    lock = threading.Lock()
+    concurrency = [0, 0]
+    # Predictions only complete in groups of four running concurrently
+    barrier = threading.Barrier(4, timeout=10)
+
+    def predict(context, model_input):
+        # pylint: disable=unused-argument
+        with lock:
+            concurrency[0] += 1
+            concurrency[1] = max(concurrency)
+        barrier.wait()
+        with lock:
+            concurrency[0] -= 1
+        return model_input["x"] + 1
+
+    slow_model._model_impl.python_model.predict = predict
+
+    async def score_concurrently():
+        return await asyncio.gather(
+            *[
+                request(
+                    app, "POST", "/invocations", b"x\n1\n", pyfunc_scoring_server.CONTENT_TYPE_CSV
+                )
+                for _ in range(8)
+            ]
+        )
+
+    responses = run(score_concurrently())
+    assert all(status == 200 for status, _, _ in responses)
+    assert concurrency[1] == 4
+
+
+def test_process_executor_predicts_with_models_loaded_in_the_worker_processes(
+    slow_model, model_path
+):
+    app = asgi.init(slow_model, executor_type="process", executor_workers=2, model_uri=model_path)
+    status, _, response = run(
+        request(app, "POST", "/invocations", b"x\n1\n", pyfunc_scoring_server.CONTENT_TYPE_CSV)
+    )
+    assert status == 200
+    assert json.loads(response) == [{"x": 2}]
+    # The model served by the application is not used to make predictions
+    assert slow_model._model_impl.python_model.max_concurrency == 0
+
+
+def test_process_executor_does_not_load_the_model_in_the_server_process(model_path, monkeypatch):
+    monkeypatch.setenv(pyfunc_scoring_server._SERVER_MODEL_PATH, model_path)
+    monkeypatch.setenv(asgi.EXECUTOR_ENV_KEY, "process")
+    monkeypatch.setenv(asgi.EXECUTOR_WORKERS_ENV_KEY, "1")
+    with mock.patch(
+        "mlflow.pyfunc.scoring_server._load_model_for_serving"
+    ) as load_model_mock, mock.patch("mlflow.pyfunc.load_model") as pyfunc_load_model_mock:
+        app = asgi.create_app()
+    load_model_mock.assert_not_called()
+    pyfunc_load_model_mock.assert_not_called()
+    assert app._input_schema is None
+    app._process_pool.shutdown()
+
+
+def run_lifespan(app, message_types, on_send=None):
+    messages = [{"type": message_type} for message_type in message_types]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+        if on_send is not None:
+            on_send(message)
+
+    run(app({"type": "lifespan"}, receive, send))
+    return sent
+
+
+class ProcessRecordingModel(PythonModel):
+    """
+    Model recording the IDs of the processes that load it in the file specified by the
+    environment, which fails to load if the file name is "fail".
+    """
+
+    def load_context(self, context):
+        path = os.environ["MLFLOW_TEST_LOADING_PROCESSES_FILE"]
+        if os.path.basename(path) == "fail":
+            raise Exception("Failed to load the model")
+        with open(path, "a") as f:
+            f.write("{}\n".format(os.getpid()))
+
+    def predict(self, context, model_input):
+        return model_input
+
+
+@pytest.fixture
+def process_recording_model_path(tmpdir):
+    path = tmpdir.join("process-recording-model").strpath
+    mlflow.pyfunc.save_model(path, python_model=ProcessRecordingModel(), pip_requirements=[])
+    return path
+
+
+def test_process_executor_loads_the_model_in_every_process_on_startup(
+    process_recording_model_path, tmpdir, monkeypatch
+):
+    processes_file = tmpdir.join("processes")
+    monkeypatch.setenv("MLFLOW_TEST_LOADING_PROCESSES_FILE", processes_file.strpath)
+    app = asgi.init(
+        None, executor_type="process", executor_workers=3, model_uri=process_recording_model_path
+    )
+    assert not processes_file.exists()
+    loading_processes = []
+    sent = run_lifespan(
+        app,
+        ["lifespan.startup", "lifespan.shutdown"],
+        on_send=lambda message: loading_processes.append(set(processes_file.read().split())),
+    )
+    assert sent[0] == {"type": "lifespan.startup.complete"}
+    # All the processes loaded the model before the server reported being ready
+    assert len(loading_processes[0]) == 3
+
+
+def test_startup_fails_if_the_processes_cannot_load_the_model(
+    process_recording_model_path, tmpdir, monkeypatch
+):
+    monkeypatch.setenv("MLFLOW_TEST_LOADING_PROCESSES_FILE", tmpdir.join("fail").strpath)
+    app = asgi.init(
+        None, executor_type="process", executor_workers=2, model_uri=process_recording_model_path
+    )
+    sent = run_lifespan(app, ["lifespan.startup"])
+    assert [message["type"] for message in sent] == ["lifespan.startup.failed"]
+    app._process_pool.shutdown()
+
+
+def test_executors_are_shut_down_with_the_server(slow_model, model_path):
+    app = asgi.init(slow_model, executor_type="process", executor_workers=1, model_uri=model_path)
+    assert run(request(app, "POST", "/invocations", b"x\n1\n", "text/csv"))[0] == 200
+    sent = run_lifespan(app, ["lifespan.startup", "lifespan.shutdown"])
+    assert [message["type"] for message in sent] == [
+        "lifespan.startup.complete",
+        "lifespan.shutdown.complete",
+    ]
+    with pytest.raises(RuntimeError, match="shutdown"):
+        app._executor.submit(print)
+    with pytest.raises(RuntimeError, match="shutdown"):
+        app._process_pool.submit(print)
+
+
+def test_executor_is_configured_by_environment(slow_model, monkeypatch):
+    monkeypatch.setenv(asgi.EXECUTOR_ENV_KEY, "process")
+    monkeypatch.setenv(asgi.EXECUTOR_WORKERS_ENV_KEY, "3")
+    assert asgi._get_executor_config() == ("process", 3)
+    assert asgi._get_executor_config("thread", 5) == ("thread", 5)
+
+    with pytest.raises(MlflowException, match="requires the URI of the model"):
+        asgi.init(slow_model)
+    monkeypatch.setenv(asgi.EXECUTOR_ENV_KEY, "fiber")
+    with pytest.raises(MlflowException, match="Invalid inference executor configuration"):
+        asgi.init(slow_model)
+
+
+def test_serve_runs_the_asgi_server(model_path):
+    with mock.patch("mlflow.pyfunc.backend.subprocess.Popen") as popen_mock, mock.patch(
+        "mlflow.pyfunc.backend._check_uvicorn_installed"
+    ):
+        result = CliRunner().invoke(
+            models_cli.serve,
+            [
+                "-m",
+                model_path,
+                "--no-conda",
+                "--asgi",
+                "--workers",
+                "2",
+                "--inference-executor",
+                "process",
+                "--inference-workers",
+                "8",
+            ],
+            catch_exceptions=False,
+        )
+    assert result.exit_code == 0
+    args, kwargs = popen_mock.call_args
+    assert args[0][-1] == (
+        "uvicorn --factory --host 127.0.0.1 --port 5000 --workers 2"
+        " mlflow.pyfunc.scoring_server.asgi:create_app"
+    )
+    assert kwargs["env"][asgi.EXECUTOR_ENV_KEY] == "process"
+    assert kwargs["env"][asgi.EXECUTOR_WORKERS_ENV_KEY] == "8"
+
+
+def test_serve_checks_that_uvicorn_is_installed_in_the_conda_environment(model_path):
+    with mock.patch("mlflow.pyfunc.backend._execute_in_conda_env") as execute_mock:
+        result = CliRunner().invoke(
+            models_cli.serve, ["-m", model_path, "--asgi"], catch_exceptions=False
+        )
+    assert result.exit_code == 0
+    command = execute_mock.call_args[0][1]
+    assert command.startswith(
+        'python -c "from mlflow.pyfunc.backend import _check_uvicorn_installed;'
+    )
+    assert command.endswith("mlflow.pyfunc.scoring_server.asgi:create_app")
+
+
+def test_invocations_return_predictions_in_the_accepted_format(slow_model):
+    app = asgi.init(slow_model)
+    scope_headers = [
+        (b"content-type", pyfunc_scoring_server.CONTENT_TYPE_CSV.encode()),
+        (b"accept", pyfunc_scoring_server.CONTENT_TYPE_ARROW_STREAM.encode()),
+    ]
+    messages = [{"type": "http.request", "body": b"x\n1\n2\n"}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/invocations", "headers": scope_headers}
+    run(app(scope, receive, send))
+    assert sent[0]["status"] == 200
+    assert dict(sent[0]["headers"])[b"content-type"] == b"application/vnd.apache.arrow.stream"
+    predictions = arrow_utils.read_arrow_stream(sent[1]["body"])
+    assert predictions.column("x").to_pylist() == [2, 3]
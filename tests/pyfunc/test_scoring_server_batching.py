@@ -0,0 +1,192 @@
+import json
+import threading
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+import mlflow.pyfunc
+import mlflow.pyfunc.scoring_server as pyfunc_scoring_server
+from mlflow.exceptions import MlflowException
+from mlflow.models import cli as models_cli
+from mlflow.pyfunc import PythonModel
+from mlflow.pyfunc.scoring_server.batching import PredictionBatcher
+
+
+class RecordingPredictor(object):
+    """
+    Prediction function that doubles its inputs and records the number of rows of each call.
+    """
+
+    def __init__(self):
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def __call__(self, data):
+        with self._lock:
+            self.batch_sizes.append(len(data))
+        if isinstance(data, pd.DataFrame) and (data["x"] < 0).any():
+            raise MlflowException("Negative inputs are not supported")
+        return data["x"].values * 2 if isinstance(data, pd.DataFrame) else data * 2
+
+
+def predict_concurrently(batcher, inputs):
+    results = [None] * len(inputs)
+
+    def predict(i):
+        try:
+            results[i] = batcher.predict(inputs[i])
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=predict, args=(i,)) for i in range(len(inputs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_inputs_are_merged_and_predictions_split():
+    predictor = RecordingPredictor()
+    # The batch is scored as soon as it is full, long before its maximum latency
+    batcher = PredictionBatcher(predictor, max_batch_size=8, max_latency_ms=60000)
+    inputs = [pd.DataFrame({"x": [i, i + 100]}) for i in range(4)]
+
+    results = predict_concurrently(batcher, inputs)
+
+    assert predictor.batch_sizes == [8]
+    for i, result in enumerate(results):
+        np.testing.assert_array_equal(result, [2 * i, 2 * i + 200])
+
+
+def test_batches_are_scored_after_max_latency():
+    predictor = RecordingPredictor()
+    batcher = PredictionBatcher(predictor, max_batch_size=100, max_latency_ms=10)
+    results = predict_concurrently(batcher, [np.array([1, 2]), np.array([3])])
+    assert sum(predictor.batch_sizes) == 3
+    np.testing.assert_array_equal(results[0], [2, 4])
+    np.testing.assert_array_equal(results[1], [6])
+
+
+def test_incompatible_and_large_inputs_are_not_merged():
+    predictor = RecordingPredictor()
+    batcher = PredictionBatcher(predictor, max_batch_size=4, max_latency_ms=50)
+    inputs = [
+        pd.DataFrame({"x": [1]}),
+        pd.DataFrame({"x": [1.5]}),
+        pd.DataFrame({"x": [1], "y": [2]}),
+        pd.DataFrame({"x": [1, 2, 3, 4, 5]}),
+    ]
+    results = predict_concurrently(batcher, inputs)
+    assert sorted(predictor.batch_sizes) == [1, 1, 1, 5]
+    np.testing.assert_array_equal(results[1], [3.0])
+    # Inputs of unsupported types are scored directly
+    assert batcher.predict(np.array([[1, 2]]))[0].tolist() == [2, 4]
+    with pytest.raises(TypeError):
+        batcher.predict(None)
+
+
+def test_errors_are_reported_to_the_requests_that_caused_them():
+    predictor = RecordingPredictor()
+    batcher = PredictionBatcher(predictor, max_batch_size=3, max_latency_ms=60000)
+    inputs = [pd.DataFrame({"x": [x]}) for x in [1, -1, 2]]
+
+    results = predict_concurrently(batcher, inputs)
+
+    assert isinstance(results[1], MlflowException)
+    np.testing.assert_array_equal(results[0], [2])
+    np.testing.assert_array_equal(results[2], [4])
+    # The failed batch is scored again one input at a time
+    assert sorted(predictor.batch_sizes) == [1, 1, 1, 3]
+
+
+def test_predictions_that_cannot_be_split_are_made_separately():
+    calls = []
+
+    def predict_mean(data):
+        calls.append(len(data))
+        return float(data["x"].mean())
+
+    batcher = PredictionBatcher(predict_mean, max_batch_size=2, max_latency_ms=60000)
+    results = predict_concurrently(batcher, [pd.DataFrame({"x": [1]}), pd.DataFrame({"x": [3]})])
+    assert sorted(results) == [1.0, 3.0]
+    assert sorted(calls) == [1, 1, 2]
+
+
+class BatchRecordingModel(PythonModel):
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, context, model_input):
+        self.batch_sizes.append(len(model_input))
+        return model_input["x"] + 1
+
+
+@pytest.fixture
+def batch_recording_model(tmpdir):
+    model_path = tmpdir.join("model").strpath
+    mlflow.pyfunc.save_model(model_path, python_model=BatchRecordingModel(), pip_requirements=[])
+    return mlflow.pyfunc.load_model(model_path)
+
+
+def test_scoring_server_batches_concurrent_requests(batch_recording_model):
+    app = pyfunc_scoring_server.init(
+        batch_recording_model, max_batch_size=4, max_batch_latency_ms=60000
+    )
+    responses = [None] * 4
+
+    def score(i):
+        responses[i] = app.test_client().post(
+            "/invocations",
+            data=pd.DataFrame({"x": [i]}).to_json(orient="split"),
+            headers={"Content-Type": pyfunc_scoring_server.CONTENT_TYPE_JSON_SPLIT_ORIENTED},
+        )
+
+    threads = [threading.Thread(target=score, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i, response in enumerate(responses):
+        assert response.status_code == 200
+        assert json.loads(response.data) == [{"x": i + 1}]
+    assert batch_recording_model._model_impl.python_model.batch_sizes == [4]
+
+
+def test_batching_is_configured_by_environment(batch_recording_model, monkeypatch):
+    monkeypatch.setenv(pyfunc_scoring_server.MAX_BATCH_SIZE_ENV_KEY, "16")
+    monkeypatch.setenv(pyfunc_scoring_server.MAX_BATCH_LATENCY_MS_ENV_KEY, "2.5")
+    assert pyfunc_scoring_server._get_batching_config() == (16, 2.5)
+    assert pyfunc_scoring_server._get_batching_config(4, 1) == (4, 1)
+
+    monkeypatch.setenv(pyfunc_scoring_server.MAX_BATCH_SIZE_ENV_KEY, "0")
+    with pytest.raises(MlflowException, match="Invalid batching configuration"):
+        pyfunc_scoring_server.init(batch_recording_model)
+
+
+def test_serve_passes_batching_options_to_the_server(tmpdir):
+    model_path = tmpdir.join("model").strpath
+    mlflow.pyfunc.save_model(model_path, python_model=BatchRecordingModel(), pip_requirements=[])
+    with mock.patch("mlflow.pyfunc.backend.subprocess.Popen") as popen_mock:
+        result = CliRunner().invoke(
+            models_cli.serve,
+            [
+                "-m",
+                model_path,
+                "--no-conda",
+                "--max-batch-size",
+                "64",
+                "--max-batch-latency-ms",
+                "3",
+            ],
+            catch_exceptions=False,
+        )
+    assert result.exit_code == 0
+    args, kwargs = popen_mock.call_args
+    assert "--threads 32" in args[0][-1]
+    assert kwargs["env"][pyfunc_scoring_server.MAX_BATCH_SIZE_ENV_KEY] == "64"
+    assert kwargs["env"][pyfunc_scoring_server.MAX_BATCH_LATENCY_MS_ENV_KEY] == "3.0"
@@ -0,0 +1,182 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+import mlflow.pyfunc
+from mlflow.exceptions import MlflowException
+from mlflow.models import cli as models_cli
+from mlflow.models.signature import ModelSignature
+from mlflow.pyfunc import PythonModel
+from mlflow.pyfunc.scoring_server import multi_model
+from mlflow.types import ColSpec, Schema
+
+
+class AddN(PythonModel):
+    def __init__(self, n):
+        self.n = n
+
+    def predict(self, context, model_input):
+        return model_input["x"].values + self.n
+
+
+@pytest.fixture
+def model_root(tmpdir):
+    root = tmpdir.join("models")
+    for name, version, n in [("a", "1", 1), ("a", "2", 2), ("b", "1", 10)]:
+        mlflow.pyfunc.save_model(
+            root.join(name, version).strpath,
+            python_model=AddN(n),
+            signature=ModelSignature(inputs=Schema([ColSpec("long", "x")])),
+            pip_requirements=[],
+        )
+    return root.strpath
+
+
+def invoke(client, name, version, data=None):
+    data = data or pd.DataFrame({"x": [1, 2]}).to_json(orient="split")
+    return client.post(
+        "/models/{}/{}/invocations".format(name, version),
+        data=data,
+        headers={"Content-Type": "application/json; format=pandas-split"},
+    )
+
+
+def test_requests_are_routed_by_model_name_and_version(model_root):
+    client = multi_model.init(model_root_uri=model_root).test_client()
+    assert client.get("/ping").status_code == 200
+    for name, version, expected in [("a", "1", [2, 3]), ("a", "2", [3, 4]), ("b", "1", [11, 12])]:
+        response = invoke(client, name, version)
+        assert response.status_code == 200
+        assert json.loads(response.data) == expected
+
+
+def test_models_are_loaded_once_and_evicted_in_lru_order(model_root):
+    app = multi_model.init(model_root_uri=model_root, max_models=2)
+    client = app.test_client()
+    with mock.patch(
+        "mlflow.pyfunc.scoring_server.load_model", wraps=mlflow.pyfunc.load_model
+    ) as load_mock:
+        for name, version in [("a", "1"), ("a", "1"), ("a", "2"), ("a", "1"), ("b", "1")]:
+            assert invoke(client, name, version).status_code == 200
+    assert load_mock.call_count == 3
+    listing = json.loads(client.get("/models").data)
+    assert listing["models"] == [
+        os.path.join(model_root, "a", "1"),
+        os.path.join(model_root, "b", "1"),
+    ]
+    stats = listing["cache"]
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1)
+    assert stats["size_bytes"] > 0
+
+
+def test_model_size_bounds_the_cache(model_root):
+    size_mb = multi_model._get_model_size_bytes(os.path.join(model_root, "a", "1")) / 1024 / 1024
+    client = multi_model.init(
+        model_root_uri=model_root, max_cache_size_mb=size_mb * 1.5
+    ).test_client()
+    invoke(client, "a", "1")
+    invoke(client, "b", "1")
+    listing = json.loads(client.get("/models").data)
+    assert listing["models"] == [os.path.join(model_root, "b", "1")]
+
+
+def test_evicted_models_are_deleted_from_their_download_directory(model_root):
+    client = multi_model.init(model_root_uri=model_root, max_models=1).test_client()
+    download_dirs = []
+    original_mkdtemp = tempfile.mkdtemp
+
+    def mkdtemp():
+        download_dirs.append(original_mkdtemp())
+        return download_dirs[-1]
+
+    with mock.patch("tempfile.mkdtemp", mkdtemp):
+        assert invoke(client, "a", "1").status_code == 200
+        assert os.listdir(download_dirs[0])
+        assert invoke(client, "b", "1").status_code == 200
+    first_dir, second_dir = download_dirs
+    assert not os.path.exists(first_dir)
+    assert os.path.exists(second_dir)
+
+
+def test_models_in_use_keep_their_download_directory_until_released(model_root):
+    loader = multi_model._ModelLoader()
+    model, _ = loader.load(os.path.join(model_root, "a", "1"))
+    local_dir = loader._downloads[id(model)].local_dir
+    assert loader.acquire(model)
+    assert loader.acquire(model)
+    # The model is evicted while two requests use it
+    loader.evict("a/1", model)
+    loader.release(model)
+    assert os.path.isdir(local_dir)
+    loader.release(model)
+    assert not os.path.exists(local_dir)
+    # Requests that looked the model up before its eviction must load it again
+    assert not loader.acquire(model)
+
+
+def test_each_model_enforces_its_schema(model_root):
+    client = multi_model.init(model_root_uri=model_root).test_client()
+    response = invoke(client, "a", "1", data=json.dumps({"columns": ["y"], "data": [[1]]}))
+    assert response.status_code == 400
+    assert "Model is missing inputs" in json.loads(response.data)["message"]
+
+
+def test_missing_and_invalid_models_are_reported(model_root):
+    client = multi_model.init(model_root_uri=model_root).test_client()
+    response = invoke(client, "c", "1")
+    assert response.status_code == 404
+    assert json.loads(response.data)["error_code"] == "RESOURCE_DOES_NOT_EXIST"
+    response = invoke(client, "..", "a")
+    assert response.status_code == 400
+    assert json.loads(response.data)["error_code"] == "INVALID_PARAMETER_VALUE"
+    assert json.loads(client.get("/models").data)["cache"]["load_failures"] == 1
+
+
+def test_models_are_resolved_from_the_registry_without_model_root():
+    assert multi_model._get_model_uri(None, "tenant", "Production") == "models:/tenant/Production"
+    assert multi_model._get_model_uri("s3://bucket/models", "t", "3") == "s3://bucket/models/t/3"
+
+
+def test_stages_are_resolved_to_their_latest_version():
+    with mock.patch.object(
+        multi_model.MlflowClient, "get_latest_versions", side_effect=[[mock.Mock(version="3")], []],
+    ) as get_latest_versions_mock:
+        assert multi_model._resolve_model_uri("models:/tenant/Production") == "models:/tenant/3"
+        with pytest.raises(MlflowException, match="No versions of model") as e:
+            multi_model._resolve_model_uri("models:/tenant/Staging")
+    assert e.value.error_code == "RESOURCE_DOES_NOT_EXIST"
+    get_latest_versions_mock.assert_any_call("tenant", ["Production"])
+    assert multi_model._resolve_model_uri("models:/tenant/2") == "models:/tenant/2"
+    assert multi_model._resolve_model_uri("s3://bucket/models/t/3") == "s3://bucket/models/t/3"
+
+
+def test_cache_configuration_is_read_from_the_environment(monkeypatch):
+    monkeypatch.setenv(multi_model.MAX_MODELS_ENV_KEY, "5")
+    monkeypatch.setenv(multi_model.MAX_CACHE_SIZE_MB_ENV_KEY, "10.5")
+    assert multi_model._get_cache_config() == (5, 10.5)
+    assert multi_model._get_cache_config(max_models=2) == (2, 10.5)
+    monkeypatch.setenv(multi_model.MAX_MODELS_ENV_KEY, "0")
+    with pytest.raises(MlflowException, match="Invalid model cache configuration"):
+        multi_model._get_cache_config()
+
+
+def test_serve_multi_model_cli_starts_the_multi_model_server(tmpdir):
+    with mock.patch("subprocess.Popen") as popen_mock:
+        result = CliRunner().invoke(
+            models_cli.commands,
+            ["serve-multi-model", "--model-root", tmpdir.strpath, "--max-models", "7", "-w", "2"],
+            catch_exceptions=False,
+        )
+    assert result.exit_code == 0
+    command = popen_mock.call_args[0][0]
+    env = popen_mock.call_args[1]["env"]
+    assert "mlflow.pyfunc.scoring_server.wsgi:app" in command[-1]
+    assert "-w 2" in command[-1]
+    assert env[multi_model._SERVER_MULTI_MODEL] == "true"
+    assert env[multi_model.MODEL_ROOT_ENV_KEY] == tmpdir.strpath
+    assert env[multi_model.MAX_MODELS_ENV_KEY] == "7"
@@ -0,0 +1,143 @@
+import base64
+import json
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import mlflow.pyfunc.scoring_server as pyfunc_scoring_server
+from mlflow.pyfunc.scoring_server import parsing
+from mlflow.types import ColSpec, Schema, TensorSpec
+
+SCHEMA = Schema(
+    [
+        ColSpec("integer", "a"),
+        ColSpec("long", "b"),
+        ColSpec("float", "c"),
+        ColSpec("double", "d"),
+        ColSpec("string", "e"),
+        ColSpec("boolean", "f"),
+    ]
+)
+
+SPLIT_INPUTS = [
+    {"columns": ["a", "b"], "data": [[1, 2.5], [3, 4.0]]},
+    {"columns": ["a", "b"], "index": [0, 1], "data": [[1, "x"], [None, "y"]]},
+    {"columns": ["a", "b"], "index": [5, 3], "data": [[1, None], [2, None]]},
+    {"columns": ["a", "b"], "data": [[True, [1, 2]], [False, [3]]]},
+    # Inputs handled by pandas
+    {"columns": ["created_at", "b"], "data": [[1600000000, 1], [1600000001, 2]]},
+    {"columns": ["1", "b"], "data": [[1, 2]]},
+    {"columns": ["a", "a"], "data": [[1, 2]]},
+    {"columns": ["a", "b"], "index": [1600000000], "data": [[1, 2]]},
+    {"columns": ["a", "b"], "index": ["x"], "data": [[1, 2]]},
+    {"columns": ["a", "b"], "data": []},
+]
+
+SCHEMA_SPLIT_INPUTS = [
+    {
+        "columns": ["a", "b", "c", "d", "e", "f"],
+        "data": [[1, 2, 3.5, 4, "x", True], [5, 6, 7, 8.25, "y", False]],
+    },
+    {
+        "columns": ["f", "e", "d", "c", "b", "a"],
+        "index": [0, 1],
+        "data": [[True, "x", 1, 2, 3, 2 ** 40], [False, "", 5.5, 6, 7, -(2 ** 40)]],
+    },
+    {
+        "columns": ["a", "b", "c", "d", "e", "f"],
+        "data": [[True, 2, 3, 4, "x", True], [5, 6, 7, 8, "y", False]],
+    },
+    # Inputs handled by pandas
+    {
+        "columns": ["a", "b", "c", "d", "e", "f"],
+        "data": [[1.5, 2, 3, 4, "x", 1], [None, 6, 7, 8, 1, 0]],
+    },
+    {"columns": ["a", "b", "c", "d", "e"], "data": [[1, 2, 3, 4, "x"]]},
+    {
+        "columns": ["a", "b", "c", "d", "e", "f"],
+        "data": [[1, 2, 3, "4", "x", True], [5, 6, 7, 8, "y", "z"]],
+    },
+]
+
+
+def split_to_records(split_input):
+    return [dict(zip(split_input["columns"], row)) for row in split_input["data"]]
+
+
+def assert_parsed_like_pandas(payload, orient, schema=None):
+    expected = pyfunc_scoring_server.parse_json_input(payload, orient=orient, schema=schema)
+    parsed = pyfunc_scoring_server._parse_json_input_from_bytes(
+        payload.encode("utf-8"), orient=orient, schema=schema
+    )
+    pd.testing.assert_frame_equal(parsed, expected)
+
+
+@pytest.mark.parametrize("split_input", SPLIT_INPUTS)
+def test_parsing_without_schema_matches_pandas(split_input):
+    assert_parsed_like_pandas(json.dumps(split_input), orient="split")
+    if len(set(split_input["columns"])) == len(split_input["columns"]):
+        assert_parsed_like_pandas(json.dumps(split_to_records(split_input)), orient="records")
+
+
+@pytest.mark.parametrize("split_input", SCHEMA_SPLIT_INPUTS)
+def test_parsing_with_schema_matches_pandas(split_input):
+    assert_parsed_like_pandas(json.dumps(split_input), orient="split", schema=SCHEMA)
+    assert_parsed_like_pandas(
+        json.dumps(split_to_records(split_input)), orient="records", schema=SCHEMA
+    )
+
+
+def test_columns_are_converted_to_the_types_of_the_schema():
+    decoded = parsing.loads_json(json.dumps(SCHEMA_SPLIT_INPUTS[0]).encode("utf-8"))
+    df = parsing.dataframe_from_json_object(decoded, orient="split", schema=SCHEMA)
+    assert [str(dtype) for dtype in df.dtypes] == [
+        "int32",
+        "int64",
+        "float32",
+        "float64",
+        str(SCHEMA.pandas_types()[4]),
+        "bool",
+    ]
+    schema = Schema([ColSpec("binary", "x")])
+    df = parsing.dataframe_from_json_object(
+        [{"x": base64.encodebytes(b"\x00\x01").decode("ascii")}], orient="records", schema=schema
+    )
+    assert df["x"][0] == b"\x00\x01"
+
+
+def test_unsupported_inputs_are_left_to_pandas():
+    assert parsing.dataframe_from_json_object({"data": [[1]]}, orient="split") is None
+    assert parsing.dataframe_from_json_object([{"a": 1}, {"b": 2}], orient="records") is None
+    assert parsing.dataframe_from_json_object([{"a": 1}], orient="index") is None
+    tensor_schema = Schema([TensorSpec(np.dtype("float32"), (-1,), "a")])
+    assert (
+        parsing.dataframe_from_json_object([{"a": 1.0}], orient="records", schema=tensor_schema)
+        is None
+    )
+
+
+def test_request_bodies_are_parsed_once():
+    body = json.dumps(split_to_records(SCHEMA_SPLIT_INPUTS[0])).encode("utf-8")
+    with mock.patch("pandas.read_json") as read_json_mock, mock.patch(
+        "mlflow.pyfunc.scoring_server.parsing.loads_json", wraps=parsing.loads_json
+    ):
+        df = pyfunc_scoring_server._parse_invocation_input(
+            pyfunc_scoring_server.CONTENT_TYPE_JSON, body, SCHEMA
+        )
+    read_json_mock.assert_not_called()
+    assert df["a"].tolist() == [1, 5]
+
+
+def test_json_documents_rejected_by_orjson_are_decoded_with_the_standard_library():
+    assert np.isnan(parsing.loads_json(b'[{"a": NaN}]')[0]["a"])
+    with pytest.raises(json.JSONDecodeError):
+        parsing.loads_json(b"{not json")
+
+
+def test_csv_is_parsed_from_bytes():
+    df = pyfunc_scoring_server._parse_invocation_input(
+        pyfunc_scoring_server.CONTENT_TYPE_CSV, "a,b\n1,x\n2,é\n".encode("utf-8")
+    )
+    pd.testing.assert_frame_equal(df, pd.DataFrame({"a": [1, 2], "b": ["x", "é"]}))
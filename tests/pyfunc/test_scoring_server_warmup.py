@@ -0,0 +1,108 @@
+import importlib
+import sys
+from unittest import mock
+
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+import mlflow.pyfunc
+import mlflow.pyfunc.scoring_server as pyfunc_scoring_server
+from mlflow.models import cli as models_cli
+from mlflow.pyfunc import PythonModel
+from mlflow.utils.file_utils import path_to_local_file_uri
+
+
+class LazyModel(PythonModel):
+    def __init__(self):
+        self.inputs = []
+
+    def predict(self, context, model_input):
+        self.inputs.append(model_input)
+        if (model_input["x"] < 0).any():
+            raise ValueError("Negative input")
+        return model_input["x"].values * 2
+
+
+def save_model(path, input_example=None):
+    mlflow.pyfunc.save_model(
+        path, python_model=LazyModel(), input_example=input_example, pip_requirements=[]
+    )
+    return path_to_local_file_uri(path)
+
+
+def get_inputs(model):
+    return model._model_impl.python_model.inputs
+
+
+def test_warm_up_predicts_the_input_example(tmpdir):
+    model_uri = save_model(tmpdir.join("model").strpath, pd.DataFrame({"x": [1, 2]}))
+    model = mlflow.pyfunc.load_model(model_uri)
+    pyfunc_scoring_server._warm_up(model, model_uri)
+    assert len(get_inputs(model)) == 1
+    assert get_inputs(model)[0]["x"].tolist() == [1, 2]
+
+
+def test_models_are_only_warmed_up_if_enabled(tmpdir, monkeypatch):
+    model_uri = save_model(tmpdir.join("model").strpath, pd.DataFrame({"x": [1]}))
+    assert get_inputs(pyfunc_scoring_server._load_model_for_serving(model_uri)) == []
+    monkeypatch.setenv(pyfunc_scoring_server.WARMUP_ENV_KEY, "true")
+    assert len(get_inputs(pyfunc_scoring_server._load_model_for_serving(model_uri))) == 1
+
+
+@pytest.mark.parametrize(
+    "input_example, message",
+    [
+        (None, "which has no input example"),
+        (pd.DataFrame({"x": [-1]}), "Failed to warm up the model"),
+    ],
+)
+def test_models_that_cannot_be_warmed_up_are_served(tmpdir, input_example, message):
+    model_uri = save_model(tmpdir.join("model").strpath, input_example)
+    model = mlflow.pyfunc.load_model(model_uri)
+    with mock.patch("mlflow.pyfunc.scoring_server._logger.warning") as warn_mock:
+        pyfunc_scoring_server._warm_up(model, model_uri)
+    assert message in warn_mock.call_args[0][0]
+    response = (
+        pyfunc_scoring_server.init(model)
+        .test_client()
+        .post(
+            "/invocations",
+            data=pd.DataFrame({"x": [3]}).to_json(orient="split"),
+            headers={"Content-Type": pyfunc_scoring_server.CONTENT_TYPE_JSON_SPLIT_ORIENTED},
+        )
+    )
+    assert response.status_code == 200
+
+
+def test_wsgi_app_is_warmed_up_before_serving(tmpdir, monkeypatch):
+    model_uri = save_model(tmpdir.join("model").strpath, pd.DataFrame({"x": [1]}))
+    monkeypatch.setenv(pyfunc_scoring_server._SERVER_MODEL_PATH, model_uri)
+    monkeypatch.setenv(pyfunc_scoring_server.WARMUP_ENV_KEY, "true")
+    monkeypatch.delitem(sys.modules, "mlflow.pyfunc.scoring_server.wsgi", raising=False)
+    with mock.patch(
+        "mlflow.pyfunc.scoring_server._warm_up", wraps=pyfunc_scoring_server._warm_up
+    ) as warm_up_mock:
+        wsgi = importlib.import_module("mlflow.pyfunc.scoring_server.wsgi")
+    warm_up_mock.assert_called_once()
+    assert wsgi.app.test_client().get("/ping").status_code == 200
+
+
+@pytest.mark.parametrize(
+    "extra_args, preload", [([], True), (["--asgi"], False)],
+)
+def test_serve_passes_preload_and_warm_up_options_to_the_server(tmpdir, extra_args, preload):
+    model_path = tmpdir.join("model").strpath
+    save_model(model_path)
+    with mock.patch("mlflow.pyfunc.backend.subprocess.Popen") as popen_mock, mock.patch(
+        "mlflow.pyfunc.backend._check_uvicorn_installed"
+    ):
+        result = CliRunner().invoke(
+            models_cli.serve,
+            ["-m", model_path, "--no-conda", "--preload", "--warm-up"] + extra_args,
+            catch_exceptions=False,
+        )
+    assert result.exit_code == 0
+    command = popen_mock.call_args[0][0][-1]
+    assert ("--preload" in command) == preload
+    assert popen_mock.call_args[1]["env"][pyfunc_scoring_server.WARMUP_ENV_KEY] == "true"
@@ -1,5 +1,9 @@
 import os
+import shutil
+import subprocess
 import sys
+import zipfile
+from unittest import mock
 
 import numpy as np
 import pandas as pd
@@ -252,7 +256,7 @@ def test_model_cache(spark, model_path):
         assert isinstance(model, PyFuncModel)
         # NB: Can not use instanceof test as remote does not know about ConstantPyfuncWrapper class.
         assert type(model._model_impl).__name__ == constant_model_name
-        return SparkModelCache._cache_hits
+        return SparkModelCache.stats()["hits"]
 
     # This will run 30 distinct tasks, and we expect most to reuse an already-loaded model.
     # Note that we can't necessarily expect an even split, or even that there were only
@@ -265,3 +269,181 @@ def test_model_cache(spark, model_path):
     # Running again should see no newly-loaded models.
     results2 = spark.sparkContext.parallelize(range(0, 100), 30).map(get_model).collect()
     assert sys.version[0] == "3" or min(results2) > 0
+
+
+def test_model_archives_are_cached_by_content(model_path):
+    mlflow.pyfunc.save_model(
+        path=model_path, python_model=BatchRecordingModel(), pip_requirements=[]
+    )
+    spark = mock.Mock()
+    spark.sparkContext.applicationId = "app-1"
+    with mock.patch.dict(SparkModelCache._archives, clear=True):
+        archive_path = SparkModelCache.add_local_model(spark, model_path)
+        assert SparkModelCache.add_local_model(spark, model_path) == archive_path
+        spark.sparkContext.addFile.assert_called_once_with(archive_path)
+
+        # A deleted archive is recreated at the path it was added from
+        shutil.rmtree(os.path.dirname(archive_path))
+        assert SparkModelCache.add_local_model(spark, model_path) == archive_path
+        spark.sparkContext.addFile.assert_called_once_with(archive_path)
+        with zipfile.ZipFile(archive_path) as archive:
+            assert "MLmodel" in archive.namelist()
+
+        with open(os.path.join(model_path, "extra.txt"), "w") as f:
+            f.write("changed")
+        changed_archive_path = SparkModelCache.add_local_model(spark, model_path)
+        assert os.path.basename(changed_archive_path) != os.path.basename(archive_path)
+
+        spark.sparkContext.applicationId = "app-2"
+        assert SparkModelCache.add_local_model(spark, model_path) not in (
+            archive_path,
+            changed_archive_path,
+        )
+        assert spark.sparkContext.addFile.call_count == 3
+
+
+class BatchRecordingModel(PythonModel):
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, context, model_input):
+        self.batch_sizes.append(len(model_input))
+        return model_input.sum(axis=1).values
+
+
+def test_spark_udf_fetches_the_model_once_per_task_and_splits_batches(model_path):
+    mlflow.pyfunc.save_model(
+        path=model_path, python_model=BatchRecordingModel(), pip_requirements=[]
+    )
+    model = mlflow.pyfunc.load_model(model_path)
+    with mock.patch("pyspark.sql.functions.pandas_udf", side_effect=lambda f, *_: f), mock.patch(
+        "mlflow.pyfunc.spark_model_cache.SparkModelCache.add_local_model", return_value="archive"
+    ), mock.patch(
+        "mlflow.pyfunc.spark_model_cache.SparkModelCache.get_or_load", return_value=model
+    ) as get_or_load_mock:
+        udf = spark_udf(mock.Mock(), model_path, DoubleType(), max_records_per_batch=2)
+        batches = [
+            (pd.Series([1.0, 2.0, 3.0]), pd.Series([1.0, 1.0, 1.0])),
+            (pd.Series([4.0]), pd.Series([0.0])),
+        ]
+        predictions = list(udf.__wrapped__(iter(batches)))
+    get_or_load_mock.assert_called_once_with("archive")
+    assert model._model_impl.python_model.batch_sizes == [2, 1, 1]
+    assert pd.concat(predictions).tolist() == [2.0, 3.0, 4.0, 4.0]
+
+
+def test_spark_udf_rejects_invalid_batch_sizes(model_path):
+    with pytest.raises(MlflowException, match="Invalid max_records_per_batch"):
+        spark_udf(mock.Mock(), model_path, DoubleType(), max_records_per_batch=0)
+
+
+@pytest.fixture
+def executor_model_cache(tmpdir, monkeypatch):
+    """
+    Simulate the model cache of a Python worker of an executor, whose SparkFiles are stored in
+    ``tmpdir``.
+    """
+    monkeypatch.setenv("MLFLOW_SPARK_MODEL_CACHE_MAX_MODELS", "1")
+    spark_files = tmpdir.mkdir("spark_files").strpath
+    with mock.patch.object(SparkModelCache, "_cache", None), mock.patch.dict(
+        SparkModelCache._archives, clear=True
+    ), mock.patch.dict(SparkModelCache._extraction_locks, clear=True), mock.patch(
+        "mlflow.pyfunc.spark_model_cache.SparkFiles.getRootDirectory", return_value=spark_files
+    ), mock.patch(
+        "mlflow.pyfunc.spark_model_cache.SparkFiles.get",
+        side_effect=lambda name: os.path.join(spark_files, name),
+    ):
+        yield spark_files
+
+
+def add_models(tmpdir, spark_files, n):
+    spark = mock.Mock()
+    spark.sparkContext.addFile.side_effect = lambda path: shutil.copy(path, spark_files)
+    archive_paths = []
+    for i in range(n):
+        model_path = tmpdir.join("model-{}".format(i)).strpath
+        mlflow.pyfunc.save_model(
+            path=model_path, python_model=BatchRecordingModel(), pip_requirements=[]
+        )
+        # Make the contents of the models distinct
+        with open(os.path.join(model_path, "id.txt"), "w") as f:
+            f.write(str(i))
+        archive_paths.append(SparkModelCache.add_local_model(spark, model_path))
+    return archive_paths
+
+
+def test_model_cache_evicts_models_and_deletes_their_directories(tmpdir, executor_model_cache):
+    archive_a, archive_b = add_models(tmpdir, executor_model_cache, 2)
+    model_a = SparkModelCache.get_or_load(archive_a)
+    assert SparkModelCache.get_or_load(archive_a) is model_a
+    path_a = SparkModelCache._get_extraction_path(archive_a)
+    assert os.path.isdir(path_a)
+
+    SparkModelCache.get_or_load(archive_b)
+    assert not os.path.exists(path_a)
+    assert os.path.isdir(SparkModelCache._get_extraction_path(archive_b))
+    # Only the lock files are left
+    name_a, name_b = [os.path.basename(p).replace(".zip", "") for p in (archive_a, archive_b)]
+    assert set(os.listdir(SparkModelCache._get_extraction_root())) == {
+        name_a + ".lock",
+        name_b,
+        name_b + ".lock",
+    }
+
+    assert SparkModelCache.get_or_load(archive_a) is not model_a
+    stats = SparkModelCache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 2)
+
+
+def test_extracted_models_are_shared_by_python_workers(tmpdir, executor_model_cache):
+    archive_a, archive_b = add_models(tmpdir, executor_model_cache, 2)
+    SparkModelCache.get_or_load(archive_a)
+    path_a = SparkModelCache._get_extraction_path(archive_a)
+    # Another Python worker reuses the extracted model, and keeps it while the first one evicts it
+    with mock.patch.object(SparkModelCache, "_cache", None), mock.patch.dict(
+        SparkModelCache._extraction_locks, clear=True
+    ), mock.patch("mlflow.pyfunc.spark_model_cache.zipfile.ZipFile") as zip_mock:
+        SparkModelCache.get_or_load(archive_a)
+        other_worker_cache = SparkModelCache._cache
+        other_worker_locks = dict(SparkModelCache._extraction_locks)
+    zip_mock.assert_not_called()
+    SparkModelCache.get_or_load(archive_b)
+    assert os.path.isdir(path_a)
+    # The directory is deleted when the last worker evicts the model
+    with mock.patch.object(SparkModelCache, "_cache", other_worker_cache), mock.patch.dict(
+        SparkModelCache._extraction_locks, other_worker_locks, clear=True
+    ):
+        SparkModelCache.get_or_load(archive_b)
+    assert not os.path.exists(path_a)
+
+
+def test_models_evicted_while_their_archive_is_reloaded_keep_the_directory(
+    tmpdir, executor_model_cache
+):
+    (archive_a,) = add_models(tmpdir, executor_model_cache, 1)
+    path_a = SparkModelCache._get_extraction_path(archive_a)
+    # A request loads the archive again before the evicted model of the archive is released
+    evicted_model, _ = SparkModelCache._load(archive_a)
+    reloaded_model, _ = SparkModelCache._load(archive_a)
+    SparkModelCache._release(archive_a, evicted_model)
+    assert os.path.isdir(path_a)
+    assert list(SparkModelCache._extraction_locks) == [id(reloaded_model)]
+    SparkModelCache._release(archive_a, reloaded_model)
+    assert not os.path.exists(path_a)
+
+
+def test_spark_model_cache_does_not_import_the_scoring_server():
+    code = (
+        "import sys, mlflow.pyfunc.spark_model_cache; "
+        "assert 'mlflow.pyfunc.scoring_server' not in sys.modules"
+    )
+    subprocess.check_call([sys.executable, "-c", code])
+
+
+def test_model_cache_configuration_is_validated(monkeypatch):
+    monkeypatch.setenv("MLFLOW_SPARK_MODEL_CACHE_MAX_MODELS", "3")
+    monkeypatch.setenv("MLFLOW_SPARK_MODEL_CACHE_MAX_SIZE_MB", "0.5")
+    assert SparkModelCache._get_cache_config() == (3, 512 * 1024)
+    monkeypatch.setenv("MLFLOW_SPARK_MODEL_CACHE_MAX_MODELS", "none")
+    with pytest.raises(MlflowException, match="Invalid Spark model cache configuration"):
+        SparkModelCache._get_cache_config()
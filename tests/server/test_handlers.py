@@ -6,7 +6,16 @@ from unittest import mock
 
 import os
 import mlflow
-from mlflow.entities import ViewType
+from mlflow.entities import (
+    ViewType,
+    Run,
+    RunInfo,
+    RunData,
+    RunStatus,
+    LifecycleStage,
+    Metric,
+    RunAggregationGroup,
+)
 from mlflow.entities.model_registry import (
     RegisteredModel,
     ModelVersion,
@@ -16,10 +25,15 @@ from mlflow.entities.model_registry import (
 from mlflow.exceptions import MlflowException
 from mlflow.protos.databricks_pb2 import INTERNAL_ERROR, INVALID_PARAMETER_VALUE, ErrorCode
 from mlflow.server.handlers import (
+    _compute_file_etag,
     get_endpoints,
     _create_experiment,
     _get_request_message,
     _search_runs,
+    _get_runs,
+    _aggregate_runs,
+    _log_metric,
+    _list_experiments,
     _log_batch,
     catch_mlflow_exception,
     _create_registered_model,
@@ -42,9 +56,17 @@ from mlflow.server.handlers import (
     _set_model_version_tag,
     _delete_model_version_tag,
 )
-from mlflow.server import BACKEND_STORE_URI_ENV_VAR, app
+from mlflow.server import BACKEND_STORE_URI_ENV_VAR, app, handlers
 from mlflow.store.entities.paged_list import PagedList
-from mlflow.protos.service_pb2 import CreateExperiment, SearchRuns
+from mlflow.protos.service_pb2 import (
+    CreateExperiment,
+    SearchRuns,
+    GetRuns,
+    AggregateRuns,
+    LogMetric,
+    ListExperiments,
+)
+from mlflow.server.request_coalescer import RequestCoalescer
 from mlflow.protos.model_registry_pb2 import (
     CreateRegisteredModel,
     UpdateRegisteredModel,
@@ -189,6 +211,125 @@ def test_search_runs_default_view_type(mock_get_request_message, mock_tracking_s
     assert args[2] == ViewType.ACTIVE_ONLY
 
 
+@pytest.fixture()
+def search_coalescer():
+    coalescer = RequestCoalescer(ttl_seconds=60)
+    with mock.patch("mlflow.server.handlers._get_search_coalescer", return_value=coalescer):
+        yield coalescer
+
+
+def test_search_runs_results_are_cached_and_invalidated_by_run_writes(
+    mock_get_request_message, mock_tracking_store, search_coalescer
+):
+    mock_tracking_store.search_runs.return_value = PagedList([_create_run_entity("run1")], None)
+    mock_get_request_message.return_value = SearchRuns(experiment_ids=["0"], filter="")
+    _search_runs()
+    _search_runs()
+    assert mock_tracking_store.search_runs.call_count == 1
+
+    mock_get_request_message.return_value = LogMetric(run_id="run1", key="m", value=1.0)
+    _log_metric()
+    mock_get_request_message.return_value = SearchRuns(experiment_ids=["0"], filter="")
+    _search_runs()
+    assert mock_tracking_store.search_runs.call_count == 2
+
+
+def test_writes_to_runs_unknown_to_the_worker_only_invalidate_their_experiment(
+    mock_get_request_message, mock_tracking_store, search_coalescer
+):
+    mock_tracking_store.search_runs.return_value = PagedList([], None)
+    mock_tracking_store.get_run.return_value = _create_run_entity("other-worker-run")
+    with mock.patch.dict(handlers._run_experiment_ids, clear=True):
+        for experiment_id in ["0", "1"]:
+            mock_get_request_message.return_value = SearchRuns(experiment_ids=[experiment_id])
+            _search_runs()
+        assert mock_tracking_store.search_runs.call_count == 2
+
+        # The run of experiment 0 was created by another server worker
+        for _ in range(2):
+            mock_get_request_message.return_value = LogMetric(
+                run_id="other-worker-run", key="m", value=1.0
+            )
+            _log_metric()
+        # The experiment of the run is looked up once
+        mock_tracking_store.get_run.assert_called_once_with("other-worker-run")
+        for experiment_id in ["0", "1"]:
+            mock_get_request_message.return_value = SearchRuns(experiment_ids=[experiment_id])
+            _search_runs()
+        assert mock_tracking_store.search_runs.call_count == 3
+
+
+def test_list_experiments_results_are_invalidated_by_experiment_creation(
+    mock_get_request_message, mock_tracking_store, search_coalescer
+):
+    mock_tracking_store.list_experiments.return_value = PagedList([], None)
+    mock_get_request_message.return_value = ListExperiments()
+    _list_experiments()
+    _list_experiments()
+    assert mock_tracking_store.list_experiments.call_count == 1
+
+    mock_tracking_store.create_experiment.return_value = "1"
+    mock_get_request_message.return_value = CreateExperiment(name="new")
+    _create_experiment()
+    mock_get_request_message.return_value = ListExperiments()
+    _list_experiments()
+    assert mock_tracking_store.list_experiments.call_count == 2
+
+
+def test_get_runs(mock_get_request_message, mock_tracking_store):
+    mock_get_request_message.return_value = GetRuns(run_ids=["run2", "run1"])
+    mock_tracking_store.get_runs.return_value = [
+        _create_run_entity("run2"),
+        _create_run_entity("run1"),
+    ]
+    response = _get_runs()
+    mock_tracking_store.get_runs.assert_called_once_with(["run2", "run1"])
+    json_response = json.loads(response.get_data())
+    assert [run["info"]["run_id"] for run in json_response["runs"]] == ["run2", "run1"]
+
+
+def test_get_runs_rejects_too_many_run_ids(mock_get_request_message, mock_tracking_store):
+    mock_get_request_message.return_value = GetRuns(run_ids=["run"] * 1001)
+    response = _get_runs()
+    assert response.status_code == 400
+    json_response = json.loads(response.get_data())
+    assert json_response["error_code"] == ErrorCode.Name(INVALID_PARAMETER_VALUE)
+    mock_tracking_store.get_runs.assert_not_called()
+
+
+def test_aggregate_runs(mock_get_request_message, mock_tracking_store):
+    mock_get_request_message.return_value = AggregateRuns(
+        experiment_ids=["0"],
+        filter="metrics.accuracy > 0.5",
+        group_by=["params.model_type"],
+        aggregations=["count(*)", "avg(metrics.accuracy)"],
+    )
+    mock_tracking_store.aggregate_runs.return_value = [
+        RunAggregationGroup(
+            [("params.model_type", "cnn")], [("count(*)", 2.0), ("avg(metrics.accuracy)", None)]
+        )
+    ]
+    response = _aggregate_runs()
+    mock_tracking_store.aggregate_runs.assert_called_once_with(
+        ["0"],
+        "metrics.accuracy > 0.5",
+        ViewType.ACTIVE_ONLY,
+        ["params.model_type"],
+        ["count(*)", "avg(metrics.accuracy)"],
+    )
+    assert json.loads(response.get_data()) == {
+        "groups": [
+            {
+                "group_by": [{"key": "params.model_type", "value": "cnn"}],
+                "aggregations": [
+                    {"aggregation": "count(*)", "value": 2.0},
+                    {"aggregation": "avg(metrics.accuracy)"},
+                ],
+            }
+        ]
+    }
+
+
 def test_log_batch_api_req(mock_get_request_json):
     mock_get_request_json.return_value = "a" * (MAX_BATCH_LOG_REQUEST_SIZE + 1)
     response = _log_batch()
@@ -201,6 +342,106 @@ def test_log_batch_api_req(mock_get_request_json):
     )
 
 
+def _create_run_entity(run_id="abc", metric_value=1.0, artifact_uri=None):
+    run_info = RunInfo(
+        run_uuid=run_id,
+        run_id=run_id,
+        experiment_id="0",
+        user_id="user",
+        status=RunStatus.to_string(RunStatus.FINISHED),
+        start_time=0,
+        end_time=1,
+        lifecycle_stage=LifecycleStage.ACTIVE,
+        artifact_uri=artifact_uri,
+    )
+    return Run(run_info, RunData(metrics=[Metric("m", metric_value, 0, 0)]))
+
+
+def test_get_run_returns_etag_and_honors_if_none_match(mock_tracking_store):
+    mock_tracking_store.get_run.return_value = _create_run_entity()
+    with app.test_client() as c:
+        response = c.get("/api/2.0/mlflow/runs/get", query_string={"run_id": "abc"})
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert json.loads(response.get_data())["run"]["info"]["run_id"] == "abc"
+
+        response = c.get(
+            "/api/2.0/mlflow/runs/get",
+            query_string={"run_id": "abc"},
+            headers={"If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert response.get_data() == b""
+
+        # A modified run produces a different ETag, so stale validators yield a full response
+        mock_tracking_store.get_run.return_value = _create_run_entity(metric_value=2.0)
+        response = c.get(
+            "/api/2.0/mlflow/runs/get",
+            query_string={"run_id": "abc"},
+            headers={"If-None-Match": etag},
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+
+def test_get_metric_history_honors_if_none_match(mock_tracking_store):
+    mock_tracking_store.get_metric_history.return_value = [Metric("m", 1.0, 0, 0)]
+    with app.test_client() as c:
+        query = {"run_id": "abc", "metric_key": "m"}
+        response = c.get("/api/2.0/mlflow/metrics/get-history", query_string=query)
+        assert response.status_code == 200
+        response = c.get(
+            "/api/2.0/mlflow/metrics/get-history",
+            query_string=query,
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+        assert response.status_code == 304
+
+
+def test_get_artifact_honors_if_none_match(mock_tracking_store, tmpdir):
+    artifact_dir = tmpdir.mkdir("artifacts")
+    artifact_dir.join("a.txt").write("hello")
+    mock_tracking_store.get_run.return_value = _create_run_entity(artifact_uri=str(artifact_dir))
+    with app.test_client() as c:
+        query = {"run_id": "abc", "path": "a.txt"}
+        response = c.get("/get-artifact", query_string=query)
+        assert response.status_code == 200
+        assert response.get_data() == b"hello"
+        etag = response.headers["ETag"]
+        response.close()
+
+        response = c.get("/get-artifact", query_string=query, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        response.close()
+
+        artifact_dir.join("a.txt").write("goodbye")
+        response = c.get("/get-artifact", query_string=query, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.get_data() == b"goodbye"
+        response.close()
+
+
+def test_artifact_etags_are_computed_once_per_file_version(mock_tracking_store, tmpdir):
+    artifact_dir = tmpdir.mkdir("artifacts")
+    artifact_file = artifact_dir.join("model.bin")
+    artifact_file.write("weights")
+    mock_tracking_store.get_run.return_value = _create_run_entity(artifact_uri=str(artifact_dir))
+    query = {"run_id": "abc", "path": "model.bin"}
+    with app.test_client() as c, mock.patch(
+        "mlflow.server.handlers._compute_file_etag", wraps=_compute_file_etag
+    ) as compute_mock:
+        etag = c.get("/get-artifact", query_string=query).headers["ETag"]
+        for _ in range(3):
+            response = c.get("/get-artifact", query_string=query, headers={"If-None-Match": etag})
+            assert response.status_code == 304
+        assert compute_mock.call_count == 1
+        artifact_file.write("new weights")
+        os.utime(artifact_file.strpath, (0, 0))
+        response = c.get("/get-artifact", query_string=query, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert compute_mock.call_count == 2
+
+
 def test_catch_mlflow_exception():
     @catch_mlflow_exception
     def test_handler():
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+from flask import Flask, Response
+from prometheus_client import REGISTRY
+
+from mlflow.entities import ExperimentTag
+from mlflow.server.prometheus_exporter import activate_prometheus_exporter, instrument_store
+from mlflow.store.tracking.file_store import FileStore
+from mlflow.store.tracking.sqlalchemy_store import SqlAlchemyStore
+from mlflow.utils.file_utils import path_to_local_sqlite_uri
+
+
+def _sample_value(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.fixture
+def app(tmpdir, monkeypatch):
+    monkeypatch.setenv("prometheus_multiproc_dir", tmpdir.mkdir("metrics").strpath)
+    app = Flask(__name__)
+
+    @app.route("/api/2.0/mlflow/runs/get")
+    def _get_run():
+        return Response("{}", mimetype="application/json")
+
+    @app.route("/get-artifact")
+    def serve_artifacts():
+        return Response(b"x" * 1024)
+
+    activate_prometheus_exporter(app)
+    return app
+
+
+def test_handler_latency_and_payload_sizes_are_recorded(app):
+    latency_labels = {"handler": "_get_run", "method": "GET", "status": "200"}
+    latency_before = _sample_value("mlflow_handler_latency_seconds_count", latency_labels)
+    size_before = _sample_value("mlflow_response_payload_size_bytes_sum", {"handler": "_get_run"})
+
+    with app.test_client() as c:
+        assert c.get("/api/2.0/mlflow/runs/get").status_code == 200
+        assert c.get("/unknown-route").status_code == 404
+
+    assert _sample_value("mlflow_handler_latency_seconds_count", latency_labels) == (
+        latency_before + 1
+    )
+    assert _sample_value("mlflow_response_payload_size_bytes_sum", {"handler": "_get_run"}) == (
+        size_before + 2
+    )
+
+
+def test_artifact_bytes_served_are_recorded(app):
+    labels = {"handler": "serve_artifacts"}
+    bytes_before = _sample_value("mlflow_artifact_bytes_served_total", labels)
+    throughput_before = _sample_value("mlflow_artifact_throughput_bytes_per_second_count", labels)
+
+    with app.test_client() as c:
+        assert c.get("/get-artifact").status_code == 200
+
+    assert _sample_value("mlflow_artifact_bytes_served_total", labels) == bytes_before + 1024
+    assert _sample_value("mlflow_artifact_throughput_bytes_per_second_count", labels) == (
+        throughput_before + 1
+    )
+
+
+def test_instrument_file_store_records_method_latency(tmpdir):
+    store = instrument_store(FileStore(tmpdir.join("mlruns").strpath), "tracking")
+    labels = {"store": "tracking", "backend": "FileStore", "method": "get_experiment"}
+    success_before = _sample_value(
+        "mlflow_store_method_latency_seconds_count", dict(labels, status="success")
+    )
+    error_before = _sample_value(
+        "mlflow_store_method_latency_seconds_count", dict(labels, status="error")
+    )
+
+    store.get_experiment("0")
+    with pytest.raises(Exception):
+        store.get_experiment("does-not-exist")
+
+    assert _sample_value(
+        "mlflow_store_method_latency_seconds_count", dict(labels, status="success")
+    ) == (success_before + 1)
+    assert _sample_value(
+        "mlflow_store_method_latency_seconds_count", dict(labels, status="error")
+    ) == (error_before + 1)
+
+
+def test_instrument_sqlalchemy_store_records_pool_metrics(tmpdir):
+    db_uri = path_to_local_sqlite_uri(os.path.join(tmpdir.strpath, "mlruns.db"))
+    store = instrument_store(SqlAlchemyStore(db_uri, tmpdir.join("artifacts").strpath), "tracking")
+    # Instrumenting a store that shares an already instrumented engine must not double count
+    instrument_store(SqlAlchemyStore(db_uri, tmpdir.join("artifacts").strpath), "tracking")
+    acquire_before = _sample_value(
+        "mlflow_db_pool_connection_acquire_seconds_count", {"store": "tracking"}
+    )
+    store.set_experiment_tag("0", ExperimentTag("key", "value"))
+    acquire_after = _sample_value(
+        "mlflow_db_pool_connection_acquire_seconds_count", {"store": "tracking"}
+    )
+    assert acquire_after == acquire_before + 1
@@ -0,0 +1,150 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from mlflow.server.request_coalescer import RequestCoalescer, ALL_TAGS
+
+
+def _blocking_func(release_event, started_event, result="result"):
+    calls = []
+
+    def func():
+        calls.append(1)
+        started_event.set()
+        release_event.wait(timeout=10)
+        return result
+
+    return func, calls
+
+
+def test_concurrent_identical_requests_share_one_execution():
+    coalescer = RequestCoalescer()
+    release, started = threading.Event(), threading.Event()
+    func, calls = _blocking_func(release, started)
+    results = []
+
+    def call():
+        results.append(coalescer.execute("key", func))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(timeout=10)
+    followers = [threading.Thread(target=call) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(timeout=10)
+
+    assert len(calls) == 1
+    assert results == ["result"] * 6
+
+
+def test_exceptions_are_propagated_to_all_waiters_and_not_cached():
+    coalescer = RequestCoalescer(ttl_seconds=60)
+
+    def fail():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError, match="failed"):
+        coalescer.execute("key", fail)
+    assert coalescer.execute("key", lambda: "recovered") == "recovered"
+
+
+def test_results_are_not_cached_without_ttl():
+    coalescer = RequestCoalescer()
+    func = mock.Mock(return_value="result")
+    coalescer.execute("key", func)
+    coalescer.execute("key", func)
+    assert func.call_count == 2
+
+
+def test_results_are_cached_until_ttl_expires():
+    coalescer = RequestCoalescer(ttl_seconds=10)
+    func = mock.Mock(return_value="result")
+    with mock.patch("time.time", return_value=100):
+        coalescer.execute("key", func)
+        coalescer.execute("key", func)
+    assert func.call_count == 1
+    with mock.patch("time.time", return_value=111):
+        coalescer.execute("key", func)
+    assert func.call_count == 2
+
+
+def test_invalidate_discards_results_with_matching_tags():
+    coalescer = RequestCoalescer(ttl_seconds=60)
+    func_a = mock.Mock(return_value="a")
+    func_b = mock.Mock(return_value="b")
+    coalescer.execute("a", func_a, tags=["exp-1"])
+    coalescer.execute("b", func_b, tags=["exp-2"])
+
+    coalescer.invalidate(["exp-1"])
+    coalescer.execute("a", func_a, tags=["exp-1"])
+    coalescer.execute("b", func_b, tags=["exp-2"])
+    assert func_a.call_count == 2
+    assert func_b.call_count == 1
+
+    coalescer.invalidate(ALL_TAGS)
+    coalescer.execute("b", func_b, tags=["exp-2"])
+    assert func_b.call_count == 2
+
+
+def test_results_racing_with_invalidation_are_not_cached():
+    coalescer = RequestCoalescer(ttl_seconds=60)
+
+    def invalidating_func():
+        coalescer.invalidate(["exp-1"])
+        return "stale"
+
+    assert coalescer.execute("key", invalidating_func, tags=["exp-1"]) == "stale"
+    assert coalescer.execute("key", lambda: "fresh", tags=["exp-1"]) == "fresh"
+
+
+@pytest.mark.parametrize("invalidated_tags", [["exp-1"], ALL_TAGS])
+def test_requests_after_a_write_do_not_join_a_read_started_before_it(invalidated_tags):
+    coalescer = RequestCoalescer(ttl_seconds=60)
+    release, started = threading.Event(), threading.Event()
+    slow_read, calls = _blocking_func(release, started, result="before write")
+    results = {}
+
+    def read_before_write():
+        results["before"] = coalescer.execute("key", slow_read, tags=["exp-1"])
+
+    reader = threading.Thread(target=read_before_write)
+    reader.start()
+    assert started.wait(timeout=10)
+    # A write lands while the slow read is in flight
+    coalescer.invalidate(invalidated_tags)
+    assert coalescer.execute("key", lambda: "after write", tags=["exp-1"]) == "after write"
+    release.set()
+    reader.join(timeout=10)
+
+    assert results["before"] == "before write"
+    assert len(calls) == 1
+    # Neither the detached read nor its completion replaced the fresh result
+    assert coalescer.execute("key", lambda: "other", tags=["exp-1"]) == "after write"
+
+
+def test_invalidation_only_detaches_in_flight_requests_with_matching_tags():
+    coalescer = RequestCoalescer()
+    release, started = threading.Event(), threading.Event()
+    func, _ = _blocking_func(release, started)
+    thread = threading.Thread(target=coalescer.execute, args=("key", func, ["exp-2"]))
+    thread.start()
+    assert started.wait(timeout=10)
+    coalescer.invalidate(["exp-1"])
+    assert "key" in coalescer._in_flight
+    coalescer.invalidate(["exp-2"])
+    assert "key" not in coalescer._in_flight
+    release.set()
+    thread.join(timeout=10)
+
+
+def test_least_recently_used_results_are_evicted():
+    coalescer = RequestCoalescer(ttl_seconds=60, max_entries=1)
+    func = mock.Mock(return_value="result")
+    coalescer.execute("a", func)
+    coalescer.execute("b", func)
+    coalescer.execute("a", func)
+    assert func.call_count == 3
@@ -1,8 +1,12 @@
+import os
 import posixpath
+import threading
+import time
 from unittest import mock
 import pytest
 
 from mlflow.entities import FileInfo
+from mlflow.exceptions import MlflowException
 from mlflow.store.artifact.artifact_repo import ArtifactRepository
 from mlflow.utils.file_utils import TempDir
 
@@ -67,3 +71,199 @@ def test_download_artifacts_handles_empty_dir(base_uri, download_arg, list_retur
         repo = ArtifactRepositoryImpl(base_uri)
         with TempDir() as tmp:
             repo.download_artifacts(download_arg, dst_path=tmp.path())
+
+
+def _create_local_dir(tmpdir, num_files, file_size=1):
+    local_dir = tmpdir.mkdir("local")
+    local_dir.mkdir("subdir")
+    for i in range(num_files):
+        parent = local_dir if i % 2 == 0 else local_dir.join("subdir")
+        parent.join("file%d" % i).write("x" * file_size)
+    return local_dir
+
+
+def test_upload_files_concurrently_uploads_every_file(tmpdir, monkeypatch):
+    monkeypatch.setenv("MLFLOW_ARTIFACT_UPLOAD_MAX_WORKERS", "4")
+    local_dir = _create_local_dir(tmpdir, num_files=20)
+    uploaded = {}
+    lock = threading.Lock()
+
+    def upload_file(local_file, artifact_file_path):
+        with lock:
+            uploaded[artifact_file_path] = local_file
+
+    ArtifactRepositoryImpl("uri")._upload_files_concurrently(local_dir.strpath, upload_file)
+    expected = {}
+    for i in range(20):
+        artifact_file_path = "file%d" % i if i % 2 == 0 else "subdir/file%d" % i
+        expected[artifact_file_path] = local_dir.join(artifact_file_path).strpath
+    assert uploaded == expected
+
+
+def test_upload_files_concurrently_bounds_inflight_bytes(tmpdir, monkeypatch):
+    monkeypatch.setenv("MLFLOW_ARTIFACT_UPLOAD_MAX_WORKERS", "8")
+    monkeypatch.setenv("MLFLOW_ARTIFACT_UPLOAD_MAX_INFLIGHT_BYTES", "250")
+    local_dir = _create_local_dir(tmpdir, num_files=16, file_size=100)
+    inflight_bytes = [0]
+    max_inflight_bytes = [0]
+    lock = threading.Lock()
+
+    def upload_file(local_file, _):
+        with lock:
+            inflight_bytes[0] += 100
+            max_inflight_bytes[0] = max(max_inflight_bytes[0], inflight_bytes[0])
+        time.sleep(0.01)
+        with lock:
+            inflight_bytes[0] -= 100
+
+    ArtifactRepositoryImpl("uri")._upload_files_concurrently(local_dir.strpath, upload_file)
+    assert max_inflight_bytes[0] == 200
+
+
+def test_upload_files_concurrently_uploads_files_larger_than_inflight_limit(tmpdir, monkeypatch):
+    monkeypatch.setenv("MLFLOW_ARTIFACT_UPLOAD_MAX_INFLIGHT_BYTES", "10")
+    local_dir = _create_local_dir(tmpdir, num_files=4, file_size=100)
+    upload_file = mock.Mock()
+    ArtifactRepositoryImpl("uri")._upload_files_concurrently(local_dir.strpath, upload_file)
+    assert upload_file.call_count == 4
+
+
+def test_upload_files_concurrently_aggregates_failures(tmpdir):
+    local_dir = _create_local_dir(tmpdir, num_files=4)
+    uploaded = []
+
+    def upload_file(local_file, artifact_file_path):
+        if artifact_file_path.startswith("subdir"):
+            raise Exception("upload failed: " + artifact_file_path)
+        uploaded.append(artifact_file_path)
+
+    with pytest.raises(MlflowException) as e:
+        ArtifactRepositoryImpl("uri")._upload_files_concurrently(local_dir.strpath, upload_file)
+    assert "upload failed: subdir/file1" in e.value.message
+    assert "upload failed: subdir/file3" in e.value.message
+    assert sorted(uploaded) == ["file0", "file2"]
+
+
+class _InMemoryArtifactRepository(ArtifactRepositoryImpl):
+    """
+    Artifact repository serving the specified files and empty directories, whose downloads
+    block until `release_event` is set.
+    """
+
+    def __init__(self, files, empty_dirs=(), release_event=None):
+        super().__init__("memory://")
+        self.files = files
+        self.empty_dirs = empty_dirs
+        self.release_event = release_event
+        self.concurrent_downloads = 0
+        self.max_concurrent_downloads = 0
+        self.lock = threading.Lock()
+
+    def list_artifacts(self, path):
+        prefix = path.rstrip("/") + "/" if path else ""
+        children = {}
+        for artifact_path in list(self.files) + list(self.empty_dirs):
+            if artifact_path.startswith(prefix):
+                name = artifact_path[len(prefix) :].split("/")[0]
+                child_path = prefix + name
+                children[child_path] = FileInfo(child_path, child_path not in self.files, 1)
+        return sorted(children.values(), key=lambda file_info: file_info.path)
+
+    def _download_file(self, remote_file_path, local_path):
+        with self.lock:
+            self.concurrent_downloads += 1
+            self.max_concurrent_downloads = max(
+                self.max_concurrent_downloads, self.concurrent_downloads
+            )
+        try:
+            if self.release_event is not None:
+                self.release_event.wait(timeout=0.2)
+            if self.files[remote_file_path] is None:
+                raise Exception("Failed to download %s" % remote_file_path)
+            with open(local_path, "w") as f:
+                f.write(self.files[remote_file_path])
+        finally:
+            with self.lock:
+                self.concurrent_downloads -= 1
+
+
+def test_download_artifacts_downloads_directory_files_concurrently(tmpdir, monkeypatch):
+    monkeypatch.setenv("MLFLOW_ARTIFACT_DOWNLOAD_MAX_WORKERS", "4")
+    files = {"model/file%d" % i: str(i) for i in range(4)}
+    files.update({"model/sub/dir/file%d" % i: str(i) for i in range(4, 8)})
+    repo = _InMemoryArtifactRepository(
+        files, empty_dirs=["model/empty/"], release_event=threading.Event()
+    )
+
+    local_path = repo.download_artifacts("model", dst_path=tmpdir.strpath)
+
+    assert local_path == tmpdir.join("model").strpath
+    assert repo.max_concurrent_downloads == 4
+    for artifact_path, contents in files.items():
+        assert tmpdir.join(artifact_path).read() == contents
+    assert tmpdir.join("model", "empty").check(dir=1)
+
+
+def test_download_artifacts_preserves_file_destination_semantics(tmpdir):
+    repo = _InMemoryArtifactRepository({"model/sub/file": "contents"})
+    local_path = repo.download_artifacts("model/sub/file", dst_path=tmpdir.strpath)
+    assert local_path == tmpdir.join("model", "sub", "file").strpath
+    assert tmpdir.join("model", "sub", "file").read() == "contents"
+
+
+def test_download_artifacts_aggregates_failures(tmpdir):
+    repo = _InMemoryArtifactRepository({"dir/ok": "ok", "dir/bad1": None, "dir/bad2": None})
+    with pytest.raises(MlflowException) as exc:
+        repo.download_artifacts("dir", dst_path=tmpdir.strpath)
+    assert "dir/bad1" in exc.value.message
+    assert "dir/bad2" in exc.value.message
+    assert "dir/ok" not in exc.value.message
+
+
+def test_download_artifacts_is_sequential_for_repositories_without_concurrency_support(tmpdir):
+    repo = _InMemoryArtifactRepository({"dir/file%d" % i: "x" for i in range(4)})
+    repo._supports_concurrent_downloads = False
+    repo.download_artifacts("dir", dst_path=tmpdir.strpath)
+    assert repo.max_concurrent_downloads == 1
+
+
+def test_list_artifacts_recursive_walks_directories_by_default():
+    repo = _InMemoryArtifactRepository(
+        {"a": "1", "dir/b": "22", "dir/sub/c": "333"}, empty_dirs=["dir/empty/"]
+    )
+    assert [(f.path, f.is_dir) for f in repo.list_artifacts_recursive("dir")] == [
+        ("dir/b", False),
+        ("dir/sub/c", False),
+    ]
+    assert [f.path for f in repo.list_artifacts_recursive()] == ["a", "dir/b", "dir/sub/c"]
+    assert repo.list_artifacts_recursive("a") == []
+
+
+def test_open_downloads_file_to_temporary_directory_by_default():
+    repo = _InMemoryArtifactRepository({"dir/file": "contents"})
+    with repo.open("dir/file") as f:
+        local_path = f.name
+        assert f.read() == b"contents"
+        f.seek(3)
+        assert f.read(2) == b"te"
+    assert not os.path.exists(os.path.dirname(os.path.dirname(local_path)))
+
+
+def test_open_rejects_directories():
+    repo = _InMemoryArtifactRepository({"dir/file": "contents"})
+    with pytest.raises(MlflowException, match="is a directory"):
+        repo.open("dir")
+
+
+def test_upload_bytes_logs_staged_file_by_default():
+    repo = ArtifactRepositoryImpl("memory://")
+    uploaded = []
+
+    def log_artifact(local_file, artifact_path=None):
+        with open(local_file, "rb") as f:
+            uploaded.append((os.path.basename(local_file), artifact_path, f.read()))
+
+    repo.log_artifact = log_artifact
+    repo.upload_bytes(b"data", "file.json")
+    repo.upload_bytes(b"more data", "dir/sub/file.txt")
+    assert uploaded == [("file.json", None, b"data"), ("file.txt", "dir/sub", b"more data")]
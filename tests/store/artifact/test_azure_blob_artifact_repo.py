@@ -1,3 +1,4 @@
+import hashlib
 import os
 import posixpath
 import pytest
@@ -42,6 +43,22 @@ def mock_client():
         os.environ["AZURE_STORAGE_CONNECTION_STRING"] = old_conn_string
 
 
+def mock_blob_properties(properties, contents=b"hello world!"):
+    properties.size = len(contents)
+    properties.etag = "etag"
+    properties.content_settings.content_encoding = None
+    properties.content_settings.content_md5 = bytearray(hashlib.md5(contents).digest())
+
+
+def mock_blob_download(mock_client, contents=b"hello world!"):
+    container_client = mock_client.get_container_client()
+    mock_blob_properties(
+        container_client.get_blob_client.return_value.get_blob_properties.return_value, contents
+    )
+    mock_blob_properties(container_client.download_blob.return_value.properties, contents)
+    container_client.download_blob().readinto.side_effect = lambda f: f.write(contents)
+
+
 def test_artifact_uri_factory(mock_client):
     # pylint: disable=unused-argument
     # We pass in the mock_client here to clear Azure environment variables, but we don't use it;
@@ -123,6 +140,28 @@ def test_list_artifacts(mock_client, root_path):
     assert artifacts[1].file_size == 42
 
 
+def test_list_artifacts_recursive(mock_client):
+    repo = AzureBlobArtifactRepository(TEST_URI, mock_client)
+
+    blobs = []
+    for name, size in [("dir/nested/file2", 2), ("dir/", 0), ("dir/file1", 1)]:
+        blob_props = BlobProperties()
+        blob_props.size = size
+        blob_props.name = posixpath.join(TEST_ROOT_PATH, name)
+        blobs.append(blob_props)
+    mock_client.get_container_client().list_blobs.return_value = MockBlobList(blobs)
+
+    artifacts = repo.list_artifacts_recursive("dir")
+    mock_client.get_container_client().list_blobs.assert_called_once_with(
+        name_starts_with="some/path/dir/"
+    )
+    mock_client.get_container_client().walk_blobs.assert_not_called()
+    assert [(a.path, a.is_dir, a.file_size) for a in artifacts] == [
+        ("dir/file1", False, 1),
+        ("dir/nested/file2", False, 2),
+    ]
+
+
 def test_log_artifact(mock_client, tmpdir):
     repo = AzureBlobArtifactRepository(TEST_URI, mock_client)
 
@@ -176,19 +215,17 @@ def test_download_file_artifact(mock_client, tmpdir):
     repo = AzureBlobArtifactRepository(TEST_URI, mock_client)
 
     mock_client.get_container_client().walk_blobs.return_value = MockBlobList([])
+    mock_blob_download(mock_client)
 
-    def create_file(buffer):
-        local_path = os.path.basename(buffer.name)
-        f = tmpdir.join(local_path)
-        f.write("hello world!")
-
-    mock_client.get_container_client().download_blob().readinto.side_effect = create_file
-
-    repo.download_artifacts("test.txt")
-    assert os.path.exists(os.path.join(tmpdir.strpath, "test.txt"))
+    local_path = repo.download_artifacts("test.txt", tmpdir.strpath)
+    assert local_path == tmpdir.join("test.txt").strpath
+    assert open(local_path).read() == "hello world!"
+    assert os.listdir(tmpdir.strpath) == ["test.txt"]
+    # The properties of the blob are read from the download response
     mock_client.get_container_client().download_blob.assert_called_with(
-        posixpath.join(TEST_ROOT_PATH, "test.txt")
+        posixpath.join(TEST_ROOT_PATH, "test.txt"), offset=None
     )
+    mock_client.get_container_client().get_blob_client().get_blob_properties.assert_not_called()
 
 
 def test_download_directory_artifact_succeeds_when_artifact_root_is_not_blob_container_root(
@@ -222,17 +259,13 @@ def test_download_directory_artifact_succeeds_when_artifact_root_is_not_blob_con
         else:
             return MockBlobList([])
 
-    def create_file(buffer):
-        fname = os.path.basename(buffer.name)
-        f = tmpdir.join(fname)
-        f.write("hello world!")
-
     mock_client.get_container_client().walk_blobs.side_effect = get_mock_listing
-    mock_client.get_container_client().download_blob().readinto.side_effect = create_file
+    mock_client.get_container_client().list_blobs.side_effect = get_mock_listing
+    mock_blob_download(mock_client)
 
     # Ensure that the root directory can be downloaded successfully
-    repo.download_artifacts("")
-    # Ensure that the `mkfile` side effect copied all of the download artifacts into `tmpdir`
+    repo.download_artifacts("", tmpdir.strpath)
+    # Ensure that all of the artifacts were downloaded into `tmpdir`
     dir_contents = os.listdir(tmpdir.strpath)
     assert file_path_1 in dir_contents
     assert file_path_2 in dir_contents
@@ -273,20 +306,22 @@ def test_download_directory_artifact_succeeds_when_artifact_root_is_blob_contain
         else:
             return MockBlobList([])
 
-    def create_file(buffer):
-        fname = os.path.basename(buffer.name)
-        f = tmpdir.join(fname)
-        f.write("hello world!")
+    def get_mock_recursive_listing(*args, **kwargs):
+        # pylint: disable=unused-argument
+        if posixpath.abspath(kwargs["name_starts_with"]) == "/":
+            return MockBlobList([blob_props_1, blob_props_2])
+        else:
+            return get_mock_listing(*args, **kwargs)
 
     mock_client.get_container_client().walk_blobs.side_effect = get_mock_listing
-    mock_client.get_container_client().download_blob().readinto.side_effect = create_file
+    mock_client.get_container_client().list_blobs.side_effect = get_mock_recursive_listing
+    mock_blob_download(mock_client)
 
     # Ensure that the root directory can be downloaded successfully
-    repo.download_artifacts("")
-    # Ensure that the `mkfile` side effect copied all of the download artifacts into `tmpdir`
-    dir_contents = os.listdir(tmpdir.strpath)
-    assert file_path_1 in dir_contents
-    assert file_path_2 in dir_contents
+    repo.download_artifacts("", tmpdir.strpath)
+    # Ensure that all of the artifacts were downloaded into `tmpdir`
+    dir_contents = os.listdir(tmpdir.join(subdir_path).strpath)
+    assert sorted(dir_contents) == [file_path_1, file_path_2]
 
 
 def test_download_artifact_throws_value_error_when_listed_blobs_do_not_contain_artifact_root_prefix(
@@ -321,3 +356,106 @@ def test_download_artifact_throws_value_error_when_listed_blobs_do_not_contain_a
         repo.download_artifacts("")
 
     assert "Azure blob does not begin with the specified artifact path" in str(exc)
+
+
+def test_interrupted_download_is_resumed_and_verified(mock_client, tmpdir, monkeypatch):
+    monkeypatch.setattr("mlflow.utils.download_utils._RESUME_BACKOFF_SECONDS", 0)
+    repo = AzureBlobArtifactRepository(TEST_URI, mock_client)
+    mock_client.get_container_client().walk_blobs.return_value = MockBlobList([])
+    mock_blob_download(mock_client)
+    container_client = mock_client.get_container_client()
+
+    def download_blob(blob, offset, **kwargs):
+        # pylint: disable=unused-argument
+        downloader = mock.Mock()
+        mock_blob_properties(downloader.properties)
+        if offset is None:
+
+            def readinto(f):
+                f.write(b"hello ")
+                raise ConnectionError("Connection reset")
+
+            downloader.readinto.side_effect = readinto
+        else:
+            downloader.readinto.side_effect = lambda f: f.write(b"hello world!"[offset:])
+        return downloader
+
+    container_client.download_blob.reset_mock()
+    container_client.download_blob.side_effect = download_blob
+    local_path = repo.download_artifacts("test.txt", tmpdir.strpath)
+    assert open(local_path).read() == "hello world!"
+    assert [c[1]["offset"] for c in container_client.download_blob.call_args_list] == [None, 6]
+    # The resumed download is pinned to the ETag returned by the first response
+    assert container_client.download_blob.call_args[1]["etag"] == "etag"
+
+    # Corrupted downloads are rejected without leaving files behind
+    container_client.download_blob.side_effect = None
+    container_client.download_blob.return_value.readinto.side_effect = lambda f: f.write(
+        b"hello wOrld!"
+    )
+    with pytest.raises(MlflowException, match="md5 checksum"):
+        repo.download_artifacts("test.txt", tmpdir.mkdir("dst").strpath)
+    assert os.listdir(tmpdir.join("dst").strpath) == []
+
+
+def test_open_reads_byte_ranges(mock_client):
+    repo = AzureBlobArtifactRepository(TEST_URI, mock_client)
+    contents = b"0123456789"
+    container_client = mock_client.get_container_client.return_value
+    properties = container_client.get_blob_client.return_value.get_blob_properties.return_value
+    properties.size = len(contents)
+    properties.etag = "etag"
+
+    def download_blob(blob, offset, length, **kwargs):
+        # pylint: disable=unused-argument
+        downloader = mock.Mock()
+        downloader.readall.return_value = contents[offset : offset + length]
+        return downloader
+
+    container_client.download_blob.side_effect = download_blob
+
+    with repo.open("dir/file.bin") as f:
+        f.seek(6)
+        assert f.read() == b"6789"
+    container_client.get_blob_client.assert_called_with(
+        posixpath.join(TEST_ROOT_PATH, "dir/file.bin")
+    )
+    assert container_client.download_blob.call_args[1]["etag"] == "etag"
+
+
+def test_upload_bytes(mock_client):
+    repo = AzureBlobArtifactRepository(TEST_URI, mock_client)
+    repo.upload_bytes(b"{}", "dir/data.json")
+    mock_client.get_container_client().upload_blob.assert_called_once_with(
+        posixpath.join(TEST_ROOT_PATH, "dir/data.json"), b"{}", overwrite=True
+    )
+
+
+def test_delete_artifacts_deletes_blobs_in_batches(mock_client):
+    repo = AzureBlobArtifactRepository(TEST_URI, mock_client)
+    names = [posixpath.join(TEST_ROOT_PATH, "model", "part%d" % i) for i in range(300)]
+    blobs = []
+    for name in names + [posixpath.join(TEST_ROOT_PATH, "model-metadata")]:
+        blob_props = BlobProperties()
+        blob_props.name = name
+        blobs.append(blob_props)
+    container_client = mock_client.get_container_client.return_value
+    container_client.list_blobs.return_value = MockBlobList(blobs)
+
+    repo.delete_artifacts("model")
+
+    batches = [call[0] for call in container_client.delete_blobs.call_args_list]
+    assert sorted(len(batch) for batch in batches) == [44, 256]
+    assert sorted(name for batch in batches for name in batch) == sorted(names)
+
+
+def test_delete_artifacts_reports_failed_batches(mock_client):
+    repo = AzureBlobArtifactRepository(TEST_URI, mock_client)
+    blob_props = BlobProperties()
+    blob_props.name = posixpath.join(TEST_ROOT_PATH, "file")
+    container_client = mock_client.get_container_client.return_value
+    container_client.list_blobs.return_value = MockBlobList([blob_props])
+    container_client.delete_blobs.side_effect = Exception("Batch failed")
+
+    with pytest.raises(MlflowException, match="Batch failed"):
+        repo.delete_artifacts()
@@ -0,0 +1,87 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from mlflow.store.artifact.connection_pool import ConnectionPool
+
+
+def test_connections_are_reused():
+    create_connection = mock.Mock(side_effect=lambda: mock.Mock())
+    pool = ConnectionPool(create_connection, max_size=4)
+    with pool.connection() as first_connection:
+        pass
+    with pool.connection() as second_connection:
+        assert second_connection is first_connection
+    assert create_connection.call_count == 1
+
+
+def test_number_of_connections_is_bounded():
+    lock = threading.Lock()
+    active = []
+    max_active = []
+
+    def use_connection():
+        with pool.connection() as connection:
+            with lock:
+                assert connection not in active
+                active.append(connection)
+                max_active.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(connection)
+
+    pool = ConnectionPool(mock.Mock, max_size=3)
+    threads = [threading.Thread(target=use_connection) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(max_active) == 3
+    assert len(pool._idle_connections) == 3
+
+
+def test_connections_are_discarded_after_failures():
+    pool = ConnectionPool(mock.Mock, max_size=1)
+    with pytest.raises(ValueError):
+        with pool.connection() as failed_connection:
+            raise ValueError("Connection reset")
+    failed_connection.close.assert_called_once_with()
+    with pool.connection() as connection:
+        assert connection is not failed_connection
+
+
+def test_idle_connections_expire():
+    pool = ConnectionPool(mock.Mock, max_size=2, max_idle_seconds=60)
+    expired_connection = mock.Mock()
+    pool.add(expired_connection)
+    pool._idle_connections[0] = (expired_connection, time.time() - 61)
+
+    with pool.connection() as connection:
+        assert connection is not expired_connection
+    expired_connection.close.assert_called_once_with()
+
+    pool.close()
+    connection.close.assert_called_once_with()
+    assert pool._idle_connections == []
+
+
+def test_connections_are_only_discarded_after_connection_errors():
+    pool = ConnectionPool(
+        mock.Mock,
+        max_size=1,
+        is_connection_error=lambda connection, e: isinstance(e, ConnectionError),
+    )
+    with pytest.raises(FileNotFoundError):
+        with pool.connection() as first_connection:
+            raise FileNotFoundError("No such file")
+    first_connection.close.assert_not_called()
+    with pytest.raises(ConnectionError):
+        with pool.connection() as connection:
+            assert connection is first_connection
+            raise ConnectionError("Connection reset")
+    first_connection.close.assert_called_once_with()
+    with pool.connection() as connection:
+        assert connection is not first_connection
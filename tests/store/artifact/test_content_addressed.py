@@ -0,0 +1,244 @@
+import json
+import os
+from unittest import mock
+
+import pytest
+
+import mlflow
+from mlflow.exceptions import MlflowException
+from mlflow.store.artifact import content_addressed
+from mlflow.store.artifact.content_addressed import resolve_blob_pointers
+from mlflow.store.artifact.local_artifact_repo import LocalArtifactRepository
+from mlflow.store.artifact.s3_artifact_repo import S3ArtifactRepository
+from mlflow.tracking import MlflowClient
+
+from tests.helper_functions import set_boto_credentials  # pylint: disable=unused-import
+from tests.helper_functions import mock_s3_bucket  # pylint: disable=unused-import
+
+
+@pytest.fixture(autouse=True)
+def clear_existing_blobs():
+    content_addressed._existing_blobs.clear()
+    yield
+    content_addressed._existing_blobs.clear()
+
+
+@pytest.fixture
+def blob_dir(tmpdir, monkeypatch):
+    blob_dir = tmpdir.join("blobs")
+    monkeypatch.setenv("MLFLOW_ARTIFACT_DEDUP_URI", blob_dir.strpath)
+    return blob_dir
+
+
+@pytest.fixture
+def local_dir(tmpdir):
+    local_dir = tmpdir.mkdir("local")
+    local_dir.join("embeddings.bin").write("embeddings")
+    local_dir.mkdir("model").join("head.pkl").write("head")
+    return local_dir
+
+
+def _list_blobs(blob_dir):
+    return sorted(f for _, _, files in os.walk(blob_dir.strpath) for f in files)
+
+
+def test_log_artifacts_stores_identical_files_once(blob_dir, local_dir, tmpdir):
+    repo1 = LocalArtifactRepository(tmpdir.join("run1").strpath)
+    repo2 = LocalArtifactRepository(tmpdir.join("run2").strpath)
+
+    repo1.log_artifacts(local_dir.strpath)
+    local_dir.join("model", "head.pkl").write("new head")
+    with mock.patch.object(
+        LocalArtifactRepository,
+        "log_artifact",
+        autospec=True,
+        side_effect=LocalArtifactRepository.log_artifact,
+    ) as log_artifact_mock:
+        repo2.log_artifacts(local_dir.strpath)
+    # Only the modified file is uploaded to the blob area
+    assert log_artifact_mock.call_count == 1
+
+    assert len(_list_blobs(blob_dir)) == 3
+    # Pointers are named after the original file and its size
+    for repo, head_size in [(repo1, len("head")), (repo2, len("new head"))]:
+        assert sorted(f.path for f in repo.list_artifacts_recursive()) == [
+            "embeddings.bin.10.mlflow-blob",
+            "model/head.pkl.{}.mlflow-blob".format(head_size),
+        ]
+    with open(tmpdir.join("run1", "embeddings.bin.10.mlflow-blob").strpath) as f:
+        pointer = json.load(f)
+    assert pointer["size"] == len("embeddings")
+    # Pointers only record the hash of their blob, never its location
+    assert set(pointer) == {"version", "sha256", "size"}
+
+
+def test_pointers_are_resolved_by_downloads_and_listings(blob_dir, local_dir, tmpdir):
+    repo = LocalArtifactRepository(tmpdir.join("run").strpath)
+    repo.log_artifacts(local_dir.strpath, "artifacts")
+
+    # Listings resolve pointers from their names, without reading them
+    with mock.patch.object(LocalArtifactRepository, "_download_file") as download_file_mock:
+        listing = resolve_blob_pointers(repo.list_artifacts("artifacts"))
+    download_file_mock.assert_not_called()
+    assert [(f.path, f.is_dir, f.file_size) for f in listing] == [
+        ("artifacts/embeddings.bin", False, len("embeddings")),
+        ("artifacts/model", True, None),
+    ]
+
+    dst_dir = tmpdir.mkdir("dst")
+    local_path = repo.download_artifacts("artifacts", dst_dir.strpath)
+    assert open(os.path.join(local_path, "embeddings.bin")).read() == "embeddings"
+    assert open(os.path.join(local_path, "model", "head.pkl")).read() == "head"
+    assert not any(content_addressed.is_blob_pointer(f) for f in _list_blobs(dst_dir))
+
+    # Deduplicated files can be downloaded individually, and local artifacts made of pointers
+    # are downloaded rather than returned in place
+    for dst_path in [tmpdir.mkdir("dst2").strpath, None]:
+        local_file = repo.download_artifacts("artifacts/model/head.pkl", dst_path)
+        assert open(local_file).read() == "head"
+    local_path = repo.download_artifacts("artifacts")
+    assert open(os.path.join(local_path, "model", "head.pkl")).read() == "head"
+
+
+def test_repeated_downloads_of_local_pointers_reuse_the_same_file(blob_dir, local_dir, tmpdir):
+    # pylint: disable=unused-argument
+    repo = LocalArtifactRepository(tmpdir.join("run").strpath)
+    repo.log_artifacts(local_dir.strpath)
+    local_file = repo.download_artifacts("embeddings.bin")
+    assert os.path.basename(local_file) == "embeddings.bin"
+    assert open(local_file).read() == "embeddings"
+    with mock.patch.object(content_addressed, "download_blob") as download_blob_mock:
+        assert repo.download_artifacts("embeddings.bin") == local_file
+    download_blob_mock.assert_not_called()
+
+
+def _write_pointer(repo_dir, name, pointer):
+    repo_dir.ensure_dir()
+    pointer_name = "{}.{}{}".format(name, pointer["size"], content_addressed.BLOB_POINTER_SUFFIX)
+    repo_dir.join(pointer_name).write(json.dumps(pointer))
+
+
+def test_pointers_cannot_reference_blobs_outside_of_the_blob_area(blob_dir, local_dir, tmpdir):
+    repo = LocalArtifactRepository(tmpdir.join("run").strpath)
+    repo.log_artifacts(local_dir.strpath)
+    secret = tmpdir.join("secret")
+    secret.write("secret")
+    sha256 = content_addressed._compute_sha256(secret.strpath)
+    # The location recorded by a pointer is ignored, so the secret file is looked up in the blob
+    # area, where it does not exist
+    _write_pointer(
+        tmpdir.join("run"),
+        "secret",
+        {"version": 1, "sha256": sha256, "size": 6, "uri": secret.strpath},
+    )
+    with pytest.raises(Exception, match=sha256):
+        repo.download_artifacts("secret", tmpdir.mkdir("dst").strpath)
+    assert not os.path.exists(tmpdir.join("dst", "secret").strpath)
+
+    # Invalid pointers are ordinary files, which do not stand for the file they are named after
+    for bad_sha256 in ["../../secret", "0" * 63, "A" * 64, None]:
+        _write_pointer(
+            tmpdir.join("run"), "bad", {"version": 1, "sha256": bad_sha256, "size": 6},
+        )
+        dst_dir = tmpdir.mkdir("dst-{}".format(id(bad_sha256)))
+        with pytest.raises(Exception, match="bad"):
+            repo.download_artifacts("bad", dst_dir.strpath)
+        assert not os.path.exists(dst_dir.join("bad").strpath)
+
+
+def test_pointers_are_ignored_unless_the_blob_area_is_configured(
+    blob_dir, local_dir, tmpdir, monkeypatch
+):
+    # pylint: disable=unused-argument
+    repo = LocalArtifactRepository(tmpdir.join("run").strpath)
+    repo.log_artifacts(local_dir.strpath)
+    monkeypatch.delenv("MLFLOW_ARTIFACT_DEDUP_URI")
+
+    listing = resolve_blob_pointers(repo.list_artifacts())
+    assert [f.path for f in listing] == ["embeddings.bin.10.mlflow-blob", "model"]
+    dst_dir = tmpdir.mkdir("dst")
+    repo.download_artifacts("", dst_dir.strpath)
+    assert dst_dir.join("model", "head.pkl.4.mlflow-blob").check(file=True)
+    with pytest.raises(MlflowException, match="MLFLOW_ARTIFACT_DEDUP_URI"):
+        content_addressed.download_blob(
+            {"sha256": "0" * 64}, "embeddings.bin.10.mlflow-blob", dst_dir.join("e").strpath
+        )
+    # Artifacts are returned in place without looking for pointers
+    with mock.patch(
+        "mlflow.store.artifact.local_artifact_repo._contains_blob_pointers"
+    ) as contains_blob_pointers_mock:
+        assert repo.download_artifacts("") == tmpdir.join("run").strpath
+    contains_blob_pointers_mock.assert_not_called()
+
+
+@pytest.mark.parametrize("dedup", [True, False])
+def test_files_named_like_pointers_are_ordinary_files(tmpdir, monkeypatch, dedup):
+    if dedup:
+        monkeypatch.setenv("MLFLOW_ARTIFACT_DEDUP_URI", tmpdir.join("blobs").strpath)
+    else:
+        monkeypatch.delenv("MLFLOW_ARTIFACT_DEDUP_URI", raising=False)
+    run_dir = tmpdir.mkdir("run")
+    run_dir.join("notes.mlflow-blob").write("notes")
+    run_dir.join("data.5.mlflow-blob").write("not a pointer")
+    repo = LocalArtifactRepository(run_dir.strpath)
+
+    listing = resolve_blob_pointers(repo.list_artifacts())
+    # Only names with a size are pointers, which are only resolved if deduplication is configured
+    expected_paths = ["data" if dedup else "data.5.mlflow-blob", "notes.mlflow-blob"]
+    assert [f.path for f in listing] == expected_paths
+    dst_dir = tmpdir.mkdir("dst")
+    repo.download_artifacts("", dst_dir.strpath)
+    assert dst_dir.join("notes.mlflow-blob").read() == "notes"
+    assert dst_dir.join("data.5.mlflow-blob").read() == "not a pointer"
+    assert not dst_dir.join("data").exists()
+
+
+def test_missing_files_still_raise(blob_dir, tmpdir):
+    # pylint: disable=unused-argument
+    repo = LocalArtifactRepository(tmpdir.mkdir("run").strpath)
+    with pytest.raises(Exception):
+        repo.download_artifacts("missing", tmpdir.mkdir("dst").strpath)
+
+
+def test_blobs_with_mismatching_contents_are_rejected(blob_dir, local_dir, tmpdir):
+    repo = LocalArtifactRepository(tmpdir.join("run").strpath)
+    repo.log_artifacts(local_dir.strpath)
+    for root, _, files in os.walk(blob_dir.strpath):
+        for f in files:
+            with open(os.path.join(root, f), "w") as blob:
+                blob.write("corrupted")
+
+    with pytest.raises(MlflowException, match="do not match their hash"):
+        repo.download_artifacts("embeddings.bin", tmpdir.mkdir("dst").strpath)
+
+
+def test_client_list_artifacts_resolves_pointers(blob_dir, local_dir, tmpdir):
+    # pylint: disable=unused-argument
+    mlflow.set_tracking_uri(tmpdir.join("mlruns").strpath)
+    try:
+        with mlflow.start_run() as run:
+            mlflow.log_artifacts(local_dir.strpath)
+        listing = MlflowClient().list_artifacts(run.info.run_id)
+    finally:
+        mlflow.set_tracking_uri(None)
+    assert [(f.path, f.file_size) for f in listing] == [
+        ("embeddings.bin", len("embeddings")),
+        ("model", None),
+    ]
+
+
+def test_deduplicated_s3_artifacts(mock_s3_bucket, local_dir, tmpdir, monkeypatch):
+    bucket_uri = "s3://{}".format(mock_s3_bucket)
+    monkeypatch.setenv("MLFLOW_ARTIFACT_DEDUP_URI", bucket_uri + "/blobs")
+    repo1 = S3ArtifactRepository(bucket_uri + "/run1/artifacts")
+    repo2 = S3ArtifactRepository(bucket_uri + "/run2/artifacts")
+    repo1.log_artifacts(local_dir.strpath)
+    content_addressed._existing_blobs.clear()
+    repo2.log_artifacts(local_dir.strpath)
+
+    blobs = S3ArtifactRepository(bucket_uri + "/blobs").list_artifacts_recursive()
+    assert len(blobs) == 2
+
+    local_path = repo2.download_artifacts("", tmpdir.mkdir("dst").strpath)
+    assert open(os.path.join(local_path, "embeddings.bin")).read() == "embeddings"
+    assert open(os.path.join(local_path, "model", "head.pkl")).read() == "head"
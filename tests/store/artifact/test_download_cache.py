@@ -0,0 +1,227 @@
+import os
+import posixpath
+import threading
+from unittest import mock
+
+import pytest
+
+from mlflow.exceptions import MlflowException
+from mlflow.store.artifact.download_cache import (
+    DownloadCache,
+    get_download_cache,
+    get_download_cache_stats,
+)
+from mlflow.store.artifact.local_artifact_repo import LocalArtifactRepository
+from mlflow.store.artifact.s3_artifact_repo import S3ArtifactRepository
+from mlflow.tracking.artifact_utils import _download_artifact_from_uri
+
+from tests.helper_functions import set_boto_credentials  # pylint: disable=unused-import
+from tests.helper_functions import mock_s3_bucket  # pylint: disable=unused-import
+
+
+class FingerprintedArtifactRepository(LocalArtifactRepository):
+    """
+    Local artifact repository with a configurable fingerprint, which counts downloaded files.
+    """
+
+    def __init__(self, artifact_uri, fingerprint="v1"):
+        super().__init__(artifact_uri)
+        self.fingerprint = fingerprint
+        self.downloaded_files = []
+
+    def _get_artifact_fingerprint(self, artifact_path):
+        return self.fingerprint
+
+    def _download_file(self, remote_file_path, local_path):
+        self.downloaded_files.append(remote_file_path)
+        super()._download_file(remote_file_path, local_path)
+
+
+@pytest.fixture
+def repo(tmpdir):
+    artifact_dir = tmpdir.mkdir("artifacts")
+    artifact_dir.mkdir("model").join("model.pkl").write("model")
+    artifact_dir.join("model").mkdir("data").join("weights").write("weights")
+    artifact_dir.join("model").mkdir("empty")
+    return FingerprintedArtifactRepository(artifact_dir.strpath)
+
+
+@pytest.fixture
+def cache(tmpdir):
+    return DownloadCache(tmpdir.join("cache").strpath)
+
+
+def test_download_is_cached_and_hits_are_hard_linked(repo, cache, tmpdir):
+    stats_before = get_download_cache_stats()
+
+    first_path = cache.download_artifacts(repo, "model", tmpdir.mkdir("dst1").strpath)
+    second_path = cache.download_artifacts(repo, "model", tmpdir.mkdir("dst2").strpath)
+
+    assert first_path == tmpdir.join("dst1", "model").strpath
+    assert second_path == tmpdir.join("dst2", "model").strpath
+    assert sorted(repo.downloaded_files) == ["model/data/weights", "model/model.pkl"]
+    for local_path in [first_path, second_path]:
+        assert open(os.path.join(local_path, "model.pkl")).read() == "model"
+        assert open(os.path.join(local_path, "data", "weights")).read() == "weights"
+        assert os.path.isdir(os.path.join(local_path, "empty"))
+    assert os.path.samefile(
+        os.path.join(first_path, "model.pkl"), os.path.join(second_path, "model.pkl")
+    )
+
+    stats = get_download_cache_stats()
+    assert stats["misses"] == stats_before["misses"] + 1
+    assert stats["hits"] == stats_before["hits"] + 1
+    assert stats["bytes_downloaded"] == stats_before["bytes_downloaded"] + 12
+
+
+def test_file_download_is_cached_into_new_directory(repo, cache):
+    first_path = cache.download_artifacts(repo, "model/model.pkl")
+    second_path = cache.download_artifacts(repo, "model/model.pkl")
+
+    assert first_path != second_path
+    assert first_path.endswith(os.path.join("model", "model.pkl"))
+    assert open(second_path).read() == "model"
+    assert repo.downloaded_files == ["model/model.pkl"]
+
+
+def test_modified_artifacts_are_downloaded_again(repo, cache):
+    cache.download_artifacts(repo, "model")
+    repo.fingerprint = "v2"
+    cache.download_artifacts(repo, "model")
+    assert len(repo.downloaded_files) == 4
+
+
+def test_artifacts_without_fingerprint_are_not_cached(repo, cache, tmpdir):
+    repo.fingerprint = None
+    stats_before = get_download_cache_stats()
+    cache.download_artifacts(repo, "model", tmpdir.mkdir("dst1").strpath)
+    cache.download_artifacts(repo, "model", tmpdir.mkdir("dst2").strpath)
+    assert len(repo.downloaded_files) == 4
+    assert get_download_cache_stats()["uncacheable"] == stats_before["uncacheable"] + 2
+
+
+def test_cache_lookups_are_logged(repo, cache):
+    with mock.patch("mlflow.store.artifact.download_cache._logger.debug") as debug_mock:
+        cache.download_artifacts(repo, "model")
+        cache.download_artifacts(repo, "model")
+        repo.fingerprint = None
+        cache.download_artifacts(repo, "model")
+
+    lookup_results = [c[0][1] for c in debug_mock.call_args_list if c[0][2] == "model"]
+    assert lookup_results == ["miss", "hit", "uncacheable artifact"]
+
+
+def test_least_recently_used_entries_are_evicted(repo, tmpdir):
+    cache = DownloadCache(tmpdir.join("cache").strpath, max_size_bytes=12)
+    cache.download_artifacts(repo, "model/model.pkl")
+    cache.download_artifacts(repo, "model/data/weights")
+    # Using the first entry makes the second one the least recently used
+    cache.download_artifacts(repo, "model/model.pkl")
+    assert len(repo.downloaded_files) == 2
+
+    repo.fingerprint = "v2"
+    cache.download_artifacts(repo, "model/model.pkl")
+    assert len(os.listdir(tmpdir.join("cache", "entries").strpath)) == 2
+
+    repo.fingerprint = "v1"
+    cache.download_artifacts(repo, "model/model.pkl")
+    assert len(repo.downloaded_files) == 3
+    cache.download_artifacts(repo, "model/data/weights")
+    assert len(repo.downloaded_files) == 4
+
+
+def test_hard_links_remain_valid_after_eviction(repo, tmpdir):
+    cache = DownloadCache(tmpdir.join("cache").strpath, max_size_bytes=5)
+    local_path = cache.download_artifacts(repo, "model/model.pkl")
+    repo.fingerprint = "v2"
+    cache.download_artifacts(repo, "model/model.pkl")
+    assert open(local_path).read() == "model"
+
+
+def test_artifacts_larger_than_cache_are_not_cached(repo, tmpdir):
+    cache = DownloadCache(tmpdir.join("cache").strpath, max_size_bytes=4)
+    local_path = cache.download_artifacts(repo, "model", tmpdir.mkdir("dst").strpath)
+    assert open(os.path.join(local_path, "data", "weights")).read() == "weights"
+    assert os.listdir(tmpdir.join("cache", "entries").strpath) == []
+    assert os.listdir(tmpdir.join("cache", "tmp").strpath) == []
+
+
+@pytest.mark.parametrize("link_mode", ["symlink", "copy"])
+def test_link_modes(repo, tmpdir, link_mode):
+    cache = DownloadCache(tmpdir.join("cache").strpath, link_mode=link_mode)
+    cache.download_artifacts(repo, "model")
+    local_path = cache.download_artifacts(repo, "model")
+    local_file = os.path.join(local_path, "model.pkl")
+    assert open(local_file).read() == "model"
+    assert os.path.islink(local_file) == (link_mode == "symlink")
+
+
+def test_invalid_link_mode_raises(tmpdir):
+    with pytest.raises(MlflowException, match="Invalid artifact cache link mode"):
+        DownloadCache(tmpdir.strpath, link_mode="move")
+
+
+def test_concurrent_downloads_of_the_same_artifact_download_it_once(repo, cache):
+    results = []
+
+    def download():
+        results.append(cache.download_artifacts(repo, "model"))
+
+    threads = [threading.Thread(target=download) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(results)) == 8
+    assert sorted(repo.downloaded_files) == ["model/data/weights", "model/model.pkl"]
+
+
+def test_get_download_cache_is_configured_by_environment(tmpdir, monkeypatch):
+    assert get_download_cache() is None
+    monkeypatch.setenv("MLFLOW_ARTIFACT_CACHE_DIR", tmpdir.strpath)
+    monkeypatch.setenv("MLFLOW_ARTIFACT_CACHE_MAX_SIZE_BYTES", "1024")
+    monkeypatch.setenv("MLFLOW_ARTIFACT_CACHE_LINK_MODE", "copy")
+    cache = get_download_cache()
+    assert cache.cache_dir == tmpdir.strpath
+    assert cache.max_size_bytes == 1024
+    assert cache.link_mode == "copy"
+
+
+def test_download_artifact_from_uri_uses_cache_for_s3_artifacts(
+    mock_s3_bucket, tmpdir, monkeypatch
+):
+    monkeypatch.setenv("MLFLOW_ARTIFACT_CACHE_DIR", tmpdir.join("cache").strpath)
+    artifact_uri = "s3://{}/some/path".format(mock_s3_bucket)
+    local_dir = tmpdir.mkdir("model")
+    local_dir.join("model.pkl").write("v1")
+    S3ArtifactRepository(artifact_uri).log_artifacts(local_dir.strpath, "model")
+
+    stats_before = get_download_cache_stats()
+    for _ in range(2):
+        local_path = _download_artifact_from_uri(posixpath.join(artifact_uri, "model"))
+        assert open(os.path.join(local_path, "model.pkl")).read() == "v1"
+    stats = get_download_cache_stats()
+    assert stats["misses"] == stats_before["misses"] + 1
+    assert stats["hits"] == stats_before["hits"] + 1
+
+    # Overwriting an object changes its ETag and hence the fingerprint of the artifact
+    local_dir.join("model.pkl").write("v2")
+    S3ArtifactRepository(artifact_uri).log_artifacts(local_dir.strpath, "model")
+    local_path = _download_artifact_from_uri(posixpath.join(artifact_uri, "model"))
+    assert open(os.path.join(local_path, "model.pkl")).read() == "v2"
+    assert get_download_cache_stats()["misses"] == stats_before["misses"] + 2
+
+
+def test_s3_fingerprint_only_covers_the_specified_artifact(mock_s3_bucket, tmpdir):
+    repo = S3ArtifactRepository("s3://{}/some/path".format(mock_s3_bucket))
+    local_dir = tmpdir.mkdir("local")
+    local_dir.join("a").write("a")
+    local_dir.join("ab").write("ab")
+    repo.log_artifacts(local_dir.strpath)
+
+    fingerprint_a = repo._get_artifact_fingerprint("a")
+    local_dir.join("ab").write("modified")
+    repo.log_artifacts(local_dir.strpath)
+    assert repo._get_artifact_fingerprint("a") == fingerprint_a
+    assert repo._get_artifact_fingerprint("missing") is None
@@ -1,4 +1,9 @@
 # pylint: disable=redefined-outer-name
+import os
+import threading
+import time
+from collections import Counter
+from unittest import mock
 from unittest.mock import MagicMock
 import pytest
 import posixpath
@@ -220,7 +225,9 @@ def __posixpath_parents(pathname, root):
 
 
 @pytest.mark.parametrize("artifact_path", [None, "dir", "dir1/dir2"])
-def test_log_artifacts(artifact_path, ftp_mock, tmpdir):
+def test_log_artifacts(artifact_path, ftp_mock, tmpdir, monkeypatch):
+    # The mocked connection tracks a single working directory, so files are uploaded serially
+    monkeypatch.setenv("MLFLOW_ARTIFACT_UPLOAD_MAX_WORKERS", "1")
     # Setup FTP mock.
     dest_path_root = "/some/path"
     repo = FTPArtifactRepository("ftp://test_ftp" + dest_path_root)
@@ -404,3 +411,88 @@ def test_log_artifact_reuse_ftp_client(ftp_mock, tmpdir):
     repo.log_artifact(fpath, "subdir3")
 
     assert repo.get_ftp_client.call_count == 3
+
+
+def test_connections_are_pooled_and_bounded(tmpdir, monkeypatch):
+    monkeypatch.setenv("MLFLOW_ARTIFACT_UPLOAD_MAX_WORKERS", "2")
+    monkeypatch.setenv("MLFLOW_ARTIFACT_DOWNLOAD_MAX_WORKERS", "2")
+    local_dir = tmpdir.mkdir("data")
+    for i in range(8):
+        local_dir.join("file%d" % i).write(str(i))
+
+    lock = threading.Lock()
+    active_connections = set()
+    max_active_connections = []
+
+    def create_ftp():
+        ftp = MagicMock(autospec=FTP)
+
+        def storbinary(cmd, f):
+            # pylint: disable=unused-argument
+            with lock:
+                assert ftp not in active_connections, "connection used concurrently"
+                active_connections.add(ftp)
+                max_active_connections.append(len(active_connections))
+            time.sleep(0.01)
+            with lock:
+                active_connections.remove(ftp)
+
+        ftp.storbinary.side_effect = storbinary
+        return ftp
+
+    with mock.patch(
+        "mlflow.store.artifact.ftp_artifact_repo.FTP", side_effect=create_ftp
+    ) as ftp_class_mock:
+        repo = FTPArtifactRepository("ftp://test_ftp/some/path")
+        repo.log_artifacts(local_dir.strpath)
+        repo.log_artifacts(local_dir.strpath, "dir")
+
+    assert 1 <= ftp_class_mock.call_count <= 2
+    assert max(max_active_connections) <= 2
+    for ftp, _ in repo._connection_pool._idle_connections:
+        ftp.login.assert_called_once()
+
+
+def test_log_artifacts_checks_each_directory_once(ftp_mock, tmpdir):
+    repo = FTPArtifactRepository("ftp://test_ftp/some/path")
+    repo.get_ftp_client = MagicMock()
+    repo.get_ftp_client.return_value = MagicMock(__enter__=MagicMock(return_value=ftp_mock))
+
+    local_dir = tmpdir.mkdir("data")
+    local_dir.mkdir("a").mkdir("b").join("file").write("file")
+    local_dir.join("a").join("file").write("file")
+    existing_dirs = {"/", "/some", "/some/path"}
+
+    def cwd(pathname):
+        if pathname not in existing_dirs:
+            raise ftplib.error_perm
+
+    ftp_mock.cwd = MagicMock(side_effect=cwd)
+    ftp_mock.mkd = MagicMock(side_effect=existing_dirs.add)
+
+    repo.log_artifacts(local_dir.strpath, "dir")
+
+    assert [call[0][0] for call in ftp_mock.mkd.call_args_list] == [
+        "/some/path/dir",
+        "/some/path/dir/a",
+        "/some/path/dir/a/b",
+    ]
+    # Each directory is checked once before being created, and entered once per uploaded file
+    assert Counter(call[0][0] for call in ftp_mock.cwd.call_args_list) == {
+        "/some/path/dir": 1,
+        "/some/path/dir/a": 2,
+        "/some/path/dir/a/b": 2,
+    }
+
+
+def test_log_artifacts_skips_entries_that_are_not_files(ftp_mock, tmpdir):
+    repo = FTPArtifactRepository("ftp://test_ftp/some/path")
+    repo.get_ftp_client = MagicMock()
+    repo.get_ftp_client.return_value = MagicMock(__enter__=MagicMock(return_value=ftp_mock))
+    local_dir = tmpdir.mkdir("data")
+    local_dir.join("file").write("file")
+    os.symlink(local_dir.join("missing").strpath, local_dir.join("broken-link").strpath)
+
+    repo.log_artifacts(local_dir.strpath)
+
+    assert [call[0][0] for call in ftp_mock.storbinary.call_args_list] == ["STOR file"]
@@ -1,4 +1,6 @@
 # pylint: disable=redefined-outer-name
+import base64
+import hashlib
 import os
 import posixpath
 import pytest
@@ -6,9 +8,11 @@ from unittest import mock
 
 from google.cloud.storage import client as gcs_client
 
+from mlflow.exceptions import MlflowException
 from mlflow.store.artifact.artifact_repository_registry import get_artifact_repository
 from mlflow.store.artifact.gcs_artifact_repo import GCSArtifactRepository
 from google.auth.exceptions import DefaultCredentialsError
+from google.api_core.exceptions import NotFound
 
 
 @pytest.fixture
@@ -112,6 +116,29 @@ def test_list_artifacts_with_subdir(gcs_mock, dir_name):
     assert artifacts[1].file_size is None
 
 
+def test_list_artifacts_recursive(gcs_mock):
+    artifact_root_path = "/experiment_id/run_id/"
+    repo = GCSArtifactRepository("gs://test_bucket" + artifact_root_path, gcs_mock)
+
+    blob_mocks = []
+    for name, size in [("model/variables/data", 2), ("model/", 0), ("model/model.pb", 1)]:
+        blob_mock = mock.Mock()
+        blob_mock.configure_mock(name=artifact_root_path + name, size=size)
+        blob_mocks.append(blob_mock)
+    mock_results = mock.MagicMock()
+    mock_results.__iter__.return_value = blob_mocks
+    gcs_mock.Client.return_value.bucket.return_value.list_blobs.return_value = mock_results
+
+    artifacts = repo.list_artifacts_recursive(path="model")
+    gcs_mock.Client().bucket().list_blobs.assert_called_once_with(
+        prefix=posixpath.join(artifact_root_path[1:], "model/")
+    )
+    assert [(a.path, a.is_dir, a.file_size) for a in artifacts] == [
+        ("model/model.pb", False, 1),
+        ("model/variables/data", False, 2),
+    ]
+
+
 def test_log_artifact(gcs_mock, tmpdir):
     repo = GCSArtifactRepository("gs://test_bucket/some/path", gcs_mock)
 
@@ -157,26 +184,61 @@ def test_log_artifacts(gcs_mock, tmpdir):
     )
 
 
-def test_download_artifacts_calls_expected_gcs_client_methods(gcs_mock, tmpdir):
-    repo = GCSArtifactRepository("gs://test_bucket/some/path", gcs_mock)
+def mock_blob_download(gcs_mock, contents=b"hello world!"):
+    blob_mock = gcs_mock.Client.return_value.bucket.return_value.blob.return_value
+    # Downloads record the checksums of the blob from the response headers, but not its size
+    blob_mock.size = None
+    blob_mock.content_encoding = None
+    blob_mock.md5_hash = base64.b64encode(hashlib.md5(contents).digest()).decode()
+    blob_mock.download_to_file.side_effect = lambda f, start: f.write(contents[start or 0 :])
+    return blob_mock
 
-    def mkfile(fname):
-        fname = os.path.basename(fname)
-        f = tmpdir.join(fname)
-        f.write("hello world!")
 
-    gcs_mock.Client.return_value.bucket.return_value.blob.return_value.download_to_filename.side_effect = (  # noqa
-        mkfile
-    )
+def test_download_artifacts_calls_expected_gcs_client_methods(gcs_mock, tmpdir):
+    repo = GCSArtifactRepository("gs://test_bucket/some/path", gcs_mock)
+    blob_mock = mock_blob_download(gcs_mock)
 
-    repo.download_artifacts("test.txt")
-    assert os.path.exists(os.path.join(tmpdir.strpath, "test.txt"))
+    local_path = repo.download_artifacts("test.txt", tmpdir.strpath)
+    assert open(local_path).read() == "hello world!"
+    assert os.listdir(tmpdir.strpath) == ["test.txt"]
     gcs_mock.Client().bucket.assert_called_with("test_bucket")
     gcs_mock.Client().bucket().blob.assert_called_with("some/path/test.txt")
-    download_calls = gcs_mock.Client().bucket().blob().download_to_filename.call_args_list
+    gcs_mock.Client().bucket().get_blob.assert_not_called()
+    download_calls = blob_mock.download_to_file.call_args_list
     assert len(download_calls) == 1
-    download_path_arg = download_calls[0][0][0]
-    assert "test.txt" in download_path_arg
+    assert download_calls[0][1] == {"start": None}
+
+
+def test_interrupted_download_is_resumed_and_verified(gcs_mock, tmpdir, monkeypatch):
+    monkeypatch.setattr("mlflow.utils.download_utils._RESUME_BACKOFF_SECONDS", 0)
+    repo = GCSArtifactRepository("gs://test_bucket/some/path", gcs_mock)
+    blob_mock = mock_blob_download(gcs_mock)
+
+    def download_to_file(f, start):
+        if start is None:
+            f.write(b"hello ")
+            raise ConnectionError("Connection reset")
+        f.write(b"hello world!"[start:])
+
+    blob_mock.download_to_file.side_effect = download_to_file
+    local_path = repo.download_artifacts("test.txt", tmpdir.strpath)
+    assert open(local_path).read() == "hello world!"
+    assert [c[1]["start"] for c in blob_mock.download_to_file.call_args_list] == [None, 6]
+
+    # Truncated downloads are rejected without leaving files behind
+    blob_mock.download_to_file.side_effect = lambda f, start: f.write(b"hello")
+    with pytest.raises(MlflowException, match="md5 checksum"):
+        repo.download_artifacts("test.txt", tmpdir.mkdir("dst").strpath)
+    assert os.listdir(tmpdir.join("dst").strpath) == []
+
+    # The checksums of blobs stored gzip-compressed do not describe their decompressed contents
+    blob_mock.content_encoding = "gzip"
+    local_path = repo.download_artifacts("test.txt", tmpdir.mkdir("gzip").strpath)
+    assert open(local_path).read() == "hello"
+
+    blob_mock.download_to_file.side_effect = NotFound("Not found")
+    with pytest.raises(MlflowException, match="does not exist"):
+        repo.download_artifacts("test.txt", tmpdir.mkdir("missing").strpath)
 
 
 def test_get_anonymous_bucket(gcs_mock):
@@ -225,20 +287,54 @@ def test_download_artifacts_downloads_expected_content(gcs_mock, tmpdir):
         else:
             return mock_empty_results
 
-    def mkfile(fname):
-        fname = os.path.basename(fname)
-        f = tmpdir.join(fname)
-        f.write("hello world!")
-
     gcs_mock.Client.return_value.bucket.return_value.list_blobs.side_effect = get_mock_listing
-
-    gcs_mock.Client.return_value.bucket.return_value.blob.return_value.download_to_filename.side_effect = (  # noqa
-        mkfile
-    )
+    mock_blob_download(gcs_mock)
 
     # Ensure that the root directory can be downloaded successfully
-    repo.download_artifacts("")
-    # Ensure that the `mkfile` side effect copied all of the download artifacts into `tmpdir`
+    repo.download_artifacts("", tmpdir.strpath)
+    # Ensure that all of the artifacts were downloaded into `tmpdir`
     dir_contents = os.listdir(tmpdir.strpath)
     assert file_path_1 in dir_contents
     assert file_path_2 in dir_contents
+
+
+def test_open_reads_byte_ranges(gcs_mock):
+    repo = GCSArtifactRepository("gs://test_bucket/some/path", gcs_mock)
+    contents = b"0123456789"
+    blob_mock = gcs_mock.Client.return_value.bucket.return_value.get_blob.return_value
+    blob_mock.size = len(contents)
+    blob_mock.download_as_bytes.side_effect = lambda start, end: contents[start : end + 1]
+
+    with repo.open("dir/file.bin") as f:
+        f.seek(6)
+        assert f.read() == b"6789"
+    gcs_mock.Client().bucket().get_blob.assert_called_with("some/path/dir/file.bin")
+    blob_mock.download_as_bytes.assert_called_once_with(start=6, end=9)
+
+
+def test_upload_bytes(gcs_mock):
+    repo = GCSArtifactRepository("gs://test_bucket/some/path", gcs_mock)
+    repo.upload_bytes(b"{}", "dir/data.json")
+    gcs_mock.Client().bucket().blob.assert_called_with("some/path/dir/data.json")
+    gcs_mock.Client().bucket().blob().upload_from_string.assert_called_once_with(
+        b"{}", content_type="application/json"
+    )
+
+
+def test_delete_artifacts_deletes_blobs_in_batches(gcs_mock):
+    repo = GCSArtifactRepository("gs://test_bucket/some/path", gcs_mock)
+    names = ["some/path/model/part%d" % i for i in range(150)] + ["some/path/model-metadata"]
+    blobs = []
+    for name in names:
+        blob = mock.Mock()
+        blob.configure_mock(name=name)
+        blobs.append(blob)
+    bucket_mock = gcs_mock.Client.return_value.bucket.return_value
+    bucket_mock.list_blobs.return_value = blobs
+
+    repo.delete_artifacts("model")
+
+    bucket_mock.list_blobs.assert_called_once_with(prefix="some/path/model")
+    assert bucket_mock.client.batch.call_count == 2
+    deleted_names = [call[0][0] for call in bucket_mock.delete_blob.call_args_list]
+    assert sorted(deleted_names) == sorted(names[:-1])
@@ -187,3 +187,28 @@ def test_delete_artifacts(local_artifact_repo):
         assert os.path.exists(os.path.join(local_artifact_repo._artifact_dir, "b.txt"))
         local_artifact_repo.delete_artifacts()
         assert not os.path.exists(os.path.join(local_artifact_repo._artifact_dir))
+
+
+def test_open_reads_artifact_in_place(local_artifact_repo, local_artifact_root):
+    os.mkdir(os.path.join(local_artifact_root, "dir"))
+    artifact_path = os.path.join(local_artifact_root, "dir", "file.bin")
+    with open(artifact_path, "wb") as f:
+        f.write(b"0123456789")
+
+    with local_artifact_repo.open("dir/file.bin") as f:
+        assert os.path.samefile(f.name, artifact_path)
+        f.seek(4)
+        assert f.read(3) == b"456"
+
+    with pytest.raises(Exception):
+        local_artifact_repo.open("dir/missing")
+
+
+def test_upload_bytes(local_artifact_repo, local_artifact_root):
+    local_artifact_repo.upload_bytes(b"data", "dir1/dir2/file.json")
+    local_artifact_repo.upload_bytes(b"new data", "dir1/../dir1/dir2/file.json")
+    with open(os.path.join(local_artifact_root, "dir1", "dir2", "file.json"), "rb") as f:
+        assert f.read() == b"new data"
+
+    with pytest.raises(MlflowException, match="Invalid artifact path"):
+        local_artifact_repo.upload_bytes(b"data", "../file.json")
@@ -1,11 +1,16 @@
+import hashlib
 import os
 import posixpath
 import tarfile
 
 import pytest
+from boto3.s3.transfer import create_transfer_manager
 
 from mlflow.store.artifact.artifact_repository_registry import get_artifact_repository
+from mlflow.store.artifact import s3_artifact_repo
+from mlflow.exceptions import MlflowException
 from mlflow.store.artifact.s3_artifact_repo import S3ArtifactRepository
+from mlflow.utils.download_utils import Checksum
 
 from tests.helper_functions import set_boto_credentials  # pylint: disable=unused-import
 from tests.helper_functions import mock_s3_bucket  # pylint: disable=unused-import
@@ -21,6 +26,7 @@ def s3_artifact_root(mock_s3_bucket):
 def teardown_function():
     if "MLFLOW_S3_UPLOAD_EXTRA_ARGS" in os.environ:
         del os.environ["MLFLOW_S3_UPLOAD_EXTRA_ARGS"]
+    s3_artifact_repo._s3_clients.clear()
 
 
 def test_file_artifact_is_logged_and_downloaded_successfully(s3_artifact_root, tmpdir):
@@ -170,6 +176,38 @@ def test_file_and_directories_artifacts_are_logged_and_listed_successfully_in_ba
     assert nested_artifacts_listing == [("nested/c.txt", False, 1)]
 
 
+def test_list_artifacts_recursive_lists_nested_files_with_a_single_listing(
+    s3_artifact_root, tmpdir
+):
+    subdir_path = str(tmpdir.mkdir("subdir"))
+    nested_path = os.path.join(subdir_path, "nested", "deeper")
+    os.makedirs(nested_path)
+    with open(os.path.join(subdir_path, "a.txt"), "w") as f:
+        f.write("A")
+    with open(os.path.join(nested_path, "b.txt"), "w") as f:
+        f.write("BB")
+
+    repo = get_artifact_repository(posixpath.join(s3_artifact_root, "some/path"))
+    repo.log_artifacts(subdir_path)
+    # Directory marker objects created by other tools must not be listed as files
+    bucket, _ = repo.parse_s3_uri(s3_artifact_root)
+    repo._get_s3_client().put_object(Bucket=bucket, Key="some/path/nested/", Body=b"")
+
+    with mock.patch.object(repo, "list_artifacts") as list_artifacts_mock:
+        listing = [(f.path, f.is_dir, f.file_size) for f in repo.list_artifacts_recursive()]
+        nested_listing = [f.path for f in repo.list_artifacts_recursive("nested")]
+        file_listing = repo.list_artifacts_recursive("a.txt")
+    list_artifacts_mock.assert_not_called()
+
+    assert listing == [("a.txt", False, 1), ("nested/deeper/b.txt", False, 2)]
+    assert nested_listing == ["nested/deeper/b.txt"]
+    assert file_listing == []
+
+    downloaded_dir_path = repo.download_artifacts("nested")
+    with open(os.path.join(downloaded_dir_path, "deeper", "b.txt"), "r") as f:
+        assert f.read() == "BB"
+
+
 def test_download_directory_artifact_succeeds_when_artifact_root_is_s3_bucket_root(
     s3_artifact_root, tmpdir
 ):
@@ -260,3 +298,181 @@ def test_delete_artifacts(s3_artifact_root, tmpdir):
     repo.delete_artifacts()
     tmpdir_objects = repo.list_artifacts()
     assert not tmpdir_objects
+
+
+def test_open_reads_byte_ranges(s3_artifact_root, tmpdir):
+    file_path = tmpdir.join("data.bin")
+    file_path.write_binary(bytes(range(256)) * 4)
+    repo = get_artifact_repository(posixpath.join(s3_artifact_root, "some/path"))
+    repo.log_artifact(file_path.strpath, "dir")
+
+    s3_client = repo._get_s3_client()
+    with mock.patch.object(repo, "_get_s3_client", return_value=s3_client), mock.patch.object(
+        s3_client, "get_object", wraps=s3_client.get_object
+    ) as get_object_mock:
+        with repo.open("dir/data.bin") as f:
+            f.seek(1000)
+            assert f.read() == bytes(range(232, 256))
+            f.seek(-4, os.SEEK_END)
+            assert f.read(2) == bytes([252, 253])
+            f.seek(10)
+            assert f.read(2) == bytes([10, 11])
+    assert [call[1]["Range"] for call in get_object_mock.call_args_list] == [
+        "bytes=1000-1023",
+        "bytes=1020-1023",
+        "bytes=10-1023",
+    ]
+
+
+def test_open_missing_artifact_raises(s3_artifact_root):
+    repo = get_artifact_repository(posixpath.join(s3_artifact_root, "some/path"))
+    with pytest.raises(Exception):
+        repo.open("missing.txt")
+
+
+def test_upload_bytes(s3_artifact_root):
+    repo = get_artifact_repository(posixpath.join(s3_artifact_root, "some/path"))
+    repo.upload_bytes(b'{"k": "v"}', "dir/data.json")
+
+    with repo.open("dir/data.json") as f:
+        assert f.read() == b'{"k": "v"}'
+    bucket, _ = repo.parse_s3_uri(s3_artifact_root)
+    head = repo._get_s3_client().head_object(Bucket=bucket, Key="some/path/dir/data.json")
+    assert head["ContentType"] == "application/json"
+
+
+def test_s3_clients_are_shared_by_repositories_with_the_same_configuration(s3_artifact_root):
+    repo1 = get_artifact_repository(posixpath.join(s3_artifact_root, "some/path"))
+    repo2 = get_artifact_repository(posixpath.join(s3_artifact_root, "other/path"))
+    s3_client = repo1._get_s3_client()
+    assert repo2._get_s3_client() is s3_client
+
+    for env in [
+        {"AWS_ACCESS_KEY_ID": "OtherAccessKey"},
+        {"MLFLOW_S3_ENDPOINT_URL": "http://localhost:9000"},
+        {"MLFLOW_S3_IGNORE_TLS": "true"},
+    ]:
+        with mock.patch.dict("os.environ", env):
+            assert repo2._get_s3_client() is not s3_client
+    assert repo2._get_s3_client() is s3_client
+
+
+def test_s3_client_connection_pool_fits_concurrent_transfers(s3_artifact_root, monkeypatch):
+    monkeypatch.setenv("MLFLOW_S3_MAX_CONCURRENCY", "4")
+    monkeypatch.setenv("MLFLOW_ARTIFACT_UPLOAD_MAX_WORKERS", "8")
+    repo = get_artifact_repository(posixpath.join(s3_artifact_root, "some/path"))
+    assert repo._get_s3_client().meta.config.max_pool_connections == 32
+
+
+def test_get_s3_transfer_config(monkeypatch):
+    default_config = S3ArtifactRepository.get_s3_transfer_config()
+    monkeypatch.setenv("MLFLOW_S3_MULTIPART_THRESHOLD", str(64 * 1024 * 1024))
+    monkeypatch.setenv("MLFLOW_S3_MULTIPART_CHUNKSIZE", str(16 * 1024 * 1024))
+    monkeypatch.setenv("MLFLOW_S3_MAX_CONCURRENCY", "20")
+    config = S3ArtifactRepository.get_s3_transfer_config()
+    assert config.multipart_threshold == 64 * 1024 * 1024
+    assert config.multipart_chunksize == 16 * 1024 * 1024
+    assert config.max_request_concurrency == 20
+    assert config.num_download_attempts == default_config.num_download_attempts
+
+
+@pytest.mark.parametrize("value", ["8MB", "0"])
+def test_get_s3_transfer_config_invalid_values(monkeypatch, value):
+    monkeypatch.setenv("MLFLOW_S3_MULTIPART_CHUNKSIZE", value)
+    with pytest.raises(MlflowException, match="MLFLOW_S3_MULTIPART_CHUNKSIZE"):
+        S3ArtifactRepository.get_s3_transfer_config()
+
+
+def test_transfers_use_configured_transfer_config(s3_artifact_root, tmpdir, monkeypatch):
+    monkeypatch.setenv("MLFLOW_S3_MULTIPART_THRESHOLD", "5242880")
+    local_file = tmpdir.join("model.bin")
+    local_file.write("model")
+    repo = get_artifact_repository(posixpath.join(s3_artifact_root, "some/path"))
+
+    s3_client = repo._get_s3_client()
+    with mock.patch.object(s3_client, "upload_file", wraps=s3_client.upload_file) as upload_mock:
+        repo.log_artifact(local_file.strpath)
+    assert upload_mock.call_args[1]["Config"].multipart_threshold == 5242880
+
+    with mock.patch(
+        "boto3.s3.transfer.create_transfer_manager", wraps=create_transfer_manager
+    ) as create_transfer_manager_mock:
+        repo.download_artifacts("model.bin", tmpdir.mkdir("dst").strpath)
+    assert create_transfer_manager_mock.call_args[0][1].multipart_threshold == 5242880
+
+
+def test_downloads_request_the_metadata_of_objects_once(s3_artifact_root, tmpdir, monkeypatch):
+    # Objects larger than the multipart threshold are downloaded in concurrent ranges
+    monkeypatch.setenv("MLFLOW_S3_MULTIPART_THRESHOLD", "5242880")
+    monkeypatch.setenv("MLFLOW_S3_MULTIPART_CHUNKSIZE", "5242880")
+    repo = get_artifact_repository(posixpath.join(s3_artifact_root, "some/path"))
+    s3_client = repo._get_s3_client()
+    bucket, _ = s3_artifact_repo.data.parse_s3_uri(s3_artifact_root)
+    for size in [5, 12 * 1024 * 1024]:
+        file_name = "model-{}.bin".format(size)
+        s3_client.put_object(Bucket=bucket, Key="some/path/" + file_name, Body=b"x" * size)
+        with mock.patch.object(
+            s3_client, "head_object", wraps=s3_client.head_object
+        ) as head_object_mock:
+            local_path = repo.download_artifacts(
+                file_name, tmpdir.mkdir("dst-{}".format(size)).strpath
+            )
+        assert os.path.getsize(local_path) == size
+        assert head_object_mock.call_count == 1
+
+
+def test_delete_artifacts_deletes_objects_in_batches(s3_artifact_root, tmpdir, monkeypatch):
+    monkeypatch.setattr(s3_artifact_repo, "_MAX_KEYS_PER_DELETE", 2)
+    local_dir = tmpdir.mkdir("local")
+    model_dir = local_dir.mkdir("model")
+    for i in range(5):
+        model_dir.join("part%d" % i).write(str(i))
+    local_dir.mkdir("model-metadata").join("MLmodel").write("metadata")
+    repo = get_artifact_repository(posixpath.join(s3_artifact_root, "some/path"))
+    repo.log_artifacts(local_dir.strpath)
+
+    s3_client = repo._get_s3_client()
+    with mock.patch.object(
+        s3_client, "delete_objects", wraps=s3_client.delete_objects
+    ) as delete_objects_mock:
+        repo.delete_artifacts("model")
+    assert sorted(
+        len(call[1]["Delete"]["Objects"]) for call in delete_objects_mock.call_args_list
+    ) == [1, 2, 2]
+    # Artifacts whose names start with the name of the deleted artifact are preserved
+    assert [f.path for f in repo.list_artifacts_recursive()] == ["model-metadata/MLmodel"]
+
+
+def test_delete_artifacts_reports_objects_that_failed_to_be_deleted(s3_artifact_root, tmpdir):
+    local_dir = tmpdir.mkdir("local")
+    local_dir.join("a.txt").write("a")
+    repo = get_artifact_repository(posixpath.join(s3_artifact_root, "some/path"))
+    repo.log_artifacts(local_dir.strpath)
+
+    s3_client = repo._get_s3_client()
+    errors = {"Errors": [{"Key": "some/path/a.txt", "Code": "AccessDenied"}]}
+    with mock.patch.object(s3_client, "delete_objects", return_value=errors):
+        with pytest.raises(MlflowException, match="some/path/a.txt \\(AccessDenied\\)"):
+            repo.delete_artifacts()
+
+
+def test_downloads_are_verified_and_moved_into_place(s3_artifact_root, tmpdir):
+    local_file = tmpdir.join("model.bin")
+    local_file.write("model")
+    repo = get_artifact_repository(posixpath.join(s3_artifact_root, "some/path"))
+    repo.log_artifact(local_file.strpath)
+
+    dst_dir = tmpdir.mkdir("dst")
+    local_path = repo.download_artifacts("model.bin", dst_dir.strpath)
+    assert open(local_path).read() == "model"
+    assert os.listdir(dst_dir.strpath) == ["model.bin"]
+
+    # Downloads whose contents do not match the ETag of the object are rejected
+    corrupted_dir = tmpdir.mkdir("corrupted")
+    with mock.patch.object(
+        s3_artifact_repo,
+        "checksum_from_s3_etag",
+        return_value=Checksum("md5", hashlib.md5(b"other").digest()),
+    ), pytest.raises(MlflowException, match="md5 checksum"):
+        repo.download_artifacts("model.bin", corrupted_dir.strpath)
+    assert os.listdir(corrupted_dir.strpath) == []
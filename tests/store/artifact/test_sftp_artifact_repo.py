@@ -3,7 +3,7 @@ import pytest
 from tempfile import NamedTemporaryFile
 import pysftp
 from mlflow.store.artifact.artifact_repository_registry import get_artifact_repository
-from mlflow.store.artifact.sftp_artifact_repo import SFTPArtifactRepository
+from mlflow.store.artifact.sftp_artifact_repo import SFTPArtifactRepository, _is_connection_error
 from mlflow.utils.file_utils import TempDir
 import os
 import posixpath
@@ -170,3 +170,81 @@ def test_log_artifacts():
 
             with open(posixpath.join(remote_dir, directory, file2), "rb") as remote_content:
                 assert remote_content.read() == file_content_2
+
+
+@pytest.mark.large
+def test_download_directory_checks_each_subdirectory_once(sftp_mock, tmpdir):
+    artifact_root_path = "/experiment_id/run_id"
+    repo = SFTPArtifactRepository("sftp://test_sftp" + artifact_root_path, sftp_mock)
+
+    # mocked file structure
+    #  |- model
+    #     |- model.pb
+    #     |- variables
+    #        |- variables.index
+    tree = {
+        "/experiment_id/run_id/model": ["model.pb", "variables"],
+        "/experiment_id/run_id/model/variables": ["variables.index"],
+    }
+    sftp_mock.isdir = MagicMock(side_effect=lambda path: path in tree)
+    sftp_mock.listdir = MagicMock(side_effect=lambda path: tree[path])
+    sftp_mock.stat.return_value.st_size = 1
+    sftp_mock.get = MagicMock(side_effect=lambda remote, local: open(local, "w").close())
+
+    repo.download_artifacts("model", tmpdir.strpath)
+
+    isdir_calls = [call[0][0] for call in sftp_mock.isdir.call_args_list]
+    # The root directory is checked by `download_artifacts` and when listing the tree
+    assert isdir_calls.count("/experiment_id/run_id/model") == 2
+    assert isdir_calls.count("/experiment_id/run_id/model/variables") == 1
+    assert sorted(call[0][0] for call in sftp_mock.get.call_args_list) == [
+        "/experiment_id/run_id/model/model.pb",
+        "/experiment_id/run_id/model/variables/variables.index",
+    ]
+    assert os.path.exists(os.path.join(tmpdir.strpath, "model", "variables", "variables.index"))
+
+
+@pytest.mark.large
+def test_log_artifacts_creates_each_directory_once(sftp_mock, tmpdir):
+    repo = SFTPArtifactRepository("sftp://test_sftp/some/path", sftp_mock)
+    local_dir = tmpdir.mkdir("data")
+    local_dir.join("MLmodel").write("MLmodel")
+    local_dir.mkdir("variables").join("variables.index").write("index")
+    local_dir.mkdir("empty")
+
+    repo.log_artifacts(local_dir.strpath, "model")
+
+    assert sorted(call[0][0] for call in sftp_mock.makedirs.call_args_list) == [
+        "/some/path/model",
+        "/some/path/model/empty",
+        "/some/path/model/variables",
+    ]
+    assert sorted(call[0][1] for call in sftp_mock.put.call_args_list) == [
+        "/some/path/model/MLmodel",
+        "/some/path/model/variables/variables.index",
+    ]
+
+
+def test_provided_client_is_used_without_pooling_and_never_closed(sftp_mock, tmpdir):
+    repo = SFTPArtifactRepository("sftp://test_sftp/some/path", sftp_mock)
+    assert repo.sftp is sftp_mock
+    sftp_mock.get = MagicMock(side_effect=EOFError("Connection closed"))
+    with pytest.raises(EOFError):
+        repo._download_file("file", tmpdir.join("file").strpath)
+    sftp_mock.get = MagicMock(side_effect=lambda remote, local: open(local, "w").close())
+    repo._download_file("file", tmpdir.join("file").strpath)
+    sftp_mock.close.assert_not_called()
+
+
+def test_only_connection_errors_discard_pooled_connections():
+    import paramiko
+
+    sftp = MagicMock()
+    transport = sftp.sftp_client.get_channel.return_value.get_transport.return_value
+    transport.is_active.return_value = True
+    assert not _is_connection_error(sftp, FileNotFoundError("No such file"))
+    assert not _is_connection_error(sftp, ValueError())
+    assert _is_connection_error(sftp, paramiko.SSHException())
+    assert _is_connection_error(sftp, EOFError())
+    transport.is_active.return_value = False
+    assert _is_connection_error(sftp, OSError("Socket is closed"))
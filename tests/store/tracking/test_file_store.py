@@ -482,6 +482,20 @@ class TestFileStore(unittest.TestCase, AbstractStoreTest):
             for run_id in runs:
                 self._verify_run(fs, run_id)
 
+    def test_get_runs(self):
+        fs = FileStore(self.test_root)
+        run_ids = [
+            run_id for exp_id in self.experiments for run_id in self.exp_data[exp_id]["runs"]
+        ]
+        run_ids = list(reversed(run_ids))
+        runs = fs.get_runs(run_ids)
+        assert [run.info.run_id for run in runs] == run_ids
+        for run in runs:
+            assert run.data.params == self.run_data[run.info.run_id]["params"]
+        assert fs.get_runs([]) == []
+        with pytest.raises(MlflowException, match="not found"):
+            fs.get_runs([run_ids[0], uuid.uuid4().hex])
+
     def test_get_run_int_experiment_id_backcompat(self):
         fs = FileStore(self.test_root)
         exp_id = FileStore.DEFAULT_EXPERIMENT_ID
@@ -668,6 +682,41 @@ class TestFileStore(unittest.TestCase, AbstractStoreTest):
         for n in [0, 1, 2, 4, 8, 10, 20]:
             assert runs[: min(10, n)] == self._search(fs, exp, max_results=n)
 
+    def test_aggregate_runs(self):
+        fs = FileStore(self.test_root)
+        exp = fs.create_experiment("test_aggregate_runs")
+        runs = [("cnn", 0.9), ("cnn", 0.8), ("rnn", 0.7), ("rnn", float("nan"))]
+        for model_type, accuracy in runs:
+            run_id = fs.create_run(exp, "user", 1000, []).info.run_id
+            fs.log_param(run_id, Param("model_type", model_type))
+            fs.log_metric(run_id, Metric("accuracy", accuracy, 0, 0))
+        deleted_run_id = fs.create_run(exp, "user", 1000, []).info.run_id
+        fs.log_metric(deleted_run_id, Metric("accuracy", 0.1, 0, 0))
+        fs.delete_run(deleted_run_id)
+
+        groups = fs.aggregate_runs(
+            [exp],
+            "",
+            ViewType.ACTIVE_ONLY,
+            ["params.model_type"],
+            ["count(*)", "avg(metrics.accuracy)", "p50(metrics.accuracy)"],
+        )
+        assert [dict(group.group_by) for group in groups] == [
+            {"params.model_type": "cnn"},
+            {"params.model_type": "rnn"},
+        ]
+        assert list(groups[0].aggregations.values()) == pytest.approx([2, 0.85, 0.85])
+        assert list(groups[1].aggregations.values()) == pytest.approx([2, 0.7, 0.7])
+
+        groups = fs.aggregate_runs(
+            [exp],
+            "metrics.accuracy < 0.75",
+            ViewType.ALL,
+            [],
+            ["count(*)", "max(metrics.accuracy)"],
+        )
+        assert [list(group.aggregations.values()) for group in groups] == [[2, 0.7]]
+
     def test_search_runs_pagination(self):
         fs = FileStore(self.test_root)
         exp = fs.create_experiment("test_search_runs_pagination")
@@ -32,6 +32,8 @@ from mlflow.protos.service_pb2 import (
     DeleteTag,
     SetExperimentTag,
     GetExperimentByName,
+    GetRuns,
+    AggregateRuns,
     ListExperiments,
     LogModel,
 )
@@ -47,7 +49,7 @@ from mlflow.store.tracking.rest_store import (
     DatabricksRestStore,
 )
 from mlflow.utils.proto_json_utils import message_to_json
-from mlflow.utils.rest_utils import MlflowHostCreds, _DEFAULT_HEADERS
+from mlflow.utils.rest_utils import MlflowHostCreds, ConditionalResponseCache, _DEFAULT_HEADERS
 
 
 class MyCoolException(Exception):
@@ -134,6 +136,86 @@ class TestRestStore(object):
         assert len(experiments) == 1
         assert experiments[0].name == "My experiment"
 
+    @mock.patch("requests.Session.request")
+    def test_get_run_revalidates_cached_response_with_etag(self, request):
+        run_json = {"run": {"info": {"run_id": "etag-run", "experiment_id": "0"}}}
+        ok_response = mock.MagicMock()
+        ok_response.status_code = 200
+        ok_response.text = json.dumps(run_json)
+        ok_response.headers = {"ETag": '"abc123"'}
+        not_modified_response = mock.MagicMock()
+        not_modified_response.status_code = 304
+        not_modified_response.text = ""
+        not_modified_response.headers = {"ETag": '"abc123"'}
+        request.side_effect = [ok_response, not_modified_response]
+
+        store = RestStore(lambda: MlflowHostCreds("https://etag-host"))
+        with mock.patch(
+            "mlflow.store.tracking.rest_store._conditional_response_cache",
+            ConditionalResponseCache(),
+        ):
+            assert store.get_run("etag-run").info.run_id == "etag-run"
+            assert "If-None-Match" not in request.call_args[1]["headers"]
+            assert store.get_run("etag-run").info.run_id == "etag-run"
+            assert request.call_args[1]["headers"]["If-None-Match"] == '"abc123"'
+
+    def test_aggregate_runs(self):
+        store = RestStore(lambda: MlflowHostCreds("https://hello"))
+        response_proto = AggregateRuns.Response()
+        group = response_proto.groups.add()
+        group.group_by.add(key="params.model_type", value="cnn")
+        group.aggregations.add(aggregation="avg(metrics.accuracy)", value=0.85)
+        group.aggregations.add(aggregation="max(metrics.loss)")
+
+        with mock.patch.object(
+            store, "_call_endpoint", return_value=response_proto
+        ) as call_endpoint_mock:
+            groups = store.aggregate_runs(
+                [0, "1"],
+                "metrics.accuracy > 0.5",
+                ViewType.ALL,
+                ["params.model_type"],
+                ["avg(metrics.accuracy)", "max(metrics.loss)"],
+            )
+
+        call_endpoint_mock.assert_called_once()
+        api, json_body = call_endpoint_mock.call_args[0]
+        assert api == AggregateRuns
+        assert json.loads(json_body) == {
+            "experiment_ids": ["0", "1"],
+            "filter": "metrics.accuracy > 0.5",
+            "run_view_type": "ALL",
+            "group_by": ["params.model_type"],
+            "aggregations": ["avg(metrics.accuracy)", "max(metrics.loss)"],
+        }
+        assert len(groups) == 1
+        assert groups[0].group_by == {"params.model_type": "cnn"}
+        assert groups[0].aggregations == {
+            "avg(metrics.accuracy)": 0.85,
+            "max(metrics.loss)": None,
+        }
+
+    def test_get_runs_splits_run_ids_into_batches(self):
+        store = RestStore(lambda: MlflowHostCreds("https://hello"))
+        run_ids = ["run%d" % i for i in range(1500)]
+
+        def mock_call_endpoint(api, json_body):
+            response_proto = api.Response()
+            for run_id in json.loads(json_body)["run_ids"]:
+                response_proto.runs.add().info.run_id = run_id
+            return response_proto
+
+        with mock.patch.object(
+            store, "_call_endpoint", side_effect=mock_call_endpoint
+        ) as call_endpoint_mock:
+            runs = store.get_runs(run_ids)
+
+        assert [run.info.run_id for run in runs] == run_ids
+        assert call_endpoint_mock.call_count == 2
+        first_call_args, _ = call_endpoint_mock.call_args_list[0]
+        assert first_call_args[0] == GetRuns
+        assert json.loads(first_call_args[1])["run_ids"] == run_ids[:1000]
+
     def _args(self, host_creds, endpoint, method, json_body):
         res = {
             "host_creds": host_creds,
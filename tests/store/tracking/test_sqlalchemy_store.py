@@ -36,6 +36,7 @@ from mlflow.exceptions import MlflowException
 from mlflow.store.tracking.sqlalchemy_store import SqlAlchemyStore, _get_orderby_clauses
 from mlflow.utils import mlflow_tags
 from mlflow.utils.file_utils import TempDir
+from mlflow.utils.search_utils import SearchUtils
 from mlflow.utils.uri import extract_db_type_from_uri
 from mlflow.store.tracking.dbmodels.initial_models import Base as InitialBase
 from tests.integration.utils import invoke_cli_runner
@@ -636,6 +637,130 @@ class TestSqlAlchemyStoreSqlite(unittest.TestCase, AbstractStoreTest):
         deleted_run_ids = self.store._get_deleted_runs()
         self.assertEqual([run.info.run_uuid], deleted_run_ids)
 
+    def test_get_runs(self):
+        experiment_id = self._experiment_factory("test_get_runs")
+        runs = [
+            self._run_factory(self._get_run_configs(experiment_id=experiment_id)) for _ in range(3)
+        ]
+        for i, run in enumerate(runs):
+            self.store.log_metric(run.info.run_id, entities.Metric("m", i, 0, 0))
+            self.store.log_param(run.info.run_id, entities.Param("p", str(i)))
+        self.store.delete_run(runs[2].info.run_id)
+
+        run_ids = [runs[2].info.run_id, runs[0].info.run_id, runs[1].info.run_id]
+        fetched_runs = self.store.get_runs(run_ids)
+        self.assertEqual([run.info.run_id for run in fetched_runs], run_ids)
+        for run_id, fetched_run in zip(run_ids, fetched_runs):
+            expected_run = self.store.get_run(run_id)
+            self.assertEqual(fetched_run.info, expected_run.info)
+            self.assertEqual(fetched_run.data.metrics, expected_run.data.metrics)
+            self.assertEqual(fetched_run.data.params, expected_run.data.params)
+            self.assertEqual(fetched_run.data.tags, expected_run.data.tags)
+
+        self.assertEqual(self.store.get_runs([]), [])
+        with self.assertRaisesRegex(MlflowException, "not found") as e:
+            self.store.get_runs([runs[0].info.run_id, "missing-run-id"])
+        assert e.exception.error_code == ErrorCode.Name(RESOURCE_DOES_NOT_EXIST)
+
+    def test_get_runs_queries_run_ids_in_chunks(self):
+        experiment_id = self._experiment_factory("test_get_runs_in_chunks")
+        runs = [
+            self._run_factory(self._get_run_configs(experiment_id=experiment_id)) for _ in range(5)
+        ]
+        run_ids = [run.info.run_id for run in reversed(runs)] + [runs[1].info.run_id]
+        with mock.patch("mlflow.store.tracking.sqlalchemy_store._MAX_RUN_IDS_PER_QUERY", 2):
+            fetched_runs = self.store.get_runs(run_ids)
+        self.assertEqual([run.info.run_id for run in fetched_runs], run_ids)
+
+    def test_aggregate_runs(self):
+        experiment_ids = self._experiment_factory(["exp_a", "exp_b"])
+        runs = [
+            (experiment_ids[0], "cnn", 0.9, 1.0),
+            (experiment_ids[0], "cnn", 0.8, float("nan")),
+            (experiment_ids[0], "rnn", 0.7, 3.0),
+            (experiment_ids[1], "cnn", 0.6, 4.0),
+            (experiment_ids[1], None, 0.5, None),
+        ]
+        for experiment_id, model_type, accuracy, latency in runs:
+            run_id = self._run_factory(self._get_run_configs(experiment_id)).info.run_id
+            if model_type is not None:
+                self.store.log_param(run_id, entities.Param("model_type", model_type))
+            self.store.log_metric(run_id, entities.Metric("accuracy", accuracy, 0, 0))
+            if latency is not None:
+                self.store.log_metric(run_id, entities.Metric("latency", latency, 0, 0))
+        deleted_run = self._run_factory(self._get_run_configs(experiment_ids[0]))
+        self.store.log_metric(deleted_run.info.run_id, entities.Metric("accuracy", 0.1, 0, 0))
+        self.store.delete_run(deleted_run.info.run_id)
+
+        aggregations = [
+            "count(*)",
+            "min(metrics.accuracy)",
+            "max(metrics.accuracy)",
+            "avg(metrics.accuracy)",
+            "count(metrics.latency)",
+            "p50(metrics.latency)",
+        ]
+        groups = self.store.aggregate_runs(
+            experiment_ids,
+            "",
+            ViewType.ACTIVE_ONLY,
+            ["params.model_type", "attributes.experiment_id"],
+            aggregations,
+        )
+        self.assertEqual(
+            [list(group.group_by.values()) for group in groups],
+            [
+                ["cnn", experiment_ids[0]],
+                ["cnn", experiment_ids[1]],
+                ["rnn", experiment_ids[0]],
+                [None, experiment_ids[1]],
+            ],
+        )
+        expected_values = [
+            [2, 0.8, 0.9, 0.85, 1, 1.0],
+            [1, 0.6, 0.6, 0.6, 1, 4.0],
+            [1, 0.7, 0.7, 0.7, 1, 3.0],
+            [1, 0.5, 0.5, 0.5, 0, None],
+        ]
+        for group, values in zip(groups, expected_values):
+            self.assertEqual(list(group.aggregations), aggregations)
+            for value, expected_value in zip(group.aggregations.values(), values):
+                if expected_value is None:
+                    self.assertIsNone(value)
+                else:
+                    self.assertAlmostEqual(value, expected_value)
+
+        # The results must match the in-memory aggregation of the same runs
+        all_runs = self.store.search_runs(experiment_ids, "", ViewType.ALL)
+        for filter_string in ["", "metrics.accuracy < 0.75", "params.model_type = 'cnn'"]:
+            groups = self.store.aggregate_runs(
+                experiment_ids, filter_string, ViewType.ALL, ["attributes.status"], aggregations
+            )
+            expected_groups = SearchUtils.aggregate(
+                SearchUtils.filter(all_runs, filter_string), ["attributes.status"], aggregations
+            )
+            self.assertEqual(len(groups), len(expected_groups))
+            for group, expected_group in zip(groups, expected_groups):
+                self.assertEqual(group.group_by, expected_group.group_by)
+                for value, expected_value in zip(
+                    group.aggregations.values(), expected_group.aggregations.values()
+                ):
+                    if expected_value is None:
+                        self.assertIsNone(value)
+                    else:
+                        self.assertAlmostEqual(value, expected_value)
+
+        self.assertEqual(
+            self.store.aggregate_runs(
+                experiment_ids, "metrics.accuracy > 1", ViewType.ALL, [], ["count(*)"]
+            ),
+            [],
+        )
+        with self.assertRaisesRegex(MlflowException, "Only metrics can be aggregated"):
+            self.store.aggregate_runs(
+                experiment_ids, "", ViewType.ALL, [], ["avg(params.model_type)"]
+            )
+
     def test_log_metric(self):
         run = self._run_factory()
 
@@ -459,6 +459,26 @@ def test_search_pagination(mlflow_client, backend_store_uri):
     assert result.token is None
 
 
+def test_aggregate_runs(mlflow_client, backend_store_uri):
+    experiment_id = mlflow_client.create_experiment("aggregate_runs")
+    for model_type, accuracy in [("cnn", 0.9), ("cnn", 0.8), ("rnn", 0.7)]:
+        run_id = mlflow_client.create_run(experiment_id).info.run_id
+        mlflow_client.log_param(run_id, "model_type", model_type)
+        mlflow_client.log_metric(run_id, "accuracy", accuracy)
+
+    groups = mlflow_client.aggregate_runs(
+        experiment_id,
+        group_by=["params.model_type"],
+        aggregations=["count(*)", "avg(metrics.accuracy)", "max(metrics.loss)"],
+        filter_string="metrics.accuracy > 0.75",
+    )
+    assert len(groups) == 1
+    assert groups[0].group_by == {"params.model_type": "cnn"}
+    assert groups[0].aggregations["count(*)"] == 2
+    assert groups[0].aggregations["avg(metrics.accuracy)"] == pytest.approx(0.85)
+    assert groups[0].aggregations["max(metrics.loss)"] is None
+
+
 def test_get_experiment_by_name(mlflow_client, backend_store_uri):
     name = "test_get_experiment_by_name"
     experiment_id = mlflow_client.create_experiment(name)
@@ -606,6 +606,18 @@ def test_log_dict(subdir, extension):
             assert loaded == dictionary
 
 
+def test_log_text_and_dict_utf8_and_open_artifact():
+    with mlflow.start_run() as run:
+        mlflow.log_text("caf\u00e9", "dir/file.txt")
+        mlflow.log_dict({"k": "v"}, "data.json")
+
+    client = MlflowClient()
+    with client.open_artifact(run.info.run_id, "dir/file.txt") as f:
+        assert f.read().decode("utf-8") == "caf\u00e9"
+    with client.open_artifact(run.info.run_id, "data.json") as f:
+        assert json.load(f) == {"k": "v"}
+
+
 @pytest.mark.large
 @pytest.mark.parametrize("subdir", [None, ".", "dir", "dir1/dir2", "dir/.."])
 def test_log_figure_matplotlib(subdir):
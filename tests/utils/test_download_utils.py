@@ -0,0 +1,185 @@
+import base64
+import hashlib
+import os
+from unittest import mock
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+from mlflow.exceptions import MlflowException
+from mlflow.utils import download_utils
+from mlflow.utils.download_utils import (
+    Checksum,
+    RemoteFile,
+    checksum_from_base64,
+    checksum_from_s3_etag,
+    download_resumably,
+)
+from mlflow.utils.file_utils import download_file_using_http_uri
+
+CONTENTS = b"0123456789"
+MD5 = Checksum("md5", hashlib.md5(CONTENTS).digest())
+
+
+@pytest.fixture(autouse=True)
+def no_resume_backoff(monkeypatch):
+    monkeypatch.setattr(download_utils, "_RESUME_BACKOFF_SECONDS", 0)
+
+
+def make_fetch(failures, remote_file=RemoteFile(len(CONTENTS), MD5), contents=CONTENTS):
+    """
+    Return a function to pass to `download_resumably` that records the offsets it is called with
+    and, on its n-th call, writes `failures[n]` bytes before failing if `failures[n]` is not None.
+    """
+    starts = []
+
+    def fetch(start, output_file):
+        starts.append(start)
+        num_bytes = failures[len(starts) - 1] if len(starts) <= len(failures) else None
+        if num_bytes is None:
+            output_file.write(contents[start:])
+            return remote_file
+        output_file.write(contents[start : start + num_bytes])
+        raise ConnectionError("Connection reset")
+
+    fetch.starts = starts
+    return fetch
+
+
+def test_download_is_resumed_from_last_received_byte(tmpdir):
+    local_path = tmpdir.join("file").strpath
+    fetch = make_fetch([4, 3])
+    download_resumably(local_path, fetch, "file")
+    assert fetch.starts == [0, 4, 7]
+    assert open(local_path, "rb").read() == CONTENTS
+    assert os.listdir(tmpdir.strpath) == ["file"]
+
+
+def test_failures_without_progress_are_raised_immediately(tmpdir):
+    fetch = make_fetch([4, 0])
+    with pytest.raises(ConnectionError, match="Connection reset"):
+        download_resumably(tmpdir.join("file").strpath, fetch, "file")
+    assert fetch.starts == [0, 4]
+    assert os.listdir(tmpdir.strpath) == []
+
+
+def test_number_of_attempts_is_configurable(tmpdir, monkeypatch):
+    monkeypatch.setenv("MLFLOW_ARTIFACT_DOWNLOAD_MAX_ATTEMPTS", "2")
+    fetch = make_fetch([1, 1, 1])
+    with pytest.raises(ConnectionError, match="Connection reset"):
+        download_resumably(tmpdir.join("file").strpath, fetch, "file")
+    assert fetch.starts == [0, 1]
+
+    monkeypatch.setenv("MLFLOW_ARTIFACT_DOWNLOAD_MAX_ATTEMPTS", "0")
+    with pytest.raises(MlflowException, match="Expected a positive integer"):
+        download_resumably(tmpdir.join("file").strpath, make_fetch([]), "file")
+
+
+@pytest.mark.parametrize(
+    "remote_file,error",
+    [
+        (RemoteFile(11, None), "received 10 bytes out of 11"),
+        (RemoteFile(10, Checksum("md5", hashlib.md5(b"other").digest())), "md5 checksum"),
+        (RemoteFile(None, Checksum("crc32c", b"\x00\x00\x00\x00")), "crc32c checksum"),
+    ],
+)
+def test_mismatching_downloads_are_rejected(tmpdir, remote_file, error):
+    local_path = tmpdir.join("file")
+    local_path.write("previous contents")
+    with pytest.raises(MlflowException, match=error):
+        download_resumably(local_path.strpath, make_fetch([], remote_file), "file")
+    # Existing files are only replaced by verified downloads
+    assert local_path.read() == "previous contents"
+    assert os.listdir(tmpdir.strpath) == ["file"]
+
+
+def test_checksum_parsing():
+    encoded_md5 = base64.b64encode(MD5.digest).decode()
+    assert checksum_from_base64("md5", encoded_md5) == MD5
+    assert checksum_from_base64("md5", None) is None
+    assert checksum_from_base64("md5", "not base64!") is None
+
+    etag = '"{}"'.format(MD5.digest.hex())
+    assert checksum_from_s3_etag(etag) == MD5
+    assert checksum_from_s3_etag(etag, server_side_encryption="AES256") == MD5
+    assert checksum_from_s3_etag(etag, server_side_encryption="aws:kms") is None
+    assert checksum_from_s3_etag(etag, sse_customer_algorithm="AES256") is None
+    assert checksum_from_s3_etag('"{}-3"'.format(MD5.digest.hex())) is None
+
+
+def mock_http_response(status_code, contents, headers):
+    response = mock.MagicMock(status_code=status_code, headers=CaseInsensitiveDict(headers))
+    response.__enter__.return_value = response
+    response.iter_content.return_value = [contents]
+    return response
+
+
+def test_http_download_is_resumed_with_range_requests(tmpdir):
+    md5_header = base64.b64encode(MD5.digest).decode()
+    interrupted_response = mock_http_response(
+        200,
+        CONTENTS[:6],
+        {"Content-Length": "10", "ETag": '"etag"', "x-goog-hash": "crc32c=AAAA, md5=" + md5_header},
+    )
+    interrupted_response.iter_content.side_effect = lambda chunk_size: _interrupted(CONTENTS[:6])
+    responses = [
+        interrupted_response,
+        mock_http_response(206, CONTENTS[6:], {"Content-Range": "bytes 6-9/10"}),
+    ]
+    local_path = tmpdir.join("file").strpath
+    with mock.patch(
+        "mlflow.utils.file_utils.cloud_storage_http_request", side_effect=responses
+    ) as request_mock:
+        download_file_using_http_uri("https://host/file?sig=secret", local_path)
+    assert open(local_path, "rb").read() == CONTENTS
+    assert [call[1]["headers"] for call in request_mock.call_args_list] == [
+        {},
+        {"Range": "bytes=6-", "If-Match": '"etag"'},
+    ]
+
+
+def test_http_download_handles_servers_ignoring_ranges(tmpdir):
+    interrupted_response = mock_http_response(200, b"", {"Content-Length": "10"})
+    interrupted_response.iter_content.side_effect = lambda chunk_size: _interrupted(CONTENTS[:6])
+    responses = [interrupted_response, mock_http_response(200, CONTENTS, {"Content-Length": "10"})]
+    local_path = tmpdir.join("file").strpath
+    with mock.patch("mlflow.utils.file_utils.cloud_storage_http_request", side_effect=responses):
+        download_file_using_http_uri("https://host/file", local_path)
+    assert open(local_path, "rb").read() == CONTENTS
+
+
+def test_http_download_is_verified_against_s3_etag(tmpdir):
+    response = mock_http_response(
+        200,
+        b"corrupted!",
+        {"Content-Length": "10", "ETag": '"{}"'.format(MD5.digest.hex()), "x-amz-request-id": "1"},
+    )
+    local_path = tmpdir.join("file").strpath
+    with mock.patch(
+        "mlflow.utils.file_utils.cloud_storage_http_request", return_value=response
+    ), pytest.raises(MlflowException, match="md5 checksum") as exc:
+        download_file_using_http_uri("https://host/file?sig=secret", local_path)
+    assert "secret" not in str(exc.value)
+    assert os.listdir(tmpdir.strpath) == []
+
+
+@pytest.mark.parametrize(
+    "encoding_headers", [{"Content-Encoding": "gzip"}, {"x-goog-stored-content-encoding": "gzip"}],
+)
+def test_http_download_of_encoded_contents_is_not_verified(tmpdir, encoding_headers):
+    # GCS reports the size and hash of the stored, compressed object when transcoding it
+    md5_header = base64.b64encode(hashlib.md5(b"compressed").digest()).decode()
+    headers = {"Content-Length": "4", "x-goog-hash": "md5=" + md5_header}
+    headers.update(encoding_headers)
+    local_path = tmpdir.join("file").strpath
+    with mock.patch(
+        "mlflow.utils.file_utils.cloud_storage_http_request",
+        return_value=mock_http_response(200, CONTENTS, headers),
+    ):
+        download_file_using_http_uri("https://host/file", local_path)
+    assert open(local_path, "rb").read() == CONTENTS
+
+
+def _interrupted(data):
+    yield data
+    raise ConnectionError("Connection reset")
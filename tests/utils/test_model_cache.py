@@ -0,0 +1,105 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mlflow.utils.model_cache import ModelCache
+
+
+class RecordingLoader(object):
+    def __init__(self, sizes=None, delay=0):
+        self.sizes = sizes or {}
+        self.delay = delay
+        self.loaded = []
+        self._lock = threading.Lock()
+
+    def __call__(self, key):
+        time.sleep(self.delay)
+        with self._lock:
+            self.loaded.append(key)
+        if key == "broken":
+            raise ValueError("Failed to load")
+        return "model-{}".format(key), self.sizes.get(key, 1)
+
+
+def test_models_are_loaded_once_and_cached():
+    loader = RecordingLoader()
+    cache = ModelCache(loader)
+    assert cache.get("a") == "model-a"
+    assert cache.get("a") == "model-a"
+    assert loader.loaded == ["a"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["models"]) == (1, 1, 1)
+
+
+def test_least_recently_used_models_are_evicted_first():
+    loader = RecordingLoader()
+    cache = ModelCache(loader, max_models=2)
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    cache.get("c")
+    assert cache.keys() == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+    cache.get("b")
+    assert loader.loaded == ["a", "b", "c", "b"]
+
+
+def test_models_are_evicted_when_the_cache_exceeds_its_size():
+    cache = ModelCache(
+        RecordingLoader(sizes={"a": 40, "b": 40, "c": 30, "d": 200}), max_size_bytes=100
+    )
+    cache.get("a")
+    cache.get("b")
+    cache.get("c")
+    assert cache.keys() == ["b", "c"]
+    assert cache.stats()["size_bytes"] == 70
+    # A model larger than the cache is kept until the next load
+    cache.get("d")
+    assert cache.keys() == ["d"]
+    assert cache.stats()["size_bytes"] == 200
+
+
+def test_concurrent_loads_of_a_model_are_deduplicated():
+    loader = RecordingLoader(delay=0.2)
+    cache = ModelCache(loader)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(cache.get, ["a"] * 8))
+    assert models == ["model-a"] * 8
+    assert loader.loaded == ["a"]
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["deduplicated_loads"] + stats["hits"] == 7
+    assert stats["deduplicated_loads"] > 0
+
+
+def test_failed_loads_are_raised_to_all_waiting_requests_and_not_cached():
+    loader = RecordingLoader(delay=0.2)
+    cache = ModelCache(loader)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(cache.get, "broken") for _ in range(4)]
+    for future in futures:
+        with pytest.raises(ValueError, match="Failed to load"):
+            future.result()
+    assert cache.keys() == []
+    assert cache.stats()["load_failures"] == 1
+    with pytest.raises(ValueError, match="Failed to load"):
+        cache.get("broken")
+    assert loader.loaded == ["broken", "broken"]
+
+
+def test_evicted_models_are_released():
+    evicted = []
+
+    def on_evict(key, model):
+        evicted.append((key, model))
+        if key == "b":
+            raise ValueError("Failed to release")
+
+    cache = ModelCache(RecordingLoader(), max_models=1, on_evict=on_evict)
+    cache.get("a")
+    cache.get("b")
+    # Failures to release a model are logged, without failing the request
+    assert cache.get("c") == "model-c"
+    assert evicted == [("a", "model-a"), ("b", "model-b")]
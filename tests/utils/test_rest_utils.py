@@ -12,6 +12,7 @@ from mlflow.utils.rest_utils import (
     MlflowHostCreds,
     _DEFAULT_HEADERS,
     call_endpoint,
+    ConditionalResponseCache,
 )
 from mlflow.protos.service_pb2 import GetRun
 from tests import helper_functions
@@ -226,6 +227,17 @@ def test_http_request_wrapper(request):
         http_request_safe(host_only, "/my/endpoint", "GET")
 
 
+def test_conditional_response_cache_evicts_least_recently_used_entries():
+    cache = ConditionalResponseCache(max_entries=2)
+    cache.put("a", '"1"', "{}")
+    cache.put("b", '"2"', "{}")
+    assert cache.get("a") == ('"1"', "{}")
+    cache.put("c", '"3"', "{}")
+    assert cache.get("b") is None
+    assert cache.get("a") == ('"1"', "{}")
+    assert cache.get("c") == ('"3"', "{}")
+
+
 def test_numpy_encoder():
     test_number = numpy.int64(42)
     ne = NumpyEncoder()
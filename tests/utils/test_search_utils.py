@@ -408,6 +408,108 @@ def test_order_by_metric_with_nans_infs_nones():
     assert ["inf", "1000", "0", "-1000", "-inf", "nan", "None"] == sorted_runs_desc
 
 
+@pytest.mark.parametrize(
+    "aggregation, parsed_aggregation",
+    [
+        ("avg(metrics.acc)", ("avg", "acc", None)),
+        ("MIN( metric.`val loss` )", ("min", "val loss", None)),
+        ('max(metrics."a.b")', ("max", "a.b", None)),
+        ("count(*)", ("count", None, None)),
+        ("count(metrics.acc)", ("count", "acc", None)),
+        ("p90(metrics.latency)", ("percentile", "latency", 90.0)),
+        ("p99.9(metrics.latency)", ("percentile", "latency", 99.9)),
+    ],
+)
+def test_parse_aggregation_for_aggregate_runs(aggregation, parsed_aggregation):
+    assert SearchUtils.parse_aggregation_for_aggregate_runs(aggregation) == parsed_aggregation
+
+
+@pytest.mark.parametrize(
+    "aggregation, error_message",
+    [
+        ("metrics.acc", "Invalid aggregation"),
+        ("sum(metrics.acc)", "Invalid aggregation function"),
+        ("p101(metrics.acc)", "Invalid percentile"),
+        ("avg(*)", "Only 'count' can be applied"),
+        ("avg(params.p)", "Only metrics can be aggregated"),
+        ("avg(acc)", "Invalid identifier"),
+    ],
+)
+def test_invalid_aggregation_for_aggregate_runs(aggregation, error_message):
+    with pytest.raises(MlflowException) as e:
+        SearchUtils.parse_aggregation_for_aggregate_runs(aggregation)
+    assert error_message in e.value.message
+
+
+@pytest.mark.parametrize(
+    "group_by, error_message",
+    [
+        ("metrics.acc", "Runs can only be grouped by params, tags"),
+        ("attributes.artifact_uri", "Invalid attribute key"),
+        ("acc", "Invalid identifier"),
+    ],
+)
+def test_invalid_group_by_for_aggregate_runs(group_by, error_message):
+    with pytest.raises(MlflowException) as e:
+        SearchUtils.parse_group_by_for_aggregate_runs(group_by)
+    assert error_message in e.value.message
+
+
+def test_aggregate():
+    def create_run(run_id, metrics, params):
+        return Run(
+            run_info=RunInfo(
+                run_uuid=run_id,
+                run_id=run_id,
+                experiment_id="0",
+                user_id="user-id",
+                status=RunStatus.to_string(RunStatus.FINISHED),
+                start_time=0,
+                end_time=1,
+                lifecycle_stage=LifecycleStage.ACTIVE,
+            ),
+            run_data=RunData(
+                metrics=[Metric(key, value, 1, 0) for key, value in metrics.items()],
+                params=[Param(key, value) for key, value in params.items()],
+                tags=[],
+            ),
+        )
+
+    runs = [
+        create_run("1", {"acc": 0.5, "loss": 2.0}, {"model": "b"}),
+        create_run("2", {"acc": 0.7, "loss": float("nan")}, {"model": "b"}),
+        create_run("3", {"acc": 0.9}, {"model": "a"}),
+        create_run("4", {"acc": 0.1, "loss": 4.0}, {}),
+    ]
+    aggregations = [
+        "count(*)",
+        "min(metrics.acc)",
+        "max(metrics.acc)",
+        "avg(metrics.acc)",
+        "p50(metrics.acc)",
+        "count(metrics.loss)",
+        "avg(metrics.loss)",
+    ]
+    groups = SearchUtils.aggregate(runs, ["params.model", "attributes.user_id"], aggregations)
+    assert [list(group.group_by.values()) for group in groups] == [
+        ["a", "user-id"],
+        ["b", "user-id"],
+        [None, "user-id"],
+    ]
+    assert list(groups[0].aggregations.items()) == list(
+        zip(aggregations, [1, 0.9, 0.9, 0.9, 0.9, 0, None])
+    )
+    assert list(groups[1].aggregations.values()) == pytest.approx([2, 0.5, 0.7, 0.6, 0.6, 1, 2.0])
+    assert list(groups[2].aggregations.values()) == [1, 0.1, 0.1, 0.1, 0.1, 1, 4.0]
+
+    groups = SearchUtils.aggregate(runs, [], ["count(*)", "p75(metrics.acc)"])
+    assert len(groups) == 1
+    assert groups[0].group_by == {}
+    assert list(groups[0].aggregations.values()) == pytest.approx([4, 0.75])
+
+    assert SearchUtils.aggregate([], ["params.model"], ["count(*)"]) == []
+
+
 @pytest.mark.parametrize(
     "order_by, error_message",
     [